@@ -0,0 +1,128 @@
+"""
+Backup encryption benchmark: in-memory gzip + per-byte XOR vs. streaming AEAD
+
+Builds a throw-away SQLite database of roughly --mb megabytes and measures
+both directions of routes/backup.py:
+
+  before  open().read() + gzip.compress(level 9) + simple_encrypt()
+          (repeating-key XOR through a Python generator), restore the reverse
+          (old behaviour, embedded below)
+  after   services/backup_service.write_backup(): 1 MiB blocks -> gzip level 6
+          -> 64 KiB XChaCha20-Poly1305 secretstream records -> file, and
+          restore_to_file() (also used for legacy XOR files)
+
+Both restores must reproduce the database byte for byte, and the new restore
+must read the legacy file too. Peak Python heap (tracemalloc) is reported.
+
+Usage:
+    cd backend
+    python benchmarks/bench_backup_crypto.py [--mb 32]
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.backup_service import restore_to_file, write_backup  # noqa: E402
+
+PASSWORD = "bench-password"
+LEGACY_SALT = "CIRS_BACKUP_SALT_2024"
+
+
+def legacy_encrypt(data: bytes, password: str) -> bytes:
+    """Old routes/backup.simple_encrypt (also its own inverse)"""
+    key = hashlib.pbkdf2_hmac('sha256', password.encode(), LEGACY_SALT.encode(), 100000, dklen=32)
+    extended_key = (key * ((len(data) // len(key)) + 1))[:len(data)]
+    return bytes(a ^ b for a, b in zip(data, extended_key))
+
+
+def legacy_backup(db_path: str, dest: str):
+    with open(db_path, 'rb') as f:
+        db_data = f.read()
+    with open(dest, 'wb') as f:
+        f.write(legacy_encrypt(gzip.compress(db_data, compresslevel=9), PASSWORD))
+
+
+def legacy_restore(path: str, dest: str):
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(dest, 'wb') as f:
+        f.write(gzip.decompress(legacy_encrypt(data, PASSWORD)))
+
+
+def build_db(path: str, megabytes: int):
+    """Inventory / audit-like rows: compressible, but not trivially"""
+    words = ["water", "rice", "blanket", "bandage", "生理食鹽水", "口罩", "battery", "tent", "A區", "B區"]
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE audit (id INTEGER PRIMARY KEY, ts TEXT, station TEXT, item TEXT, qty INTEGER, note TEXT)")
+    rows_per_mb = 14000
+    rng = random.Random(1)
+    for _ in range(megabytes):
+        conn.executemany(
+            "INSERT INTO audit (ts, station, item, qty, note) VALUES (?, ?, ?, ?, ?)",
+            ((f"2024-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+              f"STATION-{rng.randint(1, 40):02d}", rng.choice(words), rng.randint(1, 500),
+              rng.randbytes(12).hex()) for _ in range(rows_per_mb))
+        )
+    conn.commit()
+    conn.close()
+
+
+def measure(label: str, fn, *args, size: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<22} {elapsed:7.2f} s  {size / elapsed / 1e6:7.1f} MB/s  peak heap {peak / 1e6:8.1f} MB")
+
+
+def same_file(a: str, b: str) -> bool:
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        return hashlib.sha256(fa.read()).digest() == hashlib.sha256(fb.read()).digest()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=32)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="cirs-bench-")
+    try:
+        db = os.path.join(tmp, "cirs.db")
+        build_db(db, args.mb)
+        size = os.path.getsize(db)
+        print(f"database {size / 1e6:.1f} MB")
+
+        legacy_file = os.path.join(tmp, "legacy.db.gz.enc")
+        stream_file = os.path.join(tmp, "stream.db.gz.enc")
+        measure("before: backup", legacy_backup, db, legacy_file, size=size)
+        measure("after:  backup", write_backup, db, stream_file, PASSWORD, size=size)
+        print(f"  file size: before {os.path.getsize(legacy_file) / 1e6:.1f} MB, "
+              f"after {os.path.getsize(stream_file) / 1e6:.1f} MB")
+
+        out = os.path.join(tmp, "restored.db")
+        measure("before: restore", legacy_restore, legacy_file, out, size=size)
+        assert same_file(db, out), "legacy restore mismatch"
+        measure("after:  restore", restore_to_file, stream_file, out, PASSWORD, size=size)
+        assert same_file(db, out), "streaming restore mismatch"
+        measure("after:  legacy file", restore_to_file, legacy_file, out, PASSWORD, size=size)
+        assert same_file(db, out), "legacy file via new restore mismatch"
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
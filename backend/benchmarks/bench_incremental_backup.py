@@ -0,0 +1,122 @@
+"""
+Incremental backup benchmark: full backup every time vs. page deltas
+
+Builds a throw-away WAL database of roughly --mb megabytes, then simulates
+--rounds scheduled backups, each after --changes row updates / inserts:
+
+  before  backup_database(): snapshot + gzip + encrypt of the whole database
+          (every scheduled backup is a full copy)
+  after   backup_database_incremental(): snapshot + BLAKE2b page digests,
+          only changed pages written (.delta.gz.enc) after the first full one
+
+Reports time and bytes written per backup (what lands on the USB stick),
+then restores the last delta through its chain and checks it matches the
+live database.
+
+Usage:
+    cd backend
+    python benchmarks/bench_incremental_backup.py [--mb 32] [--rounds 5] [--changes 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.backup_service import backup_database, backup_database_incremental, restore_to_file  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+def build_db(path: str, megabytes: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE inventory (id INTEGER PRIMARY KEY, station TEXT, item TEXT, qty INTEGER, note TEXT)")
+    rng = random.Random(1)
+    for _ in range(megabytes):
+        conn.executemany(
+            "INSERT INTO inventory (station, item, qty, note) VALUES (?, ?, ?, ?)",
+            ((f"STATION-{rng.randint(1, 40):02d}", f"ITEM-{rng.randint(0, 999):04d}", rng.randint(1, 500),
+              rng.randbytes(12).hex()) for _ in range(14000))
+        )
+    conn.commit()
+    return conn
+
+
+def mutate(conn: sqlite3.Connection, changes: int, rng: random.Random):
+    max_id = conn.execute("SELECT MAX(id) FROM inventory").fetchone()[0]
+    for _ in range(changes):
+        conn.execute("UPDATE inventory SET qty = qty - 1 WHERE id = ?", (rng.randint(1, max_id),))
+    conn.execute("INSERT INTO inventory (station, item, qty, note) VALUES ('STATION-01', 'ITEM-0001', 1, 'new')")
+    conn.commit()
+
+
+def fingerprint(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*), SUM(qty), MAX(id) FROM inventory").fetchone()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="cirs-bench-")
+    try:
+        db = os.path.join(tmp, "cirs.db")
+        conn = build_db(db, args.mb)
+        print(f"database {os.path.getsize(db) / 1e6:.1f} MB, {args.changes} row updates between backups")
+
+        full_dir = os.path.join(tmp, "full")
+        delta_dir = os.path.join(tmp, "delta")
+        os.makedirs(full_dir)
+        os.makedirs(delta_dir)
+        rng = random.Random(2)
+        totals = {"before": [0.0, 0], "after": [0.0, 0]}
+        last = None
+        for round_no in range(args.rounds):
+            if round_no:
+                mutate(conn, args.changes, rng)
+
+            start = time.perf_counter()
+            full = backup_database(db, os.path.join(full_dir, f"b{round_no}.db.gz.enc"), PASSWORD)
+            full_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            last = backup_database_incremental(db, delta_dir, f"b{round_no}", PASSWORD)
+            delta_time = time.perf_counter() - start
+
+            totals["before"][0] += full_time
+            totals["before"][1] += full["size"]
+            totals["after"][0] += delta_time
+            totals["after"][1] += last["size"]
+            print(f"  backup {round_no}: before {full_time:5.2f} s {full['size'] / 1e6:7.2f} MB   "
+                  f"after ({last['kind']:<5} {last['pages_changed']:>5} pages) {delta_time:5.2f} s "
+                  f"{last['size'] / 1e6:7.2f} MB")
+        print(f"  total:    before {totals['before'][0]:5.2f} s {totals['before'][1] / 1e6:7.2f} MB   "
+              f"after {totals['after'][0]:5.2f} s {totals['after'][1] / 1e6:7.2f} MB")
+
+        out = os.path.join(tmp, "restored.db")
+        start = time.perf_counter()
+        restore_to_file(last["path"], out, PASSWORD)
+        print(f"  chain restore {time.perf_counter() - start:.2f} s")
+        assert fingerprint(out) == fingerprint(db), "restored chain does not match the database"
+        conn.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
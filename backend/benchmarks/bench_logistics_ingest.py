@@ -0,0 +1,188 @@
+"""
+Logistics packet ingestion benchmark: per-action statements vs. set-based apply
+
+Builds real REPORT_PACKETs with shared/protocol/report.ReportBuilder (signed
+with a provisioned station secret, sealed to the Hub key) and measures the
+write-locked apply phase of /api/logistics/ingest on a throw-away database:
+
+  before  one `SELECT ... WHERE name = ?` + one UPDATE + one audit INSERT per
+          action, inventory.name unindexed (old behaviour)
+  after   apply_report_actions(): one IN (...) lookup on idx_inventory_name,
+          one UPDATE per touched item, executemany audit rows
+
+Both rounds must leave identical inventory quantities and audit rows. The
+full endpoint (decrypt + HMAC + dedup + apply) is timed for the new path too.
+
+Usage:
+    cd backend
+    python benchmarks/bench_logistics_ingest.py [--packets 20] [--actions 500] [--items 50] [--inventory 5000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR.parent))
+
+# Point the Hub at a temporary database before anything opens it
+_tmp = tempfile.mkdtemp(prefix="xirs-bench-")
+import database  # noqa: E402
+database.DATA_DIR = Path(_tmp)
+database.DB_PATH = os.path.join(_tmp, database.DB_NAME)
+
+from database import init_db, write_db  # noqa: E402
+from routes.logistics import (  # noqa: E402
+    IngestPacketRequest, apply_report_actions, get_or_create_hub_keys, ingest_packet, log_audit
+)
+from shared.crypto.hmac import generate_station_secret  # noqa: E402
+from shared.protocol.report import ReportBuilder, ReportDecryptor  # noqa: E402
+
+STATION_ID = "STATION-BENCH"
+
+
+def legacy_apply(conn, station_id: str, packet_id: str, actions: list):
+    """Old ingest_packet action loop (one round trip per statement)"""
+    for action in actions:
+        action_type = action.get('type')
+        item_code = action.get('item_code')
+        qty = action.get('qty', 0)
+
+        if action_type == 'RECEIVE':
+            manifest_id = action.get('manifest_id')
+            if manifest_id:
+                conn.execute("""
+                    UPDATE logistics_manifests
+                    SET status = 'ACKNOWLEDGED', acknowledged_at = CURRENT_TIMESTAMP
+                    WHERE manifest_id = ?
+                """, (manifest_id,))
+            inv_row = conn.execute("SELECT id, quantity FROM inventory WHERE name = ?", (item_code,)).fetchone()
+            if inv_row:
+                conn.execute("UPDATE inventory SET quantity = quantity + ? WHERE id = ?", (qty, inv_row['id']))
+
+        elif action_type == 'DISPENSE':
+            inv_row = conn.execute("SELECT id, quantity FROM inventory WHERE name = ?", (item_code,)).fetchone()
+            if inv_row:
+                new_qty = max(0, inv_row['quantity'] - qty)
+                conn.execute("UPDATE inventory SET quantity = ? WHERE id = ?", (new_qty, inv_row['id']))
+
+        log_audit(conn, f'ACTION_{action_type}', station_id, packet_id, details=json.dumps(action))
+
+
+def seed(inventory_rows: int, items: int) -> list:
+    """Inventory with `items` report item codes among `inventory_rows` rows"""
+    codes = [f"ITEM-{i:04d}" for i in range(items)]
+    with write_db() as conn:
+        conn.executemany(
+            "INSERT INTO inventory (name, category, quantity) VALUES (?, 'other', 0)",
+            ((f"filler {i}",) for i in range(inventory_rows - items))
+        )
+        conn.executemany(
+            "INSERT INTO inventory (name, category, quantity) VALUES (?, 'supplies', ?)",
+            ((code, random.randint(0, 200)) for code in codes)
+        )
+    return codes
+
+
+def build_envelopes(packets: int, actions: int, codes: list) -> list:
+    with write_db() as conn:
+        keys = get_or_create_hub_keys(conn)
+        secret = generate_station_secret()
+        conn.execute(
+            "INSERT INTO logistics_stations (station_id, display_name, station_secret) VALUES (?, ?, ?)",
+            (STATION_ID, "Bench Station", secret)
+        )
+
+    builder = ReportBuilder(STATION_ID, secret, keys['encryption_public'])
+    envelopes = []
+    for _ in range(packets):
+        report_actions = []
+        for _ in range(actions):
+            action_type = random.choice(["DISPENSE", "DISPENSE", "DISPENSE", "RECEIVE", "REGISTER"])
+            if action_type == "REGISTER":
+                report_actions.append({"type": "REGISTER", "person_id": f"P{random.randint(1, 999):04d}"})
+            else:
+                report_actions.append({"type": action_type, "item_code": random.choice(codes),
+                                       "qty": random.randint(1, 20), "unit": "unit"})
+        envelopes.append(builder.encrypt_report(builder.create_report(report_actions)))
+    return envelopes, keys
+
+
+def time_apply(db_path: str, apply, reports: list) -> list:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    timings = []
+    for report in reports:
+        start = time.perf_counter()
+        apply(conn, report['station_id'], report['packet_id'], report['actions'])
+        conn.commit()
+        timings.append((time.perf_counter() - start) * 1000)
+    state = [tuple(row) for row in conn.execute("SELECT id, quantity FROM inventory ORDER BY id")]
+    state += [tuple(row) for row in conn.execute(
+        "SELECT event_type, station_id, packet_id, manifest_id, details FROM logistics_audit ORDER BY id"
+    )]
+    conn.close()
+    return timings, state
+
+
+def summarize(label: str, timings: list, actions: int):
+    print(f"  {label:<8} median {statistics.median(timings):8.2f} ms/packet   "
+          f"max {max(timings):8.2f} ms   ({actions / statistics.median(timings) * 1000:,.0f} actions/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", type=int, default=20)
+    parser.add_argument("--actions", type=int, default=500)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--inventory", type=int, default=5000)
+    args = parser.parse_args()
+    random.seed(1)
+
+    init_db()
+    codes = seed(args.inventory, args.items)
+    envelopes, keys = build_envelopes(args.packets, args.actions, codes)
+    database.close_pool()
+
+    decryptor = ReportDecryptor(keys['encryption_private'])
+    reports = [json.loads(decryptor._sealed_box.decrypt(e['payload'], decompress=e.get('compressed', True)))
+               for e in envelopes]
+
+    before_db = os.path.join(_tmp, "before.db")
+    after_db = os.path.join(_tmp, "after.db")
+    shutil.copy(database.DB_PATH, before_db)
+    shutil.copy(database.DB_PATH, after_db)
+    with sqlite3.connect(before_db) as conn:
+        conn.execute("DROP INDEX IF EXISTS idx_inventory_name")
+
+    print(f"{args.packets} packets x {args.actions} actions, {args.items} item codes, "
+          f"{args.inventory} inventory rows")
+    before, before_state = time_apply(before_db, legacy_apply, reports)
+    after, after_state = time_apply(after_db, apply_report_actions, reports)
+    assert before_state == after_state, "set-based apply diverged from per-action apply"
+    summarize("before", before, args.actions)
+    summarize("after", after, args.actions)
+
+    # Full endpoint on the live database (decrypt + verify + dedup + apply)
+    endpoint = []
+    for envelope in envelopes:
+        start = time.perf_counter()
+        asyncio.run(ingest_packet(IngestPacketRequest(envelope=envelope)))
+        endpoint.append((time.perf_counter() - start) * 1000)
+    summarize("endpoint", endpoint, args.actions)
+
+    database.close_pool()
+    shutil.rmtree(_tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Mixed concurrent load benchmark: event-loop blocking vs. async DB facade
+
+Starts the Hub under uvicorn on a throw-away database, then runs:
+  - N clients polling /api/health and /api/stats
+  - 1 client repeatedly triggering a long VACUUM
+
+Two rounds are measured:
+  before  VACUUM/stats run inline in an `async def` handler (old behaviour)
+  after   the real /api/system/cleanup and /api/stats (db_read / run_in_db_thread)
+
+Usage:
+    cd backend
+    python benchmarks/bench_mixed_load.py [--rows 200000] [--clients 8] [--seconds 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Point the Hub at a temporary database before anything opens it
+_tmp = tempfile.mkdtemp(prefix="xirs-bench-")
+import database  # noqa: E402
+database.DATA_DIR = Path(_tmp)
+database.DB_PATH = os.path.join(_tmp, database.DB_NAME)
+
+import uvicorn  # noqa: E402
+from main import app, _build_stats  # noqa: E402
+from database import get_db, write_db, vacuum_db  # noqa: E402
+
+
+# Old-style handlers: blocking sqlite3 straight on the event loop
+@app.post("/bench/blocking-cleanup")
+async def blocking_cleanup():
+    vacuum_db()
+    return {"success": True}
+
+
+@app.get("/bench/blocking-stats")
+async def blocking_stats():
+    with get_db() as conn:
+        return _build_stats(conn)
+
+
+def seed(rows: int):
+    """Fill event_log so VACUUM has real work to do"""
+    with write_db() as conn:
+        conn.executemany(
+            "INSERT INTO event_log (event_type, notes) VALUES ('BENCH', ?)",
+            ((f"bench row {i} " + "x" * 200,) for i in range(rows))
+        )
+    # Leave free pages behind so every VACUUM rewrites the file
+    with write_db() as conn:
+        conn.execute("DELETE FROM event_log WHERE event_type = 'BENCH' AND id % 2 = 0")
+
+
+def request(base: str, method: str, path: str) -> float:
+    start = time.perf_counter()
+    req = urllib.request.Request(base + path, method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(req, timeout=120) as resp:
+        resp.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_round(base: str, stats_path: str, cleanup_path: str, clients: int, seconds: float) -> dict:
+    stop = time.perf_counter() + seconds
+    health, stats, cleanups = [], [], []
+    lock = threading.Lock()
+
+    def poller(i):
+        while time.perf_counter() < stop:
+            path = "/api/health" if i % 2 == 0 else stats_path
+            ms = request(base, "GET", path)
+            with lock:
+                (health if path == "/api/health" else stats).append(ms)
+
+    def vacuumer():
+        while time.perf_counter() < stop:
+            ms = request(base, "POST", cleanup_path)
+            with lock:
+                cleanups.append(ms)
+
+    threads = [threading.Thread(target=poller, args=(i,)) for i in range(clients)]
+    threads.append(threading.Thread(target=vacuumer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    def summary(samples):
+        if not samples:
+            return {"n": 0}
+        samples = sorted(samples)
+        return {
+            "n": len(samples),
+            "p50_ms": round(statistics.median(samples), 1),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 1),
+            "max_ms": round(samples[-1], 1),
+        }
+
+    return {"health": summary(health), "stats": summary(stats), "vacuum": summary(cleanups)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{args.port}"
+    print(f"Seeding {args.rows} rows into {database.DB_PATH} ...")
+    seed(args.rows)
+
+    results = {
+        "before": run_round(base, "/bench/blocking-stats", "/bench/blocking-cleanup", args.clients, args.seconds),
+        "after": run_round(base, "/api/stats", "/api/system/cleanup", args.clients, args.seconds),
+    }
+    print(json.dumps(results, indent=2))
+
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
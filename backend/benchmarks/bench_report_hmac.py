@@ -0,0 +1,131 @@
+"""
+Report verification benchmark: per-packet secret lookup + double serialization
+vs. cached StationKey + one canonical serialization
+
+Measures the HMAC / dedup-hash step of /api/logistics/ingest on decrypted
+REPORT_PACKETs built with shared/protocol/report.ReportBuilder:
+
+  before  SELECT station_secret per packet, compute_hmac() (base64 decode,
+          re-key HMAC, canonical json.dumps), then a second
+          json.dumps(report, sort_keys=True) for payload_hash (old behaviour)
+  after   station_key_cache.get() + verify_report(): decoded, pre-keyed
+          StationKey; the canonical bytes are serialized once and feed both
+          the HMAC and payload_hash
+
+Both paths must accept every report and reject a tampered one.
+
+Usage:
+    cd backend
+    python benchmarks/bench_report_hmac.py [--packets 200] [--actions 50 500 5000]
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR.parent))
+
+# Point the Hub at a temporary database before anything opens it
+_tmp = tempfile.mkdtemp(prefix="xirs-bench-")
+import database  # noqa: E402
+database.DATA_DIR = Path(_tmp)
+database.DB_PATH = os.path.join(_tmp, database.DB_NAME)
+
+from database import get_db, init_db, write_db  # noqa: E402
+from routes.logistics import PacketRejected, get_or_create_hub_keys, station_key_cache, verify_report  # noqa: E402
+from shared.crypto.hmac import compute_hmac, generate_station_secret  # noqa: E402
+from shared.protocol.report import ReportBuilder  # noqa: E402
+
+STATION_ID = "STATION-BENCH"
+
+
+def legacy_verify(conn, report: dict) -> str:
+    """Old ingest_packet lookup + HMAC + payload_hash"""
+    row = conn.execute(
+        "SELECT station_secret FROM logistics_stations WHERE station_id = ? AND is_active = 1",
+        (report['station_id'],)
+    ).fetchone()
+    signable = {k: v for k, v in report.items() if k != 'hmac'}
+    expected_hmac = compute_hmac(row['station_secret'], signable)
+    if not hmac.compare_digest(expected_hmac, report.get('hmac')):
+        raise PacketRejected(401, "HMAC verification failed")
+    return hashlib.sha256(json.dumps(report, sort_keys=True).encode()).hexdigest()
+
+
+def cached_verify(conn, report: dict) -> str:
+    return verify_report(report, station_key_cache.get(conn, [report['station_id']]))
+
+
+def build_reports(builder: ReportBuilder, packets: int, actions: int) -> list:
+    reports = []
+    for _ in range(packets):
+        report_actions = [
+            {"type": random.choice(["DISPENSE", "RECEIVE"]), "item_code": f"ITEM-{random.randint(0, 999):04d}",
+             "qty": random.randint(1, 20), "unit": "unit", "note": "批次補給"}
+            for _ in range(actions)
+        ]
+        reports.append(builder.create_report(report_actions).to_dict())
+    return reports
+
+
+def time_verify(verify, reports: list) -> list:
+    timings = []
+    with get_db() as conn:
+        for report in reports:
+            start = time.perf_counter()
+            verify(conn, report)
+            timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--packets", type=int, default=200)
+    parser.add_argument("--actions", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+    random.seed(1)
+
+    init_db()
+    secret = generate_station_secret()
+    with write_db() as conn:
+        keys = get_or_create_hub_keys(conn)
+        conn.execute(
+            "INSERT INTO logistics_stations (station_id, display_name, station_secret) VALUES (?, ?, ?)",
+            (STATION_ID, "Bench Station", secret)
+        )
+    builder = ReportBuilder(STATION_ID, secret, keys['encryption_public'])
+
+    for actions in args.actions:
+        reports = build_reports(builder, args.packets, actions)
+        tampered = dict(reports[0], seq_id=reports[0]['seq_id'] + 1)
+        with get_db() as conn:
+            for verify in (legacy_verify, cached_verify):
+                try:
+                    verify(conn, tampered)
+                    raise AssertionError(f"{verify.__name__} accepted a tampered report")
+                except PacketRejected:
+                    pass
+
+        before = time_verify(legacy_verify, reports)
+        after = time_verify(cached_verify, reports)
+        size = len(json.dumps(reports[0])) / 1024
+        print(f"{actions:>6} actions (~{size:,.0f} KB): before {statistics.median(before):9.1f} us   "
+              f"after {statistics.median(after):9.1f} us   "
+              f"({statistics.median(before) / statistics.median(after):.2f}x)")
+
+    database.close_pool()
+    shutil.rmtree(_tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,17 @@ Note: Renamed from cirs.db to xirs_hub.db (v2.0)
 """
 import sqlite3
 from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque, OrderedDict
+import asyncio
+import importlib.util
+import re
 import threading
+import queue
+import time
 import os
 from pathlib import Path
+from typing import Optional
 
 # ============================================================================
 # Environment Detection
@@ -36,12 +44,47 @@ else:
     DB_PATH = str(DATA_DIR / DB_NAME)
     print(f"[xIRS Hub] Running in production mode: {DB_PATH}")
 
+# Connection pool sizing (file-based mode only)
+# Readers are shared by get_db(); write_db() always uses the single writer.
+POOL_READERS = int(os.environ.get("XIRS_DB_POOL_SIZE", "4"))
+POOL_TIMEOUT = float(os.environ.get("XIRS_DB_POOL_TIMEOUT", "30"))
+
+# Group commit settings for the write queue
+# - WRITE_BATCH_MS: max time the first job in a batch waits for companions
+# - WRITE_BATCH_MAX: max jobs committed in one transaction
+# - WRITE_FAIRNESS: 'round_robin' (interleave lanes) or 'fifo'
+WRITE_BATCH_MS = float(os.environ.get("XIRS_WRITE_BATCH_MS", "5"))
+WRITE_BATCH_MAX = int(os.environ.get("XIRS_WRITE_BATCH_MAX", "64"))
+WRITE_FAIRNESS = os.environ.get("XIRS_WRITE_FAIRNESS", "round_robin")
+
+# Versioned migrations
+# schema.sql (+ the legacy upgrade for pre-versioning hubs) brings a database
+# to SCHEMA_BASELINE_VERSION; migrations/NNN_name.(sql|py) above it run once.
+MIGRATIONS_DIR = BACKEND_DIR / "migrations"
+SCHEMA_BASELINE_VERSION = 4
+
 # Global lock for write operations
 db_lock = threading.Lock()
 
+
+class PoolBusy(sqlite3.OperationalError):
+    """drained_pool() could not get every connection back in time"""
+
 # Singleton connection for in-memory mode (persists across requests)
 _memory_connection = None
 
+# Process-wide connection pool (created lazily on first use)
+_pool = None
+_pool_lock = threading.Lock()
+
+# Process-wide group-commit writer (started lazily on first submit)
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+# Worker threads backing the async facade (created lazily)
+_db_executor = None
+_db_executor_lock = threading.Lock()
+
 
 def migrate_db_name():
     """
@@ -75,97 +118,671 @@ def migrate_db_name():
         print(f"[xIRS Hub] Warning: Both {OLD_DB_NAME} and {DB_NAME} exist. Using {DB_NAME}.")
 
 
-def get_connection():
-    """Create a new database connection with optimized settings"""
-    global _memory_connection
+def _open_connection():
+    """Open a file-based connection with the Raspberry Pi PRAGMAs applied"""
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        timeout=30.0  # Wait up to 30 seconds for lock
+    )
+    conn.row_factory = sqlite3.Row
 
-    if IS_VERCEL:
-        # For in-memory mode, reuse the same connection
-        if _memory_connection is None:
-            _memory_connection = sqlite3.connect(
-                DB_PATH,
-                check_same_thread=False,
-                timeout=30.0
-            )
-            _memory_connection.row_factory = sqlite3.Row
-            # Basic pragmas for in-memory
-            _memory_connection.execute("PRAGMA foreign_keys=ON;")
-        return _memory_connection
-    else:
-        # For file-based mode, ensure migration is done first
+    # Critical optimizations for Raspberry Pi
+    conn.execute("PRAGMA journal_mode=WAL;")        # Write-Ahead Logging
+    conn.execute("PRAGMA synchronous=NORMAL;")      # Balance performance/safety
+    conn.execute("PRAGMA cache_size=-64000;")       # 64MB cache
+    conn.execute("PRAGMA temp_store=MEMORY;")       # Temp tables in memory
+    conn.execute("PRAGMA mmap_size=268435456;")     # 256MB mmap
+    conn.execute("PRAGMA foreign_keys=ON;")         # Enable foreign keys
+
+    return conn
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of pre-configured SQLite connections.
+
+    - `readers` connections are handed out by get_db() and returned afterwards
+    - One dedicated writer connection is used by write_db() under db_lock
+    - Every connection is opened and configured once, then kept alive
+    """
+
+    def __init__(self, readers: int = POOL_READERS, timeout: float = POOL_TIMEOUT):
+        # File housekeeping happens once per pool, not once per request
         migrate_db_name()
 
-        # Ensure data directory exists
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        self.size = max(1, readers)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        # Cleared by drain(): new checkouts wait so the drain is not starved
+        self._open = threading.Event()
+        self._open.set()
+        self._local = threading.local()  # readers held per thread
+
+        self.writer = _open_connection()
+        for _ in range(self.size):
+            self._idle.put(_open_connection())
+
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "timeouts": 0,
+            "replaced": 0,
+            "writer_checkouts": 0,
+            "writer_wait_ms_total": 0.0,
+            "writer_wait_ms_max": 0.0,
+        }
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a reader connection, waiting up to `timeout` seconds"""
+        start = time.perf_counter()
+        # A thread already holding a reader is let through while draining,
+        # it could otherwise never return the one it has
+        held = getattr(self._local, "held", 0)
+        if held or self._open.wait(self.timeout):
+            conn = self._take(self.timeout)
+        else:
+            conn = None
+        if conn is None:
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise sqlite3.OperationalError(
+                f"Connection pool exhausted ({self.size} connections busy for {self.timeout}s)"
+            )
+        self._local.held = held + 1
+        waited = (time.perf_counter() - start) * 1000
+
+        with self._stats_lock:
+            s = self._stats
+            s["checkouts"] += 1
+            s["in_use"] += 1
+            s["peak_in_use"] = max(s["peak_in_use"], s["in_use"])
+            s["wait_ms_total"] += waited
+            s["wait_ms_max"] = max(s["wait_ms_max"], waited)
+        return conn
+
+    def _take(self, timeout: float) -> Optional[sqlite3.Connection]:
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, conn: sqlite3.Connection, broken: bool = False):
+        """Return a reader connection; broken connections are replaced"""
+        with self._stats_lock:
+            self._stats["in_use"] -= 1
+        held = getattr(self._local, "held", 0)
+        if held:
+            self._local.held = held - 1
+
+        if self._closed:
+            conn.close()
+            return
+
+        if broken or conn.in_transaction:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            conn = _open_connection()
+            with self._stats_lock:
+                self._stats["replaced"] += 1
+
+        self._idle.put(conn)
+
+    def record_writer_wait(self, waited_ms: float):
+        """Record how long a write_db() caller waited for db_lock"""
+        with self._stats_lock:
+            s = self._stats
+            s["writer_checkouts"] += 1
+            s["writer_wait_ms_total"] += waited_ms
+            s["writer_wait_ms_max"] = max(s["writer_wait_ms_max"], waited_ms)
+
+    def stats(self) -> dict:
+        """Pool sizing and checkout-wait metrics"""
+        with self._stats_lock:
+            s = dict(self._stats)
+
+        checkouts = s["checkouts"]
+        writer_checkouts = s["writer_checkouts"]
+        return {
+            "mode": "pool",
+            "readers": self.size,
+            "idle": self._idle.qsize(),
+            "in_use": s["in_use"],
+            "peak_in_use": s["peak_in_use"],
+            "checkouts": checkouts,
+            "timeouts": s["timeouts"],
+            "replaced": s["replaced"],
+            "wait_ms_avg": round(s["wait_ms_total"] / checkouts, 3) if checkouts else 0.0,
+            "wait_ms_max": round(s["wait_ms_max"], 3),
+            "writer": {
+                "checkouts": writer_checkouts,
+                "wait_ms_avg": round(s["writer_wait_ms_total"] / writer_checkouts, 3) if writer_checkouts else 0.0,
+                "wait_ms_max": round(s["writer_wait_ms_max"], 3),
+            },
+        }
+
+    def drain(self) -> list:
+        """
+        Stop new checkouts and collect every reader as it is returned.
+        Raises PoolBusy (checkouts reopened) if readers stay busy for `timeout`.
+        """
+        self._open.clear()
+        held = []
+        deadline = time.perf_counter() + self.timeout
+        while len(held) < self.size:
+            conn = self._take(max(deadline - time.perf_counter(), 0))
+            if conn is None:
+                self.undrain(held)
+                raise PoolBusy(
+                    f"{self.size - len(held)} of {self.size} reader connections still busy after {self.timeout}s"
+                )
+            held.append(conn)
+            with self._stats_lock:
+                self._stats["in_use"] += 1
+        return held
+
+    def undrain(self, held: list):
+        """Give back what drain() collected and reopen checkouts"""
+        with self._stats_lock:
+            self._stats["in_use"] -= len(held)
+        for conn in held:
+            self._idle.put(conn)
+        self._open.set()
+
+    def suspend(self, held: list):
+        """Checkpoint, then close the writer and `held` (every reader, checked out by the caller)"""
+        try:
+            self.writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+        for conn in held + [self.writer]:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def resume(self, count: int):
+        """Reopen the writer and `count` readers after suspend() (on the file now at DB_PATH)"""
+        self.writer = _open_connection()
+        for _ in range(count):
+            self.release(_open_connection())
+        self._open.set()
+
+    def close(self):
+        """Close every idle connection and the writer"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+def get_pool() -> ConnectionPool:
+    """Get (or lazily create) the process-wide connection pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_pool():
+    """
+    Close all pooled connections (shutdown / before replacing the DB file).
+    The next get_db()/write_db() call opens a fresh pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
 
-        conn = sqlite3.connect(
+@contextmanager
+def drained_pool():
+    """
+    Quiesce the database so its file can be replaced (restore).
+
+    Stops new reader checkouts and waits for every reader to be returned,
+    then takes db_lock (in-flight writes and write jobs finish first),
+    checkpoints and closes all connections. Readers are drained before
+    db_lock because a read may itself wait on a write job (resilience
+    engine writer). Inside the block nothing has DB_PATH open; requests
+    arriving meanwhile wait in get_db() / write_db(). On exit every
+    connection is reopened on the file now at DB_PATH and those requests
+    continue on it. Raises PoolBusy if readers or the writer stay busy for
+    POOL_TIMEOUT; the pool is left as it was.
+    """
+    if IS_VERCEL:
+        with db_lock:
+            yield
+        return
+
+    pool = get_pool()
+    held = pool.drain()
+    if not db_lock.acquire(timeout=pool.timeout):
+        pool.undrain(held)
+        raise PoolBusy(f"Writer still busy after {pool.timeout}s")
+    try:
+        pool.suspend(held)
+        try:
+            yield
+        finally:
+            pool.resume(len(held))
+    finally:
+        db_lock.release()
+
+
+def get_pool_stats() -> dict:
+    """Connection pool metrics for /api/system/status"""
+    if IS_VERCEL:
+        return {"mode": "memory", "readers": 1}
+    if _pool is None:
+        return {"mode": "pool", "readers": POOL_READERS, "initialized": False}
+    return _pool.stats()
+
+
+def get_connection():
+    """Get the shared in-memory connection (Vercel demo mode only)"""
+    global _memory_connection
+
+    if _memory_connection is None:
+        _memory_connection = sqlite3.connect(
             DB_PATH,
             check_same_thread=False,
-            timeout=30.0  # Wait up to 30 seconds for lock
+            timeout=30.0
         )
-        conn.row_factory = sqlite3.Row
-
-        # Critical optimizations for Raspberry Pi
-        conn.execute("PRAGMA journal_mode=WAL;")        # Write-Ahead Logging
-        conn.execute("PRAGMA synchronous=NORMAL;")      # Balance performance/safety
-        conn.execute("PRAGMA cache_size=-64000;")       # 64MB cache
-        conn.execute("PRAGMA temp_store=MEMORY;")       # Temp tables in memory
-        conn.execute("PRAGMA mmap_size=268435456;")     # 256MB mmap
-        conn.execute("PRAGMA foreign_keys=ON;")         # Enable foreign keys
-
-        return conn
+        _memory_connection.row_factory = sqlite3.Row
+        # Basic pragmas for in-memory
+        _memory_connection.execute("PRAGMA foreign_keys=ON;")
+    return _memory_connection
 
 
 @contextmanager
 def get_db():
     """Thread-safe database connection context manager"""
-    conn = get_connection()
+    if IS_VERCEL:
+        # For in-memory mode, reuse the same connection
+        conn = get_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return
+
+    pool = get_pool()
+    conn = pool.acquire()
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            broken = True
         raise
     finally:
-        # Only close for file-based mode; keep in-memory connection alive
-        if not IS_VERCEL:
-            conn.close()
+        pool.release(conn, broken)
 
 
 @contextmanager
 def write_db():
     """Serialized write operations to prevent 'database is locked' errors"""
+    if IS_VERCEL:
+        with db_lock:
+            with get_db() as conn:
+                yield conn
+        return
+
+    pool = get_pool()
+    start = time.perf_counter()
     with db_lock:
-        with get_db() as conn:
+        pool.record_writer_wait((time.perf_counter() - start) * 1000)
+        conn = pool.writer
+        try:
             yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+# ============================================================================
+# Group Commit Write Queue
+# ============================================================================
+
+class _WriteJob:
+    """A single unit of work for the writer thread"""
+    __slots__ = ("fn", "args", "lane", "future", "enqueued_at")
+
+    def __init__(self, fn, args, lane):
+        self.fn = fn
+        self.args = args
+        self.lane = lane
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class WriteQueue:
+    """
+    Single-writer queue with group commit.
+
+    Routes submit `fn(conn, *args)` jobs. A dedicated thread drains them and
+    applies up to `max_batch` jobs in ONE transaction (one fsync), waiting at
+    most `max_latency_ms` after the first job for companions to arrive.
+
+    Each job runs inside its own SAVEPOINT, so a job that raises is rolled
+    back alone and its exception is delivered to that caller only; the rest
+    of the batch still commits.
+
+    Fairness:
+    - 'round_robin': jobs are grouped by lane (e.g. 'checkin', 'inventory',
+      'satellite') and batches interleave lanes, so a burst from one source
+      cannot starve the others
+    - 'fifo': strict arrival order
+    """
+
+    def __init__(self, max_latency_ms: float = WRITE_BATCH_MS,
+                 max_batch: int = WRITE_BATCH_MAX,
+                 fairness: str = WRITE_FAIRNESS):
+        self.max_latency = max(0.0, max_latency_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self.fairness = fairness if fairness in ("round_robin", "fifo") else "round_robin"
+
+        self._lanes = OrderedDict()  # lane -> deque[_WriteJob]
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+
+        self._stats = {
+            "jobs": 0,
+            "failed_jobs": 0,
+            "batches": 0,
+            "largest_batch": 0,
+            "queue_ms_total": 0.0,
+            "queue_ms_max": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="xirs-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, lane: str = "default") -> Future:
+        """Enqueue `fn(conn, *args)`; the returned Future holds its result or exception"""
+        job = _WriteJob(fn, args, lane)
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Write queue is stopped")
+            self._lanes.setdefault(lane, deque()).append(job)
+            self._pending += 1
+            self._cond.notify()
+        return job.future
+
+    def stop(self, timeout: float = 5.0):
+        """Finish queued jobs, then stop the writer thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _take(self, limit: int) -> list:
+        """Pop up to `limit` jobs according to the fairness policy (caller holds _cond)"""
+        taken = []
+        if self.fairness == "fifo":
+            while len(taken) < limit and self._pending:
+                lane, jobs = min(
+                    ((k, v) for k, v in self._lanes.items() if v),
+                    key=lambda kv: kv[1][0].enqueued_at
+                )
+                taken.append(jobs.popleft())
+                self._pending -= 1
+        else:
+            while len(taken) < limit and self._pending:
+                for lane in list(self._lanes):
+                    jobs = self._lanes[lane]
+                    if jobs and len(taken) < limit:
+                        taken.append(jobs.popleft())
+                        self._pending -= 1
+                    if not jobs:
+                        del self._lanes[lane]
+        return taken
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending and self._stopping:
+                    return
+
+                # Give concurrent callers a short window to join this batch
+                deadline = time.perf_counter() + self.max_latency
+                while self._pending < self.max_batch and not self._stopping:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._take(self.max_batch)
+
+            self._apply(batch)
+
+    def _apply(self, batch: list):
+        started = time.perf_counter()
+        results = []
+
+        try:
+            with write_db() as conn:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                for job in batch:
+                    if not job.future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT write_job")
+                    try:
+                        value = job.fn(conn, *job.args)
+                    except BaseException as e:
+                        conn.execute("ROLLBACK TO write_job")
+                        conn.execute("RELEASE write_job")
+                        results.append((job, False, e))
+                    else:
+                        conn.execute("RELEASE write_job")
+                        results.append((job, True, value))
+        except BaseException as e:
+            # The commit itself failed: every job in the batch failed with it
+            for job in batch:
+                if not job.future.done():
+                    try:
+                        job.future.set_exception(e)
+                    except Exception:
+                        pass
+            results = []
+
+        for job, ok, value in results:
+            if ok:
+                job.future.set_result(value)
+            else:
+                job.future.set_exception(value)
+
+        with self._cond:
+            s = self._stats
+            s["batches"] += 1
+            s["jobs"] += len(batch)
+            s["failed_jobs"] += sum(1 for _, ok, _ in results if not ok)
+            s["largest_batch"] = max(s["largest_batch"], len(batch))
+            for job in batch:
+                waited = (started - job.enqueued_at) * 1000
+                s["queue_ms_total"] += waited
+                s["queue_ms_max"] = max(s["queue_ms_max"], waited)
+
+    def stats(self) -> dict:
+        """Group commit metrics"""
+        with self._cond:
+            s = dict(self._stats)
+            pending = self._pending
+        jobs = s["jobs"]
+        return {
+            "fairness": self.fairness,
+            "max_batch": self.max_batch,
+            "max_latency_ms": self.max_latency * 1000,
+            "pending": pending,
+            "jobs": jobs,
+            "failed_jobs": s["failed_jobs"],
+            "batches": s["batches"],
+            "largest_batch": s["largest_batch"],
+            "avg_batch": round(jobs / s["batches"], 2) if s["batches"] else 0.0,
+            "queue_ms_avg": round(s["queue_ms_total"] / jobs, 3) if jobs else 0.0,
+            "queue_ms_max": round(s["queue_ms_max"], 3),
+        }
+
+
+def get_write_queue() -> WriteQueue:
+    """Get (or lazily start) the process-wide group-commit writer"""
+    global _write_queue
+    if _write_queue is None:
+        with _write_queue_lock:
+            if _write_queue is None:
+                _write_queue = WriteQueue()
+    return _write_queue
+
+
+def stop_write_queue():
+    """Drain and stop the group-commit writer (shutdown)"""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.stop()
+            _write_queue = None
+
+
+def submit_write(fn, *args, lane: str = "default") -> Future:
+    """
+    Queue `fn(conn, *args)` for the group-commit writer.
+    Returns a concurrent.futures.Future with the job's result or exception.
+    """
+    if IS_VERCEL:
+        # Demo mode: single in-memory connection, run inline
+        future = Future()
+        try:
+            with write_db() as conn:
+                future.set_result(fn(conn, *args))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+    return get_write_queue().submit(fn, *args, lane=lane)
+
+
+def run_write(fn, *args, lane: str = "default"):
+    """Blocking helper: queue a write job and wait for its result"""
+    return submit_write(fn, *args, lane=lane).result()
+
+
+async def write_job(fn, *args, lane: str = "default"):
+    """Async helper for route handlers: await a queued write job"""
+    return await asyncio.wrap_future(submit_write(fn, *args, lane=lane))
+
+
+def get_write_queue_stats() -> dict:
+    """Group commit metrics for /api/system/db-pool"""
+    if _write_queue is None:
+        return {"started": False}
+    return _write_queue.stats()
+
+
+# ============================================================================
+# Async Facade
+# ============================================================================
+# Route handlers are `async def`; calling sqlite3 directly from them blocks
+# the event loop, so one slow query (e.g. VACUUM) stalls every request.
+# These helpers run the blocking work on a small thread pool instead:
+#
+#     rows = await db_read(lambda conn: conn.execute(sql).fetchall())
+#     await db_write(_apply_update, item_id, payload)
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Get (or lazily create) the thread pool used by the async facade"""
+    global _db_executor
+    if _db_executor is None:
+        with _db_executor_lock:
+            if _db_executor is None:
+                # Demo mode shares one in-memory connection: keep it to one thread.
+                # Otherwise one worker per pooled reader, plus headroom for
+                # writers and maintenance jobs waiting on db_lock.
+                workers = 1 if IS_VERCEL else POOL_READERS + 2
+                _db_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="xirs-db")
+    return _db_executor
+
+
+def shutdown_db_executor():
+    """Stop the async facade worker threads (shutdown)"""
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown(wait=True)
+            _db_executor = None
+
+
+def _read_call(fn, args):
+    with get_db() as conn:
+        return fn(conn, *args)
+
+
+def _write_call(fn, args):
+    with write_db() as conn:
+        return fn(conn, *args)
+
+
+async def run_in_db_thread(fn, *args):
+    """Await any blocking callable `fn(*args)` on the database thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), fn, *args)
+
+
+async def db_read(fn, *args):
+    """Await `fn(conn, *args)` on a pooled reader connection"""
+    return await run_in_db_thread(_read_call, fn, args)
+
+
+async def db_write(fn, *args):
+    """Await `fn(conn, *args)` inside write_db() (own transaction, not batched)"""
+    return await run_in_db_thread(_write_call, fn, args)
+
+
+def vacuum_db():
+    """
+    Run VACUUM on the writer connection.
+    VACUUM cannot run inside a transaction, so any open one is committed first.
+    Blocks other writers for its duration; readers keep working under WAL.
+    """
+    with db_lock:
+        conn = get_connection() if IS_VERCEL else get_pool().writer
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("VACUUM")
 
 
 def init_db():
-    """Initialize database with schema and apply migrations"""
+    """Initialize database schema via the versioned migration runner"""
     with get_db() as conn:
-        # For Vercel, always initialize fresh
-        if IS_VERCEL:
-            schema_path = BACKEND_DIR / "schema.sql"
-            if schema_path.exists():
-                with open(schema_path, "r") as f:
-                    conn.executescript(f.read())
-                print("[xIRS Hub] In-memory database initialized with schema")
-            return
+        applied = migrate(conn)
 
-        # For file-based: check if inventory table exists and apply migrations BEFORE schema
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='inventory'")
-        if cursor.fetchone():
-            # Existing database - apply migrations first
-            apply_migrations(conn)
-
-        # Then execute schema (CREATE IF NOT EXISTS is safe)
-        schema_path = BACKEND_DIR / "schema.sql"
-        if schema_path.exists():
-            with open(schema_path, "r") as f:
-                conn.executescript(f.read())
-            print(f"[xIRS Hub] Database initialized at {DB_PATH}")
-        else:
-            print(f"[xIRS Hub] Warning: schema.sql not found at {schema_path}")
+    if applied:
+        print(f"[xIRS Hub] Database at schema v{applied[-1][0]} ({DB_PATH})")
 
 
 def reset_memory_db():
@@ -188,8 +805,124 @@ def reset_memory_db():
     return True
 
 
-def apply_migrations(conn):
-    """Apply schema migrations for existing databases"""
+# ============================================================================
+# Schema Migrations
+# ============================================================================
+
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+
+
+def discover_migrations() -> list:
+    """List (version, name, path) for migrations/NNN_name.sql|py in version order"""
+    migrations = []
+    if MIGRATIONS_DIR.exists():
+        for path in MIGRATIONS_DIR.iterdir():
+            match = _MIGRATION_FILE.match(path.name)
+            if match:
+                migrations.append((int(match.group(1)), match.group(2), path))
+    migrations.sort(key=lambda m: m[0])
+
+    versions = [m[0] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration version in {MIGRATIONS_DIR}")
+    return migrations
+
+
+def get_schema_version(conn) -> int:
+    """Current schema version (0 = database predates versioning or is empty)"""
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'")
+    if not cursor.fetchone():
+        return 0
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn) -> list:
+    """
+    Bring the database up to the newest migration.
+    Returns the (version, name) pairs applied; empty when already current,
+    in which case no DDL is executed at all.
+    """
+    migrations = discover_migrations()
+    latest = max([SCHEMA_BASELINE_VERSION] + [m[0] for m in migrations])
+
+    current = get_schema_version(conn)
+    if current >= latest:
+        return []
+
+    applied = []
+    if current == 0:
+        _bootstrap_schema(conn)
+        current = SCHEMA_BASELINE_VERSION
+        applied.append((current, "baseline"))
+
+    for version, name, path in migrations:
+        if version <= current:
+            continue
+        print(f"Migration {version:03d}: {name}")
+        _apply_migration(conn, version, name, path)
+        applied.append((version, name))
+
+    return applied
+
+
+def _bootstrap_schema(conn):
+    """
+    One-time setup for databases without schema_version:
+    fresh databases get schema.sql; pre-versioning hubs are first upgraded
+    with the legacy probes, then schema.sql fills in anything still missing.
+    """
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='inventory'")
+    if cursor.fetchone():
+        _upgrade_legacy_schema(conn)
+
+    schema_path = BACKEND_DIR / "schema.sql"
+    with open(schema_path, "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(
+        "INSERT OR IGNORE INTO schema_version (version, name) VALUES (?, 'baseline')",
+        (SCHEMA_BASELINE_VERSION,)
+    )
+    conn.commit()
+    print(f"[xIRS Hub] Schema baseline v{SCHEMA_BASELINE_VERSION} initialized")
+
+
+def _apply_migration(conn, version: int, name: str, path: Path):
+    """Run one migration file and record it, atomically"""
+    try:
+        if path.suffix == ".sql":
+            with open(path, "r", encoding="utf-8") as f:
+                sql = f.read()
+            # executescript() commits first, so the transaction lives in the script
+            conn.executescript(
+                f"BEGIN;\n{sql}\n;\n"
+                f"INSERT INTO schema_version (version, name) VALUES ({version}, '{name}');\n"
+                f"COMMIT;"
+            )
+        else:
+            spec = importlib.util.spec_from_file_location(f"xirs_migration_{version:03d}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            conn.execute("BEGIN")
+            module.upgrade(conn)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        raise RuntimeError(f"Migration {path.name} failed: {e}") from e
+
+
+def _upgrade_legacy_schema(conn):
+    """Bring a pre-versioning hub (any v1.x/v2.0 layout) up to the baseline schema"""
     # Inventory migrations
     cursor = conn.execute("PRAGMA table_info(inventory)")
     inv_columns = [row['name'] for row in cursor.fetchall()]
@@ -516,8 +1249,17 @@ def apply_migrations(conn):
             )
         """)
 
+    # Registrations claim columns (previously added by routes/registrations.py at import)
+    cursor = conn.execute("PRAGMA table_info(registrations)")
+    reg_columns = [row['name'] for row in cursor.fetchall()]
+    if reg_columns and 'claimed_by' not in reg_columns:
+        print("Migration: Adding claim columns to registrations")
+        conn.execute("ALTER TABLE registrations ADD COLUMN claimed_by TEXT")
+    if reg_columns and 'claimed_at' not in reg_columns:
+        conn.execute("ALTER TABLE registrations ADD COLUMN claimed_at DATETIME")
+
     conn.commit()
-    print("Migrations applied successfully")
+    print("Legacy schema upgraded")
 
 
 def dict_from_row(row):
@@ -530,3 +1272,17 @@ def dict_from_row(row):
 def rows_to_list(rows):
     """Convert list of sqlite3.Row to list of dict"""
     return [dict_from_row(row) for row in rows]
+
+
+SQL_IN_CHUNK = 500  # stay well below SQLITE_MAX_VARIABLE_NUMBER
+
+
+def select_in(conn, query: str, keys) -> list:
+    """Run `query` (with one `IN ({placeholders})`) over keys in chunks"""
+    keys = list(keys)
+    rows = []
+    for i in range(0, len(keys), SQL_IN_CHUNK):
+        chunk = keys[i:i + SQL_IN_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        rows.extend(conn.execute(query.format(placeholders=placeholders), chunk).fetchall())
+    return rows
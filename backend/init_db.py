@@ -67,20 +67,13 @@ def init_database():
         print(f"Error: Schema file not found at {SCHEMA_PATH}")
         sys.exit(1)
 
-    with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
-        schema_sql = f.read()
+    # Create database: schema.sql + versioned migrations (records schema_version)
+    from database import init_db, close_pool
+    init_db()
+    close_pool()
 
-    # Create database and apply schema
     conn = sqlite3.connect(DB_PATH)
 
-    # Enable WAL mode
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA synchronous=NORMAL;")
-
-    # Execute schema
-    conn.executescript(schema_sql)
-    conn.commit()
-
     # Verify tables created
     cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
     tables = [row[0] for row in cursor.fetchall()]
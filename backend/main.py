@@ -2,7 +2,7 @@
 CIRS - Community Inventory Resilience System
 FastAPI Backend Entry Point
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -10,7 +10,13 @@ from contextlib import asynccontextmanager
 import os
 from pathlib import Path
 
-from database import init_db, get_db, dict_from_row, IS_VERCEL, reset_memory_db
+from database import (
+    init_db, get_db, db_read, dict_from_row, IS_VERCEL, reset_memory_db,
+    close_pool, stop_write_queue, shutdown_db_executor
+)
+from services.backup_scheduler import backup_scheduler
+from services.dashboard_counters import get_counters, counter
+from services.response_cache import cached_json
 
 # Use pathlib for cross-platform path safety
 BACKEND_DIR = Path(__file__).parent
@@ -44,10 +50,17 @@ async def lifespan(app: FastAPI):
         with get_db() as conn:
             seed_cirs_demo(conn)
         print("[CIRS] Demo mode initialized with sample data")
+    else:
+        # Runs the backup_schedule stored in config (off the event loop)
+        backup_scheduler.start()
 
     yield
     # Shutdown
     print("Shutting down CIRS Backend...")
+    backup_scheduler.stop()
+    stop_write_queue()
+    shutdown_db_executor()
+    close_pool()
 
 
 # Create FastAPI app
@@ -113,7 +126,7 @@ async def get_demo_status():
 
 
 @app.post("/api/demo/reset")
-async def reset_demo():
+def reset_demo():
     """Reset demo database (only available in Vercel mode)"""
     if not IS_VERCEL:
         raise HTTPException(
@@ -146,97 +159,89 @@ async def reset_demo():
 # ============================================================================
 
 @app.get("/api/public/status")
-async def get_public_status():
+async def get_public_status(request: Request):
     """
     Public status endpoint for Portal (交通燈系統)
     Returns simplified status without sensitive data.
     No authentication required.
+    Cached until person/inventory/message/zone/config change (ETag aware).
     """
-    with get_db() as conn:
-        # Get headcount (checked_in only)
-        cursor = conn.execute("""
-            SELECT COUNT(*) as checked_in FROM person
-            WHERE role = 'public' AND checked_in_at IS NOT NULL
-        """)
-        headcount = cursor.fetchone()['checked_in'] or 0
+    return await cached_json(
+        request, "public_status",
+        tags=("person", "inventory", "message", "zone", "config"),
+        build=_build_public_status
+    )
 
-        # Get water and food totals
-        cursor = conn.execute("""
-            SELECT category, SUM(quantity) as total
-            FROM inventory
-            WHERE category IN ('water', 'food')
-            GROUP BY category
-        """)
-        resources = {row['category']: row['total'] for row in cursor.fetchall()}
-
-        # Get config for per-person consumption
-        cursor = conn.execute("SELECT key, value FROM config WHERE key IN ('water_per_person_per_day', 'food_per_person_per_day')")
-        config = {row['key']: float(row['value']) for row in cursor.fetchall()}
-
-        # Calculate survival days
-        people_count = headcount if headcount > 0 else 1
-        water_per_day = config.get('water_per_person_per_day', 3)
-        food_per_day = config.get('food_per_person_per_day', 2100)
-
-        water_days = resources.get('water', 0) / (water_per_day * people_count)
-        food_days = resources.get('food', 0) / (food_per_day * people_count)
-
-        # Traffic light logic: >3 days = green, 1-3 days = yellow, <1 day = red
-        def to_traffic_light(days):
-            if days >= 3:
-                return "green"
-            elif days >= 1:
-                return "yellow"
-            else:
-                return "red"
-
-        # Equipment status (check for issues)
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM inventory
-            WHERE category = 'equipment'
-            AND check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE')
-        """)
-        equipment_issues = cursor.fetchone()['count']
 
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM inventory WHERE category = 'equipment'
-        """)
-        equipment_total = cursor.fetchone()['count']
-
-        # Equipment light: all OK = green, some issues = yellow, most issues = red
-        if equipment_total == 0:
-            equipment_light = "green"
-        elif equipment_issues == 0:
-            equipment_light = "green"
-        elif equipment_issues / equipment_total < 0.3:
-            equipment_light = "yellow"
-        else:
-            equipment_light = "red"
+def _build_public_status(conn):
+    """Aggregate the public traffic-light status (runs on a DB worker thread)"""
+    # Materialized counters (kept current by triggers)
+    counters = get_counters(conn)
 
-        # Get current broadcast
-        cursor = conn.execute("""
-            SELECT content FROM message
-            WHERE message_type = 'broadcast' AND is_pinned = 1
-            ORDER BY created_at DESC LIMIT 1
-        """)
-        broadcast_row = cursor.fetchone()
-        broadcast = broadcast_row['content'] if broadcast_row else None
+    # Get headcount (checked_in only)
+    headcount = counter(counters, 'person.public.checked_in')
 
-        # Shelter capacity (using zone data if available)
-        cursor = conn.execute("""
-            SELECT SUM(capacity) as total_capacity FROM zone WHERE is_active = 1
-        """)
-        capacity_row = cursor.fetchone()
-        total_capacity = capacity_row['total_capacity'] if capacity_row and capacity_row['total_capacity'] else 100
-
-        # Shelter light: <50% = green, 50-90% = yellow, >90% = red
-        occupancy_rate = headcount / total_capacity if total_capacity > 0 else 0
-        if occupancy_rate < 0.5:
-            shelter_light = "green"
-        elif occupancy_rate < 0.9:
-            shelter_light = "yellow"
+    # Get water and food totals
+    resources = {
+        'water': counters.get('inventory.qty.water', 0),
+        'food': counters.get('inventory.qty.food', 0)
+    }
+
+    # Get config for per-person consumption
+    cursor = conn.execute("SELECT key, value FROM config WHERE key IN ('water_per_person_per_day', 'food_per_person_per_day')")
+    config = {row['key']: float(row['value']) for row in cursor.fetchall()}
+
+    # Calculate survival days
+    people_count = headcount if headcount > 0 else 1
+    water_per_day = config.get('water_per_person_per_day', 3)
+    food_per_day = config.get('food_per_person_per_day', 2100)
+
+    water_days = resources.get('water', 0) / (water_per_day * people_count)
+    food_days = resources.get('food', 0) / (food_per_day * people_count)
+
+    # Traffic light logic: >3 days = green, 1-3 days = yellow, <1 day = red
+    def to_traffic_light(days):
+        if days >= 3:
+            return "green"
+        elif days >= 1:
+            return "yellow"
         else:
-            shelter_light = "red"
+            return "red"
+
+    # Equipment status (check for issues)
+    equipment_issues = counter(counters, 'equipment.issues')
+    equipment_total = counter(counters, 'inventory.count.equipment')
+
+    # Equipment light: all OK = green, some issues = yellow, most issues = red
+    if equipment_total == 0:
+        equipment_light = "green"
+    elif equipment_issues == 0:
+        equipment_light = "green"
+    elif equipment_issues / equipment_total < 0.3:
+        equipment_light = "yellow"
+    else:
+        equipment_light = "red"
+
+    # Get current broadcast
+    cursor = conn.execute("""
+        SELECT content FROM message
+        WHERE message_type = 'broadcast' AND is_pinned = 1
+        ORDER BY created_at DESC LIMIT 1
+    """)
+    broadcast_row = cursor.fetchone()
+    broadcast = broadcast_row['content'] if broadcast_row else None
+
+    # Shelter capacity (using zone data if available)
+    total_capacity = counter(counters, 'zone.capacity') or 100
+
+    # Shelter light: <50% = green, 50-90% = yellow, >90% = red
+    occupancy_rate = headcount / total_capacity if total_capacity > 0 else 0
+    if occupancy_rate < 0.5:
+        shelter_light = "green"
+    elif occupancy_rate < 0.9:
+        shelter_light = "yellow"
+    else:
+        shelter_light = "red"
 
     return {
         "shelter": {
@@ -264,44 +269,38 @@ async def get_public_status():
 @app.get("/api/stats")
 async def get_stats():
     """Get system statistics"""
-    with get_db() as conn:
-        # Headcount by triage status
-        cursor = conn.execute("""
-            SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN triage_status = 'GREEN' THEN 1 ELSE 0 END) as green,
-                SUM(CASE WHEN triage_status = 'YELLOW' THEN 1 ELSE 0 END) as yellow,
-                SUM(CASE WHEN triage_status = 'RED' THEN 1 ELSE 0 END) as red,
-                SUM(CASE WHEN triage_status = 'BLACK' THEN 1 ELSE 0 END) as black,
-                SUM(CASE WHEN checked_in_at IS NOT NULL THEN 1 ELSE 0 END) as checked_in
-            FROM person
-            WHERE role = 'public'
-        """)
-        headcount = dict_from_row(cursor.fetchone())
+    return await db_read(_build_stats)
+
+
+def _build_stats(conn):
+    """Aggregate dashboard statistics (runs on a DB worker thread)"""
+    # Materialized counters (kept current by triggers)
+    counters = get_counters(conn)
+
+    # Headcount by triage status
+    headcount = {
+        "total": counter(counters, 'person.public'),
+        "green": counter(counters, 'person.public.GREEN'),
+        "yellow": counter(counters, 'person.public.YELLOW'),
+        "red": counter(counters, 'person.public.RED'),
+        "black": counter(counters, 'person.public.BLACK'),
+        "checked_in": counter(counters, 'person.public.checked_in')
+    }
 
-        # Inventory total count (excluding equipment)
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM inventory WHERE category != 'equipment'
-        """)
-        inventory_total = cursor.fetchone()['count']
+    # Inventory total count (excluding equipment)
+    inventory_total = sum(
+        int(value) for name, value in counters.items() if name.startswith('inventory.count.')
+    ) - counter(counters, 'inventory.count.equipment')
 
-        # Equipment OK count (check_status = 'OK' or NULL with no check needed)
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM inventory
-            WHERE category = 'equipment'
-            AND (check_status IS NULL OR check_status = 'OK')
-        """)
-        equipment_ok = cursor.fetchone()['count']
+    # Equipment OK count (check_status = 'OK' or NULL with no check needed)
+    equipment_ok = counter(counters, 'equipment.ok')
 
-        # Messages pending (unresolved, excluding replies and broadcasts)
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM message
-            WHERE (is_resolved IS NULL OR is_resolved = 0)
-            AND message_type = 'post'
-        """)
-        messages_pending = cursor.fetchone()['count']
+    # Messages pending (unresolved, excluding replies and broadcasts)
+    messages_pending = counter(counters, 'message.pending')
 
-        # Inventory alerts (below min_quantity)
+    # Inventory alerts (below min_quantity) - only scan when the counter says there are any
+    alerts = []
+    if counter(counters, 'inventory.low_stock'):
         cursor = conn.execute("""
             SELECT id, name, quantity, min_quantity, unit
             FROM inventory
@@ -309,49 +308,46 @@ async def get_stats():
         """)
         alerts = [dict_from_row(row) for row in cursor.fetchall()]
 
-        # Get water and food for survival days calculation
-        cursor = conn.execute("""
-            SELECT category, SUM(quantity) as total
-            FROM inventory
-            WHERE category IN ('water', 'food')
-            GROUP BY category
-        """)
-        resources = {row['category']: row['total'] for row in cursor.fetchall()}
-
-        # Get config for per-person consumption
-        cursor = conn.execute("SELECT key, value FROM config WHERE key IN ('water_per_person_per_day', 'food_per_person_per_day')")
-        config = {row['key']: float(row['value']) for row in cursor.fetchall()}
-
-        # Calculate survival days
-        people_count = headcount['checked_in'] or 1
-        water_days = (resources.get('water', 0) / (config.get('water_per_person_per_day', 3) * people_count)) if people_count > 0 else 0
-        food_days = (resources.get('food', 0) / (config.get('food_per_person_per_day', 2100) * people_count)) if people_count > 0 else 0
+    # Get water and food for survival days calculation
+    resources = {
+        'water': counters.get('inventory.qty.water', 0),
+        'food': counters.get('inventory.qty.food', 0)
+    }
 
-        # Equipment pending checks count
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM inventory
-            WHERE category = 'equipment'
-            AND check_interval_days IS NOT NULL
-            AND (
-                last_check_date IS NULL
-                OR DATE(last_check_date, '+' || check_interval_days || ' days') <= DATE('now')
-            )
-        """)
-        equipment_pending = cursor.fetchone()['count']
+    # Get config for per-person consumption
+    cursor = conn.execute("SELECT key, value FROM config WHERE key IN ('water_per_person_per_day', 'food_per_person_per_day')")
+    config = {row['key']: float(row['value']) for row in cursor.fetchall()}
+
+    # Calculate survival days
+    people_count = headcount['checked_in'] or 1
+    water_days = (resources.get('water', 0) / (config.get('water_per_person_per_day', 3) * people_count)) if people_count > 0 else 0
+    food_days = (resources.get('food', 0) / (config.get('food_per_person_per_day', 2100) * people_count)) if people_count > 0 else 0
+
+    # Equipment pending checks count
+    cursor = conn.execute("""
+        SELECT COUNT(*) as count FROM inventory
+        WHERE category = 'equipment'
+        AND check_interval_days IS NOT NULL
+        AND (
+            last_check_date IS NULL
+            OR DATE(last_check_date, '+' || check_interval_days || ' days') <= DATE('now')
+        )
+    """)
+    equipment_pending = cursor.fetchone()['count']
 
-        return {
-            "headcount": headcount,
-            "inventory_total": inventory_total,
-            "equipment_ok": equipment_ok,
-            "messages_pending": messages_pending,
-            "survival_days": {
-                "water": round(water_days, 1),
-                "food": round(food_days, 1)
-            },
-            "inventory_alerts": alerts,
-            "equipment_pending": equipment_pending,
-            "is_demo": IS_VERCEL
-        }
+    return {
+        "headcount": headcount,
+        "inventory_total": inventory_total,
+        "equipment_ok": equipment_ok,
+        "messages_pending": messages_pending,
+        "survival_days": {
+            "water": round(water_days, 1),
+            "food": round(food_days, 1)
+        },
+        "inventory_alerts": alerts,
+        "equipment_pending": equipment_pending,
+        "is_demo": IS_VERCEL
+    }
 
 
 # ============================================================================
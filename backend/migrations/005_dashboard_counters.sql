@@ -0,0 +1,235 @@
+-- Migration 005: Dashboard Counters
+-- Description: Materialized aggregates for /api/stats, /api/public/status,
+--              /api/satellite/status and /api/staff/summary/stats, kept
+--              current by triggers (+/- deltas on each write).
+--              Frozen copy of what services/dashboard_counters.py generated
+--              at this version; change counters in a new migration.
+
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    name TEXT PRIMARY KEY,
+    value NUMERIC NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- person
+CREATE TRIGGER IF NOT EXISTS counters_person_insert AFTER INSERT ON person
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'person.public' AS name, +(1) AS delta WHERE NEW.role = 'public'
+    UNION ALL SELECT 'person.public.' || NEW.triage_status AS name, +(1) AS delta WHERE NEW.role = 'public' AND NEW.triage_status IN ('GREEN', 'YELLOW', 'RED', 'BLACK')
+    UNION ALL SELECT 'person.public.checked_in' AS name, +(1) AS delta WHERE NEW.role = 'public' AND NEW.checked_in_at IS NOT NULL
+    UNION ALL SELECT 'staff.registered' AS name, +(1) AS delta WHERE NEW.staff_role IS NOT NULL
+    UNION ALL SELECT 'staff.' || NEW.staff_role || '.' || COALESCE(NEW.staff_status, 'NONE') AS name, +(1) AS delta WHERE NEW.staff_role IS NOT NULL
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_person_delete AFTER DELETE ON person
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'person.public' AS name, -(1) AS delta WHERE OLD.role = 'public'
+    UNION ALL SELECT 'person.public.' || OLD.triage_status AS name, -(1) AS delta WHERE OLD.role = 'public' AND OLD.triage_status IN ('GREEN', 'YELLOW', 'RED', 'BLACK')
+    UNION ALL SELECT 'person.public.checked_in' AS name, -(1) AS delta WHERE OLD.role = 'public' AND OLD.checked_in_at IS NOT NULL
+    UNION ALL SELECT 'staff.registered' AS name, -(1) AS delta WHERE OLD.staff_role IS NOT NULL
+    UNION ALL SELECT 'staff.' || OLD.staff_role || '.' || COALESCE(OLD.staff_status, 'NONE') AS name, -(1) AS delta WHERE OLD.staff_role IS NOT NULL
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_person_update AFTER UPDATE OF role, triage_status, checked_in_at, staff_role, staff_status ON person
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'person.public' AS name, -(1) AS delta WHERE OLD.role = 'public'
+    UNION ALL SELECT 'person.public.' || OLD.triage_status AS name, -(1) AS delta WHERE OLD.role = 'public' AND OLD.triage_status IN ('GREEN', 'YELLOW', 'RED', 'BLACK')
+    UNION ALL SELECT 'person.public.checked_in' AS name, -(1) AS delta WHERE OLD.role = 'public' AND OLD.checked_in_at IS NOT NULL
+    UNION ALL SELECT 'staff.registered' AS name, -(1) AS delta WHERE OLD.staff_role IS NOT NULL
+    UNION ALL SELECT 'staff.' || OLD.staff_role || '.' || COALESCE(OLD.staff_status, 'NONE') AS name, -(1) AS delta WHERE OLD.staff_role IS NOT NULL
+    UNION ALL SELECT 'person.public' AS name, +(1) AS delta WHERE NEW.role = 'public'
+    UNION ALL SELECT 'person.public.' || NEW.triage_status AS name, +(1) AS delta WHERE NEW.role = 'public' AND NEW.triage_status IN ('GREEN', 'YELLOW', 'RED', 'BLACK')
+    UNION ALL SELECT 'person.public.checked_in' AS name, +(1) AS delta WHERE NEW.role = 'public' AND NEW.checked_in_at IS NOT NULL
+    UNION ALL SELECT 'staff.registered' AS name, +(1) AS delta WHERE NEW.staff_role IS NOT NULL
+    UNION ALL SELECT 'staff.' || NEW.staff_role || '.' || COALESCE(NEW.staff_status, 'NONE') AS name, +(1) AS delta WHERE NEW.staff_role IS NOT NULL
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+-- inventory
+CREATE TRIGGER IF NOT EXISTS counters_inventory_insert AFTER INSERT ON inventory
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'inventory.count.' || NEW.category AS name, +(1) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.qty.' || NEW.category AS name, +(COALESCE(NEW.quantity, 0)) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.low_stock' AS name, +(1) AS delta WHERE NEW.quantity < NEW.min_quantity AND NEW.min_quantity > 0
+    UNION ALL SELECT 'equipment.ok' AS name, +(1) AS delta WHERE NEW.category = 'equipment' AND (NEW.check_status IS NULL OR NEW.check_status = 'OK')
+    UNION ALL SELECT 'equipment.issues' AS name, +(1) AS delta WHERE NEW.category = 'equipment' AND NEW.check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE')
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_inventory_delete AFTER DELETE ON inventory
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'inventory.count.' || OLD.category AS name, -(1) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.qty.' || OLD.category AS name, -(COALESCE(OLD.quantity, 0)) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.low_stock' AS name, -(1) AS delta WHERE OLD.quantity < OLD.min_quantity AND OLD.min_quantity > 0
+    UNION ALL SELECT 'equipment.ok' AS name, -(1) AS delta WHERE OLD.category = 'equipment' AND (OLD.check_status IS NULL OR OLD.check_status = 'OK')
+    UNION ALL SELECT 'equipment.issues' AS name, -(1) AS delta WHERE OLD.category = 'equipment' AND OLD.check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE')
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_inventory_update AFTER UPDATE OF category, quantity, min_quantity, check_status ON inventory
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'inventory.count.' || OLD.category AS name, -(1) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.qty.' || OLD.category AS name, -(COALESCE(OLD.quantity, 0)) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.low_stock' AS name, -(1) AS delta WHERE OLD.quantity < OLD.min_quantity AND OLD.min_quantity > 0
+    UNION ALL SELECT 'equipment.ok' AS name, -(1) AS delta WHERE OLD.category = 'equipment' AND (OLD.check_status IS NULL OR OLD.check_status = 'OK')
+    UNION ALL SELECT 'equipment.issues' AS name, -(1) AS delta WHERE OLD.category = 'equipment' AND OLD.check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE')
+    UNION ALL SELECT 'inventory.count.' || NEW.category AS name, +(1) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.qty.' || NEW.category AS name, +(COALESCE(NEW.quantity, 0)) AS delta WHERE 1
+    UNION ALL SELECT 'inventory.low_stock' AS name, +(1) AS delta WHERE NEW.quantity < NEW.min_quantity AND NEW.min_quantity > 0
+    UNION ALL SELECT 'equipment.ok' AS name, +(1) AS delta WHERE NEW.category = 'equipment' AND (NEW.check_status IS NULL OR NEW.check_status = 'OK')
+    UNION ALL SELECT 'equipment.issues' AS name, +(1) AS delta WHERE NEW.category = 'equipment' AND NEW.check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE')
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+-- message
+CREATE TRIGGER IF NOT EXISTS counters_message_insert AFTER INSERT ON message
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'message.pending' AS name, +(1) AS delta WHERE NEW.message_type = 'post' AND (NEW.is_resolved IS NULL OR NEW.is_resolved = 0)
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_message_delete AFTER DELETE ON message
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'message.pending' AS name, -(1) AS delta WHERE OLD.message_type = 'post' AND (OLD.is_resolved IS NULL OR OLD.is_resolved = 0)
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_message_update AFTER UPDATE OF message_type, is_resolved ON message
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'message.pending' AS name, -(1) AS delta WHERE OLD.message_type = 'post' AND (OLD.is_resolved IS NULL OR OLD.is_resolved = 0)
+    UNION ALL SELECT 'message.pending' AS name, +(1) AS delta WHERE NEW.message_type = 'post' AND (NEW.is_resolved IS NULL OR NEW.is_resolved = 0)
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+-- zone
+CREATE TRIGGER IF NOT EXISTS counters_zone_insert AFTER INSERT ON zone
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'zone.capacity' AS name, +(COALESCE(NEW.capacity, 0)) AS delta WHERE NEW.is_active = 1
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_zone_delete AFTER DELETE ON zone
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'zone.capacity' AS name, -(COALESCE(OLD.capacity, 0)) AS delta WHERE OLD.is_active = 1
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS counters_zone_update AFTER UPDATE OF capacity, is_active ON zone
+BEGIN
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    SELECT 'zone.capacity' AS name, -(COALESCE(OLD.capacity, 0)) AS delta WHERE OLD.is_active = 1
+    UNION ALL SELECT 'zone.capacity' AS name, +(COALESCE(NEW.capacity, 0)) AS delta WHERE NEW.is_active = 1
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;
+END;
+
+-- Populate from current data
+DELETE FROM dashboard_counters;
+
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(total) FROM (
+    SELECT 'person.public' AS name, SUM(1) AS total
+    FROM person r WHERE r.role = 'public' GROUP BY 1
+    UNION ALL
+    SELECT 'person.public.' || r.triage_status AS name, SUM(1) AS total
+    FROM person r WHERE r.role = 'public' AND r.triage_status IN ('GREEN', 'YELLOW', 'RED', 'BLACK') GROUP BY 1
+    UNION ALL
+    SELECT 'person.public.checked_in' AS name, SUM(1) AS total
+    FROM person r WHERE r.role = 'public' AND r.checked_in_at IS NOT NULL GROUP BY 1
+    UNION ALL
+    SELECT 'staff.registered' AS name, SUM(1) AS total
+    FROM person r WHERE r.staff_role IS NOT NULL GROUP BY 1
+    UNION ALL
+    SELECT 'staff.' || r.staff_role || '.' || COALESCE(r.staff_status, 'NONE') AS name, SUM(1) AS total
+    FROM person r WHERE r.staff_role IS NOT NULL GROUP BY 1
+) WHERE name IS NOT NULL GROUP BY name;
+
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(total) FROM (
+    SELECT 'inventory.count.' || r.category AS name, SUM(1) AS total
+    FROM inventory r WHERE 1 GROUP BY 1
+    UNION ALL
+    SELECT 'inventory.qty.' || r.category AS name, SUM(COALESCE(r.quantity, 0)) AS total
+    FROM inventory r WHERE 1 GROUP BY 1
+    UNION ALL
+    SELECT 'inventory.low_stock' AS name, SUM(1) AS total
+    FROM inventory r WHERE r.quantity < r.min_quantity AND r.min_quantity > 0 GROUP BY 1
+    UNION ALL
+    SELECT 'equipment.ok' AS name, SUM(1) AS total
+    FROM inventory r WHERE r.category = 'equipment' AND (r.check_status IS NULL OR r.check_status = 'OK') GROUP BY 1
+    UNION ALL
+    SELECT 'equipment.issues' AS name, SUM(1) AS total
+    FROM inventory r WHERE r.category = 'equipment' AND r.check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE') GROUP BY 1
+) WHERE name IS NOT NULL GROUP BY name;
+
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(total) FROM (
+    SELECT 'message.pending' AS name, SUM(1) AS total
+    FROM message r WHERE r.message_type = 'post' AND (r.is_resolved IS NULL OR r.is_resolved = 0) GROUP BY 1
+) WHERE name IS NOT NULL GROUP BY name;
+
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(total) FROM (
+    SELECT 'zone.capacity' AS name, SUM(COALESCE(r.capacity, 0)) AS total
+    FROM zone r WHERE r.is_active = 1 GROUP BY 1
+) WHERE name IS NOT NULL GROUP BY name;
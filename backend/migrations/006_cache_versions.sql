@@ -0,0 +1,147 @@
+-- Migration 006: Response Cache Versions
+-- Description: Per-table change counters used as cache tags by
+--              services/response_cache.py. Any INSERT/UPDATE/DELETE on a
+--              tagged table bumps its version, invalidating cached responses.
+
+CREATE TABLE IF NOT EXISTS cache_versions (
+    tag TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO cache_versions (tag) VALUES
+    ('inventory'),
+    ('person'),
+    ('message'),
+    ('zone'),
+    ('config'),
+    ('resilience_config'),
+    ('inventory_standards'),
+    ('staffing_rules');
+
+-- inventory
+CREATE TRIGGER IF NOT EXISTS cache_inventory_insert AFTER INSERT ON inventory
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'inventory';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_inventory_update AFTER UPDATE ON inventory
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'inventory';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_inventory_delete AFTER DELETE ON inventory
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'inventory';
+END;
+
+-- person
+CREATE TRIGGER IF NOT EXISTS cache_person_insert AFTER INSERT ON person
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'person';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_person_update AFTER UPDATE ON person
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'person';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_person_delete AFTER DELETE ON person
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'person';
+END;
+
+-- message
+CREATE TRIGGER IF NOT EXISTS cache_message_insert AFTER INSERT ON message
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'message';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_message_update AFTER UPDATE ON message
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'message';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_message_delete AFTER DELETE ON message
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'message';
+END;
+
+-- zone
+CREATE TRIGGER IF NOT EXISTS cache_zone_insert AFTER INSERT ON zone
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'zone';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_zone_update AFTER UPDATE ON zone
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'zone';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_zone_delete AFTER DELETE ON zone
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'zone';
+END;
+
+-- config
+CREATE TRIGGER IF NOT EXISTS cache_config_insert AFTER INSERT ON config
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'config';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_config_update AFTER UPDATE ON config
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'config';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_config_delete AFTER DELETE ON config
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'config';
+END;
+
+-- resilience_config
+CREATE TRIGGER IF NOT EXISTS cache_resilience_config_insert AFTER INSERT ON resilience_config
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'resilience_config';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_resilience_config_update AFTER UPDATE ON resilience_config
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'resilience_config';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_resilience_config_delete AFTER DELETE ON resilience_config
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'resilience_config';
+END;
+
+-- inventory_standards
+CREATE TRIGGER IF NOT EXISTS cache_inventory_standards_insert AFTER INSERT ON inventory_standards
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'inventory_standards';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_inventory_standards_update AFTER UPDATE ON inventory_standards
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'inventory_standards';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_inventory_standards_delete AFTER DELETE ON inventory_standards
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'inventory_standards';
+END;
+
+-- staffing_rules
+CREATE TRIGGER IF NOT EXISTS cache_staffing_rules_insert AFTER INSERT ON staffing_rules
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'staffing_rules';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_staffing_rules_update AFTER UPDATE ON staffing_rules
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'staffing_rules';
+END;
+
+CREATE TRIGGER IF NOT EXISTS cache_staffing_rules_delete AFTER DELETE ON staffing_rules
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE tag = 'staffing_rules';
+END;
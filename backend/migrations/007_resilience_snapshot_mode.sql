@@ -0,0 +1,12 @@
+-- Migration 007: Resilience Snapshot Mode
+-- Description: calculate() only writes resilience_history when inputs/results
+--              change or the history interval elapses; reads are served from
+--              the latest snapshot while its inputs are unchanged.
+
+-- 每隔多久至少保存一次快照 (分鐘, 0 = 僅在變更時保存)
+ALTER TABLE resilience_config ADD COLUMN history_interval_minutes INTEGER DEFAULT 60;
+
+-- 快照可直接重用的最長時間 (秒, 涵蓋班表等時間相關因素)
+ALTER TABLE resilience_config ADD COLUMN snapshot_max_age_seconds INTEGER DEFAULT 60;
+
+CREATE INDEX IF NOT EXISTS idx_res_hist_station_id ON resilience_history(station_id, id);
@@ -0,0 +1,49 @@
+-- Migration 008: Incremental Resilience Engine
+-- Description: per-item contributions and per-lifeline running totals so
+--              calculate() reads O(categories) numbers instead of re-parsing
+--              every inventory row. Triggers only mark changed items dirty;
+--              the engine re-parses the dirty items on its next calculation
+--              (spec parsing lives in Python, not SQL).
+
+-- 每個品項目前計入的類別與數值 (amount: 公升 / kcal / 供電小時)
+CREATE TABLE IF NOT EXISTS resilience_item_state (
+    item_id INTEGER PRIMARY KEY,
+    lifeline TEXT NOT NULL,              -- WATER, FOOD, POWER, MEDICAL
+    amount REAL NOT NULL DEFAULT 0,
+    detail TEXT,                         -- JSON: 儀表板品項明細
+    firstaid INTEGER NOT NULL DEFAULT 0,
+    masks INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_res_item_state_lifeline ON resilience_item_state(lifeline, item_id);
+
+-- 各類別累計值: WATER.amount, WATER.items, MEDICAL.firstaid ...
+CREATE TABLE IF NOT EXISTS resilience_totals (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0
+);
+
+-- 待重新換算的品項
+CREATE TABLE IF NOT EXISTS resilience_dirty (
+    item_id INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS resilience_inventory_insert AFTER INSERT ON inventory
+BEGIN
+    INSERT OR IGNORE INTO resilience_dirty (item_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS resilience_inventory_update
+AFTER UPDATE OF name, category, quantity, unit, specification ON inventory
+BEGIN
+    INSERT OR IGNORE INTO resilience_dirty (item_id) VALUES (OLD.id);
+    INSERT OR IGNORE INTO resilience_dirty (item_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS resilience_inventory_delete AFTER DELETE ON inventory
+BEGIN
+    INSERT OR IGNORE INTO resilience_dirty (item_id) VALUES (OLD.id);
+END;
+
+-- Backfill: 首次計算時換算全部現有品項
+INSERT OR IGNORE INTO resilience_dirty (item_id) SELECT id FROM inventory;
@@ -0,0 +1,90 @@
+"""
+Migration 009: Inventory Capacities
+Pre-parsed per-unit capacities, backfilled from the existing specification text.
+
+Frozen copy of the rules services/capacity.py had at this version; later
+changes to the parser re-compute rows in a new migration, not here.
+"""
+import re
+
+COLUMNS = ('capacity_liters', 'capacity_kcal', 'capacity_wh')
+
+VOLUME_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[mM][lL]'), 0.001),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[lL]'), 1.0),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*公升'), 1.0),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[cC][cC]'), 0.001),
+]
+CALORIE_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[kK]?[cC]al'), 1.0),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*大卡'), 1.0),
+]
+ENERGY_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[kK][wW][hH]'), 1000.0),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[wW][hH]'), 1.0),
+]
+
+
+def _first_match(patterns, spec):
+    for pattern, multiplier in patterns:
+        match = pattern.search(spec or '')
+        if match:
+            return float(match.group(1)) * multiplier
+    return None
+
+
+def _default_calories(name):
+    if '泡麵' in name or '麵' in name:
+        return 400
+    elif '餅乾' in name:
+        return 200
+    elif '罐頭' in name:
+        return 300
+    elif '米' in name:
+        return 350
+    return 300
+
+
+def _capacities(name, category, specification):
+    """(liters, kcal, wh) per unit, in COLUMNS order"""
+    name = name or ''
+
+    liters = _first_match(VOLUME_PATTERNS, specification)
+    if not liters and category == 'water':
+        liters = 0.6
+
+    kcal = _first_match(CALORIE_PATTERNS, specification)
+    if not kcal and category == 'food':
+        kcal = _default_calories(name)
+
+    wh = None
+    if '電源站' in name or '行動電源' in name:
+        wh = _first_match(ENERGY_PATTERNS, specification) or 2000
+    elif '發電機' in name:
+        wh = 50 / 2.0 * 100  # 50L tank / 2 L/hr * 100W load
+
+    return liters, kcal, wh
+
+
+def upgrade(conn):
+    for column in COLUMNS:
+        conn.execute(f"ALTER TABLE inventory ADD COLUMN {column} REAL")
+
+    rows = conn.execute("SELECT id, name, category, specification FROM inventory").fetchall()
+    conn.executemany(
+        f"UPDATE inventory SET {', '.join(f'{column} = ?' for column in COLUMNS)} WHERE id = ?",
+        [_capacities(row[1], row[2], row[3]) + (row[0],) for row in rows]
+    )
+
+    # Incremental resilience state (migration 008) now reads the capacity columns
+    conn.execute("DROP TRIGGER IF EXISTS resilience_inventory_update")
+    conn.execute("""
+        CREATE TRIGGER resilience_inventory_update
+        AFTER UPDATE OF name, category, quantity, unit, specification,
+                        capacity_liters, capacity_kcal, capacity_wh ON inventory
+        BEGIN
+            INSERT OR IGNORE INTO resilience_dirty (item_id) VALUES (OLD.id);
+            INSERT OR IGNORE INTO resilience_dirty (item_id) VALUES (NEW.id);
+        END
+    """)
+    conn.execute("INSERT OR IGNORE INTO resilience_dirty (item_id) SELECT id FROM inventory")
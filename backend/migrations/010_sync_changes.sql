@@ -0,0 +1,107 @@
+-- Migration 010: Satellite Delta Sync Feed
+-- Description: change log behind GET /api/satellite/inventory|persons|zones?since=<cursor>.
+--              Every insert/update/delete of a synced column takes the next
+--              sync_counter.seq; sync_changes keeps only the latest change per
+--              row (so it grows with the number of rows, not the number of
+--              writes), and deleted rows stay as tombstones (op = 'D').
+
+-- 單列序號產生器 (cursor = 目前序號)
+CREATE TABLE IF NOT EXISTS sync_counter (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    seq INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO sync_counter (id, seq) VALUES (1, 0);
+
+-- 每列最後一次變更
+CREATE TABLE IF NOT EXISTS sync_changes (
+    tbl TEXT NOT NULL,                   -- 'inventory', 'person', 'zone'
+    row_id NOT NULL,                     -- 無型別: inventory 為整數, person/zone 為文字
+    op TEXT NOT NULL,                    -- 'I' 新增, 'U' 更新, 'D' 刪除
+    seq INTEGER NOT NULL,                -- 最後變更序號
+    inserted_seq INTEGER NOT NULL,       -- 新增時序號 (區分 inserted / updated)
+    PRIMARY KEY (tbl, row_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_seq ON sync_changes(tbl, seq);
+
+-- Inventory (satellite 顯示欄位 + 篩選欄位)
+CREATE TRIGGER IF NOT EXISTS sync_inventory_insert AFTER INSERT ON inventory
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'inventory', NEW.id, 'I', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET
+        op = excluded.op, seq = excluded.seq, inserted_seq = excluded.inserted_seq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_inventory_update
+AFTER UPDATE OF name, category, quantity, unit, min_quantity ON inventory
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'inventory', NEW.id, 'U', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET op = excluded.op, seq = excluded.seq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_inventory_delete AFTER DELETE ON inventory
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'inventory', OLD.id, 'D', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET op = excluded.op, seq = excluded.seq;
+END;
+
+-- Person
+CREATE TRIGGER IF NOT EXISTS sync_person_insert AFTER INSERT ON person
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'person', NEW.id, 'I', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET
+        op = excluded.op, seq = excluded.seq, inserted_seq = excluded.inserted_seq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_person_update
+AFTER UPDATE OF display_name, role, triage_status, current_location, checked_in_at ON person
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'person', NEW.id, 'U', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET op = excluded.op, seq = excluded.seq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_person_delete AFTER DELETE ON person
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'person', OLD.id, 'D', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET op = excluded.op, seq = excluded.seq;
+END;
+
+-- Zone
+CREATE TRIGGER IF NOT EXISTS sync_zone_insert AFTER INSERT ON zone
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'zone', NEW.id, 'I', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET
+        op = excluded.op, seq = excluded.seq, inserted_seq = excluded.inserted_seq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_zone_update
+AFTER UPDATE OF name, zone_type, capacity, description, icon, sort_order, is_active ON zone
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'zone', NEW.id, 'U', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET op = excluded.op, seq = excluded.seq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS sync_zone_delete AFTER DELETE ON zone
+BEGIN
+    UPDATE sync_counter SET seq = seq + 1 WHERE id = 1;
+    INSERT INTO sync_changes (tbl, row_id, op, seq, inserted_seq)
+    SELECT 'zone', OLD.id, 'D', seq, seq FROM sync_counter WHERE id = 1
+    ON CONFLICT(tbl, row_id) DO UPDATE SET op = excluded.op, seq = excluded.seq;
+END;
@@ -0,0 +1,6 @@
+-- Migration 011: Inventory Name Index
+-- Description: logistics packet ingestion resolves report item_code values
+--              against inventory.name in one IN (...) query per packet;
+--              bundle intake looks items up by name as well.
+
+CREATE INDEX IF NOT EXISTS idx_inventory_name ON inventory(name);
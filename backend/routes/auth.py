@@ -102,7 +102,7 @@ def decode_token(token: str) -> dict:
         return None
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to get current authenticated user"""
     if credentials is None:
         return None
@@ -125,9 +125,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return person
 
 
-async def require_role(required_roles: list, credentials: HTTPAuthorizationCredentials = Depends(security)):
+def require_role(required_roles: list, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Dependency to require specific roles"""
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
 
@@ -138,7 +138,7 @@ async def require_role(required_roles: list, credentials: HTTPAuthorizationCrede
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest):
+def login(request: LoginRequest):
     """Login with person_id and PIN"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -170,9 +170,9 @@ async def login(request: LoginRequest):
 
 
 @router.post("/verify")
-async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify a token and return user info"""
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         return {"valid": False}
 
@@ -181,12 +181,12 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
 
 
 @router.post("/change-pin")
-async def change_pin(
+def change_pin(
     request: ChangePinRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Change user's PIN"""
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
 
@@ -213,9 +213,9 @@ async def change_pin(
 
 
 @router.get("/me")
-async def get_me(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def get_me(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current user info"""
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
 
@@ -366,7 +366,7 @@ def create_satellite_token(hub_name: str = "CIRS Hub", device_id: str = None, al
 
 
 @router.get("/pairing-qr")
-async def get_pairing_qr(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+def get_pairing_qr(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Generate a QR code for Satellite PWA (v1.3: Static URL only).
     Returns a PNG image containing QR code with PWA URL (no pairing code).
@@ -374,7 +374,7 @@ async def get_pairing_qr(request: Request, credentials: HTTPAuthorizationCredent
     Requires admin authentication.
     """
     # Require admin role
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -421,7 +421,7 @@ async def get_pairing_qr(request: Request, credentials: HTTPAuthorizationCredent
 
 
 @router.get("/pairing-info")
-async def get_pairing_info(
+def get_pairing_info(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     allowed_roles: str = Query(default='volunteer', description="Allowed roles: volunteer, admin, or volunteer,admin")
@@ -434,7 +434,7 @@ async def get_pairing_info(
         allowed_roles: 'volunteer', 'admin', or 'volunteer,admin' (default: volunteer)
     """
     # Require admin role
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -474,14 +474,14 @@ async def get_pairing_info(
 
 
 @router.get("/pairing-code")
-async def get_pairing_code(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+def get_pairing_code(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Generate a new 6-digit pairing code (v1.3).
     Returns only the code without QR - for display on screen.
     Requires admin authentication.
     """
     # Require admin role
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -510,7 +510,7 @@ async def get_pairing_code(request: Request, credentials: HTTPAuthorizationCrede
 
 
 @router.post("/pairing-code")
-async def generate_pairing_code_with_roles(
+def generate_pairing_code_with_roles(
     request_body: GeneratePairingCodeRequest,
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -521,7 +521,7 @@ async def generate_pairing_code_with_roles(
     Requires admin authentication.
     """
     # Require admin role
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -607,7 +607,7 @@ def register_device(device_id: str, allowed_roles: str, user_agent: str = None,
 
 
 @router.post("/satellite/exchange")
-async def exchange_pairing_code(request_body: SatelliteExchangeRequest, request: Request):
+def exchange_pairing_code(request_body: SatelliteExchangeRequest, request: Request):
     """
     Exchange a pairing code for a JWT token (v1.4: with device registration).
 
@@ -668,7 +668,7 @@ async def exchange_pairing_code(request_body: SatelliteExchangeRequest, request:
 
 
 @router.post("/satellite/verify")
-async def verify_satellite_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def verify_satellite_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Verify a satellite pairing token (v1.4: includes device status check).
     Returns hub info if valid.
@@ -720,12 +720,12 @@ class DeviceActionRequest(BaseModel):
 
 
 @router.get("/satellite/devices")
-async def list_satellite_devices(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def list_satellite_devices(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     List all registered satellite devices (v1.4).
     Requires admin authentication.
     """
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -751,7 +751,7 @@ async def list_satellite_devices(credentials: HTTPAuthorizationCredentials = Dep
 
 
 @router.post("/satellite/devices/revoke")
-async def revoke_device(
+def revoke_device(
     request_body: DeviceActionRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
@@ -760,7 +760,7 @@ async def revoke_device(
     Device can re-pair later with a new pairing code.
     Requires admin authentication.
     """
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -795,7 +795,7 @@ async def revoke_device(
 
 
 @router.post("/satellite/devices/unrevoke")
-async def unrevoke_device(
+def unrevoke_device(
     request_body: DeviceActionRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
@@ -803,7 +803,7 @@ async def unrevoke_device(
     Restore a revoked device's access (v1.4).
     Requires admin authentication.
     """
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -840,7 +840,7 @@ async def unrevoke_device(
 
 
 @router.post("/satellite/devices/blacklist")
-async def blacklist_device(
+def blacklist_device(
     request_body: DeviceActionRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
@@ -849,7 +849,7 @@ async def blacklist_device(
     Device cannot re-pair even with a new pairing code.
     Requires admin authentication.
     """
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -886,7 +886,7 @@ async def blacklist_device(
 
 
 @router.post("/satellite/devices/unblacklist")
-async def unblacklist_device(
+def unblacklist_device(
     request_body: DeviceActionRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
@@ -895,7 +895,7 @@ async def unblacklist_device(
     Device can then re-pair with a new pairing code.
     Requires admin authentication.
     """
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -930,7 +930,7 @@ async def unblacklist_device(
 
 
 @router.patch("/satellite/devices/{device_id}")
-async def update_device_name(
+def update_device_name(
     device_id: str,
     device_name: str = None,
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -939,7 +939,7 @@ async def update_device_name(
     Update device name/label (v1.4).
     Requires admin authentication.
     """
-    user = await get_current_user(credentials)
+    user = get_current_user(credentials)
     if user is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     if user.get('role') != 'admin':
@@ -1,43 +1,50 @@
 """
 CIRS Secure Backup System
-- AES-256 encrypted backups
+- Hot (WAL-consistent) snapshots via the SQLite backup API, run as background jobs
+- Streaming encrypted backups (XChaCha20-Poly1305 secretstream, see services/backup_service.py)
+- Incremental backups: only pages changed since the last backup, restored as a chain
+- Restore jobs: streamed into a temp file, integrity-checked, swapped in atomically
 - USB detection and management
 - Checksum verification
 - Audit logging
 """
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 from typing import Optional
+import asyncio
 import os
 import sys
 import json
-import gzip
-import hashlib
 import shutil
+import sqlite3
 import subprocess
+import tempfile
 from datetime import datetime
-from io import BytesIO
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, write_db, dict_from_row, rows_to_list, DB_PATH
+from database import get_db, write_db, db_read, dict_from_row, rows_to_list, DB_PATH, drained_pool, migrate, PoolBusy
+from services.backup_scheduler import DEFAULT_RETENTION, backup_scheduler, load_schedule
+from services.backup_service import (
+    BACKUP_DIR, detect_usb_devices, log_backup,
+    MANIFEST_SUFFIX, BackupBusy, BackupError, BackupJob, backup_database, backup_database_incremental,
+    backup_format, backup_jobs, file_checksum, is_backup_file, restore_to_file, swap_database, target_directory,
+    verify_database
+)
+from services.response_cache import response_cache
+from routes.logistics import hub_key_cache, station_key_cache
 
 router = APIRouter()
 
-# Backup configuration
-BACKUP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backups")
-USB_MOUNT_POINTS = ["/mnt/usb", "/media", "/mnt/backup"]  # Common USB mount points
-
-# Encryption key derivation (in production, use environment variable or secure vault)
-BACKUP_SALT = "CIRS_BACKUP_SALT_2024"
-
-
 class BackupRequest(BaseModel):
     operator_id: str
     target: str = "local"  # 'local', 'usb', 'download'
     encrypt: bool = True
     password: Optional[str] = None  # For encrypted backups
     notes: Optional[str] = None
+    wait: bool = True  # False: return a job_id at once (not for 'download')
+    incremental: bool = False  # local/usb: only pages changed since the last backup there
 
 
 class RestoreRequest(BaseModel):
@@ -46,41 +53,7 @@ class RestoreRequest(BaseModel):
     file_path: Optional[str] = None
     password: Optional[str] = None
     reason: str
-
-
-def derive_key(password: str) -> bytes:
-    """Derive encryption key from password using PBKDF2"""
-    import hashlib
-    return hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode(),
-        BACKUP_SALT.encode(),
-        100000,
-        dklen=32
-    )
-
-
-def simple_encrypt(data: bytes, password: str) -> bytes:
-    """Simple XOR-based encryption with key derivation
-    For production, use cryptography library with AES-256-GCM
-    """
-    key = derive_key(password)
-    # Extend key to match data length
-    extended_key = (key * ((len(data) // len(key)) + 1))[:len(data)]
-    # XOR encryption
-    encrypted = bytes(a ^ b for a, b in zip(data, extended_key))
-    return encrypted
-
-
-def simple_decrypt(data: bytes, password: str) -> bytes:
-    """Decrypt XOR-encrypted data"""
-    # XOR decryption is symmetric
-    return simple_encrypt(data, password)
-
-
-def calculate_checksum(data: bytes) -> str:
-    """Calculate SHA-256 checksum"""
-    return hashlib.sha256(data).hexdigest()
+    wait: bool = True  # False: return a job_id at once
 
 
 def log_audit(conn, action_type: str, operator_id: str, target_id: str = None,
@@ -99,71 +72,8 @@ def log_audit(conn, action_type: str, operator_id: str, target_id: str = None,
     )
 
 
-def log_backup(conn, backup_type: str, file_path: str, file_size: int,
-               checksum: str, encrypted: bool, operator_id: str,
-               status: str = "success", notes: str = None):
-    """Log backup to backup_log table"""
-    conn.execute(
-        """
-        INSERT INTO backup_log (backup_type, file_path, file_size, checksum,
-                                encrypted, operator_id, status, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (backup_type, file_path, file_size, checksum, 1 if encrypted else 0,
-         operator_id, status, notes)
-    )
-
-
-def detect_usb_devices():
-    """Detect mounted USB devices"""
-    usb_devices = []
-
-    # Check common mount points
-    for mount_point in USB_MOUNT_POINTS:
-        if os.path.exists(mount_point):
-            # Check if anything is mounted
-            if os.path.ismount(mount_point):
-                try:
-                    # Get disk space info
-                    stat = os.statvfs(mount_point)
-                    total = stat.f_blocks * stat.f_frsize
-                    free = stat.f_bfree * stat.f_frsize
-                    usb_devices.append({
-                        "path": mount_point,
-                        "total_bytes": total,
-                        "free_bytes": free,
-                        "total_gb": round(total / (1024**3), 2),
-                        "free_gb": round(free / (1024**3), 2)
-                    })
-                except Exception:
-                    pass
-
-            # Also check subdirectories (common for /media/username/device)
-            try:
-                for subdir in os.listdir(mount_point):
-                    subpath = os.path.join(mount_point, subdir)
-                    if os.path.isdir(subpath) and os.path.ismount(subpath):
-                        try:
-                            stat = os.statvfs(subpath)
-                            total = stat.f_blocks * stat.f_frsize
-                            free = stat.f_bfree * stat.f_frsize
-                            usb_devices.append({
-                                "path": subpath,
-                                "total_bytes": total,
-                                "free_bytes": free,
-                                "total_gb": round(total / (1024**3), 2),
-                                "free_gb": round(free / (1024**3), 2)
-                            })
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-
-    return usb_devices
-
-
 @router.get("/status")
-async def get_backup_status():
+def get_backup_status():
     """Get backup status and history"""
     # Ensure backup directory exists
     os.makedirs(BACKUP_DIR, exist_ok=True)
@@ -183,7 +93,7 @@ async def get_backup_status():
         local_backups = []
         if os.path.exists(BACKUP_DIR):
             for f in os.listdir(BACKUP_DIR):
-                if f.endswith('.db.gz') or f.endswith('.db.gz.enc'):
+                if is_backup_file(f):
                     filepath = os.path.join(BACKUP_DIR, f)
                     local_backups.append({
                         "filename": f,
@@ -193,7 +103,8 @@ async def get_backup_status():
                         "modified": datetime.fromtimestamp(
                             os.path.getmtime(filepath)
                         ).isoformat(),
-                        "encrypted": f.endswith('.enc')
+                        "encrypted": f.endswith('.enc'),
+                        "incremental": ".delta." in f
                     })
 
         # Sort by modification time (newest first)
@@ -211,134 +122,213 @@ async def get_backup_status():
         }
 
 
+def _backup_job(job: BackupJob, request: BackupRequest, target_dir: str,
+                timestamp: str, client_ip: Optional[str]) -> dict:
+    """Snapshot + compress/encrypt + log; runs in the backup job thread"""
+    password = request.password if request.encrypt else None
+    name = f"cirs_backup_{timestamp}"
+    if request.incremental:
+        result = backup_database_incremental(DB_PATH, target_dir, name, password, job, chain_prefix="cirs_backup_")
+    else:
+        filename = name + (".db.gz.enc" if request.encrypt else ".db.gz")
+        result = backup_database(DB_PATH, os.path.join(target_dir, filename), password, job)
+        result.update(path=os.path.join(target_dir, filename), filename=filename, kind="full")
+    target_path = result["path"]
+    checksum = result["checksum"]
+
+    is_download = request.target == "download"
+    with write_db() as conn:
+        log_backup(
+            conn, request.target, "download" if is_download else target_path, result["size"],
+            checksum, request.encrypt, request.operator_id,
+            "success", request.notes
+        )
+        log_audit(
+            conn, "BACKUP", request.operator_id,
+            target_id=f"download_{timestamp}" if is_download else target_path,
+            new_value=json.dumps({
+                "size": result["size"],
+                "encrypted": request.encrypt,
+                "checksum": checksum,
+                "kind": result["kind"],
+                "base": result.get("base")
+            }),
+            ip_address=client_ip
+        )
+
+    response = {
+        "success": True,
+        "filename": result["filename"],
+        "path": target_path,
+        "size_bytes": result["size"],
+        "size_mb": round(result["size"] / (1024*1024), 2),
+        "checksum": checksum,
+        "encrypted": request.encrypt,
+        "timestamp": timestamp,
+        "kind": result["kind"]
+    }
+    if request.incremental:
+        response.update(
+            base=result["base"],
+            sequence=result["sequence"],
+            pages_total=result["pages_total"],
+            pages_changed=result["pages_changed"]
+        )
+    return response
+
+
+def _get_operator(conn, operator_id: str):
+    return conn.execute("SELECT id, role FROM person WHERE id = ?", (operator_id,)).fetchone()
+
+
 @router.post("/create")
 async def create_backup(request: BackupRequest, req: Request):
-    """Create a new backup"""
+    """Create a new backup
+
+    The live database is copied with the SQLite backup API (WAL-consistent,
+    writers keep going) and then compressed / encrypted in blocks, all in a
+    backup job thread. With wait=false the job id is returned at once;
+    progress is at GET /api/backup/jobs/{job_id}.
+    """
     # Verify operator exists and has permission
-    with get_db() as conn:
-        cursor = conn.execute(
-            "SELECT id, role FROM person WHERE id = ?",
-            (request.operator_id,)
-        )
-        operator = cursor.fetchone()
-        if not operator:
-            raise HTTPException(status_code=404, detail="Operator not found")
-        if operator['role'] not in ['admin', 'staff']:
-            raise HTTPException(status_code=403, detail="Permission denied")
+    operator = await db_read(_get_operator, request.operator_id)
+    if not operator:
+        raise HTTPException(status_code=404, detail="Operator not found")
+    if operator['role'] not in ['admin', 'staff']:
+        raise HTTPException(status_code=403, detail="Permission denied")
 
     # Generate timestamp for filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Read database file
     if not os.path.exists(DB_PATH):
         raise HTTPException(status_code=404, detail="Database not found")
 
-    with open(DB_PATH, 'rb') as f:
-        db_data = f.read()
-
-    # Compress with gzip
-    compressed = gzip.compress(db_data, compresslevel=9)
-
-    # Calculate checksum before encryption
-    checksum = calculate_checksum(compressed)
-
     # Encrypt if requested
-    if request.encrypt:
-        if not request.password:
-            raise HTTPException(
-                status_code=400,
-                detail="Password required for encrypted backup"
-            )
-        final_data = simple_encrypt(compressed, request.password)
-        ext = ".db.gz.enc"
-    else:
-        final_data = compressed
-        ext = ".db.gz"
+    if request.encrypt and not request.password:
+        raise HTTPException(
+            status_code=400,
+            detail="Password required for encrypted backup"
+        )
+    if request.incremental and request.target not in ("local", "usb"):
+        raise HTTPException(
+            status_code=400,
+            detail="Incremental backups need a local or usb target"
+        )
 
-    # Determine target path
-    filename = f"cirs_backup_{timestamp}{ext}"
+    # Determine target directory
+    download_dir = None
 
-    if request.target == "local":
-        os.makedirs(BACKUP_DIR, exist_ok=True)
-        target_path = os.path.join(BACKUP_DIR, filename)
+    if request.target == "download":
+        # Return as downloadable file (temp file removed after sending)
+        download_dir = tempfile.mkdtemp(prefix="cirs-backup-")
+        target_dir = download_dir
+    else:
+        # 'local', or the first detected USB device
+        try:
+            target_dir = target_directory(request.target)
+        except BackupError as e:
+            raise HTTPException(status_code=404 if request.target == "usb" else 400, detail=str(e))
 
-        with open(target_path, 'wb') as f:
-            f.write(final_data)
+    client_ip = req.client.host if req.client else None
+    try:
+        job = backup_jobs.start("backup", _backup_job, request, target_dir, timestamp, client_ip)
+    except BackupBusy as e:
+        if download_dir:
+            shutil.rmtree(download_dir, ignore_errors=True)
+        raise HTTPException(status_code=409, detail=str(e))
 
-    elif request.target == "usb":
-        usb_devices = detect_usb_devices()
-        if not usb_devices:
-            raise HTTPException(
-                status_code=404,
-                detail="No USB device detected. Please insert a USB drive."
-            )
-
-        # Use first detected USB device
-        usb_path = usb_devices[0]['path']
-        backup_subdir = os.path.join(usb_path, "CIRS_Backups")
-        os.makedirs(backup_subdir, exist_ok=True)
-        target_path = os.path.join(backup_subdir, filename)
-
-        with open(target_path, 'wb') as f:
-            f.write(final_data)
-
-    elif request.target == "download":
-        # Return as downloadable file
-        with write_db() as conn:
-            log_backup(
-                conn, "download", "download", len(final_data),
-                checksum, request.encrypt, request.operator_id,
-                "success", request.notes
-            )
-            log_audit(
-                conn, "BACKUP", request.operator_id,
-                target_id=f"download_{timestamp}",
-                new_value=json.dumps({
-                    "size": len(final_data),
-                    "encrypted": request.encrypt,
-                    "checksum": checksum
-                }),
-                ip_address=req.client.host if req.client else None
-            )
-
-        return StreamingResponse(
-            BytesIO(final_data),
+    if download_dir:
+        try:
+            result = await asyncio.wrap_future(job.future)
+        except BaseException:
+            shutil.rmtree(download_dir, ignore_errors=True)
+            raise
+        return FileResponse(
+            result["path"],
             media_type="application/octet-stream",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "X-Checksum": checksum
-            }
+            filename=result["filename"],
+            headers={"X-Checksum": result["checksum"]},
+            background=BackgroundTask(shutil.rmtree, download_dir, ignore_errors=True)
         )
-    else:
-        raise HTTPException(status_code=400, detail="Invalid target")
 
-    # Log the backup
+    if not request.wait:
+        return {
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status,
+            "progress_url": f"/api/backup/jobs/{job.job_id}"
+        }
+
+    return await asyncio.wrap_future(job.future)
+
+
+@router.get("/jobs")
+async def list_backup_jobs():
+    """Running and recent backup / restore jobs (newest first)"""
+    return {"jobs": backup_jobs.list()}
+
+
+@router.get("/jobs/{job_id}")
+async def get_backup_job(job_id: str):
+    """Status and progress of a backup / restore job"""
+    job = backup_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+def _restore_job(job: BackupJob, request: RestoreRequest, backup_path: str,
+                 client_ip: Optional[str]) -> dict:
+    """Decompress + verify + swap + log; runs in the restore job thread"""
+    restored_path = DB_PATH + ".restoring"
+    try:
+        # Decrypt (streaming, incremental chain or legacy XOR) and decompress into a temp file
+        job.update("decompress", total=os.path.getsize(backup_path) if backup_format(backup_path) != "delta" else 0)
+        restore_to_file(backup_path, restored_path, request.password, job.advance)
+
+        # Reject damaged files before touching the live database, and bring
+        # backups from older versions up to the current schema
+        job.update("verify")
+        verify_database(restored_path)
+        conn = sqlite3.connect(restored_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            migrate(conn)
+        except sqlite3.Error as e:
+            raise BackupError(f"Restored database could not be upgraded to the current schema: {e}")
+        finally:
+            conn.close()
+
+        # Wait for in-flight requests, close every pooled connection, swap the file
+        job.update("swap")
+        try:
+            with drained_pool():
+                pre_restore = swap_database(restored_path, DB_PATH)
+        except PoolBusy as e:
+            raise BackupError(f"Database busy, restore not applied: {e}")
+    finally:
+        if os.path.exists(restored_path):
+            os.remove(restored_path)
+
+    # In-process caches were built from the old database
+    response_cache.clear()
+    hub_key_cache.invalidate()
+    station_key_cache.invalidate()
+
+    # Log the restore (in new database)
     with write_db() as conn:
-        log_backup(
-            conn, request.target, target_path, len(final_data),
-            checksum, request.encrypt, request.operator_id,
-            "success", request.notes
-        )
         log_audit(
-            conn, "BACKUP", request.operator_id,
-            target_id=target_path,
-            new_value=json.dumps({
-                "size": len(final_data),
-                "encrypted": request.encrypt,
-                "checksum": checksum
-            }),
-            ip_address=req.client.host if req.client else None
+            conn, "RESTORE", request.operator_id,
+            target_id=backup_path,
+            reason_text=request.reason,
+            ip_address=client_ip
         )
 
     return {
         "success": True,
-        "filename": filename,
-        "path": target_path,
-        "size_bytes": len(final_data),
-        "size_mb": round(len(final_data) / (1024*1024), 2),
-        "checksum": checksum,
-        "encrypted": request.encrypt,
-        "timestamp": timestamp
+        "message": "Database restored successfully",
+        "source": backup_path,
+        "pre_restore_backup": pre_restore
     }
 
 
@@ -346,101 +336,60 @@ async def create_backup(request: BackupRequest, req: Request):
 async def restore_backup(request: RestoreRequest, req: Request):
     """Restore from a backup file
     WARNING: This will overwrite the current database!
+
+    Runs as a restore job: the backup is decompressed into a temp file and
+    integrity-checked while the API keeps serving; only the final swap
+    waits for in-flight requests. With wait=false the job id is returned at
+    once; progress is at GET /api/backup/jobs/{job_id}.
     """
     # Verify operator is admin
-    with get_db() as conn:
-        cursor = conn.execute(
-            "SELECT id, role FROM person WHERE id = ?",
-            (request.operator_id,)
+    operator = await db_read(_get_operator, request.operator_id)
+    if not operator:
+        raise HTTPException(status_code=404, detail="Operator not found")
+    if operator['role'] != 'admin':
+        raise HTTPException(
+            status_code=403,
+            detail="Only admin can restore backups"
         )
-        operator = cursor.fetchone()
-        if not operator:
-            raise HTTPException(status_code=404, detail="Operator not found")
-        if operator['role'] != 'admin':
-            raise HTTPException(
-                status_code=403,
-                detail="Only admin can restore backups"
-            )
 
     # Find backup file
     backup_path = None
 
     if request.backup_id:
-        with get_db() as conn:
-            cursor = conn.execute(
-                "SELECT file_path FROM backup_log WHERE id = ?",
-                (request.backup_id,)
-            )
-            row = cursor.fetchone()
-            if row:
-                backup_path = row['file_path']
+        row = await db_read(lambda conn: conn.execute(
+            "SELECT file_path FROM backup_log WHERE id = ?",
+            (request.backup_id,)
+        ).fetchone())
+        if row:
+            backup_path = row['file_path']
     elif request.file_path:
         backup_path = request.file_path
 
     if not backup_path or not os.path.exists(backup_path):
         raise HTTPException(status_code=404, detail="Backup file not found")
 
-    # Read backup file
-    with open(backup_path, 'rb') as f:
-        backup_data = f.read()
-
-    # Decrypt if encrypted
-    if backup_path.endswith('.enc'):
-        if not request.password:
-            raise HTTPException(
-                status_code=400,
-                detail="Password required for encrypted backup"
-            )
-        try:
-            backup_data = simple_decrypt(backup_data, request.password)
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail="Decryption failed. Wrong password?"
-            )
-
-    # Decompress
+    client_ip = req.client.host if req.client else None
     try:
-        db_data = gzip.decompress(backup_data)
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail="Decompression failed. File may be corrupted."
-        )
+        job = backup_jobs.start("restore", _restore_job, request, backup_path, client_ip)
+    except BackupBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    # Create backup of current database before restore
-    if os.path.exists(DB_PATH):
-        current_backup = DB_PATH + f".pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        shutil.copy2(DB_PATH, current_backup)
-
-    # Write restored database
-    # First, close any WAL connections
-    with write_db() as conn:
-        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
-
-    # Write the restored data
-    with open(DB_PATH, 'wb') as f:
-        f.write(db_data)
-
-    # Log the restore (in new database)
-    with write_db() as conn:
-        log_audit(
-            conn, "RESTORE", request.operator_id,
-            target_id=backup_path,
-            reason_text=request.reason,
-            ip_address=req.client.host if req.client else None
-        )
+    if not request.wait:
+        return {
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status,
+            "progress_url": f"/api/backup/jobs/{job.job_id}"
+        }
 
-    return {
-        "success": True,
-        "message": "Database restored successfully",
-        "source": backup_path,
-        "pre_restore_backup": current_backup if os.path.exists(DB_PATH) else None
-    }
+    try:
+        return await asyncio.wrap_future(job.future)
+    except BackupError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/{backup_id}")
-async def delete_backup(backup_id: int, operator_id: str, req: Request):
+def delete_backup(backup_id: int, operator_id: str, req: Request):
     """Delete a backup file"""
     # Verify operator is admin
     with get_db() as conn:
@@ -463,9 +412,12 @@ async def delete_backup(backup_id: int, operator_id: str, req: Request):
         if not backup:
             raise HTTPException(status_code=404, detail="Backup record not found")
 
-    # Delete file if exists
-    if backup['file_path'] and os.path.exists(backup['file_path']):
-        os.remove(backup['file_path'])
+    # Delete file (and its page manifest) if exists
+    # Note: deltas taken after this backup can no longer be restored
+    if backup['file_path']:
+        for path in (backup['file_path'], backup['file_path'] + MANIFEST_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
 
     # Update backup log status
     with write_db() as conn:
@@ -486,14 +438,12 @@ async def delete_backup(backup_id: int, operator_id: str, req: Request):
 @router.get("/verify/{backup_id}")
 async def verify_backup(backup_id: int):
     """Verify backup integrity by checksum"""
-    with get_db() as conn:
-        cursor = conn.execute(
-            "SELECT file_path, checksum, encrypted FROM backup_log WHERE id = ?",
-            (backup_id,)
-        )
-        backup = cursor.fetchone()
-        if not backup:
-            raise HTTPException(status_code=404, detail="Backup not found")
+    backup = await db_read(lambda conn: conn.execute(
+        "SELECT file_path, checksum, encrypted FROM backup_log WHERE id = ?",
+        (backup_id,)
+    ).fetchone())
+    if not backup:
+        raise HTTPException(status_code=404, detail="Backup not found")
 
     file_path = backup['file_path']
     stored_checksum = backup['checksum']
@@ -505,25 +455,20 @@ async def verify_backup(backup_id: int):
             "stored_checksum": stored_checksum
         }
 
-    # Read and calculate checksum
-    with open(file_path, 'rb') as f:
-        data = f.read()
-
-    # For encrypted files, checksum is of encrypted data
-    # For non-encrypted files, checksum is of compressed data
-    current_checksum = calculate_checksum(data)
+    # Checksum of the file as stored (compressed, and encrypted if .enc)
+    current_checksum = await asyncio.to_thread(file_checksum, file_path)
 
     return {
         "valid": current_checksum == stored_checksum,
         "stored_checksum": stored_checksum,
         "current_checksum": current_checksum,
-        "file_size": len(data),
+        "file_size": os.path.getsize(file_path),
         "encrypted": bool(backup['encrypted'])
     }
 
 
 @router.get("/audit-log")
-async def get_backup_audit_log(limit: int = 50):
+def get_backup_audit_log(limit: int = 50):
     """Get backup-related audit log entries"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -539,15 +484,20 @@ async def get_backup_audit_log(limit: int = 50):
 
 
 @router.post("/schedule")
-async def configure_backup_schedule(
+def configure_backup_schedule(
     enabled: bool = True,
     interval_hours: int = 24,
     target: str = "local",
+    retention: int = DEFAULT_RETENTION,
     operator_id: str = None
 ):
-    """Configure automatic backup schedule (stored in config)"""
+    """Configure automatic backup schedule (stored in config, run by services/backup_scheduler.py)"""
     if not operator_id:
         raise HTTPException(status_code=400, detail="operator_id required")
+    if target not in ("local", "usb"):
+        raise HTTPException(status_code=400, detail="Invalid target")
+    if interval_hours < 1 or retention < 1:
+        raise HTTPException(status_code=400, detail="interval_hours and retention must be at least 1")
 
     # Verify admin
     with get_db() as conn:
@@ -563,6 +513,7 @@ async def configure_backup_schedule(
         "enabled": enabled,
         "interval_hours": interval_hours,
         "target": target,
+        "retention": retention,
         "updated_by": operator_id,
         "updated_at": datetime.now().isoformat()
     }
@@ -576,6 +527,7 @@ async def configure_backup_schedule(
             """,
             (json.dumps(schedule_config), json.dumps(schedule_config))
         )
+    backup_scheduler.wake()
 
     return {
         "success": True,
@@ -584,17 +536,9 @@ async def configure_backup_schedule(
 
 
 @router.get("/schedule")
-async def get_backup_schedule():
-    """Get current backup schedule configuration"""
+def get_backup_schedule():
+    """Get current backup schedule configuration and scheduler state"""
     with get_db() as conn:
-        cursor = conn.execute(
-            "SELECT value FROM config WHERE key = 'backup_schedule'"
-        )
-        row = cursor.fetchone()
-        if row:
-            return json.loads(row['value'])
-        return {
-            "enabled": False,
-            "interval_hours": 24,
-            "target": "local"
-        }
+        schedule = load_schedule(conn)
+    schedule["scheduler"] = backup_scheduler.status()
+    return schedule
@@ -1,19 +1,25 @@
 """
 CIRS Events Routes
 """
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Optional
+import json
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import get_db, rows_to_list
+from services.event_bus import event_bus, TOPICS
 
 router = APIRouter()
 
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+
 
 @router.get("")
-async def list_events(
+def list_events(
     event_type: Optional[str] = Query(None, description="Filter by event type"),
     person_id: Optional[str] = Query(None, description="Filter by person"),
     item_id: Optional[int] = Query(None, description="Filter by inventory item"),
@@ -63,7 +69,7 @@ async def list_events(
 
 
 @router.get("/summary")
-async def get_events_summary(
+def get_events_summary(
     from_date: Optional[str] = Query(None, description="From date (YYYY-MM-DD)"),
     to_date: Optional[str] = Query(None, description="To date (YYYY-MM-DD)")
 ):
@@ -93,7 +99,7 @@ async def get_events_summary(
 
 
 @router.get("/person/{person_id}")
-async def get_person_events(person_id: str, limit: int = Query(50, le=200)):
+def get_person_events(person_id: str, limit: int = Query(50, le=200)):
     """Get all events for a specific person"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -113,7 +119,7 @@ async def get_person_events(person_id: str, limit: int = Query(50, le=200)):
 
 
 @router.get("/item/{item_id}")
-async def get_item_events(item_id: int, limit: int = Query(50, le=200)):
+def get_item_events(item_id: int, limit: int = Query(50, le=200)):
     """Get all events for a specific inventory item"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -130,3 +136,91 @@ async def get_item_events(item_id: int, limit: int = Query(50, le=200)):
         events = rows_to_list(cursor.fetchall())
 
     return {"events": events, "count": len(events)}
+
+
+# ============================================================================
+# Server-Sent Events (services/event_bus.py)
+# ============================================================================
+
+def _sse(event_type: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = f"id: {event_id}\n" if event_id is not None else ""
+    return lines + f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_event(event: dict) -> str:
+    data = {**event["data"], "time": event["time"]}
+    if event.get("coalesced"):
+        data["coalesced"] = event["coalesced"]
+    return _sse(event["type"], data, event["id"])
+
+
+@router.get("/stream")
+async def stream_events(
+    topics: Optional[str] = Query(None, description="Comma-separated topics (default: all)"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Push hub change notifications (text/event-stream).
+
+    Events: inventory.changed, headcount.changed, broadcast.pinned,
+    registration.waiting, manifest.acknowledged. Clients refetch what changed.
+    A heartbeat comment is sent every 15 s; reconnecting with Last-Event-ID
+    replays missed events, or sends `resync` if they are no longer buffered.
+    """
+    selected = set(TOPICS)
+    if topics:
+        selected = {t.strip() for t in topics.split(",") if t.strip()}
+        unknown = selected - set(TOPICS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(sorted(unknown))}")
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    if event_bus.is_full():
+        raise HTTPException(status_code=503, detail="Too many event stream clients")
+
+    async def events():
+        subscriber = event_bus.subscribe(selected)
+        if subscriber is None:
+            yield _sse("error", {"detail": "Too many event stream clients"})
+            return
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            yield _sse("ready", {"topics": sorted(selected), "last_id": event_bus.last_id})
+
+            sent_id = 0
+            if resume_from is not None:
+                missed = event_bus.replay_since(resume_from, selected)
+                if missed is None:
+                    yield _sse("resync", {"topics": sorted(selected)})
+                else:
+                    for event in missed:
+                        yield _sse_event(event)
+                    sent_id = max([resume_from] + [event["id"] for event in missed])
+
+            while True:
+                batch = await subscriber.next_events(HEARTBEAT_SECONDS)
+                if not batch:
+                    yield ": heartbeat\n\n"
+                    continue
+                for event in batch:
+                    if event["id"] > sent_id:
+                        sent_id = event["id"]
+                        yield _sse_event(event)
+        finally:
+            event_bus.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stream/stats")
+async def get_stream_stats():
+    """Event bus metrics (subscribers, published, coalesced)"""
+    return event_bus.stats()
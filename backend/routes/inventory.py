@@ -10,7 +10,9 @@ import sys
 import json
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, write_db, dict_from_row, rows_to_list
+from database import get_db, write_db, write_job, dict_from_row, rows_to_list
+from services.event_bus import publish
+from services.capacity import capacity_values
 
 router = APIRouter()
 
@@ -71,7 +73,7 @@ class DistributeRequest(BaseModel):
 
 
 @router.get("")
-async def list_inventory(
+def list_inventory(
     category: Optional[str] = Query(None, description="Filter by category"),
     below_min: bool = Query(False, description="Show only items below min_quantity")
 ):
@@ -169,7 +171,7 @@ async def create_bundle(bundle: BundleCreate):
 
 
 @router.post("/bundles/intake")
-async def intake_bundle(request: BundleIntakeRequest):
+def intake_bundle(request: BundleIntakeRequest):
     """Add all items from a bundle to inventory (組套入庫)"""
     bundles_data = load_bundles()
 
@@ -232,11 +234,13 @@ async def intake_bundle(request: BundleIntakeRequest):
                 # Create new item
                 cursor = conn.execute(
                     """
-                    INSERT INTO inventory (name, specification, category, quantity, unit, location)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    INSERT INTO inventory (name, specification, category, quantity, unit, location,
+                                           capacity_liters, capacity_kcal, capacity_wh)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (item["name"], item.get("specification"), item["category"],
                      quantity, item.get("unit"), request.location)
+                    + capacity_values(item["name"], item["category"], item.get("specification"))
                 )
                 new_id = cursor.lastrowid
                 # Log event
@@ -253,6 +257,8 @@ async def intake_bundle(request: BundleIntakeRequest):
                     "quantity": quantity
                 })
 
+    publish("inventory.changed", item_ids=[i["id"] for i in created_items + updated_items], source="bundle_intake")
+
     return {
         "message": f"Bundle '{bundle['name']}' added successfully",
         "bundle": bundle["name"],
@@ -283,7 +289,7 @@ class DonationInboundRequest(BaseModel):
 
 
 @router.post("/donation/inbound")
-async def donation_inbound(request: DonationInboundRequest):
+def donation_inbound(request: DonationInboundRequest):
     """接收捐贈物資並產生收據 QR Code"""
     import uuid
     from datetime import datetime
@@ -337,10 +343,12 @@ async def donation_inbound(request: DonationInboundRequest):
                 # 建立新物品
                 cursor = conn.execute(
                     """
-                    INSERT INTO inventory (name, specification, category, quantity, unit)
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO inventory (name, specification, category, quantity, unit,
+                                           capacity_liters, capacity_kcal, capacity_wh)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (item.name, item.specification, item.category, item.quantity, item.unit)
+                    + capacity_values(item.name, item.category, item.specification)
                 )
                 new_id = cursor.lastrowid
                 # Log event
@@ -364,6 +372,8 @@ async def donation_inbound(request: DonationInboundRequest):
                     "category": item.category or 'other'
                 })
 
+    publish("inventory.changed", item_ids=[i["id"] for i in created_items + updated_items], source="donation")
+
     # 產生 DONATION_RECEIPT 信封
     now = datetime.now()
     date_str = now.strftime("%Y%m%d")
@@ -462,7 +472,7 @@ async def delete_bundle(bundle_id: str):
 # ============================================
 
 @router.get("/equipment-pending")
-async def get_equipment_pending_checks():
+def get_equipment_pending_checks():
     """Get equipment that needs daily check"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -483,7 +493,7 @@ async def get_equipment_pending_checks():
 
 
 @router.get("/expiring")
-async def get_expiring_items(days: int = Query(7, description="Days until expiry")):
+def get_expiring_items(days: int = Query(7, description="Days until expiry")):
     """Get items expiring within N days"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -502,7 +512,7 @@ async def get_expiring_items(days: int = Query(7, description="Days until expiry
 
 
 @router.get("/similar")
-async def find_similar_items(name: str = Query(..., min_length=1)):
+def find_similar_items(name: str = Query(..., min_length=1)):
     """Find items with similar names for smart merge suggestion"""
     with get_db() as conn:
         # Simple LIKE search for similar names
@@ -536,7 +546,7 @@ class EquipmentCheckRequest(BaseModel):
 
 
 @router.get("/{item_id}")
-async def get_inventory_item(item_id: int):
+def get_inventory_item(item_id: int):
     """Get a single inventory item"""
     with get_db() as conn:
         cursor = conn.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
@@ -549,16 +559,18 @@ async def get_inventory_item(item_id: int):
 
 
 @router.post("")
-async def create_inventory_item(item: InventoryCreate):
+def create_inventory_item(item: InventoryCreate):
     """Create a new inventory item"""
     with write_db() as conn:
         cursor = conn.execute(
             """
-            INSERT INTO inventory (name, specification, category, quantity, unit, location, expiry_date, min_quantity, tags, notes, check_interval_days, check_status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO inventory (name, specification, category, quantity, unit, location, expiry_date, min_quantity, tags, notes, check_interval_days, check_status,
+                                   capacity_liters, capacity_kcal, capacity_wh)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (item.name, item.specification, item.category, item.quantity, item.unit, item.location,
              item.expiry_date, item.min_quantity, item.tags, item.notes, item.check_interval_days, item.check_status)
+            + capacity_values(item.name, item.category, item.specification)
         )
         new_id = cursor.lastrowid
 
@@ -571,11 +583,13 @@ async def create_inventory_item(item: InventoryCreate):
             (new_id, item.quantity, f"Created: {item.name}")
         )
 
+    publish("inventory.changed", item_ids=[new_id], source="create")
+
     return {"id": new_id, "message": "Item created successfully"}
 
 
 @router.put("/{item_id}")
-async def update_inventory_item(item_id: int, item: InventoryUpdate):
+def update_inventory_item(item_id: int, item: InventoryUpdate):
     """Update an inventory item"""
     # Build dynamic update query
     updates = []
@@ -589,23 +603,36 @@ async def update_inventory_item(item_id: int, item: InventoryUpdate):
     if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    updates.append("updated_at = CURRENT_TIMESTAMP")
-    params.append(item_id)
-
     with write_db() as conn:
         # Check if item exists
         cursor = conn.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
-        if cursor.fetchone() is None:
+        existing = cursor.fetchone()
+        if existing is None:
             raise HTTPException(status_code=404, detail="Item not found")
 
+        # Re-parse capacities when the text they come from changes
+        changed = item.model_dump(exclude_unset=True)
+        if any(changed.get(field) is not None for field in ("name", "category", "specification")):
+            merged = {
+                field: changed[field] if changed.get(field) is not None else existing[field]
+                for field in ("name", "category", "specification")
+            }
+            updates.extend(["capacity_liters = ?", "capacity_kcal = ?", "capacity_wh = ?"])
+            params.extend(capacity_values(merged["name"], merged["category"], merged["specification"]))
+
+        updates.append("updated_at = CURRENT_TIMESTAMP")
+        params.append(item_id)
+
         query = f"UPDATE inventory SET {', '.join(updates)} WHERE id = ?"
         conn.execute(query, params)
 
+    publish("inventory.changed", item_ids=[item_id], source="update")
+
     return {"message": "Item updated successfully"}
 
 
 @router.delete("/{item_id}")
-async def delete_inventory_item(item_id: int):
+def delete_inventory_item(item_id: int):
     """Delete an inventory item"""
     with write_db() as conn:
         cursor = conn.execute("SELECT name FROM inventory WHERE id = ?", (item_id,))
@@ -624,56 +651,65 @@ async def delete_inventory_item(item_id: int):
             (item_id, f"Deleted: {item['name']}")
         )
 
+    publish("inventory.changed", item_ids=[item_id], source="delete")
+
     return {"message": "Item deleted successfully"}
 
 
 @router.post("/{item_id}/distribute")
 async def distribute_inventory(item_id: int, request: DistributeRequest):
     """Distribute inventory to a person"""
-    with write_db() as conn:
-        # Check item exists and has sufficient quantity
-        cursor = conn.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
-        item = dict_from_row(cursor.fetchone())
+    event_id, new_quantity = await write_job(_apply_distribution, item_id, request, lane="inventory")
+    publish("inventory.changed", item_ids=[item_id], source="distribute")
 
-        if item is None:
-            raise HTTPException(status_code=404, detail="Item not found")
+    return {
+        "message": "Distribution recorded",
+        "event_id": event_id,
+        "remaining_quantity": new_quantity
+    }
+
+
+def _apply_distribution(conn, item_id: int, request: DistributeRequest):
+    """Distribution write job (runs on the group-commit writer)"""
+    # Check item exists and has sufficient quantity
+    cursor = conn.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
+    item = dict_from_row(cursor.fetchone())
 
-        if item['quantity'] < request.quantity:
-            raise HTTPException(status_code=400, detail="Insufficient quantity")
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
 
-        # Check person exists
-        cursor = conn.execute("SELECT * FROM person WHERE id = ?", (request.person_id,))
-        person = cursor.fetchone()
+    if item['quantity'] < request.quantity:
+        raise HTTPException(status_code=400, detail="Insufficient quantity")
 
-        if person is None:
-            raise HTTPException(status_code=404, detail="Person not found")
+    # Check person exists
+    cursor = conn.execute("SELECT * FROM person WHERE id = ?", (request.person_id,))
+    person = cursor.fetchone()
 
-        # Update inventory
-        new_quantity = item['quantity'] - request.quantity
-        conn.execute(
-            "UPDATE inventory SET quantity = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (new_quantity, item_id)
-        )
+    if person is None:
+        raise HTTPException(status_code=404, detail="Person not found")
 
-        # Log event
-        cursor = conn.execute(
-            """
-            INSERT INTO event_log (event_type, item_id, person_id, quantity_change, notes)
-            VALUES ('RESOURCE_OUT', ?, ?, ?, ?)
-            """,
-            (item_id, request.person_id, -request.quantity, request.notes)
-        )
-        event_id = cursor.lastrowid
+    # Update inventory
+    new_quantity = item['quantity'] - request.quantity
+    conn.execute(
+        "UPDATE inventory SET quantity = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (new_quantity, item_id)
+    )
 
-    return {
-        "message": "Distribution recorded",
-        "event_id": event_id,
-        "remaining_quantity": new_quantity
-    }
+    # Log event
+    cursor = conn.execute(
+        """
+        INSERT INTO event_log (event_type, item_id, person_id, quantity_change, notes)
+        VALUES ('RESOURCE_OUT', ?, ?, ?, ?)
+        """,
+        (item_id, request.person_id, -request.quantity, request.notes)
+    )
+    event_id = cursor.lastrowid
+
+    return event_id, new_quantity
 
 
 @router.get("/{item_id}/history")
-async def get_item_history(item_id: int, limit: int = Query(50, le=200)):
+def get_item_history(item_id: int, limit: int = Query(50, le=200)):
     """Get distribution history for an item"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -693,7 +729,7 @@ async def get_item_history(item_id: int, limit: int = Query(50, le=200)):
 
 
 @router.post("/{item_id}/intake")
-async def intake_inventory(item_id: int, request: IntakeRequest):
+def intake_inventory(item_id: int, request: IntakeRequest):
     """Add quantity to inventory (入庫)"""
     with write_db() as conn:
         cursor = conn.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
@@ -718,6 +754,8 @@ async def intake_inventory(item_id: int, request: IntakeRequest):
         )
         event_id = cursor.lastrowid
 
+    publish("inventory.changed", item_ids=[item_id], source="intake")
+
     return {
         "message": "Intake recorded",
         "event_id": event_id,
@@ -726,7 +764,7 @@ async def intake_inventory(item_id: int, request: IntakeRequest):
 
 
 @router.post("/{item_id}/check")
-async def equipment_check(item_id: int, request: EquipmentCheckRequest):
+def equipment_check(item_id: int, request: EquipmentCheckRequest):
     """Record equipment daily check"""
     with write_db() as conn:
         cursor = conn.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
@@ -757,6 +795,8 @@ async def equipment_check(item_id: int, request: EquipmentCheckRequest):
         )
         event_id = cursor.lastrowid
 
+    publish("inventory.changed", item_ids=[item_id], source="check")
+
     return {
         "message": "Check recorded",
         "event_id": event_id,
@@ -8,26 +8,37 @@ Hub Backend endpoints for Store-and-Forward logistics:
 - Audit logging
 """
 
+import asyncio
+import base64
+import binascii
+import io
 import json
 import hashlib
 import sys
 import os
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from itertools import combinations, islice
+from typing import Any, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Path, Body, UploadFile, File
 from pydantic import BaseModel, Field
 
 # Add shared module path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from database import get_db, write_db, dict_from_row, rows_to_list
+from database import get_db, write_db, write_job, run_in_db_thread, dict_from_row, rows_to_list, select_in
+from services.event_bus import publish
+from services.chunk_sessions import chunk_sessions, ChunkConflict, ChunkSessionFull
 
 # Import crypto modules
 from shared.crypto.signing import Ed25519Signer, Ed25519Verifier, generate_keypair
 from shared.crypto.encryption import SealedBox, generate_encryption_keypair
-from shared.crypto.hmac import generate_station_secret, verify_hmac, compute_hmac
+from shared.crypto.hmac import generate_station_secret, report_signable_bytes, StationKey
 from shared.protocol.manifest import ManifestBuilder
-from shared.protocol.chunking import QRChunker, QRReassembler
+from shared.protocol.chunking import QRChunker, QRReassembler, parse_chunk, decode_v2
 from shared.protocol.report import ReportDecryptor
 
 
@@ -64,6 +75,10 @@ class IngestPacketRequest(BaseModel):
     envelope: dict = Field(..., description="Encrypted REPORT_PACKET envelope")
 
 
+class BulkIngestRequest(BaseModel):
+    envelopes: List[Any] = Field(..., description="Encrypted REPORT_PACKET envelopes")
+
+
 class IngestPacketResponse(BaseModel):
     success: bool
     packet_id: str
@@ -108,42 +123,169 @@ class AuditLogEntry(BaseModel):
 # Key Management Helpers
 # ============================================================================
 
+HUB_KEY_TYPES = ('signing', 'encryption')
+
+
+class HubKeySet:
+    """Hub keypairs plus ready-to-use ManifestBuilder / ReportDecryptor"""
+
+    def __init__(self, keys: dict, stamp: tuple):
+        self.keys = keys
+        self.stamp = stamp
+        # Parsed once: SigningKey inside the builder's Ed25519Signer,
+        # PrivateKey + NaCl SealedBox inside the decryptor
+        self.manifest_builder = ManifestBuilder(keys['signing_private'])
+        self.decryptor = ReportDecryptor(keys['encryption_private'])
+
+
+class HubKeyCache:
+    """
+    Process-wide cache of the Hub keys.
+
+    Each use costs one small query for the (key_type, created_at, rotated_at)
+    stamp of hub_keys; the keys are only re-read and re-parsed when that stamp
+    changes (rotation must set rotated_at), when a key row is missing, or
+    after invalidate().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[HubKeySet] = None
+
+    @staticmethod
+    def _stamp(rows) -> tuple:
+        return tuple((row['key_type'], row['created_at'], row['rotated_at']) for row in rows)
+
+    def get(self, conn) -> HubKeySet:
+        stamp = self._stamp(conn.execute(
+            "SELECT key_type, created_at, rotated_at FROM hub_keys WHERE key_type IN (?, ?) ORDER BY key_type",
+            HUB_KEY_TYPES
+        ))
+        current = self._current
+        if current is not None and current.stamp == stamp and len(stamp) == len(HUB_KEY_TYPES):
+            return current
+
+        with self._lock:
+            current = self._current
+            if current is not None and current.stamp == stamp and len(stamp) == len(HUB_KEY_TYPES):
+                return current
+            self._current = self._load(conn)
+            return self._current
+
+    def invalidate(self):
+        """Drop the cached keys (next get() reloads from hub_keys)"""
+        with self._lock:
+            self._current = None
+
+    def _load(self, conn) -> HubKeySet:
+        """Read both keypairs, generating any that do not exist yet"""
+        query = """
+            SELECT key_type, private_key, public_key, created_at, rotated_at
+            FROM hub_keys WHERE key_type IN (?, ?) ORDER BY key_type
+        """
+        rows = conn.execute(query, HUB_KEY_TYPES).fetchall()
+        present = {row['key_type'] for row in rows}
+        generators = {'signing': generate_keypair, 'encryption': generate_encryption_keypair}
+        missing = [key_type for key_type in HUB_KEY_TYPES if key_type not in present]
+        if missing:
+            # Committed by the caller's write_db() / get_db()
+            conn.executemany(
+                "INSERT INTO hub_keys (key_type, private_key, public_key) VALUES (?, ?, ?)",
+                [(key_type, *generators[key_type]()) for key_type in missing]
+            )
+            rows = conn.execute(query, HUB_KEY_TYPES).fetchall()
+
+        keys = {}
+        for row in rows:
+            keys[f"{row['key_type']}_private"] = row['private_key']
+            keys[f"{row['key_type']}_public"] = row['public_key']
+        return HubKeySet(keys, self._stamp(rows))
+
+
+hub_key_cache = HubKeyCache()
+
+
+def get_hub_key_set(conn) -> HubKeySet:
+    """Cached Hub keys and crypto objects (see HubKeyCache)."""
+    return hub_key_cache.get(conn)
+
+
 def get_or_create_hub_keys(conn):
     """Get or create Hub signing and encryption keypairs."""
-    keys = {}
-
-    # Signing key (Ed25519)
-    cursor = conn.execute("SELECT private_key, public_key FROM hub_keys WHERE key_type = 'signing'")
-    row = cursor.fetchone()
-    if row:
-        keys['signing_private'] = row['private_key']
-        keys['signing_public'] = row['public_key']
-    else:
-        priv, pub = generate_keypair()
-        conn.execute(
-            "INSERT INTO hub_keys (key_type, private_key, public_key) VALUES (?, ?, ?)",
-            ('signing', priv, pub)
-        )
-        keys['signing_private'] = priv
-        keys['signing_public'] = pub
-
-    # Encryption key (X25519)
-    cursor = conn.execute("SELECT private_key, public_key FROM hub_keys WHERE key_type = 'encryption'")
-    row = cursor.fetchone()
-    if row:
-        keys['encryption_private'] = row['private_key']
-        keys['encryption_public'] = row['public_key']
-    else:
-        priv, pub = generate_encryption_keypair()
-        conn.execute(
-            "INSERT INTO hub_keys (key_type, private_key, public_key) VALUES (?, ?, ?)",
-            ('encryption', priv, pub)
-        )
-        keys['encryption_private'] = priv
-        keys['encryption_public'] = pub
+    return dict(hub_key_cache.get(conn).keys)
+
+
+class StationKeyCache:
+    """
+    Process-wide station_id -> StationKey (decoded secret, pre-keyed HMAC)
+    for active stations.
+
+    Stations missing from the cache are looked up in logistics_stations;
+    after all_active() the cache is complete and misses need no query. The
+    station endpoints call invalidate() after committing a change; a load
+    that raced with an invalidation is not stored.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._complete = False
+        self._generation = 0
+
+    def get(self, conn, station_ids) -> dict:
+        """StationKeys of the active stations among station_ids"""
+        wanted = set(station_ids)
+        with self._lock:
+            found = {sid: self._keys[sid] for sid in wanted if sid in self._keys}
+            complete, generation = self._complete, self._generation
+
+        missing = wanted - found.keys()
+        if missing and not complete:
+            loaded = self._load(conn, missing)
+            with self._lock:
+                if self._generation == generation:
+                    self._keys.update(loaded)
+            found.update(loaded)
+        return found
+
+    def all_active(self, conn) -> dict:
+        """StationKeys of every active station"""
+        with self._lock:
+            if self._complete:
+                return dict(self._keys)
+            generation = self._generation
+
+        loaded = self._load(conn)
+        with self._lock:
+            if self._generation == generation:
+                self._keys = dict(loaded)
+                self._complete = True
+        return loaded
+
+    def invalidate(self):
+        """Forget all stations (call after a logistics_stations change commits)"""
+        with self._lock:
+            self._keys = {}
+            self._complete = False
+            self._generation += 1
+
+    @staticmethod
+    def _load(conn, station_ids=None) -> dict:
+        if station_ids is None:
+            rows = conn.execute(
+                "SELECT station_id, station_secret FROM logistics_stations WHERE is_active = 1"
+            ).fetchall()
+        else:
+            rows = select_in(
+                conn,
+                "SELECT station_id, station_secret FROM logistics_stations "
+                "WHERE is_active = 1 AND station_id IN ({placeholders})",
+                station_ids
+            )
+        return {row['station_id']: StationKey(row['station_secret']) for row in rows}
+
 
-    conn.commit()
-    return keys
+station_key_cache = StationKeyCache()
 
 
 def log_audit(conn, event_type: str, station_id: str = None,
@@ -160,7 +302,7 @@ def log_audit(conn, event_type: str, station_id: str = None,
 # ============================================================================
 
 @router.post("/manifest", response_model=CreateManifestResponse)
-async def create_manifest(request: CreateManifestRequest):
+def create_manifest(request: CreateManifestRequest):
     """
     Generate a signed RESTOCK_MANIFEST for a station.
 
@@ -179,11 +321,10 @@ async def create_manifest(request: CreateManifestRequest):
                 detail=f"Station '{request.station_id}' not found or inactive"
             )
 
-        # Get Hub signing key
-        keys = get_or_create_hub_keys(conn)
+        # Get Hub signing key (cached builder)
+        builder = get_hub_key_set(conn).manifest_builder
 
         # Build manifest
-        builder = ManifestBuilder(keys['signing_private'])
         items = [item.model_dump() for item in request.items]
         manifest = builder.create_manifest(
             station_id=request.station_id,
@@ -224,7 +365,7 @@ async def create_manifest(request: CreateManifestRequest):
 
 
 @router.get("/manifest/{manifest_id}")
-async def get_manifest(manifest_id: str):
+def get_manifest(manifest_id: str):
     """Get manifest details by ID."""
     with get_db() as conn:
         cursor = conn.execute("""
@@ -243,7 +384,7 @@ async def get_manifest(manifest_id: str):
 
 
 @router.get("/manifest/{manifest_id}/print")
-async def get_manifest_printable(manifest_id: str):
+def get_manifest_printable(manifest_id: str):
     """
     Get printable HTML for a manifest.
 
@@ -265,8 +406,7 @@ async def get_manifest_printable(manifest_id: str):
         items = json.loads(manifest['items'])
 
         # Get Hub signing key for QR generation
-        keys = get_or_create_hub_keys(conn)
-        builder = ManifestBuilder(keys['signing_private'])
+        builder = get_hub_key_set(conn).manifest_builder
 
         # Rebuild manifest object for HTML generation
         from shared.protocol.manifest import RestockManifest
@@ -286,7 +426,7 @@ async def get_manifest_printable(manifest_id: str):
 
 
 @router.get("/manifests")
-async def list_manifests(
+def list_manifests(
     station_id: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = Query(50, le=200)
@@ -328,8 +468,193 @@ async def list_manifests(
 # Packet Ingestion Endpoints
 # ============================================================================
 
+INVENTORY_ACTIONS = ('RECEIVE', 'DISPENSE')
+
+
+def apply_report_actions(conn, station_id: str, packet_id: str, actions: list):
+    """
+    Apply a REPORT_PACKET's actions as a set.
+
+    Actions are grouped by item_code and resolved against inventory.name in
+    one indexed query (first matching row, as before). Each item's quantity
+    is folded in report order - RECEIVE adds, DISPENSE subtracts clamped at 0 -
+    and written once; manifest acknowledgements and the per-action audit rows
+    go in with executemany.
+
+    Returns (changed_item_ids, acknowledged_manifest_ids).
+    """
+    item_codes = {a.get('item_code') for a in actions if a.get('type') in INVENTORY_ACTIONS}
+    item_codes.discard(None)
+
+    inventory = {}  # name -> (id, quantity) of the first matching row
+    for row in select_in(
+        conn,
+        "SELECT id, name, quantity FROM inventory WHERE name IN ({placeholders}) ORDER BY id",
+        item_codes
+    ):
+        inventory.setdefault(row['name'], (row['id'], row['quantity']))
+
+    quantities = {}  # inventory id -> running quantity
+    manifests = []
+    audit_rows = []
+    for action in actions:
+        action_type = action.get('type')
+        qty = action.get('qty', 0)
+
+        if action_type == 'RECEIVE' and action.get('manifest_id'):
+            # Manifest acknowledgement
+            manifests.append(action['manifest_id'])
+
+        if action_type in INVENTORY_ACTIONS:
+            row = inventory.get(action.get('item_code'))
+            if row:
+                item_id, stored = row
+                current = quantities.get(item_id, stored or 0)
+                if action_type == 'RECEIVE':
+                    quantities[item_id] = current + qty
+                else:
+                    quantities[item_id] = max(0, current - qty)
+
+        # REGISTER: person registration handled separately
+
+        audit_rows.append((f'ACTION_{action_type}', station_id, packet_id, json.dumps(action)))
+
+    manifests = list(dict.fromkeys(manifests))
+    conn.executemany("""
+        UPDATE logistics_manifests
+        SET status = 'ACKNOWLEDGED', acknowledged_at = CURRENT_TIMESTAMP
+        WHERE manifest_id = ?
+    """, [(manifest_id,) for manifest_id in manifests])
+    conn.executemany(
+        "UPDATE inventory SET quantity = ? WHERE id = ?",
+        [(quantity, item_id) for item_id, quantity in quantities.items()]
+    )
+    conn.executemany("""
+        INSERT INTO logistics_audit (event_type, station_id, packet_id, details)
+        VALUES (?, ?, ?, ?)
+    """, audit_rows)
+
+    return list(quantities), manifests
+
+
+class PacketRejected(Exception):
+    """A report envelope that cannot be applied (audit_event is logged when set)"""
+
+    def __init__(self, status_code: int, detail: str, audit_event: str = None,
+                 station_id: str = None, packet_id: str = None, audit_details: str = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.audit_event = audit_event
+        self.station_id = station_id
+        self.packet_id = packet_id
+        self.audit_details = audit_details
+
+    def log(self, conn):
+        if self.audit_event:
+            log_audit(conn, self.audit_event, self.station_id, self.packet_id, details=self.audit_details)
+
+
+def decrypt_report(decryptor: ReportDecryptor, envelope: dict) -> dict:
+    """Open an ENCRYPTED_REPORT envelope with the Hub key"""
+    if envelope.get('type') != 'ENCRYPTED_REPORT':
+        raise PacketRejected(400, "Invalid envelope type. Expected 'ENCRYPTED_REPORT'")
+
+    try:
+        payload_bytes = decryptor._sealed_box.decrypt(
+            envelope['payload'],
+            decompress=envelope.get('compressed', True)
+        )
+        return json.loads(payload_bytes.decode('utf-8'))
+    except Exception as e:
+        raise PacketRejected(400, f"Decryption failed: {str(e)}", 'INGEST_DECRYPT_FAILED', audit_details=str(e))
+
+
+def verify_report(report: dict, station_keys: dict) -> str:
+    """
+    Check required fields and the station HMAC; returns the payload hash.
+
+    The canonical bytes the HMAC covers are serialized once and also hashed
+    for seen_packets.payload_hash.
+    """
+    if not isinstance(report, dict):
+        raise PacketRejected(400, "Invalid report: expected a JSON object")
+
+    packet_id = report.get('packet_id')
+    station_id = report.get('station_id')
+
+    if not packet_id or not station_id:
+        raise PacketRejected(400, "Missing required fields: packet_id or station_id")
+    if not isinstance(packet_id, str) or not isinstance(station_id, str):
+        raise PacketRejected(400, "Invalid fields: packet_id and station_id must be strings")
+
+    station_key = station_keys.get(station_id)
+    if not station_key:
+        raise PacketRejected(404, f"Unknown or inactive station: {station_id}",
+                             'INGEST_UNKNOWN_STATION', station_id, packet_id)
+
+    signable = report_signable_bytes(report)
+    if not station_key.verify(signable, report.get('hmac')):
+        raise PacketRejected(401, "HMAC verification failed", 'INGEST_HMAC_FAILED', station_id, packet_id)
+
+    return hashlib.sha256(signable).hexdigest()
+
+
+def store_report(conn, report: dict, payload_hash: str) -> dict:
+    """
+    Record a verified report and apply its actions (idempotent on packet_id).
+
+    Returns {"is_duplicate", "changed_item_ids", "acknowledged_manifests"}.
+    """
+    packet_id = report['packet_id']
+    station_id = report['station_id']
+    actions = report.get('actions', [])
+    seq_id = report.get('seq_id', 0)
+
+    # Check for duplicate (idempotency)
+    cursor = conn.execute(
+        "SELECT packet_id FROM seen_packets WHERE packet_id = ?",
+        (packet_id,)
+    )
+    if cursor.fetchone():
+        log_audit(conn, 'INGEST_DUPLICATE', station_id, packet_id)
+        return {"is_duplicate": True, "changed_item_ids": [], "acknowledged_manifests": []}
+
+    # Record packet
+    conn.execute("""
+        INSERT INTO seen_packets (packet_id, station_id, payload_hash)
+        VALUES (?, ?, ?)
+    """, (packet_id, station_id, payload_hash))
+
+    # Update station sync info
+    conn.execute("""
+        UPDATE logistics_stations
+        SET last_sync_at = CURRENT_TIMESTAMP, last_seq_id = MAX(last_seq_id, ?)
+        WHERE station_id = ?
+    """, (seq_id, station_id))
+
+    # Process actions
+    changed_item_ids, acknowledged_manifests = apply_report_actions(conn, station_id, packet_id, actions)
+
+    log_audit(conn, 'INGEST_SUCCESS', station_id, packet_id,
+              details=f"Actions: {len(actions)}, seq_id: {seq_id}")
+
+    return {
+        "is_duplicate": False,
+        "changed_item_ids": changed_item_ids,
+        "acknowledged_manifests": acknowledged_manifests
+    }
+
+
+def _publish_ingest(station_id: str, changed_item_ids: list, acknowledged_manifests: list):
+    for manifest_id in acknowledged_manifests:
+        publish("manifest.acknowledged", manifest_id=manifest_id, station_id=station_id)
+    if changed_item_ids:
+        publish("inventory.changed", item_ids=changed_item_ids, source="logistics")
+
+
 @router.post("/ingest", response_model=IngestPacketResponse)
-async def ingest_packet(request: IngestPacketRequest):
+def ingest_packet(request: IngestPacketRequest):
     """
     Receive and process an encrypted REPORT_PACKET from a Station.
 
@@ -348,161 +673,49 @@ async def ingest_packet(request: IngestPacketRequest):
             detail="Invalid envelope type. Expected 'ENCRYPTED_REPORT'"
         )
 
+    rejected = None
     with write_db() as conn:
         # Get Hub decryption key
-        keys = get_or_create_hub_keys(conn)
-        decryptor = ReportDecryptor(keys['encryption_private'])
+        decryptor = get_hub_key_set(conn).decryptor
 
-        # Decrypt the envelope
         try:
-            payload_bytes = decryptor._sealed_box.decrypt(
-                envelope['payload'],
-                decompress=envelope.get('compressed', True)
-            )
-            report = json.loads(payload_bytes.decode('utf-8'))
-        except Exception as e:
-            log_audit(conn, 'INGEST_DECRYPT_FAILED', details=str(e))
-            raise HTTPException(
-                status_code=400,
-                detail=f"Decryption failed: {str(e)}"
-            )
-
-        # Extract fields
-        packet_id = report.get('packet_id')
-        station_id = report.get('station_id')
-        hmac_value = report.get('hmac')
-        actions = report.get('actions', [])
-        seq_id = report.get('seq_id', 0)
-
-        if not packet_id or not station_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Missing required fields: packet_id or station_id"
-            )
-
-        # Get station secret for HMAC verification
-        cursor = conn.execute(
-            "SELECT station_secret FROM logistics_stations WHERE station_id = ? AND is_active = 1",
-            (station_id,)
-        )
-        station_row = cursor.fetchone()
-
-        if not station_row:
-            log_audit(conn, 'INGEST_UNKNOWN_STATION', station_id, packet_id)
-            raise HTTPException(
-                status_code=404,
-                detail=f"Unknown or inactive station: {station_id}"
-            )
-
-        station_secret = station_row['station_secret']
-
-        # Verify HMAC
-        signable = {k: v for k, v in report.items() if k != 'hmac'}
-        expected_hmac = compute_hmac(station_secret, signable)
-
-        import hmac as hmac_module
-        if not hmac_module.compare_digest(expected_hmac, hmac_value):
-            log_audit(conn, 'INGEST_HMAC_FAILED', station_id, packet_id)
-            raise HTTPException(
-                status_code=401,
-                detail="HMAC verification failed"
-            )
-
-        # Check for duplicate (idempotency)
-        payload_hash = hashlib.sha256(json.dumps(report, sort_keys=True).encode()).hexdigest()
-
-        cursor = conn.execute(
-            "SELECT packet_id FROM seen_packets WHERE packet_id = ?",
-            (packet_id,)
-        )
-        if cursor.fetchone():
-            log_audit(conn, 'INGEST_DUPLICATE', station_id, packet_id)
-            return IngestPacketResponse(
-                success=True,
-                packet_id=packet_id,
-                station_id=station_id,
-                actions_count=len(actions),
-                is_duplicate=True,
-                message="Duplicate packet ignored (already processed)"
-            )
-
-        # Record packet
-        conn.execute("""
-            INSERT INTO seen_packets (packet_id, station_id, payload_hash)
-            VALUES (?, ?, ?)
-        """, (packet_id, station_id, payload_hash))
-
-        # Update station sync info
-        conn.execute("""
-            UPDATE logistics_stations
-            SET last_sync_at = CURRENT_TIMESTAMP, last_seq_id = MAX(last_seq_id, ?)
-            WHERE station_id = ?
-        """, (seq_id, station_id))
-
-        # Process actions
-        for action in actions:
-            action_type = action.get('type')
-            item_code = action.get('item_code')
-            qty = action.get('qty', 0)
-
-            if action_type == 'RECEIVE':
-                # Manifest acknowledgement
-                manifest_id = action.get('manifest_id')
-                if manifest_id:
-                    conn.execute("""
-                        UPDATE logistics_manifests
-                        SET status = 'ACKNOWLEDGED', acknowledged_at = CURRENT_TIMESTAMP
-                        WHERE manifest_id = ?
-                    """, (manifest_id,))
-
-                # Update inventory (add)
-                cursor = conn.execute(
-                    "SELECT id, quantity FROM inventory WHERE name = ?",
-                    (item_code,)
-                )
-                inv_row = cursor.fetchone()
-                if inv_row:
-                    conn.execute(
-                        "UPDATE inventory SET quantity = quantity + ? WHERE id = ?",
-                        (qty, inv_row['id'])
-                    )
-
-            elif action_type == 'DISPENSE':
-                # Update inventory (subtract)
-                cursor = conn.execute(
-                    "SELECT id, quantity FROM inventory WHERE name = ?",
-                    (item_code,)
-                )
-                inv_row = cursor.fetchone()
-                if inv_row:
-                    new_qty = max(0, inv_row['quantity'] - qty)
-                    conn.execute(
-                        "UPDATE inventory SET quantity = ? WHERE id = ?",
-                        (new_qty, inv_row['id'])
-                    )
-
-            elif action_type == 'REGISTER':
-                # Person registration - handled separately
-                person_id = action.get('person_id')
-                metadata = action.get('metadata', {})
-                # Could create person record here if needed
-
-            # Log each action
-            log_audit(conn, f'ACTION_{action_type}', station_id, packet_id,
-                      details=json.dumps(action))
-
-        log_audit(conn, 'INGEST_SUCCESS', station_id, packet_id,
-                  details=f"Actions: {len(actions)}, seq_id: {seq_id}")
-
+            report = decrypt_report(decryptor, envelope)
+            station_id = report.get('station_id') if isinstance(report, dict) else None
+            station_keys = station_key_cache.get(conn, [station_id] if isinstance(station_id, str) else [])
+            payload_hash = verify_report(report, station_keys)
+            result = store_report(conn, report, payload_hash)
+        except PacketRejected as e:
+            # Keep the audit row: reject after the transaction commits
+            e.log(conn)
+            rejected = e
+
+    if rejected:
+        raise HTTPException(status_code=rejected.status_code, detail=rejected.detail)
+
+    packet_id = report['packet_id']
+    actions = report.get('actions', [])
+
+    if result["is_duplicate"]:
         return IngestPacketResponse(
             success=True,
             packet_id=packet_id,
             station_id=station_id,
             actions_count=len(actions),
-            is_duplicate=False,
-            message=f"Packet processed successfully. {len(actions)} actions applied."
+            is_duplicate=True,
+            message="Duplicate packet ignored (already processed)"
         )
 
+    _publish_ingest(station_id, result["changed_item_ids"], result["acknowledged_manifests"])
+
+    return IngestPacketResponse(
+        success=True,
+        packet_id=packet_id,
+        station_id=station_id,
+        actions_count=len(actions),
+        is_duplicate=False,
+        message=f"Packet processed successfully. {len(actions)} actions applied."
+    )
+
 
 @router.post("/ingest/chunks")
 async def ingest_chunked_packet(chunks: List[str]):
@@ -519,7 +732,10 @@ async def ingest_chunked_packet(chunks: List[str]):
             # Reassembly complete
             envelope = json.loads(result.decode('utf-8'))
             # Reuse the ingest endpoint
-            return await ingest_packet(IngestPacketRequest(envelope=envelope))
+            return await run_in_db_thread(ingest_packet, IngestPacketRequest(envelope=envelope))
+
+    if reassembler.last_error:
+        raise HTTPException(status_code=400, detail=reassembler.last_error)
 
     # Not all chunks received
     received, total = reassembler.progress
@@ -531,12 +747,381 @@ async def ingest_chunked_packet(chunks: List[str]):
     )
 
 
+def _decode_chunk_session(header, session, added: List[int]) -> bytes:
+    """
+    v1: join the slots. v2: decode from exactly k blocks; with more held
+    (an earlier decode failed) try k-subsets that include a chunk just
+    added, as QRReassembler does.
+    """
+    if header.version != 2:
+        return base64.b64decode(session.payload())
+    blocks = session.blocks()
+    k = header.data_chunks
+    if len(blocks) == k:
+        return decode_v2(header, blocks)
+
+    subsets = (
+        subset + (seq,)
+        for seq in added
+        for subset in combinations(sorted(s for s in blocks if s != seq), k - 1)
+    )
+    error = None
+    for subset in islice(subsets, QRReassembler.MAX_DECODE_ATTEMPTS):
+        try:
+            return decode_v2(header, {s: blocks[s] for s in subset})
+        except ValueError as e:
+            error = e
+    raise error
+
+
+@router.post("/ingest/chunks/{session_id}")
+async def ingest_chunk_session(session_id: str = Path(..., min_length=1, max_length=128),
+                               chunks: List[str] = Body(...)):
+    """
+    Add QR chunks to a reassembly session (incremental, any order).
+
+    The Runner picks session_id (e.g. device + packet) and posts chunks as
+    they are scanned; repeats are ignored and unreadable chunks are counted
+    in `invalid`. Responds with the session progress (`missing_sequences`);
+    the request that completes the packet also ingests it and returns the
+    ingest result under `result`. If the chunks do not decode (a damaged v2
+    chunk) the session reports `error` and keeps accepting parity chunks;
+    400 once there is nothing left to scan.
+    """
+    parsed, invalid = [], 0
+    for chunk in chunks:
+        info = parse_chunk(chunk)
+        if info is None:
+            invalid += 1
+        else:
+            parsed.append(info)
+
+    if len({info.packet_key for info in parsed}) > 1:
+        raise HTTPException(status_code=409, detail="Chunks belong to different packets")
+    if not parsed:
+        progress = chunk_sessions.progress(session_id)
+        if progress is None:
+            raise HTTPException(status_code=400 if chunks else 404,
+                                detail="No readable chunks" if chunks else "Session not found or expired")
+        return {**progress, "invalid": invalid}
+
+    header = parsed[0]
+    try:
+        progress, session, added = chunk_sessions.add_chunks(
+            session_id, header.packet_key, header.total, header.data_chunks,
+            [(info.sequence, info.data) for info in parsed]
+        )
+    except ChunkConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ChunkSessionFull as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    progress["invalid"] = invalid
+    if session is None:
+        return progress
+
+    try:
+        envelope = json.loads(_decode_chunk_session(header, session, added))
+        if not isinstance(envelope, dict):
+            raise ValueError("not a JSON object")
+    except (ValueError, binascii.Error) as e:
+        error = f"Reassembled packet is not valid: {e}"
+        # v2: a damaged chunk can be outvoted by parity chunks scanned later
+        failed = chunk_sessions.fail(session, error)
+        if failed is None:
+            raise HTTPException(status_code=400, detail=error)
+        return {**failed, "invalid": invalid}
+    if not chunk_sessions.complete(session):
+        return progress  # a concurrent request decoded and ingested it
+    progress["result"] = await run_in_db_thread(ingest_packet, IngestPacketRequest(envelope=envelope))
+    return progress
+
+
+@router.get("/ingest/chunks/{session_id}")
+async def get_chunk_session(session_id: str):
+    """Reassembly progress of a chunk session (404 once completed or expired)."""
+    progress = chunk_sessions.progress(session_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return progress
+
+
+@router.delete("/ingest/chunks/{session_id}")
+async def discard_chunk_session(session_id: str):
+    """Drop a partially scanned packet."""
+    return {"success": True, "session_id": session_id, "discarded": chunk_sessions.discard(session_id)}
+
+
+# ============================================================================
+# Bulk Ingestion (USB drop of many envelopes)
+# ============================================================================
+
+MAX_BULK_PACKETS = 1000
+MAX_BULK_UPLOAD_BYTES = 50 * 1024 * 1024
+BULK_MEMBER_SUFFIXES = ('.json', '.jsonl', '.ndjson')
+INGEST_WORKERS = min(4, os.cpu_count() or 1)
+
+_ingest_pool: Optional[ThreadPoolExecutor] = None
+_ingest_pool_lock = threading.Lock()
+
+
+def get_ingest_pool() -> ThreadPoolExecutor:
+    """
+    Pool for archive parsing, decryption and HMAC checks of bulk ingests,
+    kept apart from the DB executor so a large USB drop does not hold the
+    threads that serve queries.
+    """
+    global _ingest_pool
+    if _ingest_pool is None:
+        with _ingest_pool_lock:
+            if _ingest_pool is None:
+                _ingest_pool = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+    return _ingest_pool
+
+
+def _envelopes_from_text(source: str, text: str) -> list:
+    """[(source, envelope | Exception)] from one .json / .jsonl document"""
+    if source.lower().endswith(('.jsonl', '.ndjson')):
+        entries = []
+        for line_no, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append((f"{source}:{line_no}", json.loads(line)))
+            except ValueError as e:
+                entries.append((f"{source}:{line_no}", e))
+        return entries
+
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        return [(source, e)]
+    if isinstance(data, dict) and isinstance(data.get('envelopes'), list):
+        data = data['envelopes']
+    if isinstance(data, list):
+        return [(f"{source}#{i}", envelope) for i, envelope in enumerate(data)]
+    return [(source, data)]
+
+
+def read_envelope_upload(filename: str, data: bytes) -> list:
+    """
+    [(source, envelope | Exception)] from an uploaded .zip / .tar(.gz) archive
+    of .json / .jsonl files, or a single .json / .jsonl file.
+    """
+    members = []  # (name, bytes)
+    budget = MAX_BULK_UPLOAD_BYTES
+
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                if info.is_dir() or not info.filename.lower().endswith(BULK_MEMBER_SUFFIXES):
+                    continue
+                with archive.open(info) as member:
+                    content = member.read(budget + 1)
+                budget -= len(content)
+                if budget < 0:
+                    raise ValueError("Archive content too large")
+                members.append((info.filename, content))
+    else:
+        try:
+            archive = tarfile.open(fileobj=io.BytesIO(data), mode="r:*")
+        except tarfile.TarError:
+            archive = None
+
+        if archive is None:
+            members.append((filename or "upload.json", data))
+        else:
+            with archive:
+                for info in sorted(archive.getmembers(), key=lambda i: i.name):
+                    if not info.isfile() or not info.name.lower().endswith(BULK_MEMBER_SUFFIXES):
+                        continue
+                    content = archive.extractfile(info).read(budget + 1)
+                    budget -= len(content)
+                    if budget < 0:
+                        raise ValueError("Archive content too large")
+                    members.append((info.name, content))
+
+    entries = []
+    for name, content in members:
+        base = os.path.basename(name)
+        if base.startswith('.'):
+            continue  # macOS resource forks etc.
+        try:
+            text = content.decode('utf-8-sig')
+        except UnicodeDecodeError as e:
+            entries.append((name, e))
+            continue
+        entries.extend(_envelopes_from_text(name, text))
+    return entries
+
+
+def load_ingest_keys() -> tuple:
+    """(Hub ReportDecryptor, active StationKeys), read on a pooled reader"""
+    with get_db() as conn:
+        station_keys = station_key_cache.all_active(conn)
+        has_keys = conn.execute(
+            "SELECT COUNT(*) FROM hub_keys WHERE key_type IN (?, ?)", HUB_KEY_TYPES
+        ).fetchone()[0] == len(HUB_KEY_TYPES)
+        if has_keys:
+            return get_hub_key_set(conn).decryptor, station_keys
+    # First use on a fresh Hub: the keys are generated (a write)
+    with write_db() as conn:
+        return get_hub_key_set(conn).decryptor, station_keys
+
+
+def open_envelope(decryptor: ReportDecryptor, station_keys: dict, envelope) -> tuple:
+    """(report, payload_hash) of one bulk entry, or raises PacketRejected"""
+    if isinstance(envelope, Exception):
+        raise PacketRejected(400, f"Unreadable envelope: {envelope}")
+    if not isinstance(envelope, dict):
+        raise PacketRejected(400, "Invalid envelope: expected a JSON object")
+    report = decrypt_report(decryptor, envelope)
+    return report, verify_report(report, station_keys)
+
+
+async def open_envelopes(entries: list) -> dict:
+    """
+    Decrypt and verify envelopes on the ingest pool (SealedBox, zlib and HMAC
+    release the GIL). Hub keys and station secrets are read once.
+
+    Returns {"opened": [(index, report, payload_hash)], "rejected": {index: PacketRejected}}.
+    """
+    decryptor, station_keys = await run_in_db_thread(load_ingest_keys)
+
+    loop = asyncio.get_running_loop()
+    pool = get_ingest_pool()
+    outcomes = await asyncio.gather(
+        *(loop.run_in_executor(pool, open_envelope, decryptor, station_keys, envelope) for _, envelope in entries),
+        return_exceptions=True
+    )
+
+    opened, rejected = [], {}
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, PacketRejected):
+            rejected[index] = outcome
+        elif isinstance(outcome, Exception):
+            rejected[index] = PacketRejected(400, f"Invalid envelope: {outcome}")
+        else:
+            report, payload_hash = outcome
+            opened.append((index, report, payload_hash))
+    return {"opened": opened, "rejected": rejected}
+
+
+def _seq_key(report: dict):
+    seq_id = report.get('seq_id', 0)
+    return seq_id if isinstance(seq_id, (int, float)) else 0
+
+
+def apply_envelopes(conn, prepared: dict) -> dict:
+    """
+    Apply verified reports in one transaction (runs on the group-commit writer):
+    per station in seq_id order, one SAVEPOINT per packet so a failing packet
+    does not take the others with it. Returns {index: outcome}.
+    """
+    outcomes = {}
+    for rejection in prepared["rejected"].values():
+        rejection.log(conn)
+
+    ordered = sorted(prepared["opened"], key=lambda p: (str(p[1]['station_id']), _seq_key(p[1]), p[0]))
+    for index, report, payload_hash in ordered:
+        conn.execute("SAVEPOINT ingest_packet")
+        try:
+            outcomes[index] = store_report(conn, report, payload_hash)
+        except Exception as e:
+            conn.execute("ROLLBACK TO ingest_packet")
+            conn.execute("RELEASE ingest_packet")
+            outcomes[index] = {"error": str(e)}
+        else:
+            conn.execute("RELEASE ingest_packet")
+    return outcomes
+
+
+async def _ingest_bulk(entries: list) -> dict:
+    if not entries:
+        raise HTTPException(status_code=400, detail="No envelopes found")
+    if len(entries) > MAX_BULK_PACKETS:
+        raise HTTPException(status_code=413, detail=f"Too many envelopes (max {MAX_BULK_PACKETS})")
+
+    prepared = await open_envelopes(entries)
+    outcomes = await write_job(apply_envelopes, prepared, lane="logistics")
+
+    reports = {index: report for index, report, _ in prepared["opened"]}
+    results = []
+    counts = {"applied": 0, "duplicate": 0, "rejected": 0, "failed": 0}
+    changed = {}  # station_id -> (item ids, manifests)
+
+    for index, (source, _) in enumerate(entries):
+        report = reports.get(index) or {}
+        row = {
+            "index": index,
+            "source": source,
+            "packet_id": report.get('packet_id'),
+            "station_id": report.get('station_id'),
+            "seq_id": report.get('seq_id'),
+            "actions_count": len(report.get('actions', []) or []),
+        }
+        if index in prepared["rejected"]:
+            rejection = prepared["rejected"][index]
+            row.update(status="rejected", http_status=rejection.status_code, message=rejection.detail)
+        elif "error" in outcomes[index]:
+            row.update(status="failed", http_status=500, message=outcomes[index]["error"])
+        elif outcomes[index]["is_duplicate"]:
+            row.update(status="duplicate", http_status=200,
+                       message="Duplicate packet ignored (already processed)")
+        else:
+            outcome = outcomes[index]
+            row.update(status="applied", http_status=200,
+                       message=f"Packet processed successfully. {row['actions_count']} actions applied.")
+            item_ids, manifests = changed.setdefault(report['station_id'], ([], []))
+            item_ids.extend(outcome["changed_item_ids"])
+            manifests.extend(outcome["acknowledged_manifests"])
+        counts[row["status"]] += 1
+        results.append(row)
+
+    for station_id, (item_ids, manifests) in changed.items():
+        _publish_ingest(station_id, list(dict.fromkeys(item_ids)), list(dict.fromkeys(manifests)))
+
+    return {"total": len(entries), **counts, "results": results}
+
+
+@router.post("/ingest/bulk")
+async def ingest_bulk(request: BulkIngestRequest):
+    """
+    Ingest many ENCRYPTED_REPORT envelopes at once (e.g. a Runner's USB drop).
+
+    Envelopes are decrypted and verified in parallel, then applied in one
+    write transaction in seq_id order per station. Returns a per-packet
+    result table (status: applied / duplicate / rejected / failed).
+    """
+    return await _ingest_bulk([(f"envelopes[{i}]", e) for i, e in enumerate(request.envelopes)])
+
+
+@router.post("/ingest/bulk/upload")
+async def ingest_bulk_upload(file: UploadFile = File(...)):
+    """
+    Same as /ingest/bulk for an uploaded .zip / .tar.gz of .json / .jsonl
+    envelope files (or a single .json list / .jsonl file).
+    """
+    data = await file.read(MAX_BULK_UPLOAD_BYTES + 1)
+    if len(data) > MAX_BULK_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Upload too large")
+
+    try:
+        entries = await asyncio.get_running_loop().run_in_executor(
+            get_ingest_pool(), read_envelope_upload, file.filename, data
+        )
+    except (ValueError, zipfile.BadZipFile, tarfile.TarError) as e:
+        raise HTTPException(status_code=400, detail=f"Unreadable upload: {e}")
+
+    return await _ingest_bulk(entries)
+
+
 # ============================================================================
 # Station Management Endpoints
 # ============================================================================
 
 @router.post("/station/provision", response_model=ProvisionStationResponse)
-async def provision_station(request: ProvisionStationRequest):
+def provision_station(request: ProvisionStationRequest):
     """
     Provision a new station with credentials.
 
@@ -571,17 +1156,19 @@ async def provision_station(request: ProvisionStationRequest):
         log_audit(conn, 'STATION_PROVISIONED', request.station_id,
                   details=f"Display name: {request.display_name}")
 
-        return ProvisionStationResponse(
-            station_id=request.station_id,
-            display_name=request.display_name,
-            station_secret=station_secret,
-            hub_public_key=keys['signing_public'],
-            hub_encryption_key=keys['encryption_public']
-        )
+    station_key_cache.invalidate()
+
+    return ProvisionStationResponse(
+        station_id=request.station_id,
+        display_name=request.display_name,
+        station_secret=station_secret,
+        hub_public_key=keys['signing_public'],
+        hub_encryption_key=keys['encryption_public']
+    )
 
 
 @router.get("/station/{station_id}/secret")
-async def get_station_secret(station_id: str):
+def get_station_secret(station_id: str):
     """
     Get station credentials (for re-provisioning).
 
@@ -609,7 +1196,7 @@ async def get_station_secret(station_id: str):
 
 
 @router.get("/stations")
-async def list_stations(include_inactive: bool = False):
+def list_stations(include_inactive: bool = False):
     """List all registered stations."""
     with get_db() as conn:
         query = """
@@ -630,7 +1217,7 @@ async def list_stations(include_inactive: bool = False):
 
 
 @router.patch("/station/{station_id}")
-async def update_station(station_id: str, display_name: Optional[str] = None,
+def update_station(station_id: str, display_name: Optional[str] = None,
                          is_active: Optional[bool] = None):
     """Update station settings."""
     with write_db() as conn:
@@ -660,11 +1247,14 @@ async def update_station(station_id: str, display_name: Optional[str] = None,
 
             log_audit(conn, 'STATION_UPDATED', station_id, details=str(updates))
 
-        return {"success": True, "station_id": station_id}
+    if is_active is not None:
+        station_key_cache.invalidate()
+
+    return {"success": True, "station_id": station_id}
 
 
 @router.delete("/station/{station_id}")
-async def delete_station(station_id: str, hard_delete: bool = False):
+def delete_station(station_id: str, hard_delete: bool = False):
     """
     Delete or deactivate a station.
 
@@ -689,7 +1279,9 @@ async def delete_station(station_id: str, hard_delete: bool = False):
             )
             log_audit(conn, 'STATION_DEACTIVATED', station_id)
 
-        return {"success": True, "station_id": station_id, "hard_delete": hard_delete}
+    station_key_cache.invalidate()
+
+    return {"success": True, "station_id": station_id, "hard_delete": hard_delete}
 
 
 # ============================================================================
@@ -697,7 +1289,7 @@ async def delete_station(station_id: str, hard_delete: bool = False):
 # ============================================================================
 
 @router.get("/audit")
-async def get_audit_logs(
+def get_audit_logs(
     event_type: Optional[str] = None,
     station_id: Optional[str] = None,
     limit: int = Query(100, le=500),
@@ -748,7 +1340,7 @@ async def get_audit_logs(
 
 
 @router.get("/audit/summary")
-async def get_audit_summary():
+def get_audit_summary():
     """Get summary statistics from audit logs."""
     with get_db() as conn:
         # Event type counts
@@ -793,7 +1385,7 @@ async def get_audit_summary():
 # ============================================================================
 
 @router.get("/hub/keys")
-async def get_hub_public_keys():
+def get_hub_public_keys():
     """
     Get Hub's public keys for Station configuration.
 
@@ -10,6 +10,7 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import get_db, write_db, dict_from_row, rows_to_list
+from services.event_bus import publish
 
 router = APIRouter()
 
@@ -41,7 +42,7 @@ class PinRequest(BaseModel):
 
 
 @router.get("")
-async def list_messages(
+def list_messages(
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(50, le=200),
     offset: int = Query(0)
@@ -80,7 +81,7 @@ async def list_messages(
 
 
 @router.get("/broadcast")
-async def get_current_broadcast():
+def get_current_broadcast():
     """Get current pinned broadcast"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -97,7 +98,7 @@ async def get_current_broadcast():
 
 
 @router.get("/all-broadcasts")
-async def list_broadcasts(limit: int = Query(20, le=100)):
+def list_broadcasts(limit: int = Query(20, le=100)):
     """List all broadcasts"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -115,7 +116,7 @@ async def list_broadcasts(limit: int = Query(20, le=100)):
 
 
 @router.post("")
-async def create_message(message: MessageCreate, request: Request):
+def create_message(message: MessageCreate, request: Request):
     """Create a new message post"""
     # Get client IP for anti-abuse
     client_ip = request.client.host if request.client else "unknown"
@@ -142,7 +143,7 @@ async def create_message(message: MessageCreate, request: Request):
 
 
 @router.post("/broadcast")
-async def create_broadcast(broadcast: BroadcastCreate):
+def create_broadcast(broadcast: BroadcastCreate):
     """Create a broadcast (Admin only)"""
     with write_db() as conn:
         # Unpin previous broadcasts if this one is pinned
@@ -158,11 +159,14 @@ async def create_broadcast(broadcast: BroadcastCreate):
         )
         new_id = cursor.lastrowid
 
+    if broadcast.is_pinned:
+        publish("broadcast.pinned", message_id=new_id, pinned=True)
+
     return {"id": new_id, "message": "Broadcast created successfully"}
 
 
 @router.post("/{message_id}/resolve")
-async def resolve_message(message_id: int, request: ResolveRequest):
+def resolve_message(message_id: int, request: ResolveRequest):
     """Mark a message as resolved or unresolve it"""
     with write_db() as conn:
         cursor = conn.execute("SELECT * FROM message WHERE id = ?", (message_id,))
@@ -178,7 +182,7 @@ async def resolve_message(message_id: int, request: ResolveRequest):
 
 
 @router.post("/{message_id}/pin")
-async def pin_message(message_id: int, request: PinRequest):
+def pin_message(message_id: int, request: PinRequest):
     """Pin or unpin a message (Admin only)"""
     with write_db() as conn:
         cursor = conn.execute("SELECT * FROM message WHERE id = ?", (message_id,))
@@ -190,11 +194,13 @@ async def pin_message(message_id: int, request: PinRequest):
             (1 if request.is_pinned else 0, message_id)
         )
 
+    publish("broadcast.pinned", message_id=message_id, pinned=request.is_pinned)
+
     return {"message": "Message pin status updated"}
 
 
 @router.post("/{message_id}/reply")
-async def reply_to_message(message_id: int, reply: ReplyCreate, request: Request):
+def reply_to_message(message_id: int, reply: ReplyCreate, request: Request):
     """Reply to a message"""
     client_ip = request.client.host if request.client else "unknown"
 
@@ -218,7 +224,7 @@ async def reply_to_message(message_id: int, reply: ReplyCreate, request: Request
 
 
 @router.delete("/{message_id}")
-async def delete_message(message_id: int):
+def delete_message(message_id: int):
     """Delete a message"""
     with write_db() as conn:
         cursor = conn.execute("SELECT * FROM message WHERE id = ?", (message_id,))
@@ -231,7 +237,7 @@ async def delete_message(message_id: int):
 
 
 @router.get("/stats")
-async def get_message_stats():
+def get_message_stats():
     """Get message statistics"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -9,7 +9,8 @@ import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, write_db, dict_from_row, rows_to_list
+from database import get_db, write_db, write_job, dict_from_row, rows_to_list
+from services.event_bus import publish
 from routes.auth import hash_pin
 
 router = APIRouter()
@@ -76,7 +77,7 @@ class BatchCheckoutRequest(BaseModel):
 
 
 @router.get("")
-async def list_persons(
+def list_persons(
     role: Optional[str] = Query(None, description="Filter by role"),
     triage_status: Optional[str] = Query(None, description="Filter by triage status"),
     checked_in: Optional[bool] = Query(None, description="Filter by check-in status")
@@ -114,7 +115,7 @@ async def list_persons(
 
 
 @router.get("/lookup")
-async def lookup_by_national_id(national_id: str = Query(..., description="身分證字號")):
+def lookup_by_national_id(national_id: str = Query(..., description="身分證字號")):
     """Lookup person by national ID (身分證查詢)"""
     nid_hash = hash_national_id(national_id)
 
@@ -132,7 +133,7 @@ async def lookup_by_national_id(national_id: str = Query(..., description="身
 
 
 @router.get("/{person_id}")
-async def get_person(person_id: str):
+def get_person(person_id: str):
     """Get a single person by system ID"""
     with get_db() as conn:
         cursor = conn.execute("SELECT * FROM person WHERE id = ?", (person_id,))
@@ -148,7 +149,7 @@ async def get_person(person_id: str):
 
 
 @router.post("")
-async def create_person(person: PersonCreate):
+def create_person(person: PersonCreate):
     """Create a new person (register/check-in)"""
     pin_hash_val = hash_pin(person.pin) if person.pin else None
 
@@ -217,11 +218,14 @@ async def create_person(person: PersonCreate):
                 raise HTTPException(status_code=400, detail="此身分證已登記")
             raise
 
+    publish("headcount.changed", scope="public" if person.role == "public" else "staff",
+            person_ids=[new_id], source="register")
+
     return {"id": new_id, "message": "報到成功", "existing": False}
 
 
 @router.put("/{person_id}")
-async def update_person(person_id: str, person: PersonUpdate):
+def update_person(person_id: str, person: PersonUpdate):
     """Update a person's info"""
     updates = []
     params = []
@@ -251,63 +255,73 @@ async def update_person(person_id: str, person: PersonUpdate):
 @router.post("/{person_id}/checkin")
 async def check_in(person_id: str, location: Optional[str] = None):
     """Check in a person"""
-    with write_db() as conn:
-        cursor = conn.execute("SELECT * FROM person WHERE id = ?", (person_id,))
-        person = cursor.fetchone()
+    await write_job(_apply_check_in, person_id, location, lane="checkin")
+    publish("headcount.changed", scope="public", person_ids=[person_id], source="checkin")
 
-        if person is None:
-            raise HTTPException(status_code=404, detail="Person not found")
+    return {"message": "Check-in successful"}
 
-        conn.execute(
-            """
-            UPDATE person SET checked_in_at = CURRENT_TIMESTAMP, current_location = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-            """,
-            (location, person_id)
-        )
 
-        conn.execute(
-            """
-            INSERT INTO event_log (event_type, person_id, location)
-            VALUES ('CHECK_IN', ?, ?)
-            """,
-            (person_id, location)
-        )
+def _apply_check_in(conn, person_id: str, location: Optional[str]):
+    """Check-in write job (runs on the group-commit writer)"""
+    cursor = conn.execute("SELECT * FROM person WHERE id = ?", (person_id,))
+    person = cursor.fetchone()
 
-    return {"message": "Check-in successful"}
+    if person is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+
+    conn.execute(
+        """
+        UPDATE person SET checked_in_at = CURRENT_TIMESTAMP, current_location = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """,
+        (location, person_id)
+    )
+
+    conn.execute(
+        """
+        INSERT INTO event_log (event_type, person_id, location)
+        VALUES ('CHECK_IN', ?, ?)
+        """,
+        (person_id, location)
+    )
 
 
 @router.post("/{person_id}/checkout")
 async def check_out(person_id: str):
     """Check out a person"""
-    with write_db() as conn:
-        cursor = conn.execute("SELECT * FROM person WHERE id = ?", (person_id,))
-        person = cursor.fetchone()
+    await write_job(_apply_check_out, person_id, lane="checkin")
+    publish("headcount.changed", scope="public", person_ids=[person_id], source="checkout")
 
-        if person is None:
-            raise HTTPException(status_code=404, detail="Person not found")
+    return {"message": "Check-out successful"}
 
-        conn.execute(
-            """
-            UPDATE person SET checked_in_at = NULL, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-            """,
-            (person_id,)
-        )
 
-        conn.execute(
-            """
-            INSERT INTO event_log (event_type, person_id)
-            VALUES ('CHECK_OUT', ?)
-            """,
-            (person_id,)
-        )
+def _apply_check_out(conn, person_id: str):
+    """Check-out write job (runs on the group-commit writer)"""
+    cursor = conn.execute("SELECT * FROM person WHERE id = ?", (person_id,))
+    person = cursor.fetchone()
 
-    return {"message": "Check-out successful"}
+    if person is None:
+        raise HTTPException(status_code=404, detail="Person not found")
+
+    conn.execute(
+        """
+        UPDATE person SET checked_in_at = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        """,
+        (person_id,)
+    )
+
+    conn.execute(
+        """
+        INSERT INTO event_log (event_type, person_id)
+        VALUES ('CHECK_OUT', ?)
+        """,
+        (person_id,)
+    )
 
 
 @router.post("/batch-checkout")
-async def batch_checkout(request: BatchCheckoutRequest):
+def batch_checkout(request: BatchCheckoutRequest):
     """Batch checkout multiple persons (批次退場)"""
     if not request.person_ids:
         raise HTTPException(status_code=400, detail="No person IDs provided")
@@ -371,6 +385,10 @@ async def batch_checkout(request: BatchCheckoutRequest):
                 "name": person['display_name']
             })
 
+    if results["success"]:
+        publish("headcount.changed", scope="public",
+                person_ids=[p["id"] for p in results["success"]], source="batch_checkout")
+
     return {
         "message": f"批次退場完成: {len(results['success'])} 人成功",
         "results": results
@@ -378,7 +396,7 @@ async def batch_checkout(request: BatchCheckoutRequest):
 
 
 @router.post("/{person_id}/triage")
-async def triage_person(person_id: str, request: TriageRequest):
+def triage_person(person_id: str, request: TriageRequest):
     """Set triage status for a person (START Protocol)"""
     valid_statuses = ['GREEN', 'YELLOW', 'RED', 'BLACK']
     if request.status not in valid_statuses:
@@ -407,11 +425,13 @@ async def triage_person(person_id: str, request: TriageRequest):
             (person_id, request.status, request.notes)
         )
 
+    publish("headcount.changed", scope="public", person_ids=[person_id], source="triage")
+
     return {"message": f"Triage status set to {request.status}"}
 
 
 @router.post("/{person_id}/role")
-async def change_role(person_id: str, request: RoleChangeRequest):
+def change_role(person_id: str, request: RoleChangeRequest):
     """Change a person's role (Admin only)"""
     valid_roles = ['admin', 'staff', 'medic', 'public']
     if request.role not in valid_roles:
@@ -446,7 +466,7 @@ async def change_role(person_id: str, request: RoleChangeRequest):
 
 
 @router.get("/{person_id}/history")
-async def get_person_history(person_id: str, limit: int = Query(50, le=200)):
+def get_person_history(person_id: str, limit: int = Query(50, le=200)):
     """Get event history for a person"""
     with get_db() as conn:
         # Check person exists
@@ -502,7 +522,7 @@ class ConfirmIdentityRequest(BaseModel):
 
 
 @router.put("/{person_id}/admin-update")
-async def admin_update_person(person_id: str, request: AdminPersonUpdate):
+def admin_update_person(person_id: str, request: AdminPersonUpdate):
     """Admin update person with audit log (管理員修改人員資料)"""
     if request.reason_code not in REASON_CODES:
         raise HTTPException(status_code=400, detail=f"Invalid reason_code. Must be one of: {list(REASON_CODES.keys())}")
@@ -580,7 +600,7 @@ async def admin_update_person(person_id: str, request: AdminPersonUpdate):
 
 
 @router.post("/{person_id}/confirm-identity")
-async def confirm_identity(person_id: str, request: ConfirmIdentityRequest):
+def confirm_identity(person_id: str, request: ConfirmIdentityRequest):
     """Confirm identity of an unidentified person (確認身分)"""
     nid_hash = hash_national_id(request.national_id)
 
@@ -628,7 +648,7 @@ async def confirm_identity(person_id: str, request: ConfirmIdentityRequest):
 
 
 @router.get("/{person_id}/audit-log")
-async def get_person_audit_log(person_id: str, limit: int = Query(50, le=200)):
+def get_person_audit_log(person_id: str, limit: int = Query(50, le=200)):
     """Get audit log for a person (查詢人員修改記錄)"""
     with get_db() as conn:
         cursor = conn.execute(
@@ -648,7 +668,7 @@ async def get_person_audit_log(person_id: str, limit: int = Query(50, le=200)):
 
 
 @router.get("/unidentified/list")
-async def list_unidentified():
+def list_unidentified():
     """List all unidentified persons (列出待辨識人員)"""
     with get_db() as conn:
         cursor = conn.execute(
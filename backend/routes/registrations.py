@@ -19,6 +19,7 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import get_db, write_db, dict_from_row, rows_to_list
+from services.event_bus import publish
 from routes.auth import get_current_user
 
 router = APIRouter()
@@ -27,58 +28,6 @@ router = APIRouter()
 REGISTRATION_HMAC_SECRET = os.environ.get('REGISTRATION_HMAC_SECRET', 'xIRS_REG_SECRET_2025')
 
 
-def init_registrations_table():
-    """Initialize the registrations table if it doesn't exist"""
-    with write_db() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS registrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                reg_id TEXT UNIQUE NOT NULL,
-                person_id TEXT NOT NULL,
-                patient_ref TEXT NOT NULL,
-                display_name TEXT,
-                age_group TEXT,
-                gender TEXT,
-                triage TEXT,
-                priority TEXT DEFAULT 'ROUTINE',
-                chief_complaint TEXT,
-                status TEXT DEFAULT 'WAITING',
-                registered_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                registered_by TEXT,
-                called_at DATETIME,
-                completed_at DATETIME,
-                claimed_by TEXT,
-                claimed_at DATETIME,
-                notes TEXT,
-                FOREIGN KEY (person_id) REFERENCES person(id)
-            )
-        """)
-
-        # Add claimed_by column if not exists (migration)
-        try:
-            conn.execute("ALTER TABLE registrations ADD COLUMN claimed_by TEXT")
-        except:
-            pass  # Column already exists
-        try:
-            conn.execute("ALTER TABLE registrations ADD COLUMN claimed_at DATETIME")
-        except:
-            pass  # Column already exists
-
-        # Create index for faster lookups
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_registrations_status
-            ON registrations(status)
-        """)
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_registrations_person
-            ON registrations(person_id)
-        """)
-
-
-# Initialize table on module load
-init_registrations_table()
-
-
 class RegistrationCreate(BaseModel):
     person_id: str
     priority: str = 'ROUTINE'  # STAT, URGENT, ROUTINE
@@ -160,7 +109,7 @@ def build_qr_payload(registration: dict, person: dict) -> dict:
 
 
 @router.post("")
-async def create_registration(
+def create_registration(
     request: RegistrationCreate,
     current_user: dict = Depends(get_current_user)
 ):
@@ -217,6 +166,8 @@ async def create_registration(
             request.notes
         ))
 
+    publish("registration.waiting", reg_id=reg_id, status='WAITING')
+
     # Build response with QR payload
     registration = {
         'reg_id': reg_id,
@@ -247,7 +198,7 @@ async def create_registration(
 
 
 @router.get("")
-async def list_registrations(
+def list_registrations(
     status: Optional[str] = None,
     priority: Optional[str] = None,
     today_only: bool = True,
@@ -290,7 +241,7 @@ async def list_registrations(
 
 
 @router.get("/{reg_id}")
-async def get_registration(
+def get_registration(
     reg_id: str,
     current_user: dict = Depends(get_current_user)
 ):
@@ -334,7 +285,7 @@ async def get_registration(
 
 
 @router.patch("/{reg_id}")
-async def update_registration(
+def update_registration(
     reg_id: str,
     request: RegistrationUpdate,
     current_user: dict = Depends(get_current_user)
@@ -387,6 +338,9 @@ async def update_registration(
             params
         )
 
+    if request.status:
+        publish("registration.waiting", reg_id=reg_id, status=request.status)
+
     # Return updated registration
     with get_db() as conn:
         cursor = conn.execute(
@@ -399,7 +353,7 @@ async def update_registration(
 
 
 @router.delete("/{reg_id}")
-async def cancel_registration(
+def cancel_registration(
     reg_id: str,
     current_user: dict = Depends(get_current_user)
 ):
@@ -419,11 +373,13 @@ async def cancel_registration(
             (reg_id,)
         )
 
+    publish("registration.waiting", reg_id=reg_id, status='CANCELLED')
+
     return {"message": "Registration cancelled", "reg_id": reg_id}
 
 
 @router.get("/stats/today")
-async def get_today_stats(
+def get_today_stats(
     current_user: dict = Depends(get_current_user)
 ):
     """Get today's registration statistics"""
@@ -475,7 +431,7 @@ async def get_today_stats(
 
 # QR Code verification endpoint (for Doctor PWA)
 @router.post("/verify-qr")
-async def verify_registration_qr(payload: dict):
+def verify_registration_qr(payload: dict):
     """Verify a registration QR code payload (no auth required for Doctor PWA)"""
 
     if payload.get('type') not in ['CIRS_REG', 'PATIENT_REGISTRATION', 'REGISTRATION']:
@@ -540,7 +496,7 @@ async def verify_registration_qr(payload: dict):
 # ============================================================================
 
 @router.get("/waiting/list")
-async def get_waiting_registrations():
+def get_waiting_registrations():
     """
     Get all waiting registrations for Doctor PWA.
     No authentication required - simplified for disaster scenarios.
@@ -577,7 +533,7 @@ class ClaimRequest(BaseModel):
 
 
 @router.post("/{reg_id}/claim")
-async def claim_registration(reg_id: str, request: ClaimRequest):
+def claim_registration(reg_id: str, request: ClaimRequest):
     """
     Claim a registration for a specific doctor.
     This removes it from other doctors' waiting lists.
@@ -619,6 +575,8 @@ async def claim_registration(reg_id: str, request: ClaimRequest):
             WHERE reg_id = ?
         """, (request.doctor_id, reg_id))
 
+    publish("registration.waiting", reg_id=reg_id, status='IN_PROGRESS')
+
     return {
         "success": True,
         "reg_id": reg_id,
@@ -628,7 +586,7 @@ async def claim_registration(reg_id: str, request: ClaimRequest):
 
 
 @router.post("/{reg_id}/release")
-async def release_registration(reg_id: str, request: ClaimRequest):
+def release_registration(reg_id: str, request: ClaimRequest):
     """
     Release a claimed registration back to waiting list.
     """
@@ -660,6 +618,8 @@ async def release_registration(reg_id: str, request: ClaimRequest):
             WHERE reg_id = ?
         """, (reg_id,))
 
+    publish("registration.waiting", reg_id=reg_id, status='WAITING')
+
     return {
         "success": True,
         "reg_id": reg_id,
@@ -668,7 +628,7 @@ async def release_registration(reg_id: str, request: ClaimRequest):
 
 
 @router.post("/{reg_id}/complete")
-async def complete_registration(reg_id: str, request: ClaimRequest):
+def complete_registration(reg_id: str, request: ClaimRequest):
     """
     Mark a registration as completed after doctor finishes consultation.
     """
@@ -707,7 +667,7 @@ async def complete_registration(reg_id: str, request: ClaimRequest):
 
 
 @router.get("/doctor/{doctor_id}/patients")
-async def get_doctor_patients(doctor_id: str):
+def get_doctor_patients(doctor_id: str):
     """
     Get all registrations claimed by a specific doctor.
     Returns both in-progress and recently completed.
@@ -3,13 +3,14 @@ CIRS Resilience API Routes v2.0
 Provides resilience calculation, configuration, and history endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
-from database import get_db
+from database import get_db, write_db, db_read, run_write, write_job
 from services.resilience_service import CIRSResilienceEngine, StatusLevel
+from services.response_cache import cached_json
 
 router = APIRouter()
 
@@ -28,23 +29,59 @@ class ResilienceConfigUpdate(BaseModel):
     threshold_warning: Optional[float] = Field(None, ge=0.5, le=3.0)
     weight_weakest: Optional[float] = Field(None, ge=0.0, le=1.0)
     weight_average: Optional[float] = Field(None, ge=0.0, le=1.0)
+    history_interval_minutes: Optional[int] = Field(None, ge=0, le=1440)   # 0 = 僅在變更時保存
+    snapshot_max_age_seconds: Optional[int] = Field(None, ge=0, le=3600)
     updated_by: Optional[str] = None
 
 
-class SimulationRequest(BaseModel):
-    """模擬計算請求模型"""
+class InventoryAdjustment(BaseModel):
+    """模擬用庫存調整: 有 item_id 為既有品項增減，否則為假設新增品項"""
+    item_id: Optional[int] = None
+    name: Optional[str] = None
+    category: Optional[str] = None
+    quantity: float = 0
+    unit: Optional[str] = None
+    specification: Optional[str] = None
+
+
+class SimulationScenario(BaseModel):
+    """單一模擬場景"""
+    label: Optional[str] = Field(None, max_length=50)
     population: Optional[int] = Field(None, ge=0)
     target_days: Optional[int] = Field(None, ge=1, le=30)
-    inventory_adjustments: Optional[list] = None
-    staff_adjustments: Optional[Dict[str, int]] = None
+    inventory_adjustments: Optional[List[InventoryAdjustment]] = None
+    staff_adjustments: Optional[Dict[str, int]] = None   # 在勤 (ACTIVE) 人數增減
+
+
+class SimulationRequest(SimulationScenario):
+    """模擬計算請求模型 (提供 scenarios 時為批次模擬)"""
+    scenarios: Optional[List[SimulationScenario]] = Field(None, max_length=100)
 
 
 # ============================================================================
 # Dashboard Endpoint
 # ============================================================================
 
+# 摘要快取: 依賴的資料表 (任一變更即失效)；TTL 讓時間相關項目 (班表) 仍會更新
+SUMMARY_CACHE_TAGS = ("inventory", "person", "config", "resilience_config", "inventory_standards", "staffing_rules")
+SUMMARY_CACHE_TTL = 300
+
+
+def _engine(conn) -> CIRSResilienceEngine:
+    """讀取連線上的引擎: 套用待處理變更 / 寫入歷史交給寫入佇列"""
+    return CIRSResilienceEngine(conn, writer=lambda fn, *args: run_write(fn, *args, lane="resilience"))
+
+
+def _calculate(conn, station_id: str, force_save: bool = False) -> dict:
+    """在 DB 工作執行緒上計算 (避免阻塞 event loop)"""
+    return _engine(conn).calculate(station_id, force_save=force_save)
+
+
 @router.get("/dashboard")
-async def get_resilience_dashboard(station_id: str = Query("default")):
+async def get_resilience_dashboard(
+    station_id: str = Query("default"),
+    refresh: bool = Query(False, description="強制重新計算並寫入歷史")
+):
     """
     取得完整韌性儀表板數據
 
@@ -55,46 +92,74 @@ async def get_resilience_dashboard(station_id: str = Query("default")):
         完整韌性狀態 JSON (對齊 MIRS Lifelines 格式)
     """
     try:
-        with get_db() as conn:
-            engine = CIRSResilienceEngine(conn)
-            result = engine.calculate(station_id)
-            return result
+        return await db_read(_calculate, station_id, refresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"計算失敗: {str(e)}")
 
 
 @router.get("/summary")
-async def get_resilience_summary(station_id: str = Query("default")):
+async def get_resilience_summary(request: Request, station_id: str = Query("default")):
     """
     取得韌性摘要 (簡化版，用於 Portal 顯示)
+    快取至相關資料表變更 (或 SUMMARY_CACHE_TTL 秒) 為止，支援 ETag
     """
     try:
-        with get_db() as conn:
-            engine = CIRSResilienceEngine(conn)
-            full_result = engine.calculate(station_id)
-
-            # Return simplified summary
-            return {
-                "score": full_result['score']['overall'],
-                "status": full_result['score']['status'],
-                "weakest_link": full_result['score']['weakest_link'],
-                "category_scores": full_result['score']['category_scores'],
-                "lifeline_count": len(full_result['lifelines']),
-                "critical_count": sum(1 for l in full_result['lifelines'] if l['status'] == 'CRITICAL'),
-                "warning_count": sum(1 for l in full_result['lifelines'] if l['status'] == 'WARNING'),
-                "recommendations": full_result['recommendations'][:3],  # Top 3
-                "calculated_at": full_result['calculated_at']
-            }
+        return await cached_json(
+            request, "resilience_summary",
+            tags=SUMMARY_CACHE_TAGS,
+            build=lambda conn: _build_summary(conn, station_id),
+            params=(station_id,),
+            ttl=SUMMARY_CACHE_TTL
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"計算失敗: {str(e)}")
 
 
+def _build_summary(conn, station_id: str) -> dict:
+    full_result = _calculate(conn, station_id)
+
+    # Return simplified summary
+    return {
+        "score": full_result['score']['overall'],
+        "status": full_result['score']['status'],
+        "weakest_link": full_result['score']['weakest_link'],
+        "category_scores": full_result['score']['category_scores'],
+        "lifeline_count": len(full_result['lifelines']),
+        "critical_count": sum(1 for l in full_result['lifelines'] if l['status'] == 'CRITICAL'),
+        "warning_count": sum(1 for l in full_result['lifelines'] if l['status'] == 'WARNING'),
+        "recommendations": full_result['recommendations'][:3],  # Top 3
+        "calculated_at": full_result['calculated_at']
+    }
+
+
+@router.get("/verify")
+async def verify_resilience_totals(station_id: str = Query("default")):
+    """
+    驗證模式: 比對增量累計值與完整重算結果
+    不一致時可呼叫 POST /verify/rebuild 重建
+    """
+    try:
+        return await db_read(lambda conn: _engine(conn).verify(station_id))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"驗證失敗: {str(e)}")
+
+
+@router.post("/verify/rebuild")
+async def rebuild_resilience_totals():
+    """重建增量累計值 (Admin only)"""
+    try:
+        items = await write_job(lambda conn: CIRSResilienceEngine(conn).rebuild_incremental_state(), lane="resilience")
+        return {"success": True, "items": items}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重建失敗: {str(e)}")
+
+
 # ============================================================================
 # Configuration Endpoints
 # ============================================================================
 
 @router.get("/config")
-async def get_resilience_config(station_id: str = Query("default")):
+def get_resilience_config(station_id: str = Query("default")):
     """取得韌性設定"""
     try:
         with get_db() as conn:
@@ -106,13 +171,13 @@ async def get_resilience_config(station_id: str = Query("default")):
 
 
 @router.put("/config")
-async def update_resilience_config(
+def update_resilience_config(
     updates: ResilienceConfigUpdate,
     station_id: str = Query("default")
 ):
     """更新韌性設定"""
     try:
-        with get_db() as conn:
+        with write_db() as conn:
             engine = CIRSResilienceEngine(conn)
 
             # Convert Pydantic model to dict, excluding None values
@@ -152,7 +217,7 @@ async def update_resilience_config(
 # ============================================================================
 
 @router.get("/standards")
-async def get_inventory_standards():
+def get_inventory_standards():
     """取得物資標準列表"""
     with get_db() as conn:
         cursor = conn.execute("""
@@ -163,7 +228,7 @@ async def get_inventory_standards():
 
 
 @router.get("/staffing-rules")
-async def get_staffing_rules():
+def get_staffing_rules():
     """取得人力配置規則列表"""
     with get_db() as conn:
         cursor = conn.execute("""
@@ -178,7 +243,7 @@ async def get_staffing_rules():
 # ============================================================================
 
 @router.get("/history")
-async def get_resilience_history(
+def get_resilience_history(
     station_id: str = Query("default"),
     limit: int = Query(100, ge=1, le=1000)
 ):
@@ -197,7 +262,7 @@ async def get_resilience_history(
 
 
 @router.get("/history/{history_id}")
-async def get_resilience_history_detail(history_id: int):
+def get_resilience_history_detail(history_id: int):
     """取得計算歷史詳情 (完整快照)"""
     try:
         with get_db() as conn:
@@ -225,39 +290,21 @@ async def simulate_resilience(
     模擬韌性計算 (What-If 場景)
 
     允許用戶調整人口、物資等參數，查看對韌性分數的影響。
-    注意：此端點不會修改實際數據。
+    完全在記憶體中計算，不會修改設定也不會寫入歷史。
+    提供 scenarios 時一次計算多個場景 (例如掃描不同人口或天數)。
     """
-    try:
-        with get_db() as conn:
-            engine = CIRSResilienceEngine(conn)
-
-            # Get current config
-            current_config = engine.get_config(station_id)
-
-            # Apply simulation adjustments
-            sim_config = current_config.copy()
-            if request.population is not None:
-                sim_config['population_count'] = request.population
-            if request.target_days is not None:
-                sim_config['isolation_target_days'] = request.target_days
-
-            # Temporarily update config for simulation
-            engine.update_config(station_id, sim_config)
-
-            try:
-                # Calculate with simulated config
-                result = engine.calculate(station_id)
-                result['simulated'] = True
-                result['simulation_params'] = {
-                    'population': request.population,
-                    'target_days': request.target_days,
-                    'inventory_adjustments': request.inventory_adjustments,
-                    'staff_adjustments': request.staff_adjustments
-                }
-                return result
-            finally:
-                # Restore original config
-                engine.update_config(station_id, current_config)
+    if request.scenarios:
+        scenarios = [scenario.model_dump(exclude_none=True) for scenario in request.scenarios]
+    else:
+        scenarios = [request.model_dump(exclude_none=True, exclude={'scenarios'})]
 
+    try:
+        results = await db_read(lambda conn: CIRSResilienceEngine(conn).simulate(station_id, scenarios))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"模擬失敗: {str(e)}")
+
+    if request.scenarios:
+        return {"station_id": station_id, "count": len(results), "results": results}
+    return results[0]
@@ -5,9 +5,10 @@ Includes:
 - Station/Pharmacy pairing (v2.3 secure pairing)
 """
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 import socket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import json
@@ -16,10 +17,13 @@ import sys
 import hashlib
 import secrets
 import base64
+import uuid
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, write_db, dict_from_row
+from database import get_db, write_db, write_job, dict_from_row, select_in
+from services.dashboard_counters import get_counters, counter
+from services.event_bus import publish
 from routes.auth import decode_token, get_current_user
 
 router = APIRouter()
@@ -84,128 +88,211 @@ async def get_satellite_device(credentials: HTTPAuthorizationCredentials = Depen
     }
 
 
-def is_action_processed(conn, action_id: str) -> bool:
-    """Check if an action_id has already been processed"""
-    cursor = conn.execute(
-        "SELECT action_id FROM action_logs WHERE action_id = ?",
-        (action_id,)
-    )
-    return cursor.fetchone() is not None
+def fetch_processed_actions(conn, action_ids) -> set:
+    """Return the subset of action_ids already recorded in action_logs"""
+    rows = select_in(conn, "SELECT action_id FROM action_logs WHERE action_id IN ({placeholders})", set(action_ids))
+    return {row["action_id"] for row in rows}
 
 
-def record_action(conn, action_id: str, batch_id: str, action_type: str, device_id: str, payload: dict):
-    """Record a processed action in action_logs"""
-    conn.execute(
-        """INSERT INTO action_logs (action_id, batch_id, action_type, device_id, payload)
-           VALUES (?, ?, ?, ?, ?)""",
-        (action_id, batch_id, action_type, device_id, json.dumps(payload))
-    )
+class SyncBatch:
+    """
+    One Satellite sync batch applied set-based.
 
+    Referenced inventory rows and persons are prefetched once; actions are
+    validated in order against that in-memory state (so later actions see the
+    effect of earlier ones, as before), and all writes are flushed together:
+    one UPDATE per touched row with its final value, executemany for
+    event_log and action_logs.
+    """
 
-def process_dispense(conn, payload: ActionPayload, device_id: str) -> dict:
-    """Process a DISPENSE action"""
-    if not payload.item_id or not payload.quantity:
-        return {"success": False, "error": "Missing item_id or quantity"}
+    def __init__(self, conn, actions: List[SatelliteAction], batch_id: str, device_id: str):
+        self.conn = conn
+        self.batch_id = batch_id
+        self.device_id = device_id
 
-    # Get current inventory
-    cursor = conn.execute(
-        "SELECT id, name, quantity FROM inventory WHERE id = ?",
-        (payload.item_id,)
-    )
-    item = cursor.fetchone()
+        item_ids = {a.payload.item_id for a in actions if a.type == "DISPENSE" and a.payload.item_id}
+        person_ids = {a.payload.person_id for a in actions
+                      if a.type in ("CHECK_IN", "CHECK_OUT") and a.payload.person_id}
 
-    if item is None:
-        return {"success": False, "error": f"Item {payload.item_id} not found"}
+        self.quantities = {
+            row["id"]: row["quantity"]
+            for row in select_in(conn, "SELECT id, quantity FROM inventory WHERE id IN ({placeholders})", item_ids)
+        }
+        self.persons = {
+            row["id"] for row in select_in(conn, "SELECT id FROM person WHERE id IN ({placeholders})", person_ids)
+        }
 
-    current_qty = item['quantity'] or 0
-    if current_qty < payload.quantity:
-        return {"success": False, "error": f"Insufficient quantity. Have {current_qty}, need {payload.quantity}"}
+        self.dirty_items = set()
+        self.person_locations: Dict[str, Optional[str]] = {}  # final state: location, or None = checked out
+        self.events = []
+        self.logs = []
 
-    # Update inventory
-    new_qty = current_qty - payload.quantity
-    conn.execute(
-        "UPDATE inventory SET quantity = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-        (new_qty, payload.item_id)
-    )
+    def dispense(self, payload: ActionPayload) -> dict:
+        """Process a DISPENSE action"""
+        if not payload.item_id or not payload.quantity:
+            return {"success": False, "error": "Missing item_id or quantity"}
 
-    # Record in event_log
-    conn.execute(
-        """INSERT INTO event_log (event_type, item_id, quantity_change, notes, operator_id)
-           VALUES ('RESOURCE_OUT', ?, ?, ?, ?)""",
-        (payload.item_id, -payload.quantity, f"Satellite dispense: {payload.notes or ''}", device_id)
-    )
+        if payload.item_id not in self.quantities:
+            return {"success": False, "error": f"Item {payload.item_id} not found"}
 
-    return {"success": True, "new_quantity": new_qty}
+        current_qty = self.quantities[payload.item_id] or 0
+        if current_qty < payload.quantity:
+            return {"success": False, "error": f"Insufficient quantity. Have {current_qty}, need {payload.quantity}"}
 
+        new_qty = current_qty - payload.quantity
+        self.quantities[payload.item_id] = new_qty
+        self.dirty_items.add(payload.item_id)
 
-def process_checkin(conn, payload: ActionPayload, device_id: str) -> dict:
-    """Process a CHECK_IN action"""
-    if not payload.person_id:
-        return {"success": False, "error": "Missing person_id"}
+        self.events.append((
+            "RESOURCE_OUT", None, payload.item_id, -payload.quantity, None,
+            f"Satellite dispense: {payload.notes or ''}", self.device_id
+        ))
 
-    # Get person
-    cursor = conn.execute(
-        "SELECT id, display_name, checked_in_at FROM person WHERE id = ?",
-        (payload.person_id,)
-    )
-    person = cursor.fetchone()
-
-    if person is None:
-        return {"success": False, "error": f"Person {payload.person_id} not found"}
-
-    # Update check-in status
-    conn.execute(
-        """UPDATE person SET
-           checked_in_at = CURRENT_TIMESTAMP,
-           current_location = ?,
-           updated_at = CURRENT_TIMESTAMP
-           WHERE id = ?""",
-        (payload.location or 'registration', payload.person_id)
-    )
+        return {"success": True, "new_quantity": new_qty}
 
-    # Record in event_log
-    conn.execute(
-        """INSERT INTO event_log (event_type, person_id, location, notes, operator_id)
-           VALUES ('CHECK_IN', ?, ?, ?, ?)""",
-        (payload.person_id, payload.location, f"Satellite check-in: {payload.notes or ''}", device_id)
-    )
+    def checkin(self, payload: ActionPayload) -> dict:
+        """Process a CHECK_IN action"""
+        if not payload.person_id:
+            return {"success": False, "error": "Missing person_id"}
 
-    return {"success": True}
+        if payload.person_id not in self.persons:
+            return {"success": False, "error": f"Person {payload.person_id} not found"}
 
+        self.person_locations[payload.person_id] = payload.location or 'registration'
+        self.events.append((
+            "CHECK_IN", payload.person_id, None, None, payload.location,
+            f"Satellite check-in: {payload.notes or ''}", self.device_id
+        ))
 
-def process_checkout(conn, payload: ActionPayload, device_id: str) -> dict:
-    """Process a CHECK_OUT action"""
-    if not payload.person_id:
-        return {"success": False, "error": "Missing person_id"}
+        return {"success": True}
 
-    # Get person
-    cursor = conn.execute(
-        "SELECT id, display_name, checked_in_at FROM person WHERE id = ?",
-        (payload.person_id,)
-    )
-    person = cursor.fetchone()
-
-    if person is None:
-        return {"success": False, "error": f"Person {payload.person_id} not found"}
-
-    # Update check-out status
-    conn.execute(
-        """UPDATE person SET
-           checked_in_at = NULL,
-           current_location = NULL,
-           updated_at = CURRENT_TIMESTAMP
-           WHERE id = ?""",
-        (payload.person_id,)
-    )
+    def checkout(self, payload: ActionPayload) -> dict:
+        """Process a CHECK_OUT action"""
+        if not payload.person_id:
+            return {"success": False, "error": "Missing person_id"}
+
+        if payload.person_id not in self.persons:
+            return {"success": False, "error": f"Person {payload.person_id} not found"}
+
+        self.person_locations[payload.person_id] = None
+        self.events.append((
+            "CHECK_OUT", payload.person_id, None, None, None,
+            f"Satellite check-out: {payload.notes or ''}", self.device_id
+        ))
+
+        return {"success": True}
+
+    def record(self, action: SatelliteAction):
+        """Queue an action_logs row for a successful action"""
+        self.logs.append((
+            action.action_id, self.batch_id, action.type, self.device_id,
+            json.dumps(action.payload.model_dump())
+        ))
+
+    def flush(self):
+        """Write the batch's net effect"""
+        conn = self.conn
+        conn.executemany(
+            "UPDATE inventory SET quantity = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            [(self.quantities[item_id], item_id) for item_id in sorted(self.dirty_items)]
+        )
+
+        checked_in = [(loc, pid) for pid, loc in self.person_locations.items() if loc is not None]
+        checked_out = [(pid,) for pid, loc in self.person_locations.items() if loc is None]
+        conn.executemany(
+            """UPDATE person SET
+               checked_in_at = CURRENT_TIMESTAMP,
+               current_location = ?,
+               updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            checked_in
+        )
+        conn.executemany(
+            """UPDATE person SET
+               checked_in_at = NULL,
+               current_location = NULL,
+               updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            checked_out
+        )
+
+        conn.executemany(
+            """INSERT INTO event_log (event_type, person_id, item_id, quantity_change, location, notes, operator_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            self.events
+        )
+        conn.executemany(
+            """INSERT INTO action_logs (action_id, batch_id, action_type, device_id, payload)
+               VALUES (?, ?, ?, ?, ?)""",
+            self.logs
+        )
+
+
+def _apply_sync_actions(conn, batch_id: str, actions: List[SatelliteAction], device_id: str) -> List[tuple]:
+    """
+    Apply Satellite actions in order (runs on the group-commit writer).
+
+    Returns [(action_id, error)] in input order; error is None for processed
+    actions (including already-seen ones, reported as success).
+    """
+    results = []
+
+    # Idempotency: one lookup for the whole batch
+    seen = fetch_processed_actions(conn, (action.action_id for action in actions))
+    batch = SyncBatch(conn, actions, batch_id, device_id)
+
+    for action in actions:
+        if action.action_id in seen:
+            # Already processed - report as success (idempotent)
+            results.append((action.action_id, None))
+            continue
+
+        # Process based on action type
+        try:
+            if action.type == "DISPENSE":
+                result = batch.dispense(action.payload)
+            elif action.type == "CHECK_IN":
+                result = batch.checkin(action.payload)
+            elif action.type == "CHECK_OUT":
+                result = batch.checkout(action.payload)
+            else:
+                result = {"success": False, "error": f"Unknown action type: {action.type}"}
+
+            if result.get("success"):
+                batch.record(action)
+                seen.add(action.action_id)
+                results.append((action.action_id, None))
+            else:
+                results.append((action.action_id, result.get("error", "Unknown error")))
+
+        except Exception as e:
+            results.append((action.action_id, str(e)))
+
+    batch.flush()
+    return results
+
+
+def _apply_sync_batch(conn, request: SyncRequest, device_id: str):
+    """Apply one Satellite sync batch; returns (processed, failed)"""
+    processed = []
+    failed = []
+    for action_id, error in _apply_sync_actions(conn, request.batch_id, request.actions, device_id):
+        if error is None:
+            processed.append(action_id)
+        else:
+            failed.append({"action_id": action_id, "error": error})
+    return processed, failed
 
-    # Record in event_log
-    conn.execute(
-        """INSERT INTO event_log (event_type, person_id, notes, operator_id)
-           VALUES ('CHECK_OUT', ?, ?, ?)""",
-        (payload.person_id, f"Satellite check-out: {payload.notes or ''}", device_id)
-    )
 
-    return {"success": True}
+def _publish_sync_changes(actions: List[SatelliteAction], processed_ids: set):
+    """Push inventory / headcount notifications for committed sync actions"""
+    done = [a for a in actions if a.action_id in processed_ids]
+    item_ids = list(dict.fromkeys(a.payload.item_id for a in done if a.type == "DISPENSE"))
+    person_ids = list(dict.fromkeys(a.payload.person_id for a in done if a.type in ("CHECK_IN", "CHECK_OUT")))
+    if item_ids:
+        publish("inventory.changed", item_ids=item_ids, source="satellite")
+    if person_ids:
+        publish("headcount.changed", scope="public", person_ids=person_ids, source="satellite")
 
 
 # ============================================================================
@@ -228,51 +315,10 @@ async def sync_actions(request: SyncRequest, device: dict = Depends(get_satellit
        - Record action_id in action_logs
     2. Return list of processed action_ids so client can clear IndexedDB
     """
-    processed = []
-    failed = []
     device_id = device.get("device_id", "unknown")
 
-    with write_db() as conn:
-        for action in request.actions:
-            # Check idempotency
-            if is_action_processed(conn, action.action_id):
-                # Already processed - report as success (idempotent)
-                processed.append(action.action_id)
-                continue
-
-            # Process based on action type
-            try:
-                if action.type == "DISPENSE":
-                    result = process_dispense(conn, action.payload, device_id)
-                elif action.type == "CHECK_IN":
-                    result = process_checkin(conn, action.payload, device_id)
-                elif action.type == "CHECK_OUT":
-                    result = process_checkout(conn, action.payload, device_id)
-                else:
-                    result = {"success": False, "error": f"Unknown action type: {action.type}"}
-
-                if result.get("success"):
-                    # Record in action_logs
-                    record_action(
-                        conn,
-                        action.action_id,
-                        request.batch_id,
-                        action.type,
-                        device_id,
-                        action.payload.model_dump()
-                    )
-                    processed.append(action.action_id)
-                else:
-                    failed.append({
-                        "action_id": action.action_id,
-                        "error": result.get("error", "Unknown error")
-                    })
-
-            except Exception as e:
-                failed.append({
-                    "action_id": action.action_id,
-                    "error": str(e)
-                })
+    processed, failed = await write_job(_apply_sync_batch, request, device_id, lane="satellite")
+    _publish_sync_changes(request.actions, set(processed))
 
     return SyncResponse(
         processed=processed,
@@ -281,34 +327,153 @@ async def sync_actions(request: SyncRequest, device: dict = Depends(get_satellit
     )
 
 
+# Streaming sync: actions per write job / longest accepted NDJSON line
+SYNC_STREAM_CHUNK = 200
+SYNC_STREAM_MAX_LINE = 64 * 1024
+
+
+async def _ndjson_lines(request: Request):
+    """Yield NDJSON lines from the request body as they arrive (never the whole body)"""
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            yield line
+        if len(buffer) > SYNC_STREAM_MAX_LINE:
+            raise ValueError(f"NDJSON line exceeds {SYNC_STREAM_MAX_LINE} bytes")
+    if buffer:
+        yield buffer
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator is still reading the request body.
+
+    The stock response (ASGI < 2.4, e.g. older servers and TestClient) listens
+    for disconnects by consuming `receive`, which would swallow the request
+    body chunks; here `receive` belongs to the body iterator, which sees the
+    disconnect itself.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _ack_line(ack: dict) -> str:
+    return json.dumps(ack, ensure_ascii=False) + "\n"
+
+
+def _invalid_action_ack(line_no: int, line: bytes, error: Exception) -> dict:
+    if isinstance(error, ValidationError):
+        error = "; ".join(
+            f"{'.'.join(map(str, err['loc'])) or 'body'}: {err['msg']}" for err in error.errors()
+        )
+    ack = {"line": line_no, "status": "failed", "error": f"Invalid action: {error}"}
+    try:
+        action_id = json.loads(line).get("action_id")
+        if isinstance(action_id, str):
+            ack["action_id"] = action_id
+    except (ValueError, AttributeError):
+        pass
+    return ack
+
+
+@router.post("/sync/stream")
+async def sync_actions_stream(
+    request: Request,
+    batch_id: Optional[str] = None,
+    device: dict = Depends(get_satellite_device)
+):
+    """
+    Streaming variant of /sync for large offline backlogs.
+
+    Request body: newline-delimited SatelliteAction JSON (application/x-ndjson).
+    Actions are applied in chunks of SYNC_STREAM_CHUNK (one write job each),
+    and one acknowledgement line per action is streamed back as soon as its
+    chunk commits, so the client can clear IndexedDB progressively:
+
+        {"action_id": "...", "status": "processed"}
+        {"action_id": "...", "status": "failed", "error": "..."}
+        ...
+        {"done": true, "batch_id": "...", "processed": N, "failed": M, "server_time": ...}
+
+    Same idempotency as /sync; memory use is bounded by one chunk.
+    """
+    device_id = device.get("device_id", "unknown")
+    batch_id = batch_id or f"stream-{uuid.uuid4()}"
+
+    async def acknowledgements():
+        counts = {"processed": 0, "failed": 0}
+        chunk: List[SatelliteAction] = []
+
+        async def apply_chunk() -> str:
+            results = await write_job(_apply_sync_actions, batch_id, list(chunk), device_id, lane="satellite")
+            _publish_sync_changes(chunk, {action_id for action_id, error in results if error is None})
+            chunk.clear()
+            lines = []
+            for action_id, error in results:
+                if error is None:
+                    counts["processed"] += 1
+                    lines.append(_ack_line({"action_id": action_id, "status": "processed"}))
+                else:
+                    counts["failed"] += 1
+                    lines.append(_ack_line({"action_id": action_id, "status": "failed", "error": error}))
+            return "".join(lines)
+
+        line_no = 0
+        try:
+            async for line in _ndjson_lines(request):
+                line_no += 1
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append(SatelliteAction.model_validate_json(line))
+                except ValidationError as e:
+                    counts["failed"] += 1
+                    yield _ack_line(_invalid_action_ack(line_no, line, e))
+                    continue
+
+                if len(chunk) >= SYNC_STREAM_CHUNK:
+                    yield await apply_chunk()
+
+            if chunk:
+                yield await apply_chunk()
+        except ValueError as e:
+            # Unreadable stream: acks already sent stay valid, the rest can be resent
+            yield _ack_line({"error": str(e), "line": line_no + 1})
+
+        yield _ack_line({
+            "done": True,
+            "batch_id": batch_id,
+            "processed": counts["processed"],
+            "failed": counts["failed"],
+            "server_time": int(datetime.utcnow().timestamp())
+        })
+
+    return _DuplexStreamingResponse(acknowledgements(), media_type="application/x-ndjson")
+
+
 @router.get("/status")
-async def get_hub_status(device: dict = Depends(get_satellite_device)):
+def get_hub_status(device: dict = Depends(get_satellite_device)):
     """
     Get Hub status for Satellite PWA.
     Returns simplified status for mobile display.
     """
     with get_db() as conn:
-        # Headcount
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM person
-            WHERE role = 'public' AND checked_in_at IS NOT NULL
-        """)
-        headcount = cursor.fetchone()['count']
+        counters = get_counters(conn)
 
-        # Low stock alerts
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM inventory
-            WHERE quantity < min_quantity AND min_quantity > 0
-        """)
-        low_stock = cursor.fetchone()['count']
+    # Headcount
+    headcount = counter(counters, 'person.public.checked_in')
 
-        # Pending messages
-        cursor = conn.execute("""
-            SELECT COUNT(*) as count FROM message
-            WHERE (is_resolved IS NULL OR is_resolved = 0)
-            AND message_type = 'post'
-        """)
-        pending_messages = cursor.fetchone()['count']
+    # Low stock alerts
+    low_stock = counter(counters, 'inventory.low_stock')
+
+    # Pending messages
+    pending_messages = counter(counters, 'message.pending')
 
     return {
         "hub_name": device.get("hub_name", "CIRS Hub"),
@@ -321,79 +486,153 @@ async def get_hub_status(device: dict = Depends(get_satellite_device)):
     }
 
 
+# ============================================================================
+# Delta Sync Feed (migration 010)
+# ============================================================================
+
+def current_sync_cursor(conn) -> int:
+    """Latest change sequence for inventory / person / zone"""
+    row = conn.execute("SELECT seq FROM sync_counter WHERE id = 1").fetchone()
+    return row["seq"] if row else 0
+
+
+def _read_feed(conn, table: str, view_query: str, since: Optional[int]):
+    """
+    Read one Satellite list either in full or as a delta since `since`.
+
+    `view_query` is the endpoint's SELECT without ORDER BY (must select `id`).
+    Returns (cursor, rows, delta): rows is the full list when delta is None,
+    otherwise delta = {"inserted", "updated", "deleted"}. Rows that changed
+    but are no longer part of the view (checked out, equipment, inactive zone)
+    are reported as deleted; clients should upsert both inserted and updated.
+    The cursor is read first, so a concurrent write is sent again at worst.
+    """
+    cursor = current_sync_cursor(conn)
+    if since is None or since < 0 or since > cursor:
+        return cursor, None, None
+
+    changes = conn.execute(
+        "SELECT row_id, op, inserted_seq FROM sync_changes WHERE tbl = ? AND seq > ? ORDER BY seq",
+        (table, since)
+    ).fetchall()
+    visible = {
+        row["id"]: dict_from_row(row)
+        for row in select_in(
+            conn,
+            f"SELECT * FROM ({view_query}) WHERE id IN ({{placeholders}})",
+            [change["row_id"] for change in changes if change["op"] != "D"]
+        )
+    }
+
+    delta = {"inserted": [], "updated": [], "deleted": []}
+    for change in changes:
+        row = visible.get(change["row_id"])
+        if row is None:
+            delta["deleted"].append(change["row_id"])
+        elif change["inserted_seq"] > since:
+            delta["inserted"].append(row)
+        else:
+            delta["updated"].append(row)
+    return cursor, None, delta
+
+
+def _feed_response(key: str, cursor: int, rows: list, delta: Optional[dict], since: Optional[int]) -> dict:
+    if delta is not None:
+        return {
+            "delta": True,
+            "since": since,
+            "cursor": cursor,
+            **delta
+        }
+    response = {key: rows, "delta": False, "cursor": cursor}
+    if since is not None:
+        response["reset"] = True  # unknown cursor (e.g. restored hub): replace local copy
+    return response
+
+
+INVENTORY_VIEW = """
+    SELECT id, name, category, quantity, unit, min_quantity
+    FROM inventory
+    WHERE category != 'equipment'
+"""
+
+ZONE_VIEW = """
+    SELECT id, name, zone_type, capacity, description, icon
+    FROM zone
+    WHERE is_active = 1
+"""
+
+PERSON_VIEW = """
+    SELECT id, display_name, triage_status, current_location, checked_in_at
+    FROM person
+    WHERE role = 'public' AND checked_in_at IS NOT NULL
+"""
+
+
 @router.get("/inventory")
-async def get_inventory_summary(device: dict = Depends(get_satellite_device)):
+def get_inventory_summary(since: Optional[int] = None, device: dict = Depends(get_satellite_device)):
     """
     Get inventory summary for Satellite PWA (read-only).
+    With ?since=<cursor> only rows changed after that cursor are returned.
     """
     with get_db() as conn:
-        cursor = conn.execute("""
-            SELECT id, name, category, quantity, unit, min_quantity
-            FROM inventory
-            WHERE category != 'equipment'
-            ORDER BY category, name
-        """)
-        items = [dict_from_row(row) for row in cursor.fetchall()]
+        cursor, items, delta = _read_feed(conn, "inventory", INVENTORY_VIEW, since)
+        if delta is None:
+            items = [dict_from_row(row) for row in conn.execute(INVENTORY_VIEW + " ORDER BY category, name")]
 
-    return {
-        "items": items,
-        "server_time": int(datetime.utcnow().timestamp())
-    }
+    response = _feed_response("items", cursor, items, delta, since)
+    response["server_time"] = int(datetime.utcnow().timestamp())
+    return response
 
 
 @router.get("/zones")
-async def get_zones(device: dict = Depends(get_satellite_device)):
+def get_zones(since: Optional[int] = None, device: dict = Depends(get_satellite_device)):
     """
     Get available zones for Satellite PWA (v1.3.1).
     Used for new person registration location selection.
+    With ?since=<cursor> only zones changed after that cursor are returned.
     """
     with get_db() as conn:
-        cursor = conn.execute("""
-            SELECT id, name, zone_type, capacity, description, icon
-            FROM zone
-            WHERE is_active = 1
-            ORDER BY sort_order, name
-        """)
-        zones = [dict_from_row(row) for row in cursor.fetchall()]
+        cursor, zones, delta = _read_feed(conn, "zone", ZONE_VIEW, since)
+        if delta is None:
+            zones = [dict_from_row(row) for row in conn.execute(ZONE_VIEW + " ORDER BY sort_order, name")]
 
-    # Group by zone_type
-    grouped = {}
-    for zone in zones:
-        zone_type = zone.get('zone_type', 'other')
-        if zone_type not in grouped:
-            grouped[zone_type] = []
-        grouped[zone_type].append(zone)
+    response = _feed_response("zones", cursor, zones, delta, since)
+    if delta is None:
+        # Group by zone_type
+        grouped = {}
+        for zone in zones:
+            zone_type = zone.get('zone_type', 'other')
+            if zone_type not in grouped:
+                grouped[zone_type] = []
+            grouped[zone_type].append(zone)
+        response["grouped"] = grouped
 
-    return {
-        "zones": zones,
-        "grouped": grouped,
-        "server_time": int(datetime.utcnow().timestamp())
-    }
+    response["server_time"] = int(datetime.utcnow().timestamp())
+    return response
 
 
 @router.get("/persons")
-async def get_checked_in_persons(device: dict = Depends(get_satellite_device)):
+def get_checked_in_persons(since: Optional[int] = None, device: dict = Depends(get_satellite_device)):
     """
     Get list of checked-in persons for Satellite PWA (read-only).
+    With ?since=<cursor> only persons changed after that cursor are returned.
     """
     with get_db() as conn:
-        cursor = conn.execute("""
-            SELECT id, display_name, triage_status, current_location, checked_in_at
-            FROM person
-            WHERE role = 'public' AND checked_in_at IS NOT NULL
-            ORDER BY display_name
-        """)
-        persons = [dict_from_row(row) for row in cursor.fetchall()]
+        cursor, persons, delta = _read_feed(conn, "person", PERSON_VIEW, since)
+        if delta is None:
+            persons = [dict_from_row(row) for row in conn.execute(PERSON_VIEW + " ORDER BY display_name")]
 
-    return {
-        "persons": persons,
-        "total": len(persons),
-        "server_time": int(datetime.utcnow().timestamp())
-    }
+    response = _feed_response("persons", cursor, persons, delta, since)
+    if delta is None:
+        response["total"] = len(persons)
+
+    response["server_time"] = int(datetime.utcnow().timestamp())
+    return response
 
 
 @router.get("/action-logs")
-async def get_action_logs(
+def get_action_logs(
     limit: int = 50,
     device: dict = Depends(get_satellite_device)
 ):
@@ -450,7 +689,7 @@ class SupplyRequest(BaseModel):
 
 
 @router.post("/checkin")
-async def direct_checkin(request: CheckinRequest, device: dict = Depends(get_satellite_device)):
+def direct_checkin(request: CheckinRequest, device: dict = Depends(get_satellite_device)):
     """
     Direct check-in/check-out/register endpoint (v1.3.1).
     Simpler alternative to batch sync for individual operations.
@@ -458,6 +697,8 @@ async def direct_checkin(request: CheckinRequest, device: dict = Depends(get_sat
     device_id = device.get("device_id", "unknown")
     action = request.action
 
+    result = {"success": False, "message": "Unknown action"}
+
     with write_db() as conn:
         if action == 'register':
             # Register new person with triage status and zone
@@ -495,7 +736,7 @@ async def direct_checkin(request: CheckinRequest, device: dict = Depends(get_sat
             triage_labels = {'green': '輕傷', 'yellow': '延遲', 'red': '立即', 'black': '死亡'}
             triage_label = triage_labels.get(request.triage_status, request.triage_status)
 
-            return {
+            result = {
                 "success": True,
                 "action": "register",
                 "person_id": new_id,
@@ -541,7 +782,7 @@ async def direct_checkin(request: CheckinRequest, device: dict = Depends(get_sat
                 (person_id, f"Satellite check-in", device_id)
             )
 
-            return {
+            result = {
                 "success": True,
                 "action": "checkin",
                 "person_id": person_id,
@@ -582,7 +823,7 @@ async def direct_checkin(request: CheckinRequest, device: dict = Depends(get_sat
                 (person_id, f"Satellite check-out", device_id)
             )
 
-            return {
+            result = {
                 "success": True,
                 "action": "checkout",
                 "person_id": person_id,
@@ -590,11 +831,14 @@ async def direct_checkin(request: CheckinRequest, device: dict = Depends(get_sat
                 "message": f"{person_name} 退場成功"
             }
 
-    return {"success": False, "message": "Unknown action"}
+    if result.get("success"):
+        publish("headcount.changed", scope="public", person_ids=[result["person_id"]], source="satellite")
+
+    return result
 
 
 @router.post("/supply")
-async def direct_supply(request: SupplyRequest, device: dict = Depends(get_satellite_device)):
+def direct_supply(request: SupplyRequest, device: dict = Depends(get_satellite_device)):
     """
     Direct supply distribution endpoint (v1.3.1).
     Simpler alternative to batch sync for individual operations.
@@ -647,6 +891,8 @@ async def direct_supply(request: SupplyRequest, device: dict = Depends(get_satel
             (item['id'], -request.quantity, f"Satellite dispense to {request.person_name or request.person_id}", device_id)
         )
 
+    publish("inventory.changed", item_ids=[item['id']], source="satellite")
+
     return {
         "success": True,
         "item_id": item['id'],
@@ -669,7 +915,7 @@ class StocktakeRequest(BaseModel):
 
 
 @router.post("/stocktake")
-async def stocktake_adjustment(request: StocktakeRequest, device: dict = Depends(get_satellite_device)):
+def stocktake_adjustment(request: StocktakeRequest, device: dict = Depends(get_satellite_device)):
     """
     Adjust inventory quantity (stocktake/盤點) from Satellite PWA (v1.4).
     Only available for admin role.
@@ -717,6 +963,8 @@ async def stocktake_adjustment(request: StocktakeRequest, device: dict = Depends
             (event_type, request.item_id, diff, f"Satellite 盤點: {reason}", device_id)
         )
 
+    publish("inventory.changed", item_ids=[item['id']], source="stocktake")
+
     diff_str = f"+{diff}" if diff > 0 else str(diff)
     return {
         "success": True,
@@ -764,7 +1012,7 @@ def generate_station_secret() -> str:
 
 
 @router.post("/stations/pair", response_model=StationPairResponse)
-async def pair_station(request: StationPairRequest):
+def pair_station(request: StationPairRequest):
     """
     Complete station pairing (v2.3 Secure Pairing Protocol).
 
@@ -954,7 +1202,7 @@ async def generate_station_pairing(
 
 
 @router.get("/stations")
-async def list_stations(user: dict = Depends(get_current_user)):
+def list_stations(user: dict = Depends(get_current_user)):
     """
     List all paired stations (Admin only).
     """
@@ -11,6 +11,8 @@ import uuid
 import json
 
 from database import get_db, write_db, dict_from_row, rows_to_list
+from services.event_bus import publish
+from services.dashboard_counters import get_counters, counter
 
 router = APIRouter()
 
@@ -104,7 +106,7 @@ def get_role_config(conn, role_code: str) -> Optional[dict]:
 # ============================================================================
 
 @router.post("/join")
-async def submit_join_request(request: JoinRequest):
+def submit_join_request(request: JoinRequest):
     """
     提交自助登錄申請
     Returns QR token for admin approval
@@ -138,7 +140,7 @@ async def submit_join_request(request: JoinRequest):
 
 # Static /join routes must come before /join/{token}
 @router.get("/join/pending")
-async def list_pending_requests():
+def list_pending_requests():
     """
     列出待處理的申請
     """
@@ -168,11 +170,11 @@ async def list_pending_requests():
 
 
 @router.get("/join/{token}")
-async def get_join_request(token: str):
+def get_join_request(token: str):
     """
     取得申請詳情 (管理員用)
     """
-    with get_db() as conn:
+    with write_db() as conn:
         cursor = conn.execute(
             "SELECT * FROM staff_join_requests WHERE qr_token = ?",
             (token,)
@@ -214,7 +216,7 @@ async def get_join_request(token: str):
 
 
 @router.post("/join/{token}/approve")
-async def approve_join_request(token: str, approval: JoinApproval):
+def approve_join_request(token: str, approval: JoinApproval):
     """
     核准申請並建立人員
     """
@@ -300,7 +302,7 @@ async def approve_join_request(token: str, approval: JoinApproval):
 
 
 @router.post("/join/{token}/reject")
-async def reject_join_request(token: str, approver_id: str = Query(...)):
+def reject_join_request(token: str, approver_id: str = Query(...)):
     """
     拒絕申請
     """
@@ -331,7 +333,7 @@ async def reject_join_request(token: str, approver_id: str = Query(...)):
 # ============================================================================
 
 @router.get("")
-async def list_staff(
+def list_staff(
     status: Optional[str] = Query(None, description="Filter by staff_status"),
     role: Optional[str] = Query(None, description="Filter by staff_role")
 ):
@@ -374,7 +376,7 @@ async def list_staff(
 
 
 @router.post("")
-async def create_staff(request: StaffCreate):
+def create_staff(request: StaffCreate):
     """
     新增工作人員 (管理員手動)
     """
@@ -421,46 +423,43 @@ async def create_staff(request: StaffCreate):
 # ============================================================================
 
 @router.get("/summary/stats")
-async def get_staff_summary():
+def get_staff_summary():
     """
     人力摘要統計
     """
     with get_db() as conn:
+        # Materialized counters: 'staff.registered', 'staff.<ROLE>.<STATUS>'
+        counters = get_counters(conn, 'staff.')
+
         # Total registered staff
-        cursor = conn.execute(
-            "SELECT COUNT(*) as count FROM person WHERE staff_role IS NOT NULL"
-        )
-        total_registered = cursor.fetchone()['count']
+        total_registered = counter(counters, 'staff.registered')
 
         # By status (weighted)
-        cursor = conn.execute("""
-            SELECT
-                staff_role,
-                SUM(CASE WHEN staff_status = 'ACTIVE' THEN 1 ELSE 0 END) as active,
-                SUM(CASE WHEN staff_status = 'STANDBY' THEN 1 ELSE 0 END) as standby,
-                SUM(CASE WHEN staff_status = 'OFF_DUTY' THEN 1 ELSE 0 END) as off_duty,
-                COUNT(*) as total
-            FROM person
-            WHERE staff_role IS NOT NULL
-            GROUP BY staff_role
-        """)
+        role_status = {}
+        for name, value in counters.items():
+            parts = name.split('.', 2)
+            if len(parts) == 3 and value:
+                role_status.setdefault(parts[1], {})[parts[2]] = int(value)
 
         by_role = {}
         total_active = 0
         total_standby = 0
         total_effective = 0
 
-        for row in cursor.fetchall():
-            role = row['staff_role']
-            active = row['active'] or 0
-            standby = row['standby'] or 0
+        for role in sorted(role_status):
+            statuses = role_status[role]
+            total = sum(statuses.values())
+            if not total:
+                continue
+            active = statuses.get('ACTIVE', 0)
+            standby = statuses.get('STANDBY', 0)
             effective = active * 1.0 + standby * 0.5
 
             by_role[role] = {
                 'active': active,
                 'standby': standby,
-                'off_duty': row['off_duty'] or 0,
-                'total': row['total'],
+                'off_duty': statuses.get('OFF_DUTY', 0),
+                'total': total,
                 'effective': round(effective, 1)
             }
 
@@ -548,7 +547,7 @@ async def get_staff_summary():
 
 
 @router.get("/on-duty")
-async def list_on_duty():
+def list_on_duty():
     """
     列出目前在值人員
     """
@@ -569,7 +568,7 @@ async def list_on_duty():
 
 
 @router.get("/role-config")
-async def get_role_configs():
+def get_role_configs():
     """
     取得職能角色設定
     """
@@ -587,7 +586,7 @@ async def get_role_configs():
 # ============================================================================
 
 @router.get("/{staff_id}")
-async def get_staff(staff_id: str):
+def get_staff(staff_id: str):
     """
     取得工作人員詳情
     """
@@ -617,7 +616,7 @@ async def get_staff(staff_id: str):
 
 
 @router.post("/{staff_id}/verify")
-async def verify_staff(staff_id: str, request: StaffVerify):
+def verify_staff(staff_id: str, request: StaffVerify):
     """
     驗證工作人員 (查驗證件)
     """
@@ -651,7 +650,7 @@ async def verify_staff(staff_id: str, request: StaffVerify):
 # ============================================================================
 
 @router.post("/{staff_id}/clock-in")
-async def clock_in(staff_id: str, request: ClockInRequest):
+def clock_in(staff_id: str, request: ClockInRequest):
     """
     報到上班
     """
@@ -686,6 +685,8 @@ async def clock_in(staff_id: str, request: ClockInRequest):
             VALUES ('CLOCK_IN', ?, ?)
         """, (staff_id, request.notes or f"報到，預計 {request.expected_hours} 小時"))
 
+    publish("headcount.changed", scope="staff", person_ids=[staff_id], source="clock_in")
+
     return {
         "success": True,
         "staff_status": "ACTIVE",
@@ -695,7 +696,7 @@ async def clock_in(staff_id: str, request: ClockInRequest):
 
 
 @router.post("/{staff_id}/clock-out")
-async def clock_out(staff_id: str):
+def clock_out(staff_id: str):
     """
     離班下班
     Returns Fast Pass badge token for quick return
@@ -737,6 +738,8 @@ async def clock_out(staff_id: str):
             VALUES ('CLOCK_OUT', ?, ?)
         """, (staff_id, f"離班，發放通行證 {badge_token}"))
 
+    publish("headcount.changed", scope="staff", person_ids=[staff_id], source="clock_out")
+
     return {
         "success": True,
         "staff_status": "OFF_DUTY",
@@ -747,7 +750,7 @@ async def clock_out(staff_id: str):
 
 
 @router.post("/{staff_id}/toggle-status")
-async def toggle_staff_status(staff_id: str):
+def toggle_staff_status(staff_id: str):
     """
     切換工作人員狀態 (ACTIVE ↔ STANDBY)
     - ACTIVE → STANDBY (暫時離開)
@@ -789,6 +792,8 @@ async def toggle_staff_status(staff_id: str):
             VALUES ('STATUS_CHANGE', ?, ?)
         """, (staff_id, event_note))
 
+    publish("headcount.changed", scope="staff", person_ids=[staff_id], source="toggle_status")
+
     return {
         "success": True,
         "previous_status": current_status,
@@ -798,7 +803,7 @@ async def toggle_staff_status(staff_id: str):
 
 
 @router.post("/fast-pass")
-async def use_fast_pass(request: FastPassRequest):
+def use_fast_pass(request: FastPassRequest):
     """
     使用快速通關
     """
@@ -851,6 +856,8 @@ async def use_fast_pass(request: FastPassRequest):
             VALUES ('CLOCK_IN', ?, ?)
         """, (token['person_id'], "快速通關報到"))
 
+    publish("headcount.changed", scope="staff", person_ids=[token['person_id']], source="fast_pass")
+
     return {
         "success": True,
         "person_id": token['person_id'],
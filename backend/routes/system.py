@@ -6,12 +6,20 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+import asyncio
 import subprocess
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import get_db, write_db, dict_from_row, rows_to_list, DB_PATH
+from database import (
+    dict_from_row, rows_to_list, DB_PATH, get_pool_stats, get_write_queue_stats,
+    db_read, db_write, run_in_db_thread, vacuum_db
+)
+from services.backup_scheduler import backup_scheduler
+from services.backup_service import BackupBusy, BackupError
+from services.dashboard_counters import check_counters, rebuild_counters
+from services.response_cache import get_cache_stats
 
 router = APIRouter()
 
@@ -45,7 +53,8 @@ async def sync_time(request: TimeSyncRequest):
         # Only allow sync if running on Linux (Raspberry Pi)
         if os.name != 'nt':
             try:
-                subprocess.run(
+                await asyncio.to_thread(
+                    subprocess.run,
                     ['sudo', 'date', '-s', dt.strftime('%Y-%m-%d %H:%M:%S')],
                     check=True,
                     capture_output=True
@@ -63,9 +72,8 @@ async def sync_time(request: TimeSyncRequest):
 @router.get("/config")
 async def get_config():
     """Get all configuration values"""
-    with get_db() as conn:
-        cursor = conn.execute("SELECT key, value FROM config")
-        config = {row['key']: row['value'] for row in cursor.fetchall()}
+    rows = await db_read(lambda conn: conn.execute("SELECT key, value FROM config").fetchall())
+    config = {row['key']: row['value'] for row in rows}
 
     return config
 
@@ -73,19 +81,26 @@ async def get_config():
 @router.put("/config")
 async def update_config(config: ConfigUpdate):
     """Update a configuration value"""
-    with write_db() as conn:
-        conn.execute(
-            """
-            INSERT INTO config (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET value = ?, updated_at = CURRENT_TIMESTAMP
-            """,
-            (config.key, config.value, config.value)
-        )
+    await db_write(lambda conn: conn.execute(
+        """
+        INSERT INTO config (key, value, updated_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(key) DO UPDATE SET value = ?, updated_at = CURRENT_TIMESTAMP
+        """,
+        (config.key, config.value, config.value)
+    ))
 
     return {"message": f"Config '{config.key}' updated"}
 
 
+def _count_records(conn):
+    counts = {}
+    for table in ['inventory', 'person', 'event_log', 'message']:
+        cursor = conn.execute(f"SELECT COUNT(*) as count FROM {table}")
+        counts[table] = cursor.fetchone()['count']
+    return counts
+
+
 @router.get("/status")
 async def get_system_status():
     """Get system status"""
@@ -99,17 +114,16 @@ async def get_system_status():
     wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
 
     # Record counts
-    with get_db() as conn:
-        counts = {}
-        for table in ['inventory', 'person', 'event_log', 'message']:
-            cursor = conn.execute(f"SELECT COUNT(*) as count FROM {table}")
-            counts[table] = cursor.fetchone()['count']
+    counts = await db_read(_count_records)
 
     # Disk space (Linux only)
     disk_info = {}
     if os.name != 'nt':
         try:
-            result = subprocess.run(['df', '-h', '/'], capture_output=True, text=True)
+            # Not database work: keep it off the DB executor
+            result = await asyncio.to_thread(
+                subprocess.run, ['df', '-h', '/'], capture_output=True, text=True
+            )
             lines = result.stdout.strip().split('\n')
             if len(lines) > 1:
                 parts = lines[1].split()
@@ -127,7 +141,8 @@ async def get_system_status():
     backup_status = {
         "mounted": os.path.ismount("/mnt/backup"),
         "backup_count": 0,
-        "last_backup": None
+        "last_backup": None,
+        "scheduler": backup_scheduler.status()
     }
 
     if os.path.exists(backup_dir):
@@ -142,7 +157,8 @@ async def get_system_status():
             "size_bytes": db_size,
             "size_mb": round(db_size / 1024 / 1024, 2),
             "wal_size_bytes": wal_size,
-            "record_counts": counts
+            "record_counts": counts,
+            "pool": get_pool_stats()
         },
         "disk": disk_info,
         "backup": backup_status,
@@ -150,32 +166,64 @@ async def get_system_status():
     }
 
 
+@router.get("/db-pool")
+async def get_db_pool_status():
+    """Get database connection pool and group-commit write queue metrics"""
+    stats = get_pool_stats()
+    stats["write_queue"] = get_write_queue_stats()
+    return stats
+
+
+@router.get("/cache")
+async def get_response_cache_status():
+    """Get response cache hit/miss metrics"""
+    return get_cache_stats()
+
+
+@router.get("/counters/check")
+async def check_dashboard_counters():
+    """Compare dashboard_counters against a full recompute"""
+    drift = await db_read(check_counters)
+    return {"consistent": not drift, "drift": drift}
+
+
+@router.post("/counters/rebuild")
+async def rebuild_dashboard_counters():
+    """Rebuild dashboard_counters from scratch (Admin only)"""
+    drift = await db_write(check_counters)
+    count = await db_write(rebuild_counters)
+    return {"success": True, "counters": count, "corrected": drift}
+
+
 @router.post("/backup")
 async def trigger_backup():
-    """Manually trigger a backup (Admin only)"""
-    backup_script = "/home/pi/CIRS/scripts/backup.sh"
-
-    if not os.path.exists(backup_script):
-        raise HTTPException(status_code=404, detail="Backup script not found")
+    """Manually trigger a backup (Admin only)
 
+    Runs the scheduled backup (configured target, incremental, retention)
+    right away instead of waiting for the next interval.
+    """
     try:
-        result = subprocess.run(
-            ['bash', backup_script],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-
-        if result.returncode == 0:
-            return {"success": True, "output": result.stdout}
-        else:
-            return {"success": False, "error": result.stderr}
+        job = backup_scheduler.run_now()
+    except BackupBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    except subprocess.TimeoutExpired:
-        raise HTTPException(status_code=500, detail="Backup timed out")
+    try:
+        result = await asyncio.wrap_future(job.future)
+    except BackupError as e:
+        return {"success": False, "error": str(e), "job_id": job.job_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {"success": True, "job_id": job.job_id, "backup": result}
+
+
+def _purge_old_records(conn):
+    # EventLog: keep 90 days
+    conn.execute("DELETE FROM event_log WHERE timestamp < datetime('now', '-90 days')")
+
+    # Resolved messages: keep 3 days
+    conn.execute("DELETE FROM message WHERE is_resolved = 1 AND created_at < datetime('now', '-3 days')")
+
 
 @router.post("/cleanup")
 async def trigger_cleanup():
@@ -184,20 +232,16 @@ async def trigger_cleanup():
 
     if not os.path.exists(cleanup_script):
         # Run inline cleanup
-        with write_db() as conn:
-            # EventLog: keep 90 days
-            conn.execute("DELETE FROM event_log WHERE timestamp < datetime('now', '-90 days')")
-
-            # Resolved messages: keep 3 days
-            conn.execute("DELETE FROM message WHERE is_resolved = 1 AND created_at < datetime('now', '-3 days')")
+        await db_write(_purge_old_records)
 
-            # VACUUM
-            conn.execute("VACUUM")
+        # VACUUM (outside the delete transaction, off the event loop)
+        await run_in_db_thread(vacuum_db)
 
         return {"success": True, "message": "Inline cleanup completed"}
 
     try:
-        result = subprocess.run(
+        result = await asyncio.to_thread(
+            subprocess.run,
             ['bash', cleanup_script],
             capture_output=True,
             text=True,
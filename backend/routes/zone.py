@@ -50,7 +50,7 @@ class BatchMoveRequest(BaseModel):
 # ============================================
 
 @router.get("")
-async def list_zones(
+def list_zones(
     zone_type: Optional[str] = None,
     active_only: bool = True
 ):
@@ -88,7 +88,7 @@ async def get_zone_types():
 
 
 @router.get("/stats")
-async def get_zone_stats():
+def get_zone_stats():
     """Get statistics for all zones"""
     with get_db() as conn:
         # Zone occupancy
@@ -129,7 +129,7 @@ async def get_zone_stats():
 
 
 @router.get("/{zone_id}")
-async def get_zone(zone_id: str):
+def get_zone(zone_id: str):
     """Get a single zone with current occupants"""
     with get_db() as conn:
         cursor = conn.execute("SELECT * FROM zone WHERE id = ?", (zone_id,))
@@ -154,7 +154,7 @@ async def get_zone(zone_id: str):
 
 
 @router.post("")
-async def create_zone(zone: ZoneCreate):
+def create_zone(zone: ZoneCreate):
     """Create a new zone (Admin only)"""
     with write_db() as conn:
         # Check if ID already exists
@@ -175,7 +175,7 @@ async def create_zone(zone: ZoneCreate):
 
 
 @router.put("/{zone_id}")
-async def update_zone(zone_id: str, zone: ZoneUpdate):
+def update_zone(zone_id: str, zone: ZoneUpdate):
     """Update a zone (Admin only)"""
     with write_db() as conn:
         cursor = conn.execute("SELECT * FROM zone WHERE id = ?", (zone_id,))
@@ -220,7 +220,7 @@ async def update_zone(zone_id: str, zone: ZoneUpdate):
 
 
 @router.delete("/{zone_id}")
-async def delete_zone(zone_id: str):
+def delete_zone(zone_id: str):
     """Delete a zone (Admin only) - only if empty"""
     with write_db() as conn:
         # Check if zone exists
@@ -249,7 +249,7 @@ async def delete_zone(zone_id: str):
 # ============================================
 
 @router.post("/move")
-async def batch_move_people(request: BatchMoveRequest):
+def batch_move_people(request: BatchMoveRequest):
     """Move multiple people to a target zone"""
     with write_db() as conn:
         # Verify target zone exists and is active
@@ -324,7 +324,7 @@ async def batch_move_people(request: BatchMoveRequest):
 
 
 @router.get("/{zone_id}/history")
-async def get_zone_movement_history(zone_id: str, limit: int = 50):
+def get_zone_movement_history(zone_id: str, limit: int = 50):
     """Get movement history for a zone"""
     with get_db() as conn:
         cursor = conn.execute(
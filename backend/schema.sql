@@ -1,6 +1,9 @@
 -- CIRS Database Schema v2.0
 -- SQLite with WAL mode
 -- Updated: 2025-12-17 (Staff Management v1.1)
+--
+-- Baseline schema (schema_version 4). Do not edit existing tables here;
+-- later changes go in migrations/NNN_name.sql|py (see database.migrate).
 
 -- ============================================
 -- 1. Inventory (物資表)
@@ -473,7 +476,99 @@ CREATE INDEX IF NOT EXISTS idx_satellite_devices_blacklist ON satellite_devices(
 CREATE INDEX IF NOT EXISTS idx_satellite_devices_activity ON satellite_devices(last_activity_at);
 
 -- ============================================
--- 20. 預設資料
+-- 20. Distributed Logistics (物流 v1.8)
+-- ============================================
+CREATE TABLE IF NOT EXISTS logistics_stations (
+    station_id TEXT PRIMARY KEY,
+    display_name TEXT NOT NULL,
+    station_secret TEXT NOT NULL,        -- HMAC 共享密鑰
+    last_sync_at DATETIME,
+    last_seq_id INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    is_active INTEGER DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS idx_logistics_stations_active ON logistics_stations(is_active);
+
+CREATE TABLE IF NOT EXISTS logistics_manifests (
+    manifest_id TEXT PRIMARY KEY,
+    short_code TEXT NOT NULL,
+    station_id TEXT NOT NULL,
+    items TEXT NOT NULL,                 -- JSON
+    signature TEXT NOT NULL,             -- Ed25519 簽章
+    status TEXT DEFAULT 'PENDING',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    acknowledged_at DATETIME,
+    FOREIGN KEY (station_id) REFERENCES logistics_stations(station_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_logistics_manifests_station ON logistics_manifests(station_id);
+CREATE INDEX IF NOT EXISTS idx_logistics_manifests_status ON logistics_manifests(status);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_logistics_manifests_short_code ON logistics_manifests(short_code);
+
+CREATE TABLE IF NOT EXISTS seen_packets (
+    packet_id TEXT PRIMARY KEY,          -- 去重用
+    station_id TEXT NOT NULL,
+    received_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    payload_hash TEXT NOT NULL,
+    FOREIGN KEY (station_id) REFERENCES logistics_stations(station_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_seen_packets_station ON seen_packets(station_id);
+CREATE INDEX IF NOT EXISTS idx_seen_packets_time ON seen_packets(received_at);
+
+CREATE TABLE IF NOT EXISTS logistics_audit (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    station_id TEXT,
+    packet_id TEXT,
+    manifest_id TEXT,
+    details TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_logistics_audit_type ON logistics_audit(event_type);
+CREATE INDEX IF NOT EXISTS idx_logistics_audit_station ON logistics_audit(station_id);
+CREATE INDEX IF NOT EXISTS idx_logistics_audit_time ON logistics_audit(created_at);
+
+CREATE TABLE IF NOT EXISTS hub_keys (
+    key_type TEXT PRIMARY KEY,           -- 'signing', 'encryption'
+    private_key TEXT NOT NULL,
+    public_key TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    rotated_at DATETIME
+);
+
+-- ============================================
+-- 21. Registrations (掛號候診)
+-- ============================================
+CREATE TABLE IF NOT EXISTS registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reg_id TEXT UNIQUE NOT NULL,
+    person_id TEXT NOT NULL,
+    patient_ref TEXT NOT NULL,
+    display_name TEXT,
+    age_group TEXT,
+    gender TEXT,
+    triage TEXT,
+    priority TEXT DEFAULT 'ROUTINE',     -- STAT, URGENT, ROUTINE
+    chief_complaint TEXT,
+    status TEXT DEFAULT 'WAITING',       -- WAITING, IN_PROGRESS, COMPLETED, CANCELLED
+    registered_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    registered_by TEXT,
+    called_at DATETIME,
+    completed_at DATETIME,
+    claimed_by TEXT,
+    claimed_at DATETIME,
+    notes TEXT,
+    FOREIGN KEY (person_id) REFERENCES person(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_registrations_status ON registrations(status);
+CREATE INDEX IF NOT EXISTS idx_registrations_person ON registrations(person_id);
+
+-- ============================================
+-- 22. 預設資料
 -- ============================================
 
 -- 預設設定
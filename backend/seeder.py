@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 import random
 import hashlib
 
+from services.capacity import capacity_values
+
 # 台灣常見姓氏和名字
 SURNAMES = ["陳", "林", "黃", "張", "李", "王", "吳", "劉", "蔡", "楊",
             "許", "鄭", "謝", "郭", "洪", "邱", "曾", "廖", "賴", "周"]
@@ -168,9 +170,11 @@ def seed_cirs_demo(conn):
         cursor.execute("""
             INSERT INTO inventory (
                 name, category, unit, quantity, max_quantity, min_quantity,
-                specification, expiry_date, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (name, category, unit, qty, max_qty, min_qty, spec, exp, now.isoformat()))
+                specification, expiry_date, created_at,
+                capacity_liters, capacity_kcal, capacity_wh
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (name, category, unit, qty, max_qty, min_qty, spec, exp, now.isoformat())
+            + capacity_values(name, category, spec))
 
     # 設備狀態更新
     cursor.execute("""
@@ -0,0 +1,243 @@
+"""
+CIRS Backup Scheduler
+Runs the `backup_schedule` stored by POST /api/backup/schedule.
+
+One daemon thread, started from main.lifespan, re-reads the schedule from
+`config` at least every CHECK_INTERVAL_SECONDS (POST /schedule wakes it at
+once) and runs due backups as 'scheduled-backup' jobs in backup_jobs, so
+they never run on the event loop or overlap a manual backup / restore:
+
+- due interval_hours after the last scheduled backup, plus or minus a
+  random jitter (JITTER_FRACTION of the interval, at most MAX_JITTER_SECONDS)
+  so a fleet of Hubs does not hit its disks at the same minute
+- target 'local' (backend/backups) or the first detected USB device
+- incremental page-delta backups in their own `cirs_auto_*` chains,
+  encrypted when XIRS_BACKUP_PASSWORD is set
+- skipped while the database files are unchanged since the last scheduled
+  backup (size / mtime of the database and its -wal)
+- only the newest `retention` cirs_auto_* chains are kept in the target
+
+Failures (no USB stick, disk full, ...) are retried after RETRY_SECONDS.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from database import DB_PATH, get_db, write_db
+from services.backup_service import (
+    BackupBusy, BackupJob, backup_database_incremental, backup_jobs, log_backup,
+    prune_backups, target_directory,
+)
+
+CHECK_INTERVAL_SECONDS = 60
+RETRY_SECONDS = 10 * 60
+JITTER_FRACTION = 0.05
+MAX_JITTER_SECONDS = 10 * 60
+DEFAULT_RETENTION = 7              # chains (a full backup and its deltas)
+AUTO_PREFIX = "cirs_auto_"
+SCHEDULER_OPERATOR = "scheduler"
+PASSWORD_ENV = "XIRS_BACKUP_PASSWORD"
+
+DEFAULT_SCHEDULE = {
+    "enabled": False,
+    "interval_hours": 24,
+    "target": "local",
+    "retention": DEFAULT_RETENTION,
+}
+
+
+def load_schedule(conn) -> Dict:
+    """The stored backup_schedule merged over DEFAULT_SCHEDULE"""
+    row = conn.execute("SELECT value FROM config WHERE key = 'backup_schedule'").fetchone()
+    schedule = dict(DEFAULT_SCHEDULE)
+    if row:
+        try:
+            schedule.update(json.loads(row['value']))
+        except (TypeError, ValueError):
+            pass
+    return schedule
+
+
+def db_fingerprint(db_path: str = DB_PATH) -> Tuple:
+    """(size, mtime) of the database and its -wal: changes with every commit"""
+    stamp = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _jitter(interval: float) -> float:
+    spread = min(interval * JITTER_FRACTION, MAX_JITTER_SECONDS)
+    return random.uniform(-spread, spread)
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+
+class BackupScheduler:
+    def __init__(self, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_run: Optional[float] = None
+        self._next_run: Optional[float] = None
+        self._jitter = 0.0
+        self._fingerprint: Optional[Tuple] = None   # database state of the last scheduled backup
+        self._status = {"runs": 0, "skipped": 0, "failures": 0,
+                        "last_result": None, "last_error": None, "last_skipped_at": None}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="backup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        """Re-read the schedule now (after it was changed)"""
+        self._wake.set()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                **self._status,
+                "running": bool(self._thread and self._thread.is_alive()),
+                "last_run": _iso(self._last_run),
+                "next_run": _iso(self._next_run),
+            }
+
+    def run_now(self) -> BackupJob:
+        """Start a scheduled-style backup immediately (even if nothing changed)"""
+        with get_db() as conn:
+            schedule = load_schedule(conn)
+        return backup_jobs.start("scheduled-backup", self._backup_job, schedule)
+
+    # ------------------------------------------------------------------
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                delay = self._tick()
+            except Exception as e:
+                with self._lock:
+                    self._status["last_error"] = str(e)
+                print(f"[CIRS Backup] Scheduler error: {e}")
+                delay = RETRY_SECONDS
+            self._wake.wait(max(1.0, min(delay, self.check_interval)))
+            self._wake.clear()
+
+    def _tick(self) -> float:
+        """Run a due backup; returns the seconds until the next one is due"""
+        with get_db() as conn:
+            schedule = load_schedule(conn)
+            if self._last_run is None:
+                self._last_run = self._last_logged_run(conn)
+        if not schedule.get("enabled"):
+            self._next_run = None
+            return self.check_interval
+
+        interval = max(1.0, float(schedule.get("interval_hours") or 24)) * 3600
+        now = time.time()
+        due = (self._last_run + interval + self._jitter) if self._last_run else now
+        self._next_run = due
+        if now < due:
+            return due - now
+
+        if self._fingerprint is not None and self._fingerprint == db_fingerprint():
+            with self._lock:
+                self._status["skipped"] += 1
+                self._status["last_skipped_at"] = _iso(now)
+            return self._scheduled_next(now, interval)
+
+        try:
+            job = backup_jobs.start("scheduled-backup", self._backup_job, schedule)
+        except BackupBusy:
+            return RETRY_SECONDS
+        try:
+            job.future.result()
+        except Exception as e:
+            with self._lock:
+                self._status["failures"] += 1
+                self._status["last_error"] = str(e)
+            print(f"[CIRS Backup] Scheduled backup failed: {e}")
+            return RETRY_SECONDS
+        return self._scheduled_next(now, interval)
+
+    def _scheduled_next(self, now: float, interval: float) -> float:
+        self._last_run = now
+        self._jitter = _jitter(interval)
+        self._next_run = now + interval + self._jitter
+        return interval + self._jitter
+
+    @staticmethod
+    def _last_logged_run(conn) -> Optional[float]:
+        row = conn.execute(
+            "SELECT MAX(timestamp) AS ts FROM backup_log WHERE backup_type = 'scheduled' AND status = 'success'"
+        ).fetchone()
+        if not row or not row['ts']:
+            return None
+        # CURRENT_TIMESTAMP is UTC
+        return datetime.strptime(row['ts'], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+    def _backup_job(self, job: BackupJob, schedule: Dict) -> Dict:
+        """Backup + log + retention; runs in the backup job thread"""
+        target = schedule.get("target") or "local"
+        target_dir = target_directory(target)
+        password = os.environ.get(PASSWORD_ENV) or None
+        name = f"{AUTO_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        before = db_fingerprint()
+        result = backup_database_incremental(DB_PATH, target_dir, name, password, job, chain_prefix=AUTO_PREFIX)
+        unchanged = db_fingerprint() == before
+
+        job.update("retention")
+        pruned = prune_backups(target_dir, AUTO_PREFIX, int(schedule.get("retention") or DEFAULT_RETENTION))
+        with write_db() as conn:
+            log_backup(
+                conn, "scheduled", result["path"], result["size"], result["checksum"],
+                password is not None, SCHEDULER_OPERATOR, "success",
+                f"{result['kind']} {result['pages_changed']}/{result['pages_total']} pages, target {target}"
+            )
+            conn.executemany(
+                "UPDATE backup_log SET status = 'deleted', notes = COALESCE(notes, '') || ' [Pruned]' "
+                "WHERE file_path = ? AND status = 'success'",
+                [(path,) for path in pruned]
+            )
+        # Our own log write changes the files too: remember the state after it,
+        # unless someone else wrote while the snapshot was taken
+        fingerprint = db_fingerprint() if unchanged else None
+
+        with self._lock:
+            self._fingerprint = fingerprint
+            self._status["runs"] += 1
+            self._status["last_error"] = None
+            self._status["last_result"] = {
+                "path": result["path"],
+                "kind": result["kind"],
+                "size_bytes": result["size"],
+                "pages_changed": result["pages_changed"],
+                "pruned": len(pruned),
+            }
+        return {**result, "target": target, "encrypted": password is not None, "pruned": pruned}
+
+
+backup_scheduler = BackupScheduler()
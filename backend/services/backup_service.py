@@ -0,0 +1,1035 @@
+"""
+CIRS Backup Service
+Streaming backup file format used by routes/backup.py.
+
+A backup is the database gzip-compressed and, when a password is given,
+encrypted with libsodium secretstream (XChaCha20-Poly1305, via PyNaCl).
+Everything is processed in fixed-size blocks, so memory use does not depend
+on the database size:
+
+    read BLOCK_SIZE -> gzip (zlib compressobj) -> RECORD_SIZE records -> AEAD -> write
+
+Encrypted file layout (.db.gz.enc):
+
+    magic "CIRSBK2\\0" | version (1) | salt (16) | PBKDF2 iterations (u32 BE)
+    | secretstream header (24) | records...
+
+Each record is a u32 BE length followed by the ciphertext of up to
+RECORD_SIZE plaintext bytes; the file header is the associated data of every
+record and the last record carries TAG_FINAL, so tampering, reordering and
+truncation are all detected.
+
+Files without the magic are treated as legacy backups: the old repeating-key
+XOR (PBKDF2 with the fixed BACKUP_SALT) is still decrypted on restore, in
+blocks with big-int XOR instead of a per-byte generator.
+
+Incremental backups (.delta.gz[.enc]) hold only the database pages that
+changed since the previous backup in the same directory, found by comparing
+per-page BLAKE2b digests kept in a sidecar manifest (<backup>.pages):
+
+    magic "CIRSDL1\0" | version (1) | chain sequence (u16) | parent name
+    | parent file SHA-256 (32) | gzip / CIRSBK2 stream of:
+        page size (u32) | page count (u32) | parent SHA-256 (32)
+        | (page number (u32) | page)... | 0 (u32)
+
+A chain starts with a full backup and is restored by restoring the full
+backup and applying each delta in order (resolve_chain / restore_to_file).
+
+The live database is never read directly (that would miss the -wal file):
+backup_database() first takes a consistent copy with the SQLite online backup
+API (snapshot_database) and streams that copy into the backup file. Long
+running backups run as a BackupJob in their own thread and report progress
+through backup_jobs.
+"""
+
+import hashlib
+import hmac
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from nacl import bindings as sodium
+
+BLOCK_SIZE = 1024 * 1024           # read size (multiple of the legacy 32-byte key)
+RECORD_SIZE = 64 * 1024            # plaintext bytes per AEAD record
+COMPRESS_LEVEL = 6                 # gzip level: ~level 9 size at a fraction of the CPU
+
+BACKUP_MAGIC = b"CIRSBK2\0"
+FORMAT_VERSION = 1
+SALT_BYTES = 16
+PBKDF2_ITERATIONS = 100000
+HEADER_FORMAT = ">8sB16sI"         # magic, version, salt, iterations
+_HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+_STREAM_HEADER_BYTES = sodium.crypto_secretstream_xchacha20poly1305_HEADERBYTES
+_ABYTES = sodium.crypto_secretstream_xchacha20poly1305_ABYTES
+_TAG_MESSAGE = sodium.crypto_secretstream_xchacha20poly1305_TAG_MESSAGE
+_TAG_FINAL = sodium.crypto_secretstream_xchacha20poly1305_TAG_FINAL
+
+# Legacy XOR backups (routes/backup.simple_encrypt before the streaming format)
+LEGACY_BACKUP_SALT = "CIRS_BACKUP_SALT_2024"
+
+# Backup targets
+BACKUP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backups")
+USB_MOUNT_POINTS = ["/mnt/usb", "/media", "/mnt/backup"]  # Common USB mount points
+USB_BACKUP_SUBDIR = "CIRS_Backups"
+
+# Hot snapshot (SQLite online backup API)
+SNAPSHOT_STEP_PAGES = 1024         # pages per step (4 MB at the default page size)
+SNAPSHOT_MAX_RESTARTS = 3          # then copy the rest in one step
+
+# Incremental backups
+DELTA_MAGIC = b"CIRSDL1\0"
+DELTA_VERSION = 1
+DELTA_HEADER_FORMAT = ">8sBHH"     # magic, version, chain sequence, parent name length
+DELTA_BODY_FORMAT = ">II32s"       # page size, page count, parent checksum
+_DELTA_HEADER_SIZE = struct.calcsize(DELTA_HEADER_FORMAT)
+_DELTA_BODY_SIZE = struct.calcsize(DELTA_BODY_FORMAT)
+MANIFEST_MAGIC = b"CIRSPG1\0"
+MANIFEST_SUFFIX = ".pages"
+MANIFEST_HEADER_FORMAT = ">8sIIHQ32s16s16s"  # magic, page size, pages, sequence, file size, checksum, salt, key check
+_MANIFEST_HEADER_SIZE = struct.calcsize(MANIFEST_HEADER_FORMAT)
+PAGE_DIGEST_BYTES = 16
+MAX_CHAIN_LENGTH = 30              # deltas after a full backup before the next full one
+DELTA_FULL_RATIO = 0.5             # more changed pages than this: write a full backup instead
+BACKUP_SUFFIXES = (".db.gz", ".db.gz.enc", ".delta.gz", ".delta.gz.enc")
+
+MAX_FINISHED_JOBS = 20             # finished jobs kept for /api/backup/jobs
+
+ProgressCallback = Optional[Callable[[int], None]]
+PageProgressCallback = Optional[Callable[[int, int], None]]
+
+
+class BackupError(Exception):
+    """Backup cannot be written or read (wrong password, corrupt file, ...)"""
+
+
+class BackupBusy(BackupError):
+    """Another backup / restore job is still running"""
+
+
+def derive_key(password: str, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+    """32-byte key from a password (PBKDF2-HMAC-SHA256)"""
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations, dklen=32)
+
+
+# ============================================================================
+# Targets
+# ============================================================================
+
+def log_backup(conn, backup_type: str, file_path: str, file_size: int,
+               checksum: str, encrypted: bool, operator_id: str,
+               status: str = "success", notes: str = None):
+    """Log backup to backup_log table"""
+    conn.execute(
+        """
+        INSERT INTO backup_log (backup_type, file_path, file_size, checksum,
+                                encrypted, operator_id, status, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (backup_type, file_path, file_size, checksum, 1 if encrypted else 0,
+         operator_id, status, notes)
+    )
+
+
+def detect_usb_devices():
+    """Detect mounted USB devices"""
+    usb_devices = []
+
+    # Check common mount points
+    for mount_point in USB_MOUNT_POINTS:
+        if os.path.exists(mount_point):
+            # Check if anything is mounted
+            if os.path.ismount(mount_point):
+                try:
+                    # Get disk space info
+                    stat = os.statvfs(mount_point)
+                    total = stat.f_blocks * stat.f_frsize
+                    free = stat.f_bfree * stat.f_frsize
+                    usb_devices.append({
+                        "path": mount_point,
+                        "total_bytes": total,
+                        "free_bytes": free,
+                        "total_gb": round(total / (1024**3), 2),
+                        "free_gb": round(free / (1024**3), 2)
+                    })
+                except Exception:
+                    pass
+
+            # Also check subdirectories (common for /media/username/device)
+            try:
+                for subdir in os.listdir(mount_point):
+                    subpath = os.path.join(mount_point, subdir)
+                    if os.path.isdir(subpath) and os.path.ismount(subpath):
+                        try:
+                            stat = os.statvfs(subpath)
+                            total = stat.f_blocks * stat.f_frsize
+                            free = stat.f_bfree * stat.f_frsize
+                            usb_devices.append({
+                                "path": subpath,
+                                "total_bytes": total,
+                                "free_bytes": free,
+                                "total_gb": round(total / (1024**3), 2),
+                                "free_gb": round(free / (1024**3), 2)
+                            })
+                        except Exception:
+                            pass
+            except Exception:
+                pass
+
+    return usb_devices
+
+
+def target_directory(target: str) -> str:
+    """Backup directory for a 'local' or 'usb' (first detected device) target"""
+    if target == "local":
+        path = BACKUP_DIR
+    elif target == "usb":
+        usb_devices = detect_usb_devices()
+        if not usb_devices:
+            raise BackupError("No USB device detected. Please insert a USB drive.")
+        path = os.path.join(usb_devices[0]['path'], USB_BACKUP_SUBDIR)
+    else:
+        raise BackupError(f"Invalid target: {target}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# ============================================================================
+# Writing
+# ============================================================================
+
+def _read_blocks(path: str, progress: ProgressCallback = None) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                return
+            if progress:
+                progress(len(block))
+            yield block
+
+
+def _gzip_blocks(blocks: Iterator[bytes], level: int = COMPRESS_LEVEL) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for block in blocks:
+        out = compressor.compress(block)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+class _Encryptor:
+    """secretstream push side, buffering input into RECORD_SIZE records"""
+
+    def __init__(self, password: str):
+        salt = os.urandom(SALT_BYTES)
+        key = derive_key(password, salt)
+        self._state = sodium.crypto_secretstream_xchacha20poly1305_state()
+        stream_header = sodium.crypto_secretstream_xchacha20poly1305_init_push(self._state, key)
+        self.header = struct.pack(HEADER_FORMAT, BACKUP_MAGIC, FORMAT_VERSION, salt, PBKDF2_ITERATIONS) + stream_header
+        self._pending = bytearray()
+
+    def _record(self, plaintext: bytes, tag: int) -> bytes:
+        ciphertext = sodium.crypto_secretstream_xchacha20poly1305_push(self._state, plaintext, self.header, tag)
+        return struct.pack(">I", len(ciphertext)) + ciphertext
+
+    def update(self, data: bytes) -> bytes:
+        self._pending += data
+        out = []
+        while len(self._pending) > RECORD_SIZE:
+            out.append(self._record(bytes(self._pending[:RECORD_SIZE]), _TAG_MESSAGE))
+            del self._pending[:RECORD_SIZE]
+        return b"".join(out)
+
+    def final(self) -> bytes:
+        record = self._record(bytes(self._pending), _TAG_FINAL)
+        self._pending.clear()
+        return record
+
+
+def write_backup(src_path: str, dest_path: str, password: Optional[str] = None,
+                 progress: ProgressCallback = None, level: int = COMPRESS_LEVEL) -> dict:
+    """
+    Stream src_path into a (.db.gz or .db.gz.enc) backup at dest_path.
+
+    Written to dest_path + '.part' and renamed when complete, so a partial
+    file never looks like a backup. progress(n) is called with the number of
+    source bytes read.
+
+    Returns {"size", "checksum"} of the written file (checksum = SHA-256 of
+    the file as stored, which is what /verify recomputes).
+    """
+    return _write_stream(_read_blocks(src_path, progress), dest_path, password, level)
+
+
+def _write_stream(blocks: Iterator[bytes], dest_path: str, password: Optional[str] = None,
+                  level: int = COMPRESS_LEVEL, prefix: bytes = b"") -> dict:
+    """gzip (+ encrypt) `blocks` into dest_path, after an optional plain prefix"""
+    partial = dest_path + ".part"
+    digest = hashlib.sha256()
+    size = 0
+    encryptor = _Encryptor(password) if password else None
+    try:
+        with open(partial, 'wb') as out:
+            def emit(data: bytes):
+                nonlocal size
+                if data:
+                    out.write(data)
+                    digest.update(data)
+                    size += len(data)
+
+            emit(prefix)
+            if encryptor:
+                emit(encryptor.header)
+            for compressed in _gzip_blocks(blocks, level):
+                emit(encryptor.update(compressed) if encryptor else compressed)
+            if encryptor:
+                emit(encryptor.final())
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(partial, dest_path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    return {"size": size, "checksum": digest.hexdigest()}
+
+
+# ============================================================================
+# Hot snapshot
+# ============================================================================
+
+class _SnapshotRestarted(Exception):
+    pass
+
+
+def snapshot_database(db_path: str, dest_path: str, progress: PageProgressCallback = None) -> int:
+    """
+    Copy a live (WAL) database into dest_path with the SQLite backup API.
+
+    The copy is a consistent snapshot including committed pages that are
+    still in the -wal file. Pages are copied SNAPSHOT_STEP_PAGES at a time
+    and the read lock is only held during a step, so writers (and WAL
+    checkpoints) carry on between steps. When another connection commits,
+    SQLite restarts the copy; after SNAPSHOT_MAX_RESTARTS the remaining
+    copy is done in a single step, which in WAL mode holds one read
+    transaction but still does not block writers.
+
+    progress(done_pages, total_pages) is called after every step.
+    Returns the number of pages copied.
+    """
+    restarts = 0
+    last_remaining = None
+    pages = 0
+
+    def on_step(status, remaining, total):
+        nonlocal restarts, last_remaining, pages
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > SNAPSHOT_MAX_RESTARTS:
+                raise _SnapshotRestarted()
+        last_remaining = remaining
+        pages = total
+        if progress:
+            progress(total - remaining, total)
+
+    src = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        dest = sqlite3.connect(dest_path)
+        try:
+            try:
+                src.backup(dest, pages=SNAPSHOT_STEP_PAGES, progress=on_step)
+            except _SnapshotRestarted:
+                src.backup(dest, pages=-1)
+                pages = src.execute("PRAGMA page_count").fetchone()[0]
+                if progress:
+                    progress(pages, pages)
+        finally:
+            dest.close()
+    finally:
+        src.close()
+    return pages
+
+
+def backup_database(db_path: str, dest_path: str, password: Optional[str] = None,
+                    job: Optional["BackupJob"] = None) -> dict:
+    """
+    Hot backup of a live database: snapshot_database() into a temp file next
+    to the database, then write_backup() from that file.
+
+    Progress goes to `job` (phase 'snapshot' in pages, then 'compress' in
+    bytes). Returns write_backup()'s {"size", "checksum"}.
+    """
+    fd, snapshot_path = tempfile.mkstemp(prefix=".backup-", suffix=".snapshot",
+                                         dir=os.path.dirname(db_path) or ".")
+    os.close(fd)
+    try:
+        if job:
+            job.update("snapshot")
+        snapshot_database(db_path, snapshot_path, job.set_progress if job else None)
+        if job:
+            job.update("compress", total=os.path.getsize(snapshot_path))
+        return write_backup(snapshot_path, dest_path, password, job.advance if job else None)
+    finally:
+        os.remove(snapshot_path)
+
+
+# ============================================================================
+# Incremental backups
+# ============================================================================
+
+def is_backup_file(filename: str) -> bool:
+    return filename.endswith(BACKUP_SUFFIXES)
+
+
+def database_page_size(path: str) -> int:
+    """Page size from the SQLite file header"""
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b"SQLite format 3\0"):
+        raise BackupError("Not a SQLite database")
+    (size,) = struct.unpack(">H", header[16:18])
+    return 65536 if size == 1 else size
+
+
+def page_digests(path: str, page_size: int, key: bytes = b"",
+                 progress: ProgressCallback = None) -> List[bytes]:
+    """BLAKE2b digest of every page (keyed for encrypted chains)"""
+    digests = []
+    for block in _read_blocks(path, progress):
+        view = memoryview(block)
+        for offset in range(0, len(block), page_size):
+            digests.append(hashlib.blake2b(view[offset:offset + page_size],
+                                           digest_size=PAGE_DIGEST_BYTES, key=key).digest())
+    return digests
+
+
+def _digest_key(password: Optional[str], salt: bytes) -> Tuple[bytes, bytes]:
+    """(digest key, key check) of a chain; unkeyed without a password"""
+    key = derive_key(password, salt) if password else b""
+    check = hashlib.blake2b(b"CIRS page manifest", digest_size=16, key=key).digest()
+    return key, check
+
+
+class PageManifest:
+    """Page digests of one backup file, the base of the next delta"""
+
+    __slots__ = ("page_size", "sequence", "file_size", "checksum", "salt", "check", "digests")
+
+    def __init__(self, page_size: int, sequence: int, file_size: int, checksum: bytes,
+                 salt: bytes, check: bytes, digests: List[bytes]):
+        self.page_size = page_size
+        self.sequence = sequence
+        self.file_size = file_size
+        self.checksum = checksum
+        self.salt = salt
+        self.check = check
+        self.digests = digests
+
+    def save(self, path: str):
+        partial = path + ".part"
+        with open(partial, 'wb') as f:
+            f.write(struct.pack(MANIFEST_HEADER_FORMAT, MANIFEST_MAGIC, self.page_size, len(self.digests),
+                                self.sequence, self.file_size, self.checksum, self.salt, self.check))
+            f.write(b"".join(self.digests))
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["PageManifest"]:
+        """None if the file is missing or not a manifest"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, page_size, pages, sequence, file_size, checksum, salt, check = struct.unpack(
+                MANIFEST_HEADER_FORMAT, data[:_MANIFEST_HEADER_SIZE])
+        except (OSError, struct.error):
+            return None
+        body = data[_MANIFEST_HEADER_SIZE:]
+        if magic != MANIFEST_MAGIC or len(body) != pages * PAGE_DIGEST_BYTES:
+            return None
+        digests = [body[i:i + PAGE_DIGEST_BYTES] for i in range(0, len(body), PAGE_DIGEST_BYTES)]
+        return cls(page_size, sequence, file_size, checksum, salt, check, digests)
+
+
+def latest_backup(target_dir: str, prefix: str = "") -> Optional[Tuple[str, PageManifest]]:
+    """(backup path, manifest) of the newest `prefix`* backup in target_dir that can take a delta"""
+    try:
+        entries = [e for e in os.scandir(target_dir)
+                   if e.name.startswith(prefix) and e.name.endswith(MANIFEST_SUFFIX)]
+    except FileNotFoundError:
+        return None
+    if not entries:
+        return None
+    newest = max(entries, key=lambda e: e.stat().st_mtime)
+    backup_path = newest.path[:-len(MANIFEST_SUFFIX)]
+    manifest = PageManifest.load(newest.path)
+    if manifest is None or not os.path.exists(backup_path) or os.path.getsize(backup_path) != manifest.file_size:
+        return None
+    return backup_path, manifest
+
+
+def _delta_records(snapshot_path: str, page_size: int, page_count: int, changed: List[int],
+                   parent_checksum: bytes, progress: ProgressCallback = None) -> Iterator[bytes]:
+    yield struct.pack(DELTA_BODY_FORMAT, page_size, page_count, parent_checksum)
+    batch, size = [], 0
+    with open(snapshot_path, 'rb') as f:
+        for index in changed:
+            f.seek(index * page_size)
+            batch.append(struct.pack(">I", index + 1) + f.read(page_size))
+            size += page_size
+            if size >= BLOCK_SIZE:
+                if progress:
+                    progress(size)
+                yield b"".join(batch)
+                batch, size = [], 0
+    if progress:
+        progress(size)
+    batch.append(struct.pack(">I", 0))
+    yield b"".join(batch)
+
+
+def backup_database_incremental(db_path: str, target_dir: str, name: str,
+                                password: Optional[str] = None,
+                                job: Optional["BackupJob"] = None, chain_prefix: str = "") -> dict:
+    """
+    Hot backup into target_dir, as a delta of the latest backup there when
+    possible.
+
+    A full backup (name + '.db.gz[.enc]') is written when the directory has
+    no usable manifest (none yet, other password, other page size), the
+    chain is MAX_CHAIN_LENGTH long, or more than DELTA_FULL_RATIO of the
+    pages changed; otherwise only the changed pages (name + '.delta.gz[.enc]').
+    Either way a <backup>.pages manifest is written next to it. Only
+    backups whose name starts with chain_prefix are considered as parent,
+    so manual and scheduled chains in one directory stay separate.
+
+    Returns {"path", "filename", "size", "checksum", "kind" ('full' | 'delta'),
+    "base", "sequence", "pages_total", "pages_changed"}.
+    """
+    fd, snapshot_path = tempfile.mkstemp(prefix=".backup-", suffix=".snapshot",
+                                         dir=os.path.dirname(db_path) or ".")
+    os.close(fd)
+    try:
+        if job:
+            job.update("snapshot")
+        snapshot_database(db_path, snapshot_path, job.set_progress if job else None)
+        page_size = database_page_size(snapshot_path)
+
+        parent = latest_backup(target_dir, chain_prefix)
+        if parent:
+            key, check = _digest_key(password, parent[1].salt)
+            if not hmac.compare_digest(parent[1].check, check):
+                parent = None      # written with another password: start a new chain
+        if parent:
+            parent_path, manifest = parent
+            salt = manifest.salt
+        else:
+            salt = os.urandom(SALT_BYTES)
+            key, check = _digest_key(password, salt)
+        if job:
+            job.update("hash", total=os.path.getsize(snapshot_path))
+        digests = page_digests(snapshot_path, page_size, key, job.advance if job else None)
+
+        changed = None
+        if parent and manifest.page_size == page_size and manifest.sequence < MAX_CHAIN_LENGTH:
+            old = manifest.digests
+            changed = [i for i, d in enumerate(digests) if i >= len(old) or old[i] != d]
+            if len(changed) > DELTA_FULL_RATIO * len(digests):
+                changed = None
+
+        ext = ".gz.enc" if password else ".gz"
+        if os.path.exists(os.path.join(target_dir, name + ".db" + ext)) or \
+                os.path.exists(os.path.join(target_dir, name + ".delta" + ext)):
+            name += f"_{uuid.uuid4().hex[:6]}"     # same second as the previous backup
+        if changed is None:
+            dest_path = os.path.join(target_dir, name + ".db" + ext)
+            sequence, base = 0, None
+            if job:
+                job.update("compress", total=os.path.getsize(snapshot_path))
+            result = write_backup(snapshot_path, dest_path, password, job.advance if job else None)
+        else:
+            dest_path = os.path.join(target_dir, name + ".delta" + ext)
+            sequence, base = manifest.sequence + 1, os.path.basename(parent_path)
+            parent_name = base.encode()
+            prefix = (struct.pack(DELTA_HEADER_FORMAT, DELTA_MAGIC, DELTA_VERSION, sequence, len(parent_name))
+                      + parent_name + manifest.checksum)
+            if job:
+                job.update("compress", total=len(changed) * page_size)
+            records = _delta_records(snapshot_path, page_size, len(digests), changed, manifest.checksum,
+                                     job.advance if job else None)
+            result = _write_stream(records, dest_path, password, prefix=prefix)
+
+        PageManifest(page_size, sequence, result["size"], bytes.fromhex(result["checksum"]),
+                     salt, check, digests).save(dest_path + MANIFEST_SUFFIX)
+    finally:
+        os.remove(snapshot_path)
+
+    return {
+        **result,
+        "path": dest_path,
+        "filename": os.path.basename(dest_path),
+        "kind": "full" if changed is None else "delta",
+        "base": base,
+        "sequence": sequence,
+        "pages_total": len(digests),
+        "pages_changed": len(digests) if changed is None else len(changed),
+    }
+
+
+def backup_chains(target_dir: str, prefix: str = "") -> List[List[str]]:
+    """
+    `prefix`* backup files in target_dir grouped into chains (full backup
+    first, then its deltas), oldest chain first. Deltas whose base is gone
+    form a chain of their own.
+    """
+    try:
+        names = sorted(n for n in os.listdir(target_dir) if n.startswith(prefix) and is_backup_file(n))
+    except FileNotFoundError:
+        return []
+    parents = {}
+    for name in names:
+        path = os.path.join(target_dir, name)
+        try:
+            if backup_format(path) == "delta":
+                with open(path, 'rb') as f:
+                    parents[name] = os.path.basename(_read_delta_header(f)[1])
+        except (OSError, BackupError):
+            pass
+
+    def root(name: str) -> str:
+        seen = set()
+        while name in parents and name not in seen:
+            seen.add(name)
+            name = parents[name]
+        return name
+
+    chains: "OrderedDict[str, List[str]]" = OrderedDict()
+    for name in names:
+        chains.setdefault(root(name), []).append(os.path.join(target_dir, name))
+    return [chains[key] for key in sorted(chains)]
+
+
+def prune_backups(target_dir: str, prefix: str, keep: int) -> List[str]:
+    """Delete all but the newest `keep` chains (files and manifests); returns the removed backups"""
+    removed = []
+    for chain in backup_chains(target_dir, prefix)[:-max(1, keep)]:
+        for path in chain:
+            for victim in (path, path + MANIFEST_SUFFIX):
+                if os.path.exists(victim):
+                    os.remove(victim)
+            removed.append(path)
+    return removed
+
+
+def _read_delta_header(f) -> Tuple[int, str, bytes]:
+    """(sequence, parent file name, parent checksum) of a delta file"""
+    magic, version, sequence, name_length = struct.unpack(DELTA_HEADER_FORMAT, _read_exact(f, _DELTA_HEADER_SIZE))
+    if magic != DELTA_MAGIC or version != DELTA_VERSION:
+        raise BackupError(f"Unsupported incremental backup version {version}")
+    parent = _read_exact(f, name_length).decode('utf-8', errors='replace')
+    return sequence, parent, _read_exact(f, 32)
+
+
+def resolve_chain(path: str) -> List[str]:
+    """[full backup, delta 1, ..., path] for an incremental backup"""
+    chain = [path]
+    while backup_format(chain[0]) == "delta":
+        if len(chain) > MAX_CHAIN_LENGTH + 1:
+            raise BackupError("Incremental backup chain is too long")
+        with open(chain[0], 'rb') as f:
+            _, parent_name, parent_checksum = _read_delta_header(f)
+        parent = os.path.join(os.path.dirname(chain[0]), os.path.basename(parent_name))
+        if not os.path.exists(parent):
+            raise BackupError(f"Base backup {parent_name} of the incremental chain is missing")
+        if file_checksum(parent) != parent_checksum.hex():
+            raise BackupError(f"Base backup {parent_name} does not match the incremental chain")
+        chain.insert(0, parent)
+    return chain
+
+
+class _BlockReader:
+    """Exact-size reads over an iterator of blocks"""
+
+    def __init__(self, blocks: Iterator[bytes]):
+        self._blocks = blocks
+        self._buffer = bytearray()
+
+    def read_exact(self, n: int) -> bytes:
+        while len(self._buffer) < n:
+            block = next(self._blocks, None)
+            if block is None:
+                raise BackupError("Incremental backup is truncated")
+            self._buffer += block
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    def finish(self):
+        """Consume the rest (runs the end-of-stream checks)"""
+        for block in self._blocks:
+            self._buffer += block
+        if self._buffer:
+            raise BackupError("Unexpected data after the end of the incremental backup")
+
+
+def _apply_delta(path: str, dest_path: str, password: Optional[str] = None,
+                 progress: ProgressCallback = None):
+    """Write the pages of one delta over the restored database at dest_path"""
+    with open(path, 'rb') as f:
+        _, _, header_checksum = _read_delta_header(f)
+    reader = _BlockReader(iter_backup(path, password, progress))
+    page_size, page_count, parent_checksum = struct.unpack(DELTA_BODY_FORMAT, reader.read_exact(_DELTA_BODY_SIZE))
+    if parent_checksum != header_checksum:
+        raise BackupError("Incremental backup header does not match its contents")
+    if database_page_size(dest_path) != page_size:
+        raise BackupError("Incremental backup does not match its base (page size)")
+
+    with open(dest_path, 'r+b') as out:
+        while True:
+            (page_number,) = struct.unpack(">I", reader.read_exact(4))
+            if page_number == 0:
+                break
+            if page_number > page_count:
+                raise BackupError("Incremental backup is corrupted (bad page number)")
+            out.seek((page_number - 1) * page_size)
+            out.write(reader.read_exact(page_size))
+        reader.finish()
+        out.truncate(page_count * page_size)
+        out.flush()
+        os.fsync(out.fileno())
+
+
+# ============================================================================
+# Reading
+# ============================================================================
+
+def backup_format(path: str) -> str:
+    """'delta' (CIRSDL1), 'stream' (CIRSBK2), 'gzip' (plain .db.gz) or 'legacy-xor'"""
+    with open(path, 'rb') as f:
+        head = f.read(len(BACKUP_MAGIC))
+    if head == DELTA_MAGIC:
+        return "delta"
+    if head == BACKUP_MAGIC:
+        return "stream"
+    if head[:2] == b"\x1f\x8b":
+        return "gzip"
+    return "legacy-xor"
+
+
+def _read_exact(f, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise BackupError("Backup file is truncated")
+    return data
+
+
+def _decrypt_stream(f, password: str) -> Iterator[bytes]:
+    """Yield plaintext records of a CIRSBK2 file (positioned at 0)"""
+    header = _read_exact(f, _HEADER_SIZE)
+    magic, version, salt, iterations = struct.unpack(HEADER_FORMAT, header)
+    if magic != BACKUP_MAGIC or version != FORMAT_VERSION:
+        raise BackupError(f"Unsupported backup format version {version}")
+    stream_header = _read_exact(f, _STREAM_HEADER_BYTES)
+    header += stream_header
+
+    state = sodium.crypto_secretstream_xchacha20poly1305_state()
+    sodium.crypto_secretstream_xchacha20poly1305_init_pull(state, stream_header, derive_key(password, salt, iterations))
+    first = True
+    while True:
+        (length,) = struct.unpack(">I", _read_exact(f, 4))
+        if length > RECORD_SIZE + _ABYTES:
+            raise BackupError("Backup file is corrupted (bad record length)")
+        ciphertext = _read_exact(f, length)
+        try:
+            plaintext, tag = sodium.crypto_secretstream_xchacha20poly1305_pull(state, ciphertext, header)
+        except Exception:
+            if first:
+                raise BackupError("Decryption failed. Wrong password?")
+            raise BackupError("Backup file is corrupted (authentication failed)")
+        first = False
+        yield plaintext
+        if tag == _TAG_FINAL:
+            if f.read(1):
+                raise BackupError("Unexpected data after the end of the backup")
+            return
+
+
+def _legacy_xor_stream(f, password: str) -> Iterator[bytes]:
+    """Old simple_encrypt: data XOR a repeating 32-byte PBKDF2 key"""
+    key = derive_key(password, LEGACY_BACKUP_SALT.encode())
+    keystream = int.from_bytes(key * (BLOCK_SIZE // len(key)), 'big')
+    while True:
+        block = f.read(BLOCK_SIZE)
+        if not block:
+            return
+        n = len(block)
+        # Blocks start at multiples of the key length; the last one is shorter
+        ks = keystream >> ((BLOCK_SIZE - n) * 8)
+        yield (int.from_bytes(block, 'big') ^ ks).to_bytes(n, 'big')
+
+
+def _gunzip(blocks: Iterator[bytes]) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj(31)
+    try:
+        for block in blocks:
+            while block:
+                out = decompressor.decompress(block, BLOCK_SIZE)
+                if out:
+                    yield out
+                block = decompressor.unconsumed_tail
+                if decompressor.eof:
+                    break
+        if not decompressor.eof:
+            raise BackupError("Decompression failed. File may be corrupted.")
+    except zlib.error:
+        raise BackupError("Decompression failed. File may be corrupted.")
+
+
+def iter_backup(path: str, password: Optional[str] = None,
+                progress: ProgressCallback = None) -> Iterator[bytes]:
+    """
+    Yield the decompressed payload of any backup format in blocks: the
+    database itself, or for an incremental backup its page records (use
+    restore_to_file() to rebuild the database from a chain).
+
+    progress(n) is called with the number of backup-file bytes consumed.
+    Raises BackupError for a missing password, wrong password or damage.
+    """
+    with open(path, 'rb') as raw:
+        f = _ProgressReader(raw, progress) if progress else raw
+        fmt = backup_format(path)
+        if fmt == "delta":
+            _read_delta_header(f)
+            head = raw.read(len(BACKUP_MAGIC))
+            raw.seek(-len(head), os.SEEK_CUR)
+            fmt = "stream" if head == BACKUP_MAGIC else "gzip"
+        if fmt != "gzip" and not password:
+            raise BackupError("Password required for encrypted backup")
+
+        if fmt == "stream":
+            blocks = _decrypt_stream(f, password)
+        elif fmt == "legacy-xor":
+            blocks = _legacy_xor_stream(f, password)
+        else:
+            blocks = iter(lambda: f.read(BLOCK_SIZE), b"")
+        try:
+            yield from _gunzip(blocks)
+        except BackupError as e:
+            if fmt == "legacy-xor" and "Decompression" in str(e):
+                raise BackupError("Decryption failed. Wrong password?")
+            raise
+
+
+class _ProgressReader:
+    def __init__(self, f, progress: Callable[[int], None]):
+        self._f = f
+        self._progress = progress
+
+    def read(self, n: int = -1) -> bytes:
+        data = self._f.read(n)
+        self._progress(len(data))
+        return data
+
+
+def restore_to_file(path: str, dest_path: str, password: Optional[str] = None,
+                    progress: ProgressCallback = None) -> int:
+    """
+    Decompress / decrypt a backup into dest_path; returns the bytes written.
+
+    An incremental backup is restored by restoring its full base and then
+    applying every delta of the chain in order.
+    """
+    if backup_format(path) == "delta":
+        chain = resolve_chain(path)
+        restore_to_file(chain[0], dest_path, password, progress)
+        for delta in chain[1:]:
+            _apply_delta(delta, dest_path, password, progress)
+        return os.path.getsize(dest_path)
+
+    written = 0
+    with open(dest_path, 'wb') as out:
+        for block in iter_backup(path, password, progress):
+            out.write(block)
+            written += len(block)
+        out.flush()
+        os.fsync(out.fileno())
+    return written
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+
+# ============================================================================
+# Restore
+# ============================================================================
+
+def verify_database(path: str):
+    """PRAGMA integrity_check of a restored database file; raises BackupError"""
+    conn = sqlite3.connect(path)
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA integrity_check(20)")]
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"Restored file is not a valid database: {e}")
+    finally:
+        conn.close()
+    if problems != ["ok"]:
+        raise BackupError("Restored database failed integrity check: " + "; ".join(problems[:5]))
+
+
+def swap_database(new_path: str, db_path: str) -> Optional[str]:
+    """
+    Atomically move new_path to db_path (nothing may have db_path open).
+
+    The replaced database is kept as db_path.pre_restore_<timestamp>: a hard
+    link, so no copy is made (a copy where links are unsupported). Returns
+    that path, or None if there was no database.
+    """
+    pre_restore = None
+    if os.path.exists(db_path):
+        pre_restore = f"{db_path}.pre_restore_{time.strftime('%Y%m%d_%H%M%S')}"
+        if os.path.exists(pre_restore):
+            pre_restore += f"_{uuid.uuid4().hex[:6]}"
+        try:
+            os.link(db_path, pre_restore)
+        except OSError:
+            shutil.copy2(db_path, pre_restore)
+    # WAL / shared-memory files of the old database must not be applied to the new one
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(new_path, db_path)
+    try:
+        fd = os.open(os.path.dirname(db_path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+    return pre_restore
+
+
+# ============================================================================
+# Jobs
+# ============================================================================
+
+class BackupJob:
+    """One backup / restore running in its own thread, with progress"""
+
+    def __init__(self, kind: str):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.status = "running"            # running | success | failed
+        self.phase = "queued"
+        self.done = 0
+        self.total = 0
+        self.error: Optional[str] = None
+        self.result = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future: Future = Future()
+
+    def update(self, phase: str, done: int = 0, total: int = 0):
+        self.phase, self.done, self.total = phase, done, total
+
+    def set_progress(self, done: int, total: int):
+        self.done, self.total = done, total
+
+    def advance(self, n: int):
+        self.done += n
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "done": self.done,
+            "total": self.total,
+            "percent": round(100.0 * self.done / self.total, 1) if self.total else None,
+            "error": self.error,
+            "result": self.result,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 2),
+        }
+
+
+class BackupJobStore:
+    """
+    Runs backup / restore jobs one at a time and remembers the recent ones.
+
+    start() raises BackupBusy while a job is running: a restore must never
+    overlap a backup, and two snapshots at once only double the I/O.
+    """
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, BackupJob]" = OrderedDict()
+        self._active: Optional[BackupJob] = None
+
+    def start(self, kind: str, fn: Callable[..., object], *args) -> BackupJob:
+        """Run fn(job, *args) in a new thread; the job's future gets its result"""
+        with self._lock:
+            if self._active is not None:
+                raise BackupBusy(f"A {self._active.kind} job is already running ({self._active.job_id})")
+            job = BackupJob(kind)
+            self._active = job
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_finished + 1:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job, fn, args), name=f"backup-{kind}", daemon=True).start()
+        return job
+
+    def _run(self, job: BackupJob, fn, args):
+        job.future.set_running_or_notify_cancel()  # awaiting callers may go away; the job still finishes
+        try:
+            result = fn(job, *args)
+        except BaseException as e:
+            job.status, job.error = "failed", str(e) or e.__class__.__name__
+            self._finish(job)
+            job.future.set_exception(e)
+        else:
+            job.status, job.phase, job.result = "success", "done", result
+            self._finish(job)
+            job.future.set_result(result)
+
+    def _finish(self, job: BackupJob):
+        job.finished_at = time.time()
+        with self._lock:
+            if self._active is job:
+                self._active = None
+
+    def get(self, job_id: str) -> Optional[BackupJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active(self) -> Optional[BackupJob]:
+        with self._lock:
+            return self._active
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in reversed(jobs)]
+
+
+backup_jobs = BackupJobStore()
@@ -0,0 +1,117 @@
+"""
+CIRS Inventory Capacities
+Normalizes the free-text specification (600ml, 2L, 300kcal, 2000Wh ...) into
+per-unit numbers stored on the inventory row:
+
+    capacity_liters  飲水容量 (公升/單位; 飲水類未標示時以 600ml 估計)
+    capacity_kcal    熱量 (kcal/單位; 糧食類未標示時依品名估計)
+    capacity_wh      電力容量 (Wh/單位; 發電機以標準油箱與負載換算)
+
+Computed once when a row is inserted or its name/category/specification
+changes (routes/inventory.py, migration 009 backfill), so the resilience
+engine and reports read numbers instead of re-parsing text.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+CAPACITY_COLUMNS = ('capacity_liters', 'capacity_kcal', 'capacity_wh')
+
+# Volume parsing patterns
+VOLUME_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[mM][lL]'), 0.001),     # ml -> L
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[lL]'), 1.0),            # L
+    (re.compile(r'(\d+(?:\.\d+)?)\s*公升'), 1.0),            # 公升
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[cC][cC]'), 0.001),      # cc -> L
+]
+
+# Calorie parsing patterns
+CALORIE_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[kK]?[cC]al'), 1.0),    # kcal
+    (re.compile(r'(\d+(?:\.\d+)?)\s*大卡'), 1.0),            # 大卡
+]
+
+# Energy parsing patterns (battery stations)
+ENERGY_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[kK][wW][hH]'), 1000.0),  # kWh -> Wh
+    (re.compile(r'(\d+(?:\.\d+)?)\s*[wW][hH]'), 1.0),         # Wh
+]
+
+DEFAULT_WATER_LITERS = 0.6          # 600ml 瓶裝水
+DEFAULT_BATTERY_WH = 2000           # 電源站 / 行動電源
+GENERATOR_TANK_LITERS = 50          # 發電機油箱
+GENERATOR_FUEL_RATE = 2.0           # L/hr
+POWER_LOAD_WATTS = 100              # 基本運作負載 (照明+通訊)
+
+
+def _first_match(patterns, spec: Optional[str]) -> Optional[float]:
+    for pattern, multiplier in patterns:
+        match = pattern.search(spec or '')
+        if match:
+            return float(match.group(1)) * multiplier
+    return None
+
+
+def parse_volume(spec: Optional[str]) -> Optional[float]:
+    """解析容量規格 (返回公升)"""
+    return _first_match(VOLUME_PATTERNS, spec)
+
+
+def parse_calories(spec: Optional[str]) -> Optional[float]:
+    """解析熱量規格 (返回 kcal)"""
+    return _first_match(CALORIE_PATTERNS, spec)
+
+
+def parse_watt_hours(spec: Optional[str]) -> Optional[float]:
+    """解析電量規格 (返回 Wh)"""
+    return _first_match(ENERGY_PATTERNS, spec)
+
+
+def default_calories(name: str) -> float:
+    """依品名估計每單位熱量"""
+    if '泡麵' in name or '麵' in name:
+        return 400
+    elif '餅乾' in name:
+        return 200
+    elif '罐頭' in name:
+        return 300
+    elif '米' in name:
+        return 350  # per 100g
+    return 300  # default
+
+
+def is_battery(name: str) -> bool:
+    return '電源站' in name or '行動電源' in name
+
+
+def is_generator(name: str) -> bool:
+    return '發電機' in name
+
+
+def compute_capacities(name: Optional[str], category: Optional[str],
+                       specification: Optional[str]) -> Dict[str, Optional[float]]:
+    """計算單位容量 (None = 不適用)"""
+    name = name or ''
+
+    liters = parse_volume(specification)
+    if not liters and category == 'water':
+        liters = DEFAULT_WATER_LITERS
+
+    kcal = parse_calories(specification)
+    if not kcal and category == 'food':
+        kcal = default_calories(name)
+
+    wh = None
+    if is_battery(name):
+        wh = parse_watt_hours(specification) or DEFAULT_BATTERY_WH
+    elif is_generator(name):
+        wh = GENERATOR_TANK_LITERS / GENERATOR_FUEL_RATE * POWER_LOAD_WATTS
+
+    return {'capacity_liters': liters, 'capacity_kcal': kcal, 'capacity_wh': wh}
+
+
+def capacity_values(name: Optional[str], category: Optional[str],
+                    specification: Optional[str]) -> Tuple[Optional[float], ...]:
+    """compute_capacities() in CAPACITY_COLUMNS order, for SQL parameters"""
+    capacities = compute_capacities(name, category, specification)
+    return tuple(capacities[column] for column in CAPACITY_COLUMNS)
@@ -0,0 +1,226 @@
+"""
+CIRS Chunk Reassembly Sessions
+Server-side buffer behind /api/logistics/ingest/chunks/{session_id}.
+
+A Runner scanning a multi-QR packet posts chunks as they are read (any order,
+any batch size, repeats allowed) instead of re-uploading the whole set after
+a dropped request. Each session keeps one slot per sequence number and
+is ready once `needed` slots are filled (all of them for v1 chunks, any k
+of n for v2 chunks with parity); the caller then joins / decodes the slots,
+so reassembly is O(total size). A session stays in the store until the
+caller reports the decode: complete() removes it, fail() keeps it waiting
+for further (parity) chunks, or drops it if every slot is already filled.
+
+Sessions expire SESSION_TTL_SECONDS after their last chunk. Buffered chunk
+data is capped at MAX_BUFFERED_BYTES across all sessions: when a new chunk
+would exceed it, the least recently updated other sessions are evicted.
+Expiry is checked lazily on every call; there is no background task.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+SESSION_TTL_SECONDS = 15 * 60
+MAX_SESSIONS = 256
+MAX_SESSION_CHUNKS = 500           # 500 x 800-byte QR ≈ 400 KB per packet
+MAX_BUFFERED_BYTES = 16 * 1024 * 1024
+
+
+class ChunkConflict(ValueError):
+    """Chunk does not belong to the session (different packet)"""
+
+
+class ChunkSessionFull(ValueError):
+    """Session cannot be buffered within the limits"""
+
+
+class ChunkSession:
+    """Chunks of one packet, one slot per sequence number"""
+
+    __slots__ = ("session_id", "packet_key", "total", "needed", "parts", "received", "size",
+                 "error", "created_at", "updated_at")
+
+    def __init__(self, session_id: str, packet_key: Hashable, total: int, needed: int, now: float):
+        self.session_id = session_id
+        self.packet_key = packet_key
+        self.total = total
+        self.needed = needed
+        self.parts: List[Any] = [None] * total
+        self.received = 0
+        self.size = 0
+        self.error: Optional[str] = None  # why the last decode failed
+        self.created_at = now
+        self.updated_at = now
+
+    @property
+    def is_complete(self) -> bool:
+        return self.received >= self.needed
+
+    @property
+    def missing_sequences(self) -> List[int]:
+        return [i + 1 for i, part in enumerate(self.parts) if part is None]
+
+    def add(self, sequence: int, data) -> int:
+        """Store a chunk; returns the change in buffered bytes (0 for a repeat)"""
+        if self.parts[sequence - 1] is not None:
+            return 0
+        self.parts[sequence - 1] = data
+        self.received += 1
+        self.size += len(data)
+        return len(data)
+
+    def payload(self) -> str:
+        """The joined text of a complete v1 session (single join)"""
+        return "".join(self.parts)
+
+    def blocks(self) -> Dict[int, Any]:
+        """sequence -> data of the received slots"""
+        return {i + 1: part for i, part in enumerate(self.parts) if part is not None}
+
+    def progress(self, now: float) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "received": self.received,
+            "total": self.total,
+            "needed": max(0, self.needed - self.received) or (1 if self.error else 0),
+            "missing_sequences": self.missing_sequences,
+            "complete": self.is_complete and self.error is None,
+            "error": self.error,
+            "expires_in": max(0, int(self.updated_at + SESSION_TTL_SECONDS - now)),
+        }
+
+
+class ChunkSessionStore:
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_sessions: int = MAX_SESSIONS,
+                 max_bytes: int = MAX_BUFFERED_BYTES):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, ChunkSession]" = OrderedDict()  # LRU order
+        self._bytes = 0
+        self._stats = {"completed": 0, "failed": 0, "expired": 0, "evicted": 0}
+
+    def add_chunks(self, session_id: str, packet_key: Hashable, total: int, needed: int,
+                   chunks: Iterable[Tuple[int, Any]]) -> Tuple[Dict, Optional[ChunkSession], List[int]]:
+        """
+        Add (sequence, data) chunks of one packet to a session.
+
+        packet_key identifies the packet (every chunk of a session must
+        share it); `needed` of the `total` slots make the session ready.
+        Returns (progress, session, added): session is set when it is ready
+        and this call stored new chunks (their sequences in `added`); the
+        caller decodes it and reports complete() or fail().
+        Raises ChunkConflict / ChunkSessionFull without storing anything.
+        """
+        chunks = list(chunks)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is not None and session.packet_key != packet_key:
+                raise ChunkConflict(f"Chunks belong to a different packet than session {session_id}")
+            if total > MAX_SESSION_CHUNKS:
+                raise ChunkSessionFull(f"Packet has {total} chunks (limit {MAX_SESSION_CHUNKS})")
+
+            if session is None:
+                session = ChunkSession(session_id, packet_key, total, needed, now)
+            added = {}
+            for sequence, data in chunks:
+                if session.parts[sequence - 1] is None and sequence not in added:
+                    added[sequence] = data
+            incoming = sum(len(data) for data in added.values())
+            if session.size + incoming > self.max_bytes:
+                raise ChunkSessionFull("Packet exceeds the reassembly buffer")
+            self._make_room(session_id, incoming)
+
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            for sequence, data in added.items():
+                self._bytes += session.add(sequence, data)
+            if added:
+                session.error = None  # new chunks: the caller retries the decode
+            session.updated_at = now
+
+            progress = session.progress(now)
+            if not (session.is_complete and added):
+                return progress, None, list(added)
+            return progress, session, list(added)
+
+    def complete(self, session: ChunkSession) -> bool:
+        """Remove a decoded session; False if another request already did"""
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                return False
+            self._drop(session.session_id)
+            self._stats["completed"] += 1
+            return True
+
+    def fail(self, session: ChunkSession, error: str) -> Optional[Dict]:
+        """
+        Record a failed decode. The session keeps collecting chunks and
+        returns its progress; None if it was dropped because no slot is
+        left to fill (or it is gone already).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                return None
+            if session.received >= session.total:
+                self._drop(session.session_id)
+                self._stats["failed"] += 1
+                return None
+            session.error = error
+            return session.progress(now)
+
+    def progress(self, session_id: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            return session.progress(now) if session else None
+
+    def discard(self, session_id: str) -> bool:
+        with self._lock:
+            return self._drop(session_id) is not None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                **self._stats,
+                "sessions": len(self._sessions),
+                "buffered_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _drop(self, session_id: str) -> Optional[ChunkSession]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._bytes -= session.size
+        return session
+
+    def _expire(self, now: float):
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.updated_at + self.ttl > now:
+                break
+            self._drop(session_id)
+            self._stats["expired"] += 1
+
+    def _make_room(self, session_id: str, incoming: int):
+        """Evict least recently updated other sessions for incoming bytes / a new slot"""
+        new_session = session_id not in self._sessions
+        for victim in list(self._sessions):
+            over_bytes = self._bytes + incoming > self.max_bytes
+            over_count = new_session and len(self._sessions) >= self.max_sessions
+            if not (over_bytes or over_count):
+                break
+            if victim != session_id:
+                self._drop(victim)
+                self._stats["evicted"] += 1
+
+
+chunk_sessions = ChunkSessionStore()
@@ -0,0 +1,202 @@
+"""
+CIRS Dashboard Counters
+Materialized aggregates for /api/stats, /api/public/status,
+/api/satellite/status and /api/staff/summary/stats.
+
+Every counter is declared once in COUNTER_SOURCES. From that spec we
+generate both the SQLite triggers (incremental +/- deltas on each write)
+and the full-scan rebuild used by the consistency check, so the two can
+never disagree about what a counter means. The triggers are installed by
+migrations (005_dashboard_counters.sql holds the generated DDL as of that
+version): after changing COUNTER_SOURCES, put the new trigger_statements()
+in a new migration that drops the old triggers and rebuilds the counters.
+
+Usage:
+    python -m services.dashboard_counters           # check for drift
+    python -m services.dashboard_counters --rebuild # recompute from scratch
+"""
+
+from typing import Dict, List, Optional
+
+# ============================================================================
+# Counter Definitions
+# ============================================================================
+# table -> {
+#   "watch":    columns whose UPDATE can change a counter (UPDATE OF ...)
+#   "counters": [(name_expr, value_expr, condition)] with {r} = row alias
+# }
+
+COUNTER_SOURCES = {
+    "person": {
+        "watch": ["role", "triage_status", "checked_in_at", "staff_role", "staff_status"],
+        "counters": [
+            ("'person.public'", "1", "{r}.role = 'public'"),
+            ("'person.public.' || {r}.triage_status", "1",
+             "{r}.role = 'public' AND {r}.triage_status IN ('GREEN', 'YELLOW', 'RED', 'BLACK')"),
+            ("'person.public.checked_in'", "1", "{r}.role = 'public' AND {r}.checked_in_at IS NOT NULL"),
+            ("'staff.registered'", "1", "{r}.staff_role IS NOT NULL"),
+            ("'staff.' || {r}.staff_role || '.' || COALESCE({r}.staff_status, 'NONE')", "1",
+             "{r}.staff_role IS NOT NULL"),
+        ],
+    },
+    "inventory": {
+        "watch": ["category", "quantity", "min_quantity", "check_status"],
+        "counters": [
+            ("'inventory.count.' || {r}.category", "1", "1"),
+            ("'inventory.qty.' || {r}.category", "COALESCE({r}.quantity, 0)", "1"),
+            ("'inventory.low_stock'", "1", "{r}.quantity < {r}.min_quantity AND {r}.min_quantity > 0"),
+            ("'equipment.ok'", "1",
+             "{r}.category = 'equipment' AND ({r}.check_status IS NULL OR {r}.check_status = 'OK')"),
+            ("'equipment.issues'", "1",
+             "{r}.category = 'equipment' AND {r}.check_status IN ('NEEDS_REPAIR', 'OUT_OF_SERVICE')"),
+        ],
+    },
+    "message": {
+        "watch": ["message_type", "is_resolved"],
+        "counters": [
+            ("'message.pending'", "1",
+             "{r}.message_type = 'post' AND ({r}.is_resolved IS NULL OR {r}.is_resolved = 0)"),
+        ],
+    },
+    "zone": {
+        "watch": ["capacity", "is_active"],
+        "counters": [
+            ("'zone.capacity'", "COALESCE({r}.capacity, 0)", "{r}.is_active = 1"),
+        ],
+    },
+}
+
+_UPSERT = """
+INSERT INTO dashboard_counters (name, value)
+SELECT name, SUM(delta) FROM (
+    {deltas}
+) WHERE name IS NOT NULL GROUP BY name
+ON CONFLICT(name) DO UPDATE SET
+    value = value + excluded.value,
+    updated_at = CURRENT_TIMESTAMP;"""
+
+
+def _deltas(table: str, alias: str, sign: str) -> str:
+    """UNION ALL of (name, delta) rows contributed by NEW/OLD"""
+    parts = []
+    for name_expr, value_expr, condition in COUNTER_SOURCES[table]["counters"]:
+        parts.append(
+            f"SELECT {name_expr.format(r=alias)} AS name, {sign}({value_expr.format(r=alias)}) AS delta "
+            f"WHERE {condition.format(r=alias)}"
+        )
+    return "\n    UNION ALL ".join(parts)
+
+
+def trigger_statements() -> List[str]:
+    """CREATE TRIGGER statements keeping dashboard_counters current"""
+    statements = []
+    for table, source in COUNTER_SOURCES.items():
+        insert = _UPSERT.format(deltas=_deltas(table, "NEW", "+"))
+        delete = _UPSERT.format(deltas=_deltas(table, "OLD", "-"))
+        update = _UPSERT.format(
+            deltas=_deltas(table, "OLD", "-") + "\n    UNION ALL " + _deltas(table, "NEW", "+")
+        )
+        watch = ", ".join(source["watch"])
+
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS counters_{table}_insert AFTER INSERT ON {table}\n"
+            f"BEGIN{insert}\nEND"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS counters_{table}_delete AFTER DELETE ON {table}\n"
+            f"BEGIN{delete}\nEND"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS counters_{table}_update AFTER UPDATE OF {watch} ON {table}\n"
+            f"BEGIN{update}\nEND"
+        )
+    return statements
+
+
+# ============================================================================
+# Rebuild / Consistency Check
+# ============================================================================
+
+def compute_counters(conn) -> Dict[str, float]:
+    """Recompute every counter with full scans (source of truth)"""
+    expected: Dict[str, float] = {}
+    for table, source in COUNTER_SOURCES.items():
+        for name_expr, value_expr, condition in source["counters"]:
+            cursor = conn.execute(
+                f"SELECT {name_expr.format(r='r')} AS name, SUM({value_expr.format(r='r')}) AS total "
+                f"FROM {table} r WHERE {condition.format(r='r')} GROUP BY 1"
+            )
+            for row in cursor.fetchall():
+                if row[0] is not None:
+                    expected[row[0]] = expected.get(row[0], 0) + (row[1] or 0)
+    return expected
+
+
+def check_counters(conn) -> Dict[str, dict]:
+    """Compare stored counters with a full recompute; returns only drifted names"""
+    expected = compute_counters(conn)
+    stored = get_counters(conn)
+    drift = {}
+    for name in set(expected) | set(stored):
+        want = expected.get(name, 0)
+        have = stored.get(name, 0)
+        if abs(want - have) > 1e-6:
+            drift[name] = {"stored": have, "expected": want}
+    return drift
+
+
+def rebuild_counters(conn) -> int:
+    """Replace all counters with freshly computed values; returns counter count"""
+    expected = compute_counters(conn)
+    conn.execute("DELETE FROM dashboard_counters")
+    conn.executemany(
+        "INSERT INTO dashboard_counters (name, value) VALUES (?, ?)",
+        expected.items()
+    )
+    return len(expected)
+
+
+# ============================================================================
+# Read Helpers
+# ============================================================================
+
+def get_counters(conn, prefix: Optional[str] = None) -> Dict[str, float]:
+    """Read counters (optionally only names starting with prefix)"""
+    if prefix:
+        cursor = conn.execute(
+            "SELECT name, value FROM dashboard_counters WHERE name >= ? AND name < ?",
+            (prefix, prefix + "\uffff")
+        )
+    else:
+        cursor = conn.execute("SELECT name, value FROM dashboard_counters")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def counter(counters: Dict[str, float], name: str) -> int:
+    """Integer count from a counters dict (missing = 0)"""
+    return int(counters.get(name, 0) or 0)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database import write_db
+
+    parser = argparse.ArgumentParser(description="Check or rebuild dashboard_counters")
+    parser.add_argument("--rebuild", action="store_true", help="recompute all counters from scratch")
+    args = parser.parse_args()
+
+    with write_db() as conn:
+        drift = check_counters(conn)
+        for name, values in sorted(drift.items()):
+            print(f"DRIFT {name}: stored={values['stored']} expected={values['expected']}")
+        if args.rebuild:
+            count = rebuild_counters(conn)
+            print(f"Rebuilt {count} counters")
+        elif not drift:
+            print("Counters consistent")
+
+    sys.exit(1 if drift and not args.rebuild else 0)
@@ -0,0 +1,194 @@
+"""
+CIRS Event Bus
+In-process publish/subscribe behind the SSE endpoint /api/events/stream.
+
+Write paths in routes/*.py call publish() after their commit with a typed
+notification (EVENT_TYPES); Portal / Runner / Admin subscribe to the topics
+they display and refetch only what changed instead of polling.
+
+publish() is thread-safe (sync route handlers and db threads call it) and
+never blocks the writer. Each subscriber holds at most one pending event per
+type (and scope): a client that falls behind gets the events coalesced rather
+than an ever-growing queue. Merging never loses what changed: *_ids lists are
+unioned and scalar identifiers are collected into a plural list (manifest_id
+-> manifest_ids, ...; MERGED_ID_FIELDS), the scalar itself keeps the newest
+value. A list that grows past MAX_MERGED_IDS becomes None = refetch all. A short replay
+buffer lets a reconnecting client (Last-Event-ID) catch up; if its id has
+already left the buffer it is told to resync.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional
+
+# event type -> topic (the part before the dot)
+EVENT_TYPES = (
+    "inventory.changed",        # data: item_ids, source
+    "headcount.changed",        # data: scope ('public' / 'staff'), person_ids, source
+    "broadcast.pinned",         # data: message_id, pinned
+    "registration.waiting",     # waiting queue changed; data: reg_id, status
+    "manifest.acknowledged",    # data: manifest_id, station_id
+)
+# scalar identifier -> list it is collected into when events are coalesced
+MERGED_ID_FIELDS = {
+    "message_id": "message_ids",
+    "reg_id": "reg_ids",
+    "manifest_id": "manifest_ids",
+    "station_id": "station_ids",
+}
+TOPICS = tuple(sorted({event_type.split(".")[0] for event_type in EVENT_TYPES}))
+
+MAX_SUBSCRIBERS = 64
+REPLAY_BUFFER = 256
+MAX_MERGED_IDS = 200  # beyond this a merged list becomes None = "refetch everything"
+
+
+class Subscriber:
+    """One SSE client: pending events coalesced per type"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, topics: Iterable[str]):
+        self.loop = loop
+        self.topics = frozenset(topics)
+        self.pending: "OrderedDict[tuple, dict]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.coalesced = 0
+
+    def wants(self, event: dict) -> bool:
+        return event["topic"] in self.topics
+
+    def offer(self, event: dict):
+        """Queue an event (runs on the subscriber's loop)"""
+        # headcount 'public' and 'staff' are refetched by different clients
+        key = (event["type"], event["data"].get("scope"))
+        queued = self.pending.get(key)
+        if queued is None:
+            self.pending[key] = event
+        else:
+            self.coalesced += 1
+            self.pending[key] = _merge(queued, event)
+        self.wakeup.set()
+
+    async def next_events(self, timeout: float) -> List[dict]:
+        """Wait up to timeout seconds; [] means send a heartbeat"""
+        if not self.pending:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        events = sorted(self.pending.values(), key=lambda e: e["id"])
+        self.pending.clear()
+        return events
+
+
+def _merge_ids(older, newer) -> Optional[list]:
+    if older is None or newer is None:
+        return None
+    merged = list(dict.fromkeys(list(older) + list(newer)))
+    return merged if len(merged) <= MAX_MERGED_IDS else None
+
+
+def _as_ids(data: dict, field: str, plural: str) -> Optional[list]:
+    if plural in data:
+        return data[plural]
+    return [data[field]] if data.get(field) is not None else []
+
+
+def _merge(older: dict, newer: dict) -> dict:
+    """Coalesce two events of one type: newest data, ids of both kept"""
+    data = dict(newer["data"])
+    for key, value in older["data"].items():
+        if key.endswith("_ids") and key in data and key not in MERGED_ID_FIELDS.values():
+            data[key] = _merge_ids(value, data[key])
+    for field, plural in MERGED_ID_FIELDS.items():
+        if field in older["data"] or field in data:
+            data[plural] = _merge_ids(_as_ids(older["data"], field, plural), _as_ids(data, field, plural))
+    return {**newer, "data": data, "coalesced": older.get("coalesced", 1) + 1}
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self._replay: deque = deque(maxlen=REPLAY_BUFFER)
+        self._last_id = 0
+        self._stats = {"published": 0, "delivered": 0}
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def is_full(self) -> bool:
+        with self._lock:
+            return len(self._subscribers) >= MAX_SUBSCRIBERS
+
+    def subscribe(self, topics: Iterable[str]) -> Optional[Subscriber]:
+        """Register a client on the running loop (None = too many clients)"""
+        subscriber = Subscriber(asyncio.get_running_loop(), topics)
+        with self._lock:
+            if len(self._subscribers) >= MAX_SUBSCRIBERS:
+                return None
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, event_type: str, **data) -> dict:
+        """Notify subscribers of a change (call after the write committed)"""
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type: {event_type}")
+
+        with self._lock:
+            self._last_id += 1
+            event = {
+                "id": self._last_id,
+                "type": event_type,
+                "topic": event_type.split(".")[0],
+                "data": data,
+                "time": int(time.time()),
+            }
+            self._replay.append(event)
+            self._stats["published"] += 1
+            targets = [s for s in self._subscribers if s.wants(event)]
+            self._stats["delivered"] += len(targets)
+
+        for subscriber in targets:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                self.unsubscribe(subscriber)  # loop closed
+        return event
+
+    def replay_since(self, last_id: int, topics: Iterable[str]) -> Optional[List[dict]]:
+        """Events after last_id for the topics, or None if some were dropped"""
+        topics = frozenset(topics)
+        with self._lock:
+            if last_id == self._last_id:
+                return []
+            if last_id > self._last_id:
+                return None  # id from before a hub restart
+            oldest = self._replay[0]["id"] if self._replay else self._last_id + 1
+            if last_id + 1 < oldest:
+                return None
+            return [e for e in self._replay if e["id"] > last_id and e["topic"] in topics]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "subscribers": len(self._subscribers),
+                "coalesced": sum(s.coalesced for s in self._subscribers),
+                "last_id": self._last_id,
+            }
+
+
+event_bus = EventBus()
+
+
+def publish(event_type: str, **data) -> dict:
+    return event_bus.publish(event_type, **data)
@@ -7,18 +7,27 @@ Implements:
 - Explicit calc_mode standards
 - Externalized staffing rules
 - Calculation history snapshots
+- Incremental per-category totals (verify mode compares with full recompute)
+- Read-only what-if simulation (batch scenarios)
 """
 
 import sqlite3
 import json
 import math
 import hashlib
-import re
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from services.capacity import (
+    GENERATOR_FUEL_RATE, POWER_LOAD_WATTS, compute_capacities, is_battery
+)
+from services.dashboard_counters import get_counters
+
 
 class StatusLevel(str, Enum):
     """韌性警戒狀態"""
@@ -55,28 +64,24 @@ class CIRSResilienceEngine:
     """
 
     RULES_VERSION = "v2.0"
+    CALC_MODES = ("incremental", "full")
 
-    # Volume parsing patterns
-    VOLUME_PATTERNS = [
-        (r'(\d+(?:\.\d+)?)\s*[mM][lL]', 0.001),      # ml -> L
-        (r'(\d+(?:\.\d+)?)\s*[lL]', 1.0),             # L
-        (r'(\d+(?:\.\d+)?)\s*公升', 1.0),             # 公升
-        (r'(\d+(?:\.\d+)?)\s*[cC][cC]', 0.001),       # cc -> L
-    ]
-
-    # Calorie parsing patterns
-    CALORIE_PATTERNS = [
-        (r'(\d+(?:\.\d+)?)\s*[kK]?[cC]al', 1.0),     # kcal
-        (r'(\d+(?:\.\d+)?)\s*大卡', 1.0),             # 大卡
-    ]
-
-    def __init__(self, db_connection_or_path):
+    def __init__(self, db_connection_or_path, mode: str = "incremental",
+                 writer: Optional[Callable] = None):
         """
         初始化引擎
 
         Args:
             db_connection_or_path: SQLite connection or database path
+            mode: "incremental" (讀取累計值) 或 "full" (逐筆重新掃描)
+            writer: writer(fn, *args) 在寫入連線上執行 fn(conn, *args) 並回傳結果
+                    (路由傳入 database.run_write，讀取連線只讀不寫);
+                    None 表示直接寫入 db_connection_or_path
         """
+        if mode not in self.CALC_MODES:
+            raise ValueError(f"Unknown calc mode: {mode}")
+        self.mode = mode
+        self.writer = writer
         if isinstance(db_connection_or_path, str):
             self.db_path = db_connection_or_path
             self._conn = None
@@ -101,12 +106,18 @@ class CIRSResilienceEngine:
     # Main Calculation Method
     # =========================================================================
 
-    def calculate(self, station_id: str = "default") -> Dict:
+    def calculate(self, station_id: str = "default", force_save: bool = False) -> Dict:
         """
-        計算完整韌性狀態
+        計算完整韌性狀態 (快照模式)
+
+        輸入 (設定 + 相關資料表版本) 未變且快照未超過 snapshot_max_age_seconds 時，
+        直接回傳最新快照，不重新計算也不寫入。
+        重新計算後，僅在 input_hash / result_hash 改變、或超過
+        history_interval_minutes 時才新增 resilience_history。
 
         Args:
             station_id: 站點 ID
+            force_save: 強制重新計算並寫入歷史 (手動觸發)
 
         Returns:
             完整韌性狀態 JSON (對齊 MIRS Lifelines 格式)
@@ -115,165 +126,290 @@ class CIRSResilienceEngine:
         conn = self._get_connection()
 
         try:
-            # 1. Load configuration
+            # 1. Load configuration + input fingerprint
             config = self._load_config(conn, station_id)
-            target_hours = config['isolation_target_days'] * 24
-            population = config['population_count']
-
-            # 2. Calculate each category
-            lifelines = []
-            category_scores = {}
-
-            # Water
-            water_result = self._calculate_water(conn, population, target_hours)
-            if water_result:
-                lifelines.append(water_result)
-                category_scores['WATER'] = water_result.score
-
-            # Food
-            food_result = self._calculate_food(conn, population, target_hours)
-            if food_result:
-                lifelines.append(food_result)
-                category_scores['FOOD'] = food_result.score
-
-            # Power
-            power_result = self._calculate_power(conn, target_hours)
-            if power_result:
-                lifelines.append(power_result)
-                category_scores['POWER'] = power_result.score
-
-            # Medical
-            medical_result = self._calculate_medical(conn, population, target_hours)
-            if medical_result:
-                lifelines.append(medical_result)
-                category_scores['MEDICAL'] = medical_result.score
-
-            # Staff
-            staff_result = self._calculate_staff(conn, population, target_hours)
-            if staff_result:
-                lifelines.append(staff_result)
-                category_scores['STAFF'] = staff_result.score
-
-            # 3. Calculate overall score using Weighted Weakest Link
-            if category_scores:
-                valid_scores = [s for s in category_scores.values() if s >= 0]
-                if valid_scores:
-                    weakest_score = min(valid_scores)
-                    avg_score = sum(valid_scores) / len(valid_scores)
-                else:
-                    weakest_score = 0
-                    avg_score = 0
+            input_snapshot, input_hash = self._input_fingerprint(conn, config)
+            latest = self._latest_snapshot(conn, station_id)
+
+            # 2. Serve the latest snapshot while its inputs are unchanged
+            # (only when data changes are trackable via cache_versions)
+            if (not force_save and latest and input_snapshot['data_versions'] is not None
+                    and self._snapshot_reusable(station_id, latest, input_hash, config)):
+                result = json.loads(latest['result_snapshot'])
+                result.setdefault('audit', {})
+                result['audit']['history_id'] = latest['id']
+                result['audit']['from_snapshot'] = True
+                return result
+
+            # 3. Full calculation
+            result = self._compute_result(conn, station_id, config, start_time)
+            result_hash = self._result_hash(result)
+
+            # 4. Persist only on change / schedule
+            triggered_by = self._persist_reason(latest, input_hash, result_hash, config, force_save)
+            if triggered_by:
+                history_id = self._save_history(
+                    conn, station_id, input_snapshot, input_hash, result, result_hash,
+                    result['audit']['calc_duration_ms'], triggered_by
+                )
             else:
-                weakest_score = 0
-                avg_score = 0
+                history_id = latest['id']
 
-            weight_weakest = config.get('weight_weakest', 0.6)
-            weight_average = config.get('weight_average', 0.4)
+            self._remember_snapshot(station_id, history_id, input_hash)
+            result['audit']['history_id'] = history_id
+            return result
 
-            overall_score = weight_weakest * weakest_score + weight_average * avg_score
-            overall_score = max(0, min(100, overall_score))  # Clamp to 0-100
+        finally:
+            self._close_connection(conn)
 
-            # 4. Determine overall status
-            if not category_scores:
-                overall_status = StatusLevel.UNKNOWN
-            elif overall_score >= 80:
-                overall_status = StatusLevel.SAFE
-            elif overall_score >= 60:
-                overall_status = StatusLevel.WARNING
+    def _compute_result(self, conn, station_id: str, config: Dict, start_time: datetime,
+                        mode: Optional[str] = None) -> Dict:
+        """執行計算 (不寫入結果; 增量模式會先套用待處理的庫存變更)"""
+        mode = mode or self.mode
+        if mode == 'incremental' and not self._drain_dirty(conn):
+            mode = 'full'  # 舊資料庫 (尚無 migration 008) 或暫時無法取得寫入鎖
+
+        if mode == 'incremental':
+            aggregates = {lifeline: self._state_aggregate(conn, lifeline) for lifeline in self.LIFELINE_FILTERS}
+            staff_data = self._staff_from_counters(conn)
+        else:
+            aggregates = {lifeline: self._scan_aggregate(conn, lifeline) for lifeline in self.LIFELINE_FILTERS}
+            staff_data = None
+
+        return self._build_result(conn, station_id, config, aggregates, staff_data, start_time, mode)
+
+    def _build_result(self, conn, station_id: str, config: Dict, aggregates: Dict,
+                      staff_data: Optional[Dict], start_time: datetime, mode: str) -> Dict:
+        """由各類別累計值組出完整結果 (僅讀取人力規則)"""
+        target_hours = config['isolation_target_days'] * 24
+        population = config['population_count']
+
+        # 1. Calculate each category
+        lifelines = []
+        category_scores = {}
+
+        # Water
+        total, items, count, _ = aggregates['WATER']
+        water_result = self._water_lifeline(total, items, count, population, target_hours)
+        if water_result:
+            lifelines.append(water_result)
+            category_scores['WATER'] = water_result.score
+
+        # Food
+        total, items, count, _ = aggregates['FOOD']
+        food_result = self._food_lifeline(total, items, count, population, target_hours)
+        if food_result:
+            lifelines.append(food_result)
+            category_scores['FOOD'] = food_result.score
+
+        # Power
+        total, sources, count, _ = aggregates['POWER']
+        power_result = self._power_lifeline(total, sources, count, target_hours)
+        if power_result:
+            lifelines.append(power_result)
+            category_scores['POWER'] = power_result.score
+
+        # Medical
+        _, items, count, flags = aggregates['MEDICAL']
+        medical_result = self._medical_lifeline(items, count, flags, population, target_hours)
+        if medical_result:
+            lifelines.append(medical_result)
+            category_scores['MEDICAL'] = medical_result.score
+
+        # Staff
+        staff_result = self._calculate_staff(conn, population, target_hours, staff_data)
+        if staff_result:
+            lifelines.append(staff_result)
+            category_scores['STAFF'] = staff_result.score
+
+        # 2. Calculate overall score using Weighted Weakest Link
+        if category_scores:
+            valid_scores = [s for s in category_scores.values() if s >= 0]
+            if valid_scores:
+                weakest_score = min(valid_scores)
+                avg_score = sum(valid_scores) / len(valid_scores)
             else:
-                overall_status = StatusLevel.CRITICAL
-
-            # 5. Find weakest link
-            weakest_link = None
-            if category_scores:
-                weakest_category = min(category_scores, key=category_scores.get)
-                weakest_lifeline = next((l for l in lifelines if l.category == weakest_category), None)
-                if weakest_lifeline:
-                    weakest_link = {
-                        'category': weakest_category,
-                        'hours_remaining': weakest_lifeline.hours_remaining,
-                        'limiting_factor': weakest_lifeline.limiting_factor,
-                        'score': weakest_lifeline.score
-                    }
-
-            # 6. Generate recommendations
-            recommendations = self._generate_recommendations(lifelines, config)
-
-            # 7. Build result
-            calc_duration = (datetime.now() - start_time).total_seconds() * 1000
-
-            result = {
-                'system': 'CIRS',
-                'version': '2.0',
-                'station_id': station_id,
-                'calculated_at': datetime.now().isoformat(),
-                'rules_version': self.RULES_VERSION,
-                'context': {
-                    'isolation_target_days': config['isolation_target_days'],
-                    'isolation_target_hours': target_hours,
-                    'population': {
-                        'total': population,
-                        'label': config.get('population_label', '收容人數'),
-                        'special_needs': json.loads(config.get('special_needs', '{}'))
-                    }
-                },
-                'score': {
-                    'overall': round(overall_score, 1),
-                    'status': overall_status.value,
-                    'weakest_link': weakest_link,
-                    'category_scores': {k: round(v, 1) for k, v in category_scores.items()},
-                    'formula_applied': f"{weight_weakest} × {weakest_score:.1f} + {weight_average} × {avg_score:.1f} = {overall_score:.1f}"
-                },
-                'lifelines': [l.to_dict() for l in lifelines],
-                'recommendations': recommendations,
-                'audit': {
-                    'calc_duration_ms': round(calc_duration, 1)
+                weakest_score = 0
+                avg_score = 0
+        else:
+            weakest_score = 0
+            avg_score = 0
+
+        weight_weakest = config.get('weight_weakest', 0.6)
+        weight_average = config.get('weight_average', 0.4)
+
+        overall_score = weight_weakest * weakest_score + weight_average * avg_score
+        overall_score = max(0, min(100, overall_score))  # Clamp to 0-100
+
+        # 3. Determine overall status
+        if not category_scores:
+            overall_status = StatusLevel.UNKNOWN
+        elif overall_score >= 80:
+            overall_status = StatusLevel.SAFE
+        elif overall_score >= 60:
+            overall_status = StatusLevel.WARNING
+        else:
+            overall_status = StatusLevel.CRITICAL
+
+        # 4. Find weakest link
+        weakest_link = None
+        if category_scores:
+            weakest_category = min(category_scores, key=category_scores.get)
+            weakest_lifeline = next((l for l in lifelines if l.category == weakest_category), None)
+            if weakest_lifeline:
+                weakest_link = {
+                    'category': weakest_category,
+                    'hours_remaining': weakest_lifeline.hours_remaining,
+                    'limiting_factor': weakest_lifeline.limiting_factor,
+                    'score': weakest_lifeline.score
                 }
-            }
 
-            # 8. Save to history
-            history_id = self._save_history(conn, station_id, config, result, calc_duration)
-            result['audit']['history_id'] = history_id
+        # 5. Generate recommendations
+        recommendations = self._generate_recommendations(lifelines, config)
 
-            return result
+        # 6. Build result
+        calc_duration = (datetime.now() - start_time).total_seconds() * 1000
 
-        finally:
-            self._close_connection(conn)
+        result = {
+            'system': 'CIRS',
+            'version': '2.0',
+            'station_id': station_id,
+            'calculated_at': datetime.now().isoformat(),
+            'rules_version': self.RULES_VERSION,
+            'context': {
+                'isolation_target_days': config['isolation_target_days'],
+                'isolation_target_hours': target_hours,
+                'population': {
+                    'total': population,
+                    'label': config.get('population_label', '收容人數'),
+                    'special_needs': json.loads(config.get('special_needs', '{}'))
+                }
+            },
+            'score': {
+                'overall': round(overall_score, 1),
+                'status': overall_status.value,
+                'weakest_link': weakest_link,
+                'category_scores': {k: round(v, 1) for k, v in category_scores.items()},
+                'formula_applied': f"{weight_weakest} × {weakest_score:.1f} + {weight_average} × {avg_score:.1f} = {overall_score:.1f}"
+            },
+            'lifelines': [l.to_dict() for l in lifelines],
+            'recommendations': recommendations,
+            'audit': {
+                'calc_duration_ms': round(calc_duration, 1),
+                'calc_mode': mode
+            }
+        }
+
+        return result
 
     # =========================================================================
     # Category Calculation Methods
     # =========================================================================
 
-    def _calculate_water(self, conn, population: int, target_hours: float) -> Optional[CategoryResult]:
-        """計算飲水韌性"""
-        cursor = conn.cursor()
-
-        # Load inventory
-        cursor.execute("""
-            SELECT name, quantity, unit, specification
-            FROM inventory
-            WHERE category = 'water' AND quantity > 0
-        """)
-        items = list(cursor.fetchall())
+    # 各類別納入計算的庫存條件 (完整掃描與增量狀態共用)
+    LIFELINE_FILTERS = {
+        'WATER': "category = 'water' AND quantity > 0",
+        'FOOD': "category = 'food' AND quantity > 0",
+        'POWER': ("(category = 'power' OR category = 'equipment')"
+                  " AND (LOWER(name) LIKE '%電%' OR LOWER(name) LIKE '%發電%' OR LOWER(name) LIKE '%電源%')"
+                  " AND quantity > 0"),
+        'MEDICAL': "category = 'medical' AND quantity > 0",
+    }
+
+    def _item_contribution(self, lifeline: str, item) -> tuple:
+        """
+        單一品項對類別的貢獻 (使用預先換算的 capacity_* 欄位, 見 services/capacity.py)
 
-        if not items and population == 0:
-            return None
+        Returns:
+            (amount, detail, flags): amount 為公升 / kcal / 供電小時，
+            detail 為儀表板明細 (None = 不列出)，flags 為醫療必備品標記
+        """
+        name = item['name'] or ''
+        qty = item['quantity'] or 0
 
-        # Calculate total capacity (liters)
-        total_liters = 0.0
-        inventory_items = []
-        for item in items:
-            spec = item['specification'] or ''
-            volume_per_unit = self._parse_volume(spec) or 0.6  # Default 600ml
-            item_total = (item['quantity'] or 0) * volume_per_unit
-            total_liters += item_total
-            inventory_items.append({
+        if lifeline == 'WATER':
+            volume_per_unit = self._capacity(item, 'capacity_liters') or 0
+            item_total = qty * volume_per_unit
+            return item_total, {
                 'name': item['name'],
                 'quantity': item['quantity'],
                 'unit': item['unit'],
                 'capacity_total': round(item_total, 1),
                 'capacity_unit': 'L'
-            })
+            }, {}
+
+        if lifeline == 'FOOD':
+            calories_per_unit = self._capacity(item, 'capacity_kcal') or 0
+            item_total = qty * calories_per_unit
+            return item_total, {
+                'name': item['name'],
+                'quantity': item['quantity'],
+                'unit': item['unit'],
+                'calories_total': round(item_total, 0),
+                'calories_unit': 'kcal'
+            }, {}
+
+        if lifeline == 'POWER':
+            # capacity_wh 僅電源站 / 行動電源 / 發電機有值
+            capacity_wh = (self._capacity(item, 'capacity_wh') or 0) * qty
+            if not capacity_wh:
+                return 0.0, None, {}
+
+            hours = capacity_wh / POWER_LOAD_WATTS
+            if is_battery(name):
+                source_type, capacity = 'BATTERY', f"{capacity_wh} Wh"
+            else:
+                source_type, capacity = 'GENERATOR', f"{hours * GENERATOR_FUEL_RATE}L 燃油"
+            return hours, {
+                'name': f"{name} ×{qty}" if qty > 1 else name,
+                'type': source_type,
+                'capacity': capacity,
+                'hours': round(hours, 1)
+            }, {}
+
+        # MEDICAL: check essential items
+        return 0.0, {
+            'name': name,
+            'quantity': qty,
+            'unit': item['unit']
+        }, {
+            'firstaid': int('急救' in name or 'firstaid' in name.lower()),
+            'masks': int('口罩' in name)
+        }
+
+    def _capacity(self, item, column: str) -> Optional[float]:
+        """讀取單位容量; 欄位為 NULL (未經 API 寫入的資料列) 時才即時解析"""
+        value = item[column]
+        if value is None:
+            value = compute_capacities(item['name'], item['category'], item['specification'])[column]
+        return value
+
+    def _lifeline_case(self) -> str:
+        """CASE 運算式: 依 LIFELINE_FILTERS 回傳品項所屬類別 (不屬於任何類別為 NULL)"""
+        return " ".join(
+            f"WHEN {condition} THEN '{lifeline}'" for lifeline, condition in self.LIFELINE_FILTERS.items()
+        )
+
+    def _scan_entries(self, conn, lifeline: str) -> Dict:
+        """逐筆掃描庫存換算 {(0, item_id): (amount, detail, flags)}"""
+        cursor = conn.execute(f"""
+            SELECT id, name, category, quantity, unit, specification,
+                   capacity_liters, capacity_kcal, capacity_wh
+            FROM inventory
+            WHERE {self.LIFELINE_FILTERS[lifeline]}
+            ORDER BY id
+        """)
+        return {(0, item['id']): self._item_contribution(lifeline, item) for item in cursor.fetchall()}
+
+    def _scan_aggregate(self, conn, lifeline: str) -> tuple:
+        """完整模式: (total, details, item_count, flags)"""
+        return self._aggregate_entries(self._scan_entries(conn, lifeline))
+
+    def _water_lifeline(self, total_liters: float, inventory_items: List[Dict], item_count: int,
+                        population: int, target_hours: float) -> Optional[CategoryResult]:
+        """計算飲水韌性"""
+        if not item_count and population == 0:
+            return None
 
         # Consumption: 3L per person per day
         daily_consumption = population * 3.0 if population > 0 else 0
@@ -324,53 +460,12 @@ class CIRSResilienceEngine:
             recommendation=recommendation
         )
 
-    def _calculate_food(self, conn, population: int, target_hours: float) -> Optional[CategoryResult]:
+    def _food_lifeline(self, total_calories: float, inventory_items: List[Dict], item_count: int,
+                       population: int, target_hours: float) -> Optional[CategoryResult]:
         """計算糧食韌性"""
-        cursor = conn.cursor()
-
-        # Load inventory
-        cursor.execute("""
-            SELECT name, quantity, unit, specification
-            FROM inventory
-            WHERE category = 'food' AND quantity > 0
-        """)
-        items = list(cursor.fetchall())
-
-        if not items and population == 0:
+        if not item_count and population == 0:
             return None
 
-        # Estimate total calories (simplified)
-        total_calories = 0.0
-        inventory_items = []
-        for item in items:
-            spec = item['specification'] or ''
-            name = item['name'] or ''
-
-            # Try to parse calories from spec
-            calories_per_unit = self._parse_calories(spec)
-            if not calories_per_unit:
-                # Default estimates
-                if '泡麵' in name or '麵' in name:
-                    calories_per_unit = 400
-                elif '餅乾' in name:
-                    calories_per_unit = 200
-                elif '罐頭' in name:
-                    calories_per_unit = 300
-                elif '米' in name:
-                    calories_per_unit = 350  # per 100g
-                else:
-                    calories_per_unit = 300  # default
-
-            item_total = (item['quantity'] or 0) * calories_per_unit
-            total_calories += item_total
-            inventory_items.append({
-                'name': item['name'],
-                'quantity': item['quantity'],
-                'unit': item['unit'],
-                'calories_total': round(item_total, 0),
-                'calories_unit': 'kcal'
-            })
-
         # Consumption: 1800 kcal per person per day
         daily_consumption = population * 1800 if population > 0 else 0
         hourly_consumption = daily_consumption / 24 if daily_consumption > 0 else 0
@@ -418,58 +513,12 @@ class CIRSResilienceEngine:
             recommendation=recommendation
         )
 
-    def _calculate_power(self, conn, target_hours: float) -> Optional[CategoryResult]:
+    def _power_lifeline(self, total_hours: float, sources: List[Dict], item_count: int,
+                        target_hours: float) -> Optional[CategoryResult]:
         """計算電力韌性"""
-        cursor = conn.cursor()
-
-        # Load power equipment
-        cursor.execute("""
-            SELECT name, quantity, unit, specification, check_status
-            FROM inventory
-            WHERE (category = 'power' OR category = 'equipment')
-              AND (LOWER(name) LIKE '%電%' OR LOWER(name) LIKE '%發電%' OR LOWER(name) LIKE '%電源%')
-              AND quantity > 0
-        """)
-        items = list(cursor.fetchall())
-
-        if not items:
+        if not item_count:
             return None
 
-        # Simplified power calculation
-        sources = []
-        total_hours = 0.0
-
-        for item in items:
-            name = item['name'] or ''
-            qty = item['quantity'] or 0
-            spec = item['specification'] or ''
-
-            if '電源站' in name or '行動電源' in name:
-                # Assume 2000Wh capacity, 100W load
-                capacity_wh = 2000 * qty
-                load_watts = 100
-                hours = capacity_wh / load_watts if load_watts > 0 else 0
-                sources.append({
-                    'name': f"{name} ×{qty}" if qty > 1 else name,
-                    'type': 'BATTERY',
-                    'capacity': f"{capacity_wh} Wh",
-                    'hours': round(hours, 1)
-                })
-                total_hours += hours
-
-            elif '發電機' in name:
-                # Assume 50L tank, 2L/hr consumption
-                fuel_liters = 50 * qty
-                fuel_rate = 2.0
-                hours = fuel_liters / fuel_rate if fuel_rate > 0 else 0
-                sources.append({
-                    'name': f"{name} ×{qty}" if qty > 1 else name,
-                    'type': 'GENERATOR',
-                    'capacity': f"{fuel_liters}L 燃油",
-                    'hours': round(hours, 1)
-                })
-                total_hours += hours
-
         # Calculate score
         if target_hours > 0:
             score = min(100, (total_hours / target_hours) * 100)
@@ -503,40 +552,14 @@ class CIRSResilienceEngine:
             recommendation=recommendation
         )
 
-    def _calculate_medical(self, conn, population: int, target_hours: float) -> Optional[CategoryResult]:
+    def _medical_lifeline(self, inventory_items: List[Dict], item_count: int, flags: Dict,
+                          population: int, target_hours: float) -> Optional[CategoryResult]:
         """計算醫療物資韌性"""
-        cursor = conn.cursor()
-
-        # Load medical inventory
-        cursor.execute("""
-            SELECT name, quantity, unit, specification
-            FROM inventory
-            WHERE category = 'medical' AND quantity > 0
-        """)
-        items = list(cursor.fetchall())
-
-        if not items:
+        if not item_count:
             return None
 
-        # Check essential items
-        inventory_items = []
-        has_firstaid = False
-        has_masks = False
-
-        for item in items:
-            name = item['name'] or ''
-            qty = item['quantity'] or 0
-
-            if '急救' in name or 'firstaid' in name.lower():
-                has_firstaid = True
-            if '口罩' in name:
-                has_masks = True
-
-            inventory_items.append({
-                'name': name,
-                'quantity': qty,
-                'unit': item['unit']
-            })
+        has_firstaid = flags.get('firstaid', 0) > 0
+        has_masks = flags.get('masks', 0) > 0
 
         # Score based on having essential items
         base_score = 50
@@ -580,24 +603,9 @@ class CIRSResilienceEngine:
             recommendation=recommendation
         )
 
-    def _calculate_staff(self, conn, population: int, target_hours: float) -> Optional[CategoryResult]:
-        """
-        計算人力韌性 (Staff Management v1.1)
-
-        使用加權計算: ACTIVE=1.0, STANDBY=0.5
-        改用 staff_role 和 staff_status 欄位
-        """
+    def _scan_staff(self, conn) -> Dict:
+        """完整模式: 依 staff_role 加總在勤人力 (ACTIVE = 1.0, STANDBY = 0.5)"""
         cursor = conn.cursor()
-
-        # Load staffing rules
-        cursor.execute("SELECT * FROM staffing_rules WHERE is_essential = 1")
-        rules = list(cursor.fetchall())
-
-        if not rules:
-            return None
-
-        # Load current staff with weighted calculation (v1.1)
-        # ACTIVE = 1.0, STANDBY = 0.5
         cursor.execute("""
             SELECT
                 staff_role,
@@ -620,6 +628,29 @@ class CIRSResilienceEngine:
                 'standby': int((row['standby_weight'] or 0) * 2),  # Convert back to count
                 'total': row['total_count']
             }
+        return staff_data
+
+    def _calculate_staff(self, conn, population: int, target_hours: float,
+                         staff_data: Optional[Dict] = None) -> Optional[CategoryResult]:
+        """
+        計算人力韌性 (Staff Management v1.1)
+
+        使用加權計算: ACTIVE=1.0, STANDBY=0.5
+        改用 staff_role 和 staff_status 欄位
+        staff_data 未提供時以完整掃描取得
+        """
+        cursor = conn.cursor()
+
+        # Load staffing rules
+        cursor.execute("SELECT * FROM staffing_rules WHERE is_essential = 1")
+        rules = list(cursor.fetchall())
+
+        if not rules:
+            return None
+
+        # Current staff with weighted calculation (v1.1)
+        if staff_data is None:
+            staff_data = self._scan_staff(conn)
 
         # Merge MEDIC and NURSE for medical staffing requirement
         medical_effective = 0
@@ -798,7 +829,9 @@ class CIRSResilienceEngine:
             'threshold_warning': 1.0,
             'weight_weakest': 0.6,
             'weight_average': 0.4,
-            'rules_version': self.RULES_VERSION
+            'rules_version': self.RULES_VERSION,
+            'history_interval_minutes': 60,
+            'snapshot_max_age_seconds': 60
         }
 
     def _get_status(self, score: float) -> StatusLevel:
@@ -810,22 +843,6 @@ class CIRSResilienceEngine:
         else:
             return StatusLevel.CRITICAL
 
-    def _parse_volume(self, spec: str) -> Optional[float]:
-        """解析容量規格 (返回公升)"""
-        for pattern, multiplier in self.VOLUME_PATTERNS:
-            match = re.search(pattern, spec)
-            if match:
-                return float(match.group(1)) * multiplier
-        return None
-
-    def _parse_calories(self, spec: str) -> Optional[float]:
-        """解析熱量規格 (返回 kcal)"""
-        for pattern, multiplier in self.CALORIE_PATTERNS:
-            match = re.search(pattern, spec)
-            if match:
-                return float(match.group(1)) * multiplier
-        return None
-
     def _generate_recommendations(self, lifelines: List[CategoryResult], config: Dict) -> List[Dict]:
         """生成建議列表"""
         recommendations = []
@@ -847,36 +864,523 @@ class CIRSResilienceEngine:
 
         return recommendations
 
-    def _save_history(self, conn, station_id: str, config: Dict, result: Dict, duration_ms: float) -> int:
-        """儲存計算快照"""
-        cursor = conn.cursor()
+    # =========================================================================
+    # Snapshot Mode
+    # =========================================================================
+
+    # Tables whose changes can alter a calculation (cache_versions tags, migration 006)
+    INPUT_TABLES = ('inventory', 'person', 'resilience_config', 'inventory_standards', 'staffing_rules')
 
+    # station_id -> (history_id, input_hash, verified_at): snapshots verified by this process
+    _verified_snapshots: Dict[str, tuple] = {}
+    _verified_lock = threading.Lock()
+
+    def _input_fingerprint(self, conn, config: Dict):
+        """計算輸入快照與 input_hash (不含時間戳，相同輸入得相同雜湊)"""
         input_snapshot = {
             'population': config.get('population_count', 0),
             'target_days': config.get('isolation_target_days', 3),
-            'special_needs': json.loads(config.get('special_needs', '{}')),
-            'timestamp': datetime.now().isoformat()
+            'special_needs': json.loads(config.get('special_needs') or '{}'),
+            'weights': [config.get('weight_weakest', 0.6), config.get('weight_average', 0.4)],
+            'rules_version': self.RULES_VERSION,
         }
 
+        try:
+            placeholders = ','.join('?' * len(self.INPUT_TABLES))
+            cursor = conn.execute(
+                f"SELECT tag, version FROM cache_versions WHERE tag IN ({placeholders}) ORDER BY tag",
+                self.INPUT_TABLES
+            )
+            input_snapshot['data_versions'] = {row[0]: row[1] for row in cursor.fetchall()}
+        except sqlite3.OperationalError:
+            # 舊資料庫沒有 cache_versions: 無法判斷資料是否變動
+            input_snapshot['data_versions'] = None
+
+        input_json = json.dumps(input_snapshot, ensure_ascii=False, sort_keys=True)
+        input_hash = hashlib.sha256(input_json.encode()).hexdigest()
+
+        input_snapshot['timestamp'] = datetime.now().isoformat()
+        return input_snapshot, input_hash
+
+    def _latest_snapshot(self, conn, station_id: str) -> Optional[Dict]:
+        """取得最新一筆快照"""
+        cursor = conn.execute("""
+            SELECT id, input_hash, result_hash, result_snapshot, calc_timestamp
+            FROM resilience_history
+            WHERE station_id = ?
+            ORDER BY id DESC LIMIT 1
+        """, (station_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def _snapshot_reusable(self, station_id: str, latest: Dict, input_hash: str, config: Dict) -> bool:
+        """快照是否可直接回傳: 輸入相同，且本程序在 max_age 內驗證過"""
+        if latest['input_hash'] != input_hash:
+            return False
+        with self._verified_lock:
+            verified = self._verified_snapshots.get(station_id)
+        if not verified or verified[0] != latest['id'] or verified[1] != input_hash:
+            return False
+        max_age = config.get('snapshot_max_age_seconds')
+        max_age = 60 if max_age is None else max_age
+        return time.monotonic() - verified[2] < max_age
+
+    def _remember_snapshot(self, station_id: str, history_id: int, input_hash: str):
+        with self._verified_lock:
+            self._verified_snapshots[station_id] = (history_id, input_hash, time.monotonic())
+
+    def _result_hash(self, result: Dict) -> str:
+        """result_hash: 排除計算時間等每次都不同的欄位"""
+        stable = {k: v for k, v in result.items() if k not in ('calculated_at', 'audit')}
+        return hashlib.sha256(
+            json.dumps(stable, ensure_ascii=False, sort_keys=True).encode()
+        ).hexdigest()
+
+    def _persist_reason(self, latest: Optional[Dict], input_hash: str, result_hash: str,
+                        config: Dict, force_save: bool) -> Optional[str]:
+        """決定是否寫入歷史; 回傳 triggered_by 或 None"""
+        if force_save:
+            return 'MANUAL'
+        if latest is None or latest['input_hash'] != input_hash or latest['result_hash'] != result_hash:
+            return 'CHANGE'
+
+        interval = config.get('history_interval_minutes')
+        interval = 60 if interval is None else interval
+        if interval > 0 and latest['calc_timestamp']:
+            last = datetime.strptime(latest['calc_timestamp'][:19], '%Y-%m-%d %H:%M:%S')
+            if (datetime.utcnow() - last).total_seconds() >= interval * 60:
+                return 'SCHEDULE'
+        return None
+
+    def _save_history(self, conn, station_id: str, input_snapshot: Dict, input_hash: str,
+                      result: Dict, result_hash: str, duration_ms: float, triggered_by: str) -> int:
+        """儲存計算快照"""
         input_json = json.dumps(input_snapshot, ensure_ascii=False)
         result_json = json.dumps(result, ensure_ascii=False)
+        args = (station_id, input_json, result_json, input_hash, result_hash, duration_ms, triggered_by)
 
-        input_hash = hashlib.sha256(input_json.encode()).hexdigest()
-        result_hash = hashlib.sha256(result_json.encode()).hexdigest()
+        if self.writer:
+            return self.writer(self._insert_history, *args)
+        history_id = self._insert_history(conn, *args)
+        conn.commit()
+        return history_id
 
-        cursor.execute("""
+    def _insert_history(self, conn, station_id: str, input_json: str, result_json: str,
+                        input_hash: str, result_hash: str, duration_ms: float, triggered_by: str) -> int:
+        cursor = conn.execute("""
             INSERT INTO resilience_history (
                 station_id, input_snapshot, result_snapshot, rules_version,
                 input_hash, result_hash, calc_duration_ms, triggered_by
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             station_id, input_json, result_json, self.RULES_VERSION,
-            input_hash, result_hash, round(duration_ms), 'MANUAL'
+            input_hash, result_hash, round(duration_ms), triggered_by
         ))
-
-        conn.commit()
         return cursor.lastrowid
 
+    # =========================================================================
+    # Incremental Mode
+    # =========================================================================
+    # inventory 觸發器只把變動的品項寫入 resilience_dirty (migration 008)；
+    # 計算前重新換算這些品項，並把差值累加到 resilience_totals。
+    # 各類別數值因此是 O(類別數)，品項明細則直接讀取已換算的 JSON。
+
+    DRAIN_CHUNK = 500
+    _drain_lock = threading.Lock()
+
+    def _drain_dirty(self, conn) -> bool:
+        """套用待處理的品項變更; 回傳 False 表示增量狀態不可用"""
+        try:
+            if conn.execute("SELECT 1 FROM resilience_dirty LIMIT 1").fetchone() is None:
+                return True
+        except sqlite3.OperationalError:
+            return False
+
+        if self.writer:
+            return self.writer(self._drain_pending)
+        return self._drain_pending(conn)
+
+    def _drain_pending(self, conn) -> bool:
+        """在寫入連線上套用 resilience_dirty (自行開交易，或在既有交易內用 SAVEPOINT)"""
+        own_txn = not conn.in_transaction
+        with self._drain_lock:
+            try:
+                if own_txn:
+                    conn.execute("BEGIN IMMEDIATE")
+                else:
+                    conn.execute("SAVEPOINT resilience_drain")
+                self._apply_pending(conn)
+                if own_txn:
+                    conn.commit()
+                else:
+                    conn.execute("RELEASE resilience_drain")
+            except sqlite3.OperationalError:
+                # 例如寫入鎖逾時: 本次改用完整掃描，待處理項目留待下次
+                if own_txn:
+                    conn.rollback()
+                else:
+                    conn.execute("ROLLBACK TO resilience_drain")
+                    conn.execute("RELEASE resilience_drain")
+                return False
+        return True
+
+    def _apply_pending(self, conn) -> int:
+        """逐批重新換算 resilience_dirty 中的品項 (呼叫端負責交易)"""
+        case = self._lifeline_case()
+        processed = 0
+
+        while True:
+            ids = [row[0] for row in conn.execute(
+                "SELECT item_id FROM resilience_dirty LIMIT ?", (self.DRAIN_CHUNK,)
+            ).fetchall()]
+            if not ids:
+                return processed
+
+            placeholders = ','.join('?' * len(ids))
+            deltas = defaultdict(float)
+
+            # Remove previous contributions
+            for row in conn.execute(
+                f"SELECT * FROM resilience_item_state WHERE item_id IN ({placeholders})", ids
+            ).fetchall():
+                lifeline = row['lifeline']
+                deltas[f"{lifeline}.amount"] -= row['amount']
+                deltas[f"{lifeline}.items"] -= 1
+                deltas[f"{lifeline}.firstaid"] -= row['firstaid']
+                deltas[f"{lifeline}.masks"] -= row['masks']
+
+            # Add current contributions
+            states = []
+            for item in conn.execute(f"""
+                SELECT id, name, category, quantity, unit, specification,
+                       capacity_liters, capacity_kcal, capacity_wh, CASE {case} END AS lifeline
+                FROM inventory WHERE id IN ({placeholders})
+            """, ids).fetchall():
+                lifeline = item['lifeline']
+                if lifeline is None:
+                    continue
+                amount, detail, flags = self._item_contribution(lifeline, item)
+                deltas[f"{lifeline}.amount"] += amount
+                deltas[f"{lifeline}.items"] += 1
+                deltas[f"{lifeline}.firstaid"] += flags.get('firstaid', 0)
+                deltas[f"{lifeline}.masks"] += flags.get('masks', 0)
+                states.append((
+                    item['id'], lifeline, amount,
+                    json.dumps(detail, ensure_ascii=False) if detail is not None else None,
+                    flags.get('firstaid', 0), flags.get('masks', 0)
+                ))
+
+            conn.execute(f"DELETE FROM resilience_item_state WHERE item_id IN ({placeholders})", ids)
+            conn.executemany("""
+                INSERT INTO resilience_item_state (item_id, lifeline, amount, detail, firstaid, masks)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, states)
+            conn.executemany("""
+                INSERT INTO resilience_totals (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = value + excluded.value
+            """, [(key, delta) for key, delta in deltas.items() if delta])
+            conn.execute(f"DELETE FROM resilience_dirty WHERE item_id IN ({placeholders})", ids)
+            processed += len(ids)
+
+    def _state_aggregate(self, conn, lifeline: str) -> tuple:
+        """增量模式: 讀取累計值與已換算明細 (total, details, item_count, flags)"""
+        cursor = conn.execute(
+            "SELECT key, value FROM resilience_totals WHERE key >= ? AND key < ?",
+            (lifeline + '.', lifeline + '.\uffff')
+        )
+        totals = {row[0][len(lifeline) + 1:]: row[1] for row in cursor.fetchall()}
+
+        cursor = conn.execute("""
+            SELECT detail FROM resilience_item_state
+            WHERE lifeline = ? AND detail IS NOT NULL
+            ORDER BY item_id
+        """, (lifeline,))
+        details = [json.loads(row[0]) for row in cursor.fetchall()]
+
+        flags = {
+            'firstaid': int(round(totals.get('firstaid', 0))),
+            'masks': int(round(totals.get('masks', 0)))
+        }
+        return totals.get('amount', 0.0), details, int(round(totals.get('items', 0))), flags
+
+    def _staff_from_counters(self, conn) -> Dict:
+        """增量模式: 由 dashboard_counters (staff.<ROLE>.<STATUS>) 取得在勤人力"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for name, value in get_counters(conn, 'staff.').items():
+            role, _, status = name[len('staff.'):].rpartition('.')
+            if role and status in ('ACTIVE', 'STANDBY'):
+                counts.setdefault(role, {'ACTIVE': 0, 'STANDBY': 0})[status] = int(value or 0)
+
+        staff_data = {}
+        for role in sorted(counts):
+            active = counts[role]['ACTIVE']
+            standby = counts[role]['STANDBY']
+            if active + standby <= 0:
+                continue
+            staff_data[role] = {
+                'effective': active * 1.0 + standby * 0.5,
+                'active': active,
+                'standby': standby,
+                'total': active + standby
+            }
+        return staff_data
+
+    def rebuild_incremental_state(self) -> int:
+        """捨棄累計值並重新換算全部品項; 回傳計入的品項數"""
+        conn = self._get_connection()
+        own_txn = not conn.in_transaction
+        try:
+            with self._drain_lock:
+                if own_txn:
+                    conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM resilience_item_state")
+                conn.execute("DELETE FROM resilience_totals")
+                conn.execute("DELETE FROM resilience_dirty")
+                conn.execute("INSERT INTO resilience_dirty (item_id) SELECT id FROM inventory")
+                self._apply_pending(conn)
+                if own_txn:
+                    conn.commit()
+            return conn.execute("SELECT COUNT(*) FROM resilience_item_state").fetchone()[0]
+        except Exception:
+            if own_txn:
+                conn.rollback()
+            raise
+        finally:
+            self._close_connection(conn)
+
+    def verify(self, station_id: str = "default") -> Dict:
+        """
+        驗證模式: 分別以增量與完整重算計算，比對各類別累計值與評分
+
+        Returns:
+            {'consistent': bool, 'mismatches': [{'path', 'incremental', 'full'}]}
+        """
+        conn = self._get_connection()
+        try:
+            config = self._load_config(conn, station_id)
+            start_time = datetime.now()
+
+            incremental = self._compute_result(conn, station_id, config, start_time, mode='incremental')
+            if incremental['audit']['calc_mode'] != 'incremental':
+                return {
+                    'consistent': False,
+                    'available': False,
+                    'mismatches': [],
+                    'error': '增量狀態不可用 (尚未執行 migration 008 或資料庫忙碌)'
+                }
+            full = self._compute_result(conn, station_id, config, start_time, mode='full')
+
+            mismatches = []
+            for lifeline in self.LIFELINE_FILTERS:
+                self._diff(f"totals.{lifeline}", self._state_aggregate(conn, lifeline),
+                           self._scan_aggregate(conn, lifeline), mismatches)
+            self._diff('score', incremental['score'], full['score'], mismatches)
+            self._diff('lifelines', incremental['lifelines'], full['lifelines'], mismatches)
+
+            return {
+                'consistent': not mismatches,
+                'available': True,
+                'mismatches': mismatches,
+                'checked_at': datetime.now().isoformat()
+            }
+        finally:
+            self._close_connection(conn)
+
+    def _diff(self, path: str, incremental: Any, full: Any, out: List[Dict]):
+        """遞迴比對兩個結果 (數值容許浮點誤差)"""
+        if isinstance(incremental, dict) and isinstance(full, dict):
+            for key in sorted(set(incremental) | set(full), key=str):
+                self._diff(f"{path}.{key}", incremental.get(key), full.get(key), out)
+        elif (isinstance(incremental, (list, tuple)) and isinstance(full, (list, tuple))
+              and len(incremental) == len(full)):
+            for i, (a, b) in enumerate(zip(incremental, full)):
+                self._diff(f"{path}[{i}]", a, b, out)
+        elif isinstance(incremental, (int, float)) and isinstance(full, (int, float)):
+            if not math.isclose(incremental, full, rel_tol=1e-9, abs_tol=1e-6):
+                out.append({'path': path, 'incremental': incremental, 'full': full})
+        elif incremental != full:
+            out.append({'path': path, 'incremental': incremental, 'full': full})
+
+    # =========================================================================
+    # What-If Simulation
+    # =========================================================================
+    # 完全唯讀: 以目前庫存的逐品項貢獻為基準，在記憶體中套用設定覆寫與
+    # 庫存 / 人力增減，不寫入 resilience_config / resilience_history。
+
+    def simulate(self, station_id: str, scenarios: List[Dict]) -> List[Dict]:
+        """
+        批次模擬 (What-If)
+
+        Args:
+            station_id: 站點 ID
+            scenarios: [{
+                'population': 收容人數覆寫,
+                'target_days': 隔離天數覆寫,
+                'inventory_adjustments': [{'item_id', 'quantity'} 增減既有品項,
+                                          或 {'name', 'category', 'quantity', ...} 假設新增品項],
+                'staff_adjustments': {'MEDIC': +2, ...} 在勤 (ACTIVE) 人數增減
+            }]
+
+        Returns:
+            每個場景一份完整韌性結果 (simulated = True)
+        """
+        conn = self._get_connection()
+        try:
+            config = self._load_config(conn, station_id)
+            base_items, mode = self._simulation_base(conn)
+            base_staff = self._staff_from_counters(conn) if mode == 'incremental' else self._scan_staff(conn)
+
+            results = []
+            for scenario in scenarios:
+                start_time = datetime.now()
+
+                sim_config = dict(config)
+                if scenario.get('population') is not None:
+                    sim_config['population_count'] = scenario['population']
+                if scenario.get('target_days') is not None:
+                    sim_config['isolation_target_days'] = scenario['target_days']
+
+                items = self._adjust_items(conn, base_items, scenario.get('inventory_adjustments') or [])
+                staff_data = self._adjust_staff(base_staff, scenario.get('staff_adjustments') or {})
+                aggregates = {lifeline: self._aggregate_entries(entries) for lifeline, entries in items.items()}
+
+                result = self._build_result(conn, station_id, sim_config, aggregates, staff_data, start_time, mode)
+                result['simulated'] = True
+                result['simulation_params'] = scenario
+                results.append(result)
+            return results
+        finally:
+            self._close_connection(conn)
+
+    def _simulation_base(self, conn) -> tuple:
+        """
+        逐品項貢獻 {lifeline: {(0, item_id): (amount, detail, flags)}}
+
+        增量狀態為最新時直接讀取 (不需解析)，否則完整掃描; 兩者皆不寫入。
+        """
+        try:
+            pending = conn.execute("SELECT 1 FROM resilience_dirty LIMIT 1").fetchone()
+        except sqlite3.OperationalError:
+            pending = True
+
+        if not pending:
+            items = {lifeline: {} for lifeline in self.LIFELINE_FILTERS}
+            cursor = conn.execute("""
+                SELECT item_id, lifeline, amount, detail, firstaid, masks
+                FROM resilience_item_state ORDER BY item_id
+            """)
+            for row in cursor.fetchall():
+                items[row['lifeline']][(0, row['item_id'])] = (
+                    row['amount'],
+                    json.loads(row['detail']) if row['detail'] is not None else None,
+                    {'firstaid': row['firstaid'], 'masks': row['masks']}
+                )
+            return items, 'incremental'
+
+        return {lifeline: self._scan_entries(conn, lifeline) for lifeline in self.LIFELINE_FILTERS}, 'full'
+
+    def _adjust_items(self, conn, base_items: Dict, adjustments: List[Dict]) -> Dict:
+        """套用庫存增減 (只複製受影響的類別)"""
+        items = dict(base_items)
+        touched = set()
+
+        def writable(lifeline):
+            if lifeline not in touched:
+                items[lifeline] = dict(items[lifeline])
+                touched.add(lifeline)
+            return items[lifeline]
+
+        # Existing items: sum deltas per item_id
+        deltas: Dict[int, float] = {}
+        new_items = []
+        for adjustment in adjustments:
+            if adjustment.get('item_id') is not None:
+                item_id = adjustment['item_id']
+                deltas[item_id] = deltas.get(item_id, 0) + (adjustment.get('quantity') or 0)
+            else:
+                if not adjustment.get('name') or not adjustment.get('category'):
+                    raise ValueError("新增品項需提供 name 與 category")
+                new_items.append(adjustment)
+
+        for item_id, delta in deltas.items():
+            row = conn.execute("""
+                SELECT id, name, category, quantity, unit, specification,
+                       capacity_liters, capacity_kcal, capacity_wh
+                FROM inventory WHERE id = ?
+            """, (item_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Inventory item {item_id} not found")
+
+            key = (0, item_id)
+            for lifeline, entries in items.items():
+                if key in entries:
+                    del writable(lifeline)[key]
+
+            item = dict(row)
+            item['quantity'] = max(0, (item['quantity'] or 0) + delta)
+            lifeline = self._classify(conn, item)
+            if lifeline:
+                writable(lifeline)[key] = self._item_contribution(lifeline, item)
+
+        for n, adjustment in enumerate(new_items):
+            item = {
+                'name': adjustment['name'],
+                'category': adjustment['category'],
+                'quantity': adjustment.get('quantity') or 0,
+                'unit': adjustment.get('unit'),
+                'specification': adjustment.get('specification'),
+            }
+            item.update(compute_capacities(item['name'], item['category'], item['specification']))
+            lifeline = self._classify(conn, item)
+            if lifeline:
+                writable(lifeline)[(1, n)] = self._item_contribution(lifeline, item)
+
+        # Keep inventory order (existing items by id, then hypothetical ones)
+        for lifeline in touched:
+            items[lifeline] = dict(sorted(items[lifeline].items()))
+        return items
+
+    def _adjust_staff(self, base_staff: Dict, adjustments: Dict[str, int]) -> Dict:
+        """套用在勤人數增減 (ACTIVE 權重 1.0)"""
+        if not adjustments:
+            return base_staff
+
+        staff_data = {}
+        for role in sorted(set(base_staff) | set(adjustments)):
+            current = base_staff.get(role, {'active': 0, 'standby': 0})
+            active = max(0, current['active'] + adjustments.get(role, 0))
+            standby = current['standby']
+            if active + standby <= 0:
+                continue
+            staff_data[role] = {
+                'effective': active * 1.0 + standby * 0.5,
+                'active': active,
+                'standby': standby,
+                'total': active + standby
+            }
+        return staff_data
+
+    def _aggregate_entries(self, entries: Dict) -> tuple:
+        """(total, details, item_count, flags)，與 _scan_aggregate 相同格式"""
+        total = 0.0
+        details = []
+        flags = {'firstaid': 0, 'masks': 0}
+        for amount, detail, item_flags in entries.values():
+            total += amount
+            if detail is not None:
+                details.append(detail)
+            for key, value in item_flags.items():
+                flags[key] += value
+        return total, details, len(entries), flags
+
+    def _classify(self, conn, item: Dict) -> Optional[str]:
+        """以 LIFELINE_FILTERS 判斷品項類別 (與 SQL 掃描條件一致)"""
+        row = conn.execute(
+            f"SELECT CASE {self._lifeline_case()} END FROM (SELECT ? AS name, ? AS category, ? AS quantity)",
+            (item['name'], item['category'], item['quantity'])
+        ).fetchone()
+        return row[0]
+
     # =========================================================================
     # Configuration API Methods
     # =========================================================================
@@ -908,8 +1412,9 @@ class CIRSResilienceEngine:
                 INSERT OR REPLACE INTO resilience_config (
                     station_id, isolation_target_days, population_count,
                     population_label, special_needs, threshold_safe, threshold_warning,
-                    weight_weakest, weight_average, rules_version, updated_at, updated_by
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    weight_weakest, weight_average, rules_version, updated_at, updated_by,
+                    history_interval_minutes, snapshot_max_age_seconds
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 station_id,
                 current.get('isolation_target_days', 3),
@@ -922,7 +1427,9 @@ class CIRSResilienceEngine:
                 current.get('weight_average', 0.4),
                 self.RULES_VERSION,
                 current.get('updated_at'),
-                updates.get('updated_by', 'SYSTEM')
+                updates.get('updated_by', 'SYSTEM'),
+                current.get('history_interval_minutes', 60),
+                current.get('snapshot_max_age_seconds', 60)
             ))
 
             conn.commit()
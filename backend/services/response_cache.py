@@ -0,0 +1,125 @@
+"""
+CIRS Response Cache
+In-process cache for polled read-only endpoints (Portal status screens).
+
+Entries are keyed by endpoint + params and tagged with the tables they read.
+Migration 006 keeps a version per table in `cache_versions`, bumped by
+triggers on every write, so an entry is fresh exactly while the versions it
+was built from are unchanged - whichever route (or satellite/logistics sync)
+did the write.
+
+Responses carry an ETag; a poll whose If-None-Match still matches gets a
+304 with no body.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+
+from database import db_read
+
+
+class ResponseCache:
+    """LRU of serialized JSON responses validated against table versions"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+
+    def lookup(self, conn, key: str, tags: Sequence[str], build: Callable, ttl: Optional[float]) -> dict:
+        """Return a fresh entry for key, rebuilding it with build(conn) if stale"""
+        placeholders = ",".join("?" * len(tags))
+        cursor = conn.execute(
+            f"SELECT tag, version FROM cache_versions WHERE tag IN ({placeholders})", tuple(tags)
+        )
+        versions = tuple(sorted((row[0], row[1]) for row in cursor.fetchall()))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expired = ttl is not None and now - entry["created"] > ttl
+                if entry["versions"] == versions and not expired:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry
+                self._stats["invalidations"] += 1
+            self._stats["misses"] += 1
+
+        body = json.dumps(build(conn), ensure_ascii=False, default=str).encode("utf-8")
+        entry = {
+            "versions": versions,
+            "body": body,
+            "etag": '"' + hashlib.sha1(body).hexdigest()[:20] + '"',
+            "created": now,
+        }
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+response_cache = ResponseCache()
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+async def cached_json(
+    request: Request,
+    endpoint: str,
+    tags: Sequence[str],
+    build: Callable,
+    params: Tuple = (),
+    ttl: Optional[float] = None,
+) -> Response:
+    """
+    Serve build(conn) through the response cache.
+
+    tags: tables the response depends on (must exist in cache_versions)
+    ttl:  optional max age in seconds for responses that also depend on time
+    """
+    key = endpoint + "?" + json.dumps(params, default=str)
+    entry = await db_read(response_cache.lookup, key, tuple(tags), build, ttl)
+
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+
+def get_cache_stats() -> Dict:
+    """Hit/miss metrics for /api/system/cache"""
+    return response_cache.stats()
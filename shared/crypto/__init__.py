@@ -9,7 +9,7 @@ Provides cryptographic primitives for the Store-and-Forward protocol:
 
 from .signing import Ed25519Signer, Ed25519Verifier, generate_keypair
 from .encryption import SealedBox
-from .hmac import compute_hmac, verify_hmac
+from .hmac import compute_hmac, verify_hmac, canonical_json, StationKey
 
 __all__ = [
     'Ed25519Signer',
@@ -17,7 +17,9 @@ __all__ = [
     'generate_keypair',
     'SealedBox',
     'compute_hmac',
-    'verify_hmac'
+    'verify_hmac',
+    'canonical_json',
+    'StationKey'
 ]
 
 __version__ = '1.8.0'
@@ -29,6 +29,30 @@ def generate_station_secret() -> str:
     return base64.b64encode(secret).decode('utf-8')
 
 
+def canonical_json(data: dict) -> bytes:
+    """
+    Canonical JSON form that HMACs are computed over.
+
+    Compact separators, sorted keys, UTF-8. Callers that also need a hash of
+    the payload (Hub dedup) should reuse these bytes instead of serializing
+    the report a second time.
+    """
+    return json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def report_signable_bytes(report: dict) -> bytes:
+    """Canonical bytes of a report without its 'hmac' field."""
+    return canonical_json({k: v for k, v in report.items() if k != 'hmac'})
+
+
+def _to_bytes(data: Union[str, bytes, dict]) -> bytes:
+    if isinstance(data, dict):
+        return canonical_json(data)
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return data
+
+
 def compute_hmac(secret_b64: str, data: Union[str, bytes, dict]) -> str:
     """
     Compute HMAC-SHA256 of data.
@@ -43,14 +67,8 @@ def compute_hmac(secret_b64: str, data: Union[str, bytes, dict]) -> str:
     # Decode secret
     secret = base64.b64decode(secret_b64)
 
-    # Serialize data
-    if isinstance(data, dict):
-        data = json.dumps(data, separators=(',', ':'), sort_keys=True)
-    if isinstance(data, str):
-        data = data.encode('utf-8')
-
     # Compute HMAC
-    h = hmac.new(secret, data, hashlib.sha256)
+    h = hmac.new(secret, _to_bytes(data), hashlib.sha256)
 
     return base64.b64encode(h.digest()).decode('utf-8')
 
@@ -118,6 +136,36 @@ def verify_report_hmac(secret_b64: str, report: dict) -> bool:
     return verify_hmac(secret_b64, to_verify, hmac_value)
 
 
+class StationKey:
+    """
+    A station secret decoded once, with a pre-keyed HMAC-SHA256 state.
+
+    Hub keeps one per station instead of base64-decoding the secret and
+    re-keying HMAC for every packet. Safe to share between threads.
+    """
+
+    __slots__ = ('_mac',)
+
+    def __init__(self, secret_b64: str):
+        """
+        Args:
+            secret_b64: Base64-encoded station secret
+        """
+        self._mac = hmac.new(base64.b64decode(secret_b64), digestmod=hashlib.sha256)
+
+    def sign(self, data: Union[str, bytes, dict]) -> str:
+        """Base64 HMAC of data (same result as compute_hmac)."""
+        h = self._mac.copy()
+        h.update(_to_bytes(data))
+        return base64.b64encode(h.digest()).decode('utf-8')
+
+    def verify(self, data: Union[str, bytes, dict], hmac_b64) -> bool:
+        """Constant-time check of a Base64 HMAC (False for non-string values)."""
+        if not isinstance(hmac_b64, str):
+            return False
+        return hmac.compare_digest(self.sign(data), hmac_b64)
+
+
 class StationAuthenticator:
     """
     Helper class for Station to add authentication to reports.
@@ -148,11 +196,11 @@ class HubVerifier:
 
     def __init__(self):
         """Initialize with empty station secrets map."""
-        self._secrets = {}  # station_id -> secret_b64
+        self._secrets = {}  # station_id -> StationKey
 
     def register_station(self, station_id: str, secret_b64: str):
         """Register a station's secret."""
-        self._secrets[station_id] = secret_b64
+        self._secrets[station_id] = StationKey(secret_b64)
 
     def provision_station(self, station_id: str) -> str:
         """
@@ -162,7 +210,7 @@ class HubVerifier:
             str: The generated secret (give this to Station securely)
         """
         secret = generate_station_secret()
-        self._secrets[station_id] = secret
+        self._secrets[station_id] = StationKey(secret)
         return secret
 
     def verify_report(self, report: dict) -> bool:
@@ -179,11 +227,11 @@ class HubVerifier:
         if not station_id:
             return False
 
-        secret = self._secrets.get(station_id)
-        if not secret:
+        key = self._secrets.get(station_id)
+        if not key or 'hmac' not in report:
             return False
 
-        return verify_report_hmac(secret, report)
+        return key.verify(report_signable_bytes(report), report['hmac'])
 
 
 if __name__ == '__main__':
@@ -7,12 +7,13 @@ Provides packet building and parsing for the Store-and-Forward protocol:
 - QR chunking for large payloads
 """
 
-from .chunking import QRChunker, QRReassembler
+from .chunking import QRChunker, QRChunkerV2, QRReassembler
 from .manifest import ManifestBuilder, RestockManifest
 from .report import ReportBuilder, ReportPacket, ReportDecryptor
 
 __all__ = [
     'QRChunker',
+    'QRChunkerV2',
     'QRReassembler',
     'ManifestBuilder',
     'RestockManifest',
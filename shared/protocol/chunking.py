@@ -8,6 +8,17 @@ Constraints:
 - Format: xIRS|{seq}/{total}|{chunk_data}
 - Header overhead: ~15 bytes
 
+v2 format (QRChunkerV2):
+- XIRS2:{packet_id}:{seq}/{k}/{n}:{length}:{flags}:{data}
+- packet_id: first 4 bytes of SHA-256 of the framed stream (8 hex digits),
+  keeps chunks of different packets apart and checks the reassembled data
+- flags: 'A' = Base45 data (QR alphanumeric mode, ~23% fewer QR bits than
+  Base64 in byte mode), 'B' = raw bytes after the header (QR byte mode);
+  'Z' = stream is zlib-compressed
+- k data chunks + (n - k) Reed-Solomon parity chunks: any k of n rebuild
+  the payload (see fec.py)
+- QRReassembler accepts both formats
+
 Usage:
     # Chunking (Station side)
     chunker = QRChunker(max_chunk_size=800)
@@ -24,10 +35,19 @@ Usage:
 """
 
 import base64
+import hashlib
 import json
-from typing import List, Optional, Tuple, Union
+import zlib
+from itertools import combinations, islice
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol.fec import rs_encode, rs_decode, MAX_BLOCKS
+
 
 # Protocol constants
 PROTOCOL_PREFIX = "xIRS"
@@ -35,14 +55,77 @@ CHUNK_SEPARATOR = "|"
 MAX_CHUNK_SIZE = 800  # bytes, Base64 encoded
 HEADER_OVERHEAD = 20  # "xIRS|99/99|" = ~11 chars, leave buffer
 
+# v2
+V2_PREFIX = "XIRS2"
+V2_SEPARATOR = ":"
+V2_HEADER_OVERHEAD = 40  # "XIRS2:0123ABCD:255/255/255:9999999:AZ:" = 38 chars
+V2_MAX_CHUNK_SIZE = 1150  # alphanumeric chars; same QR bit budget as an 800-char v1 chunk
+MODE_ALPHANUMERIC = "A"
+MODE_BYTE = "B"
+FLAG_COMPRESSED = "Z"
+BASE45_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_VALUES = {c: i for i, c in enumerate(BASE45_CHARSET)}
+
 
 @dataclass
 class ChunkInfo:
     """Information about a single chunk."""
     sequence: int
     total: int
-    data: str
-    raw: str
+    data: Union[str, bytes]  # v1: Base64 text, v2: decoded block
+    raw: Union[str, bytes]
+    version: int = 1
+    packet_id: Optional[str] = None
+    data_chunks: int = 0     # v2: k (chunks needed); v1: same as total
+    length: int = 0          # v2: stream length before block padding
+    flags: str = ""
+
+    def __post_init__(self):
+        if not self.data_chunks:
+            self.data_chunks = self.total
+
+    @property
+    def packet_key(self) -> tuple:
+        """Fields every chunk of the same packet shares."""
+        return (self.version, self.packet_id, self.data_chunks, self.total, self.length, self.flags)
+
+
+def base45_encode(data: bytes) -> str:
+    """RFC 9285 Base45 (QR alphanumeric charset)."""
+    out = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] * 256 + data[i + 1]
+        n, c = divmod(n, 45)
+        e, d = divmod(n, 45)
+        out.append(BASE45_CHARSET[c] + BASE45_CHARSET[d] + BASE45_CHARSET[e])
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        out.append(BASE45_CHARSET[c] + BASE45_CHARSET[d])
+    return "".join(out)
+
+
+def base45_decode(text: str) -> bytes:
+    """Inverse of base45_encode (ValueError on invalid input)."""
+    try:
+        values = [_BASE45_VALUES[c] for c in text]
+    except KeyError as e:
+        raise ValueError(f"Invalid Base45 character: {e}")
+    if len(values) % 3 == 1:
+        raise ValueError("Invalid Base45 length")
+    out = bytearray()
+    for i in range(0, len(values), 3):
+        group = values[i:i + 3]
+        if len(group) == 3:
+            n = group[0] + group[1] * 45 + group[2] * 2025
+            if n > 0xFFFF:
+                raise ValueError("Invalid Base45 group")
+            out += n.to_bytes(2, 'big')
+        else:
+            n = group[0] + group[1] * 45
+            if n > 0xFF:
+                raise ValueError("Invalid Base45 group")
+            out.append(n)
+    return bytes(out)
 
 
 class QRChunker:
@@ -115,11 +198,120 @@ class QRChunker:
         return result
 
 
+class QRChunkerV2:
+    """
+    Splits payloads into v2 chunks: compressed, alphanumeric or byte mode,
+    with optional Reed-Solomon parity chunks.
+    """
+
+    def __init__(self, max_chunk_size: Optional[int] = None, mode: str = MODE_ALPHANUMERIC,
+                 parity: int = 0, compress: bool = True):
+        """
+        Initialize chunker.
+
+        Args:
+            max_chunk_size: Maximum characters (alphanumeric) or bytes (byte mode) per chunk,
+                default V2_MAX_CHUNK_SIZE / MAX_CHUNK_SIZE
+            mode: MODE_ALPHANUMERIC (str chunks) or MODE_BYTE (bytes chunks)
+            parity: Number of parity chunks; any `total - parity` chunks rebuild the payload
+            compress: zlib-compress the payload when that makes it smaller
+        """
+        if mode not in (MODE_ALPHANUMERIC, MODE_BYTE):
+            raise ValueError(f"Unknown mode: {mode}")
+        if max_chunk_size is None:
+            max_chunk_size = V2_MAX_CHUNK_SIZE if mode == MODE_ALPHANUMERIC else MAX_CHUNK_SIZE
+        if max_chunk_size <= V2_HEADER_OVERHEAD + 3:
+            raise ValueError("max_chunk_size too small for the v2 header")
+        self.max_chunk_size = max_chunk_size
+        self.mode = mode
+        self.parity = parity
+        self.compress = compress
+        capacity = max_chunk_size - V2_HEADER_OVERHEAD
+        # Base45: 3 characters per 2 bytes
+        self.max_block_size = (capacity // 3) * 2 if mode == MODE_ALPHANUMERIC else capacity
+
+    def chunk(self, payload: Union[str, bytes, dict]) -> List[Union[str, bytes]]:
+        """
+        Split payload into chunks.
+
+        Args:
+            payload: Data to chunk (str, bytes, or dict -> JSON)
+
+        Returns:
+            List: n chunks (str in alphanumeric mode, bytes in byte mode)
+        """
+        if isinstance(payload, dict):
+            payload = json.dumps(payload, separators=(',', ':'))
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+
+        flags = self.mode
+        stream = payload
+        if self.compress:
+            compressed = zlib.compress(payload, 9)
+            if len(compressed) < len(payload):
+                stream = compressed
+                flags += FLAG_COMPRESSED
+
+        k = max(1, -(-len(stream) // self.max_block_size))
+        if k + self.parity > MAX_BLOCKS:
+            raise ValueError(f"Payload needs {k} chunks + {self.parity} parity (limit {MAX_BLOCKS})")
+        block_size = -(-len(stream) // k)
+        padded = stream.ljust(block_size * k, b'\0')
+        blocks = [padded[i * block_size:(i + 1) * block_size] for i in range(k)]
+        blocks += rs_encode(blocks, self.parity)
+
+        packet_id = hashlib.sha256(stream).hexdigest()[:8].upper()
+        n = len(blocks)
+        chunks = []
+        for seq, block in enumerate(blocks, 1):
+            header = V2_SEPARATOR.join([V2_PREFIX, packet_id, f"{seq}/{k}/{n}", str(len(stream)), flags, ""])
+            if self.mode == MODE_ALPHANUMERIC:
+                chunks.append(header + base45_encode(block))
+            else:
+                chunks.append(header.encode('ascii') + block)
+        return chunks
+
+
+def decode_v2(header: ChunkInfo, blocks: Dict[int, bytes]) -> bytes:
+    """
+    Rebuild a v2 payload from any `header.data_chunks` of its blocks.
+
+    Args:
+        header: Any parsed chunk of the packet (for k, n, length, flags, packet_id)
+        blocks: sequence -> block
+
+    Raises:
+        ValueError: Too few blocks, or the result fails the packet_id check
+    """
+    k = header.data_chunks
+    data = rs_decode({seq - 1: block for seq, block in blocks.items()}, k)
+    stream = b''.join(data)[:header.length]
+    if hashlib.sha256(stream).hexdigest()[:8].upper() != header.packet_id:
+        raise ValueError(f"Packet {header.packet_id} failed its checksum")
+    if FLAG_COMPRESSED in header.flags:
+        try:
+            return zlib.decompress(stream)
+        except zlib.error as e:
+            raise ValueError(f"Packet {header.packet_id} failed to decompress: {e}")
+    return stream
+
+
 class QRReassembler:
     """
     Reassembles chunks back into original payload.
+
+    Accepts v1 (xIRS|seq/total|) and v2 (XIRS2:...) chunks; one instance
+    collects one packet, chunks of any other packet are ignored.
+
+    A packet that fails to decode (a damaged chunk) does not end the
+    reassembly: further chunks are accepted and each one is retried
+    together with the chunks already held (v2: up to MAX_DECODE_ATTEMPTS
+    k-subsets that include the new chunk). last_error says why it failed.
     """
 
+    MAX_DECODE_ATTEMPTS = 64
+
     def __init__(self):
         """Initialize reassembler with empty buffer."""
         self.reset()
@@ -129,37 +321,47 @@ class QRReassembler:
         self._chunks = {}
         self._total = None
         self._complete = False
+        self._header = None  # first chunk's ChunkInfo
+        self._payload = None
+        self._error = None
 
     @property
     def is_complete(self) -> bool:
         """Check if all chunks received."""
         return self._complete
 
+    @property
+    def last_error(self) -> Optional[str]:
+        """Why the last decode attempt failed (None if it did not)."""
+        return self._error
+
     @property
     def progress(self) -> Tuple[int, int]:
         """Get progress as (received, total)."""
         if self._total is None:
             return (len(self._chunks), 0)
-        return (len(self._chunks), self._total)
+        return (len(self._chunks), self._header.data_chunks)
 
     @property
     def missing_sequences(self) -> List[int]:
         """Get list of missing chunk sequence numbers."""
-        if self._total is None:
+        if self._total is None or self._complete:
             return []
         all_seqs = set(range(1, self._total + 1))
         received = set(self._chunks.keys())
         return sorted(all_seqs - received)
 
-    def add_chunk(self, chunk_str: str) -> Optional[bytes]:
+    def add_chunk(self, chunk_str: Union[str, bytes]) -> Optional[bytes]:
         """
         Add a chunk to the buffer.
 
         Args:
-            chunk_str: Raw chunk string from QR code
+            chunk_str: Raw chunk string from QR code (bytes for v2 byte mode)
 
         Returns:
             bytes: Complete payload if all chunks received, None otherwise
+            (also while enough chunks are held but they fail to decode,
+            see last_error)
         """
         if self._complete:
             return None
@@ -172,22 +374,34 @@ class QRReassembler:
         # Validate consistency
         if self._total is None:
             self._total = info.total
-        elif self._total != info.total:
-            # Inconsistent total, might be different packet
+            self._header = info
+        elif self._header.packet_key != info.packet_key:
+            # Inconsistent total / packet id, different packet
             return None
 
         # Store chunk
         self._chunks[info.sequence] = info.data
 
-        # Check if complete
-        if len(self._chunks) == self._total:
-            self._complete = True
-            return self._reassemble()
+        # Check if complete (v2: any k of n)
+        if len(self._chunks) < info.data_chunks:
+            return None
+        try:
+            payload = self._reassemble(info.sequence)
+        except ValueError as e:
+            # Damaged chunk: keep collecting, parity chunks / rescans may fix it
+            self._error = str(e)
+            return None
 
-        return None
+        self._complete = True
+        self._error = None
+        self._payload = payload
+        return payload
 
-    def _reassemble(self) -> bytes:
+    def _reassemble(self, newest: int) -> bytes:
         """Reassemble all chunks into original payload."""
+        if self._header.version == 2:
+            return self._decode_v2(newest)
+
         # Concatenate in order
         parts = []
         for i in range(1, self._total + 1):
@@ -198,11 +412,26 @@ class QRReassembler:
         # Decode Base64
         return base64.b64decode(full_b64)
 
+    def _decode_v2(self, newest: int) -> bytes:
+        """Decode from exactly k chunks; after a failure, retry k-subsets with the newest chunk"""
+        k = self._header.data_chunks
+        if len(self._chunks) == k:
+            return decode_v2(self._header, self._chunks)
+
+        others = sorted(seq for seq in self._chunks if seq != newest)
+        error = None
+        for subset in islice(combinations(others, k - 1), self.MAX_DECODE_ATTEMPTS):
+            blocks = {seq: self._chunks[seq] for seq in subset}
+            blocks[newest] = self._chunks[newest]
+            try:
+                return decode_v2(self._header, blocks)
+            except ValueError as e:
+                error = e
+        raise error
+
     def get_payload(self) -> Optional[bytes]:
         """Get reassembled payload if complete."""
-        if self._complete:
-            return self._reassemble()
-        return None
+        return self._payload
 
     def get_payload_json(self) -> Optional[dict]:
         """Get reassembled payload as JSON if complete."""
@@ -212,16 +441,19 @@ class QRReassembler:
         return None
 
 
-def parse_chunk(chunk_str: str) -> Optional[ChunkInfo]:
+def parse_chunk(chunk_str: Union[str, bytes]) -> Optional[ChunkInfo]:
     """
     Parse a chunk string.
 
     Args:
-        chunk_str: Raw chunk string (e.g., "xIRS|1/3|abc123...")
+        chunk_str: Raw chunk string (e.g., "xIRS|1/3|abc123..." or "XIRS2:...")
 
     Returns:
         ChunkInfo or None if invalid
     """
+    if isinstance(chunk_str, bytes) or chunk_str.startswith(V2_PREFIX + V2_SEPARATOR):
+        return _parse_chunk_v2(chunk_str)
+
     try:
         parts = chunk_str.split(CHUNK_SEPARATOR, 2)
 
@@ -254,9 +486,53 @@ def parse_chunk(chunk_str: str) -> Optional[ChunkInfo]:
         return None
 
 
-def is_xirs_chunk(data: str) -> bool:
+def _parse_chunk_v2(chunk: Union[str, bytes]) -> Optional[ChunkInfo]:
+    try:
+        parts = (chunk.split(V2_SEPARATOR.encode('ascii'), 5) if isinstance(chunk, bytes)
+                 else chunk.split(V2_SEPARATOR, 5))
+        if len(parts) != 6:
+            return None
+        data = parts[5]
+        prefix, packet_id, seq_info, length, flags = (
+            p.decode('ascii') if isinstance(p, bytes) else p for p in parts[:5]
+        )
+        if prefix != V2_PREFIX or len(packet_id) != 8:
+            return None
+
+        sequence, k, n = (int(v) for v in seq_info.split('/'))
+        if not (1 <= k <= n <= MAX_BLOCKS and 1 <= sequence <= n):
+            return None
+
+        mode = flags[:1]
+        if mode == MODE_ALPHANUMERIC and isinstance(data, str):
+            block = base45_decode(data)
+        elif mode == MODE_BYTE and isinstance(data, bytes):
+            block = data
+        else:
+            return None
+
+        return ChunkInfo(
+            sequence=sequence,
+            total=n,
+            data=block,
+            raw=chunk,
+            version=2,
+            packet_id=packet_id,
+            data_chunks=k,
+            length=int(length),
+            flags=flags
+        )
+
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def is_xirs_chunk(data: Union[str, bytes]) -> bool:
     """Check if a string looks like an xIRS chunk."""
-    return data.startswith(f"{PROTOCOL_PREFIX}{CHUNK_SEPARATOR}")
+    if isinstance(data, bytes):
+        return data.startswith(f"{V2_PREFIX}{V2_SEPARATOR}".encode('ascii'))
+    return (data.startswith(f"{PROTOCOL_PREFIX}{CHUNK_SEPARATOR}")
+            or data.startswith(f"{V2_PREFIX}{V2_SEPARATOR}"))
 
 
 if __name__ == '__main__':
@@ -316,3 +592,12 @@ if __name__ == '__main__':
         info = parse_chunk(chunk)
         result = reassembler.add_chunk(chunk)
         print(f"Added chunk {info.sequence}/{info.total}, complete: {result is not None}")
+
+    # v2: compressed, alphanumeric, 2 parity chunks
+    print("\n=== v2 Parity Test ===")
+    v2_chunks = QRChunkerV2(max_chunk_size=100, parity=2).chunk(large)
+    print(f"v1 chunks: {len(large_chunks)}, v2 chunks: {len(v2_chunks)} (2 parity)")
+    reassembler.reset()
+    for chunk in v2_chunks[2:]:  # first two QR codes unreadable
+        result = reassembler.add_chunk(chunk)
+    print(f"Rebuilt without chunks 1-2, match original: {json.loads(result) == large}")
@@ -0,0 +1,162 @@
+"""
+Reed-Solomon Erasure Coding Module for xIRS v1.8
+
+Forward error correction for v2 QR chunk sets: k equal-length data blocks
+plus m parity blocks, any k of the k + m blocks rebuild the data. Lets a
+Runner skip an unreadable QR code instead of rescanning the whole set.
+
+Systematic Cauchy code over GF(2^8) (polynomial 0x11d): data blocks are sent
+as-is, parity block j is sum_i C[j][i] * D[i] with C[j][i] = 1 / (x_j + y_i),
+x_j = k + j, y_i = i. Every square submatrix of a Cauchy matrix is
+invertible, so any set of k blocks is decodable. Limit: k + m <= 256.
+
+Block arithmetic uses bytes.translate with per-constant multiplication
+tables and big-int XOR, so cost is O(k * m) block operations, not per byte
+Python loops.
+
+Usage:
+    parity = rs_encode(blocks, 2)                # blocks: k equal-length bytes
+    blocks = rs_decode({0: b0, 3: p1, ...}, k)   # any k of index -> block
+"""
+
+from typing import Dict, List
+
+GF_POLY = 0x11d
+MAX_BLOCKS = 256
+
+_EXP = [0] * 512
+_LOG = [0] * 256
+_value = 1
+for _power in range(255):
+    _EXP[_power] = _value
+    _LOG[_value] = _power
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= GF_POLY
+for _power in range(255, 512):
+    _EXP[_power] = _EXP[_power - 255]
+
+_MUL_TABLES: Dict[int, bytes] = {}
+
+
+def gf_mul(a: int, b: int) -> int:
+    """Multiply two GF(2^8) elements."""
+    if a == 0 or b == 0:
+        return 0
+    return _EXP[_LOG[a] + _LOG[b]]
+
+
+def gf_inv(a: int) -> int:
+    """Multiplicative inverse in GF(2^8)."""
+    if a == 0:
+        raise ZeroDivisionError("0 has no inverse in GF(256)")
+    return _EXP[255 - _LOG[a]]
+
+
+def _mul_table(c: int) -> bytes:
+    table = _MUL_TABLES.get(c)
+    if table is None:
+        table = bytes(gf_mul(c, x) for x in range(256))
+        _MUL_TABLES[c] = table
+    return table
+
+
+def _combine(coefficients: List[int], blocks: List[bytes], length: int) -> bytes:
+    """sum_i coefficients[i] * blocks[i] (addition is XOR)"""
+    acc = 0
+    for c, block in zip(coefficients, blocks):
+        if c:
+            acc ^= int.from_bytes(block if c == 1 else block.translate(_mul_table(c)), 'little')
+    return acc.to_bytes(length, 'little')
+
+
+def _cauchy(j: int, i: int, k: int) -> int:
+    return gf_inv((k + j) ^ i)
+
+
+def _invert(matrix: List[List[int]]) -> List[List[int]]:
+    """Gauss-Jordan inverse of a square GF(2^8) matrix."""
+    size = len(matrix)
+    rows = [list(row) + [1 if r == c else 0 for c in range(size)] for r, row in enumerate(matrix)]
+    for col in range(size):
+        pivot = next((r for r in range(col, size) if rows[r][col]), None)
+        if pivot is None:
+            raise ValueError("Singular matrix")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        scale = gf_inv(rows[col][col])
+        rows[col] = [gf_mul(scale, v) for v in rows[col]]
+        for r in range(size):
+            factor = rows[r][col]
+            if r != col and factor:
+                rows[r] = [v ^ gf_mul(factor, p) for v, p in zip(rows[r], rows[col])]
+    return [row[size:] for row in rows]
+
+
+def rs_encode(blocks: List[bytes], parity: int) -> List[bytes]:
+    """
+    Compute parity blocks.
+
+    Args:
+        blocks: k data blocks, all the same length
+        parity: Number of parity blocks m (k + m <= 256)
+
+    Returns:
+        List[bytes]: m parity blocks
+    """
+    k = len(blocks)
+    if k + parity > MAX_BLOCKS:
+        raise ValueError(f"Too many blocks: {k} data + {parity} parity > {MAX_BLOCKS}")
+    length = len(blocks[0]) if blocks else 0
+    if any(len(block) != length for block in blocks):
+        raise ValueError("Data blocks must have equal length")
+    return [_combine([_cauchy(j, i, k) for i in range(k)], blocks, length) for j in range(parity)]
+
+
+def rs_decode(received: Dict[int, bytes], k: int) -> List[bytes]:
+    """
+    Rebuild the k data blocks from any k received blocks.
+
+    Args:
+        received: block index -> block (0..k-1 data, k.. parity)
+        k: Number of data blocks
+
+    Returns:
+        List[bytes]: The k data blocks in order
+    """
+    if len(received) < k:
+        raise ValueError(f"Need {k} blocks, have {len(received)}")
+    lengths = {len(block) for block in received.values()}
+    if len(lengths) != 1:
+        raise ValueError("Blocks must have equal length")
+    length = lengths.pop()
+
+    data = {i: received[i] for i in range(k) if i in received}
+    missing = [i for i in range(k) if i not in data]
+    if not missing:
+        return [data[i] for i in range(k)]
+
+    parity_rows = sorted(index - k for index in received if index >= k)[:len(missing)]
+    known = sorted(data)
+    # Move the known data blocks to the right-hand side of each parity equation
+    rhs = [
+        _combine([1] + [_cauchy(j, i, k) for i in known], [received[k + j]] + [data[i] for i in known], length)
+        for j in parity_rows
+    ]
+    inverse = _invert([[_cauchy(j, i, k) for i in missing] for j in parity_rows])
+    for row, i in zip(inverse, missing):
+        data[i] = _combine(row, rhs, length)
+    return [data[i] for i in range(k)]
+
+
+if __name__ == '__main__':
+    import os
+    import random
+
+    print("=== Reed-Solomon Erasure Test ===")
+    k, m = 10, 3
+    blocks = [os.urandom(500) for _ in range(k)]
+    all_blocks = blocks + rs_encode(blocks, m)
+    for trial in range(5):
+        keep = random.sample(range(k + m), k)
+        recovered = rs_decode({i: all_blocks[i] for i in keep}, k)
+        print(f"Kept {sorted(keep)}: match {recovered == blocks}")